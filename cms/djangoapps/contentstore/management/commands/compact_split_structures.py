@@ -0,0 +1,80 @@
+"""
+Command to migrate the structures of the split modulestore to the deduplicated format,
+and to delete the block entries which are no longer used by any structure.
+"""
+
+
+import logging
+
+from django.core.management.base import BaseCommand
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+
+log = logging.getLogger(__name__)
+
+# To run from command line: ./manage.py cms compact_split_structures --deduplicate --delete-unreferenced
+
+
+class Command(BaseCommand):
+    """
+    Compacts the storage of the structures of the split modulestore.
+
+    With --deduplicate, structures in the full format, where each structure contains all
+    of its blocks, are rewritten in the deduplicated format, where each block is stored
+    once and shared by all the structures which contain it.  Structures are read in either
+    format, so this can be run at any time, and stopped and resumed.
+
+    With --delete-unreferenced, the stored blocks which are no longer used by any structure,
+    such as after pruning old structures (see scripts/structures_pruning), are deleted.
+    Blocks referenced by a structure written within the last hour are kept, so this can be
+    run while courses are being edited.
+    """
+    help = "Compacts the storage of the structures of the split modulestore."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--deduplicate',
+            action='store_true',
+            help='Rewrite the structures in the full format in the deduplicated format.',
+        )
+        parser.add_argument(
+            '--delete-unreferenced',
+            action='store_true',
+            help='Delete the stored blocks which are not used by any structure.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='The number of structures read at once when deduplicating.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the number of structures to deduplicate and of blocks to delete.',
+        )
+
+    def handle(self, *args, **options):
+        # pylint: disable=protected-access
+        db_connection = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.split).db_connection
+
+        if options['deduplicate']:
+            if options['dry_run']:
+                num_structures = db_connection.structures.count_documents({'blocks': {'$exists': True}})
+                log.info('%d structures would be deduplicated.', num_structures)
+            else:
+                num_structures = 0
+                for num_structures, structure_id in enumerate(
+                    db_connection.deduplicate_structures(options['batch_size']), start=1
+                ):
+                    log.debug('Deduplicated structure %s.', structure_id)
+                log.info('Deduplicated %d structures.', num_structures)
+
+        if options['delete_unreferenced']:
+            cutoff = db_connection.unreferenced_block_entry_cutoff()
+            block_hashes = db_connection.find_unreferenced_block_entries(cutoff)
+            if options['dry_run']:
+                log.info('%d unreferenced blocks would be deleted.', len(block_hashes))
+            else:
+                log.info('Deleted %d unreferenced blocks.', db_connection.delete_block_entries(block_hashes, cutoff))
@@ -3,11 +3,13 @@ Script for exporting all courseware from Mongo to a directory and listing the co
 """
 
 
+import os
+
 from django.core.management.base import BaseCommand
 
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
-from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_exporter import export_course_to_tarball, export_course_to_xml
 
 
 class Command(BaseCommand):
@@ -18,12 +20,17 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('output_path')
+        parser.add_argument(
+            '--tarball',
+            action='store_true',
+            help='Export each course to a gzipped tarball in the output path, instead of to a directory.',
+        )
 
     def handle(self, *args, **options):
         """
         Execute the command
         """
-        courses, failed_export_courses = export_courses_to_output_path(options['output_path'])
+        courses, failed_export_courses = export_courses_to_output_path(options['output_path'], options['tarball'])
 
         print("=" * 80)
         print("=" * 30 + "> Export summary")
@@ -34,9 +41,11 @@ class Command(BaseCommand):
         print("=" * 80)
 
 
-def export_courses_to_output_path(output_path):
+def export_courses_to_output_path(output_path, tarball=False):
     """
     Export all courses to target directory and return the list of courses which failed to export
+
+    If tarball is True, each course is exported to a gzipped tarball in the target directory.
     """
     content_store = contentstore()
     module_store = modulestore()
@@ -51,7 +60,11 @@ def export_courses_to_output_path(output_path):
         print(f"Exporting course id = {course_id} to {output_path}")
         try:
             course_dir = str(course_id).replace('/', '...')
-            export_course_to_xml(module_store, content_store, course_id, root_dir, course_dir)
+            if tarball:
+                with open(os.path.join(root_dir, course_dir + '.tar.gz'), 'wb') as tarball_file:
+                    export_course_to_tarball(module_store, content_store, course_id, course_dir, tarball_file)
+            else:
+                export_course_to_xml(module_store, content_store, course_id, root_dir, course_dir)
         except Exception as err:  # pylint: disable=broad-except
             failed_export_courses.append(str(course_id))
             print("=" * 30 + f"> Oops, failed to export {course_id}")
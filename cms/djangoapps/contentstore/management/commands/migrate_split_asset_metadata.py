@@ -0,0 +1,76 @@
+"""
+Command to copy the asset metadata of the courses and libraries of the split modulestore
+from their structures to the asset metadata index.
+"""
+
+
+import itertools
+import logging
+
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.keys import CourseKey
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+
+log = logging.getLogger(__name__)
+
+# To run from command line: ./manage.py cms migrate_split_asset_metadata [course_key ...]
+
+
+class Command(BaseCommand):
+    """
+    Copies the asset metadata kept in the assets field of the structures of the split modulestore
+    to its asset_metadata collection, where the metadata of each asset is stored on its own and
+    indexed by course branch, asset type and filename.
+
+    The asset metadata of each branch of each course is replaced by that of the current version of
+    its structure, so this can be run again to copy the assets which changed in the meantime.  Enable
+    the asset_metadata_index option of the split modulestore once this has been run.
+    """
+    help = "Copies the asset metadata of the split modulestore from the structures to the asset metadata index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'course_keys',
+            nargs='*',
+            help='The courses and libraries whose asset metadata to copy, all of them if none are given.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the number of assets to copy.',
+        )
+
+    def handle(self, *args, **options):
+        # pylint: disable=protected-access
+        split_store = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.split)
+        db_connection = split_store.db_connection
+        if not options['dry_run']:
+            db_connection.ensure_indexes()
+
+        course_keys = [CourseKey.from_string(course_key) for course_key in options['course_keys']]
+        num_assets = 0
+        for course_index in db_connection.find_matching_course_indexes(course_keys=course_keys or None):
+            for branch, version_guid in course_index['versions'].items():
+                if branch == ModuleStoreEnum.BranchName.library:
+                    course_key = split_store._create_library_locator(course_index, branch)
+                else:
+                    course_key = split_store._create_course_locator(course_index, branch)
+                structure = db_connection.get_structure(version_guid, course_key)
+                if structure is None:
+                    log.warning('Structure %s of %s was not found; skipping it.', version_guid, course_key)
+                    continue
+
+                asset_docs = list(itertools.chain.from_iterable(structure.get('assets', {}).values()))
+                num_assets += len(asset_docs)
+                if options['dry_run']:
+                    continue
+                db_connection.delete_asset_metadata(course_key)
+                db_connection.save_asset_metadata_list(course_key, asset_docs)
+                log.debug('Copied the metadata of %d assets of %s.', len(asset_docs), course_key)
+
+        if options['dry_run']:
+            log.info('The metadata of %d assets would be copied.', num_assets)
+        else:
+            log.info('Copied the metadata of %d assets.', num_assets)
@@ -0,0 +1,37 @@
+"""
+Management command to precompute the contexts of the randomized problems of courses.
+This is done automatically when Studio publishes a course for which the
+contentstore.prewarm_problem_contexts flag is enabled, but this command can be used
+to do it manually, for instance before an assignment deadline.
+
+Should be invoked from the Studio process.
+"""
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.keys import CourseKey
+
+from ...problem_contexts import prewarm_problem_contexts
+
+
+class Command(BaseCommand):
+    """
+    Invoke with:
+
+        python manage.py cms prewarm_problem_contexts <course_key> [<course_key> ...] [--max-seconds <seconds>]
+    """
+    help = "Executes the scripts of the problems of the courses for all their seeds, caching their contexts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_keys', nargs='+')
+        parser.add_argument(
+            '--max-seconds',
+            type=float,
+            help='Skip the problems whose scripts would take longer than this to execute for all their seeds.',
+        )
+
+    def handle(self, *args, **options):
+        for course_key in options['course_keys']:
+            reports = prewarm_problem_contexts(CourseKey.from_string(course_key), options['max_seconds'])
+            for report in reports:
+                self.stdout.write(
+                    '{usage_key}: {status} {num_seeds} seeds in {duration:.2f}s, {num_errors} errors'.format(**report)
+                )
@@ -0,0 +1,54 @@
+"""
+Tests for the compact_split_structures management command
+"""
+
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import BlockFactory, CourseFactory
+
+
+class TestCompactSplitStructures(ModuleStoreTestCase):
+    """
+    Tests for the compact_split_structures management command
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        self.chapter = BlockFactory.create(category='chapter', parent_location=self.course.location)
+        # pylint: disable=protected-access
+        self.db_connection = self.store._get_modulestore_by_type(ModuleStoreEnum.Type.split).db_connection
+
+    def test_deduplicate(self):
+        assert self.db_connection.structures.count_documents({'blocks': {'$exists': True}}) > 0
+
+        call_command('compact_split_structures', '--deduplicate', '--dry-run')
+        assert self.db_connection.structures.count_documents({'block_hashes': {'$exists': True}}) == 0
+
+        call_command('compact_split_structures', '--deduplicate', '--batch-size', '1')
+        assert self.db_connection.structures.count_documents({'blocks': {'$exists': True}}) == 0
+        self.db_connection.block_entry_cache.clear()
+        course = self.store.get_course(self.course.id)
+        assert course.children == [self.chapter.location]
+
+    def test_delete_unreferenced(self):
+        call_command('compact_split_structures', '--deduplicate')
+        num_block_entries = self.db_connection.structure_blocks.count_documents({})
+
+        call_command('compact_split_structures', '--delete-unreferenced')
+        assert self.db_connection.structure_blocks.count_documents({}) == num_block_entries
+
+        self.db_connection.structures.delete_many({})
+        call_command('compact_split_structures', '--delete-unreferenced')
+        # The blocks referenced within the grace period are kept.
+        assert self.db_connection.structure_blocks.count_documents({}) == num_block_entries
+        with patch.object(self.db_connection, 'BLOCK_ENTRY_GRACE_PERIOD', timedelta(seconds=-1)):
+            call_command('compact_split_structures', '--delete-unreferenced', '--dry-run')
+            assert self.db_connection.structure_blocks.count_documents({}) == num_block_entries
+            call_command('compact_split_structures', '--delete-unreferenced')
+        assert self.db_connection.structure_blocks.count_documents({}) == 0
@@ -0,0 +1,51 @@
+"""
+Tests for the migrate_split_asset_metadata management command
+"""
+
+
+from django.core.management import call_command
+
+from xmodule.assetstore import AssetMetadata
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+
+class TestMigrateSplitAssetMetadata(ModuleStoreTestCase):
+    """
+    Tests for the migrate_split_asset_metadata management command
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        self.asset_key = self.course.id.make_asset_key('asset', 'burnside.jpg')
+        self.store.save_asset_metadata(
+            AssetMetadata(self.asset_key, pathname='pictures', locked=True), ModuleStoreEnum.UserID.test
+        )
+        # pylint: disable=protected-access
+        self.split_store = self.store._get_modulestore_by_type(ModuleStoreEnum.Type.split)
+        self.addCleanup(setattr, self.split_store, 'asset_metadata_index', False)
+
+    def _indexed_filenames(self, branch):
+        """
+        Returns the filenames of the assets of the given branch of the course in the asset metadata index.
+        """
+        return [
+            asset_doc['filename']
+            for asset_doc in self.split_store.db_connection.find_asset_metadata_list(self.course.id.for_branch(branch))
+        ]
+
+    def test_migrate(self):
+        call_command('migrate_split_asset_metadata', '--dry-run')
+        assert self._indexed_filenames(ModuleStoreEnum.BranchName.draft) == []
+
+        call_command('migrate_split_asset_metadata', str(self.course.id))
+        assert self._indexed_filenames(ModuleStoreEnum.BranchName.draft) == ['burnside.jpg']
+        assert self._indexed_filenames(ModuleStoreEnum.BranchName.published) == ['burnside.jpg']
+
+        self.split_store.asset_metadata_index = True
+        asset_md = self.store.find_asset_metadata(self.asset_key)
+        assert asset_md.pathname == 'pictures'
+        assert asset_md.locked
+        all_assets = self.store.get_all_asset_metadata(self.course.id, None)
+        assert [asset.asset_id.path for asset in all_assets] == ['burnside.jpg']
@@ -0,0 +1,88 @@
+"""
+Tests for the prewarm_problem_contexts management command
+"""
+
+
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+
+from xmodule.capa.safe_exec import safe_exec_many
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import BlockFactory, CourseFactory
+
+SCRIPT_PROBLEM = """
+<problem>
+    <script type="loncapa/python">
+x = random.randint(1, 1000)
+    </script>
+    <stringresponse answer="$x">
+        <textline/>
+    </stringresponse>
+</problem>
+"""
+
+
+class TestPrewarmProblemContexts(ModuleStoreTestCase):
+    """
+    Tests for the prewarm_problem_contexts management command
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        self.problem = BlockFactory.create(
+            parent=self.course,
+            category='problem',
+            data=SCRIPT_PROBLEM,
+            metadata={'rerandomize': 'per_student'},
+        )
+        BlockFactory.create(parent=self.course, category='problem', data='<problem><p>No script</p></problem>')
+
+    def _prewarm(self, *args):
+        """
+        Runs the command for the course, and returns the jobs executed and its output.
+        """
+        out = StringIO()
+        with mock.patch(
+            'cms.djangoapps.contentstore.problem_contexts.safe_exec_many', wraps=safe_exec_many
+        ) as mock_safe_exec_many:
+            call_command('prewarm_problem_contexts', str(self.course.id), *args, stdout=out)
+        jobs = [job for call in mock_safe_exec_many.call_args_list for job in call.args[0]]
+        return jobs, out.getvalue()
+
+    def test_prewarm(self):
+        jobs, output = self._prewarm()
+        assert sorted(seed for _, _, seed in jobs) == list(range(20))
+        assert all('x' in globals_dict for _, globals_dict, _ in jobs)
+        assert f'{self.problem.location}: prewarmed 20 seeds' in output
+
+    def test_skip_expensive_problems(self):
+        jobs, output = self._prewarm('--max-seconds', '0')
+        assert len(jobs) == 1
+        assert f'{self.problem.location}: skipped 20 seeds' in output
+
+    def test_stop_after_max_seconds(self):
+        # A course with the script problem alone, whose first seed is fast enough, as if it was cached,
+        # but whose first batch of the next seeds isn't.
+        self.course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        self.problem = BlockFactory.create(
+            parent=self.course,
+            category='problem',
+            data=SCRIPT_PROBLEM,
+            metadata={'rerandomize': 'per_student'},
+        )
+        with mock.patch('cms.djangoapps.contentstore.problem_contexts.SEEDS_PER_BATCH', 5), mock.patch(
+            'cms.djangoapps.contentstore.problem_contexts.perf_counter', side_effect=[0, 0.01, 30, 30]
+        ):
+            jobs, output = self._prewarm('--max-seconds', '25')
+        assert len(jobs) == 6
+        assert f'{self.problem.location}: stopped 20 seeds' in output
+
+    def test_contexts_do_not_expire(self):
+        with mock.patch('cms.djangoapps.contentstore.problem_contexts.cache', wraps=cache) as mock_cache:
+            self._prewarm()
+        assert mock_cache.set.call_count == 20
+        assert all(call.kwargs['timeout'] is None for call in mock_cache.set.call_args_list)
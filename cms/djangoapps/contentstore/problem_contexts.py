@@ -0,0 +1,114 @@
+"""
+Precomputes the contexts of the randomized problems of courses.
+
+The scripts of a capa problem are executed in the sandbox the first time a student
+with a given seed views it, and the resulting context is cached.  Unless the scripts
+use the anonymous id of the student, the context only depends on the seed, and each
+problem has a limited number of possible seeds, so all its contexts can be computed
+when the course is published instead of while students wait.
+
+The contexts are cached in the default cache of Studio, so Studio and the LMS must share
+the same default cache, with the same KEY_PREFIX, for the LMS to find them.
+"""
+import logging
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openedx.core.lib.cache_utils import CacheService
+from xmodule.capa.safe_exec import safe_exec_many
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+
+log = logging.getLogger(__name__)
+
+# The number of seeds of a problem whose scripts are executed in the same sandbox.
+SEEDS_PER_BATCH = 20
+
+
+class PrewarmedContextCache(CacheService):
+    """
+    The cache of the precomputed contexts, which keeps them for
+    settings.PROBLEM_CONTEXT_PREWARMING_CACHE_TIMEOUT rather than for the default
+    timeout of the cache, so that they are still cached when students view the problems.
+    """
+    def set(self, key, value, *args, **kwargs):
+        kwargs.setdefault('timeout', settings.PROBLEM_CONTEXT_PREWARMING_CACHE_TIMEOUT)
+        return super().set(key, value, *args, **kwargs)
+
+
+def prewarm_problem_contexts(course_key, max_seconds=None):
+    """
+    Executes the scripts of the published problems of the course for all the seeds they
+    can be given, caching the contexts as the LMS does when students view the problems.
+
+    A problem is skipped when executing its scripts for its first seed shows that executing
+    them for all its seeds would take longer than `max_seconds`, which defaults to
+    settings.PROBLEM_CONTEXT_PREWARMING_MAX_SECONDS.  As the context of the first seed may
+    already be cached, the scripts are also no longer executed for the remaining seeds of a
+    problem once `max_seconds` have been spent on it.
+
+    Returns a list with a dict for each problem with Python scripts, with the keys:
+        'usage_key': the usage key of the problem.
+        'num_seeds': the number of seeds of the problem.
+        'num_errors': the number of seeds for which the scripts raised an exception.
+        'duration': the time spent executing the scripts, in seconds.
+        'status': 'prewarmed', 'skipped' if the scripts are too expensive, 'stopped' if
+            `max_seconds` were spent before all the seeds were prewarmed, or 'failed'.
+    """
+    if max_seconds is None:
+        max_seconds = settings.PROBLEM_CONTEXT_PREWARMING_MAX_SECONDS
+
+    store = modulestore()
+    with store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+        problems = store.get_items(course_key, qualifiers={'category': 'problem'})
+
+    safe_exec_cache = PrewarmedContextCache(cache)
+    reports = []
+    for problem in problems:
+        start_time = perf_counter()
+        try:
+            context_jobs = problem.get_context_jobs(problem.get_possible_seeds(), safe_exec_cache)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Could not load the scripts of problem %s.", problem.location)
+            reports.append(_report(problem, 0, 0, perf_counter() - start_time, 'failed'))
+            continue
+        if context_jobs is None:
+            continue
+
+        jobs, safe_exec_options = context_jobs
+        # Execute the scripts for the first seed alone, to estimate the time needed for all of them.
+        exceptions = safe_exec_many(jobs[:1], **safe_exec_options)
+        if (perf_counter() - start_time) * len(jobs) > max_seconds:
+            status = 'skipped'
+        else:
+            status = 'prewarmed'
+            for start in range(1, len(jobs), SEEDS_PER_BATCH):
+                exceptions += safe_exec_many(jobs[start:start + SEEDS_PER_BATCH], **safe_exec_options)
+                if start + SEEDS_PER_BATCH < len(jobs) and perf_counter() - start_time > max_seconds:
+                    status = 'stopped'
+                    break
+
+        num_errors = sum(exception is not None for exception in exceptions)
+        report = _report(problem, len(jobs), num_errors, perf_counter() - start_time, status)
+        log.info(
+            "Problem %s: %s %d seeds in %.2f seconds, with %d errors.",
+            report['usage_key'], status, report['num_seeds'], report['duration'], num_errors,
+        )
+        reports.append(report)
+
+    return reports
+
+
+def _report(problem, num_seeds, num_errors, duration, status):
+    """
+    Returns the report of the precomputation of the contexts of a problem.
+    """
+    return {
+        'usage_key': str(problem.location),
+        'num_seeds': num_seeds,
+        'num_errors': num_errors,
+        'duration': duration,
+        'status': status,
+    }
@@ -119,10 +119,12 @@ def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=
     """
     # import here, because signal is registered at startup, but items in tasks are not yet able to be loaded
     from cms.djangoapps.contentstore.tasks import (
+        prewarm_problem_contexts_task,
         update_outline_from_modulestore_task,
         update_search_index,
         update_special_exams_and_publish
     )
+    from cms.djangoapps.contentstore.toggles import prewarm_problem_contexts_enabled
 
     # DEVELOPER README: probably all tasks here should use transaction.on_commit
     # to avoid stale data, but the tasks are owned by many teams and are often
@@ -147,6 +149,10 @@ def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=
     if CoursewareSearchIndexer.indexing_is_enabled() and CourseAboutSearchIndexer.indexing_is_enabled():
         transaction.on_commit(lambda: update_search_index.delay(course_key_str, datetime.now(UTC).isoformat()))
 
+    # Precompute the contexts of the randomized problems after the data is ready
+    if prewarm_problem_contexts_enabled(course_key):
+        transaction.on_commit(lambda: prewarm_problem_contexts_task.delay(course_key_str))
+
     update_discussions_settings_from_course_task.apply_async(
         args=[course_key_str],
         countdown=settings.DISCUSSION_SETTINGS['COURSE_PUBLISH_TASK_DELAY'],
@@ -72,11 +72,17 @@ from xmodule.exceptions import SerializationError
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT, ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, InvalidProctoringProvider, ItemNotFoundError
-from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
+from xmodule.modulestore.xml_exporter import (
+    export_course_to_tarball,
+    export_course_to_xml,
+    export_library_to_tarball,
+    export_library_to_xml,
+)
 from xmodule.modulestore.xml_importer import CourseImportException, import_course_from_xml, import_library_from_xml
 from .outlines import update_outline_from_modulestore
 from .outlines_regenerate import CourseOutlineRegenerate
-from .toggles import bypass_olx_failure_enabled
+from .problem_contexts import prewarm_problem_contexts
+from .toggles import bypass_olx_failure_enabled, stream_export_tarball_enabled
 from .utils import course_import_olx_validation_is_enabled
 
 User = get_user_model()
@@ -358,17 +364,30 @@ def create_export_tarball(course_block, course_key, context, status=None):
     root_dir = path(mkdtemp())
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+        if stream_export_tarball_enabled():
+            # The export is compressed as it is written, so there is no separate compressing step.
+            LOGGER.debug('tar file being generated at %s', export_file.name)
+            if isinstance(course_key, LibraryLocator):
+                export_library_to_tarball(modulestore(), contentstore(), course_key, name, export_file)
+            else:
+                export_course_to_tarball(modulestore(), contentstore(), course_block.id, name, export_file)
+            export_file.flush()
+
+            if status:
+                status.set_state('Compressing')
+                status.increment_completed_steps()
         else:
-            export_course_to_xml(modulestore(), contentstore(), course_block.id, root_dir, name)
-
-        if status:
-            status.set_state('Compressing')
-            status.increment_completed_steps()
-        LOGGER.debug('tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+            if isinstance(course_key, LibraryLocator):
+                export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+            else:
+                export_course_to_xml(modulestore(), contentstore(), course_block.id, root_dir, name)
+
+            if status:
+                status.set_state('Compressing')
+                status.increment_completed_steps()
+            LOGGER.debug('tar file being generated at %s', export_file.name)
+            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
+                tar_file.add(root_dir / name, arcname=name)
 
     except SerializationError as exc:
         LOGGER.exception('There was an error exporting %s', course_key, exc_info=True)
@@ -766,6 +785,22 @@ def update_outline_from_modulestore_task(course_key_str: str):
         raise  # Re-raise so that errors are noted in reporting.
 
 
+@shared_task
+@set_code_owner_attribute
+def prewarm_problem_contexts_task(course_key_str):
+    """
+    Celery task that precomputes the contexts of the randomized problems of a course.
+    """
+    course_key = CourseKey.from_string(course_key_str)
+    reports = prewarm_problem_contexts(course_key)
+    LOGGER.info(
+        "Precomputed the contexts of %d of the %d problems with scripts of course %s.",
+        sum(report['status'] == 'prewarmed' for report in reports),
+        len(reports),
+        course_key_str,
+    )
+
+
 def validate_course_olx(courselike_key, course_dir, status):
     """
     Validates course olx and records the errors as an artifact.
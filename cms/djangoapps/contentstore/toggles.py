@@ -66,6 +66,28 @@ def bypass_olx_failure_enabled():
     return BYPASS_OLX_FAILURE.is_enabled()
 
 
+# .. toggle_name: contentstore.stream_export_tarball
+# .. toggle_implementation: WaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When enabled, course and library exports are written directly to the compressed export
+#   tarball, with the static assets read concurrently, instead of to a temporary directory which is then compressed.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-01-18
+STREAM_EXPORT_TARBALL = WaffleFlag(
+    f'{CONTENTSTORE_NAMESPACE}.stream_export_tarball',
+    __name__,
+    CONTENTSTORE_LOG_PREFIX,
+)
+
+
+def stream_export_tarball_enabled():
+    """
+    Check if exports are written directly to the export tarball.
+    """
+    return STREAM_EXPORT_TARBALL.is_enabled()
+
+
 # .. toggle_name: FEATURES['ENABLE_EXAM_SETTINGS_HTML_VIEW']
 # .. toggle_use_cases: open_edx
 # .. toggle_implementation: SettingDictToggle
@@ -687,3 +709,26 @@ def enable_course_optimizer(course_id):
     Returns a boolean if individualized anonymous_user_id is enabled on the course
     """
     return ENABLE_COURSE_OPTIMIZER.is_enabled(course_id)
+
+
+# .. toggle_name: contentstore.prewarm_problem_contexts
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When enabled, the scripts of the randomized problems of the course are executed for
+#   every seed the problems can be given whenever the course is published, so that their contexts are cached
+#   before students view them, instead of codejail running while the students wait.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_warning: Problems whose scripts would take longer than PROBLEM_CONTEXT_PREWARMING_MAX_SECONDS to run
+#   for all their seeds are skipped.  The contexts are cached in the default cache of Studio, which the LMS must
+#   share, with the same KEY_PREFIX, for it to use them.
+PREWARM_PROBLEM_CONTEXTS = CourseWaffleFlag(
+    f'{CONTENTSTORE_NAMESPACE}.prewarm_problem_contexts', __name__
+)
+
+
+def prewarm_problem_contexts_enabled(course_key):
+    """
+    Returns whether the contexts of the problems of the course are precomputed when it is published.
+    """
+    return PREWARM_PROBLEM_CONTEXTS.is_enabled(course_key)
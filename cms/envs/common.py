@@ -1219,6 +1219,19 @@ CODE_JAIL_REST_SERVICE_CONNECT_TIMEOUT = 0.5  # time in seconds
 # .. setting_description: Set the number of seconds CMS will wait for a response from the
 #   codejail remote service endpoint.
 CODE_JAIL_REST_SERVICE_READ_TIMEOUT = 3.5  # time in seconds
+# .. setting_name: PROBLEM_CONTEXT_PREWARMING_MAX_SECONDS
+# .. setting_default: 60
+# .. setting_description: When the contexts of the randomized problems of a course are precomputed
+#   (see the contentstore.prewarm_problem_contexts flag), the problems whose scripts would take longer
+#   than this number of seconds to execute for all their seeds are skipped.
+PROBLEM_CONTEXT_PREWARMING_MAX_SECONDS = 60
+# .. setting_name: PROBLEM_CONTEXT_PREWARMING_CACHE_TIMEOUT
+# .. setting_default: None
+# .. setting_description: The number of seconds the precomputed contexts of the randomized problems of a
+#   course are cached for (see the contentstore.prewarm_problem_contexts flag), None to cache them until
+#   they are evicted.  They are cached in the default cache, which the LMS must share with Studio, with the
+#   same KEY_PREFIX, for it to use them.
+PROBLEM_CONTEXT_PREWARMING_CACHE_TIMEOUT = None
 
 ############################ DJANGO_BUILTINS ################################
 # Change DEBUG in your environment settings files, not here
@@ -2343,6 +2356,20 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_CACHE_CODEC
+# .. setting_default: 'pickle'
+# .. setting_description: The codec with which course structures are encoded in the 'course_structure_cache'
+#     cache, either 'pickle' or 'msgpack'. Cached structures are decoded with the codec they were encoded with,
+#     so this can be changed without clearing the cache.
+COURSE_STRUCTURE_CACHE_CODEC = 'pickle'
+
+# .. setting_name: COURSE_STRUCTURE_CACHE_CHUNK_SIZE
+# .. setting_default: 1000000
+# .. setting_description: The largest size in bytes of the encoded course structures cached in a single entry of
+#     the 'course_structure_cache' cache. Larger structures are split into chunks of this size cached in separate
+#     entries, so this should be below the largest item size of the cache backend, which is 1MB for memcached.
+COURSE_STRUCTURE_CACHE_CHUNK_SIZE = 1000000
+
 ############################ OAUTH2 Provider ###################################
 
 # 5 minute expiration time for JWT id tokens issued for external API requests.
@@ -25,3 +25,13 @@ def monitor_import_failure(course_key, import_step, message=None, exception=None
 
         set_custom_attribute('course_import_failure_error_class', module_and_class)
         set_custom_attribute('course_import_failure_error_message', exc_message)
+
+
+def monitor_import_phase(import_phase, duration):
+    """
+    Helper method to add a custom parameter with the time taken by a phase of an import.
+    Arguments:
+        import_phase (str): phase of the import, such as 'static' or 'children'
+        duration (float): time taken by the phase, in seconds
+    """
+    set_custom_attribute(f'course_import_{import_phase}_seconds', round(duration, 3))
@@ -10,6 +10,7 @@ import ddt
 from completion.test_utils import CompletionWaffleTestMixin, submit_completions_for_testing
 from django.conf import settings
 from django.urls import reverse
+from edx_toggles.toggles.testutils import override_waffle_flag
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 from rest_framework.utils.serializer_helpers import ReturnList
 
@@ -25,6 +26,7 @@ from xmodule.modulestore.tests.factories import (  # lint-amnesty, pylint: disab
     ToyCourseFactory
 )
 
+from ..toggles import TRANSFORMER_TIMING_HEADER_FLAG
 from .helpers import deserialize_usage_key
 
 
@@ -287,6 +289,18 @@ class TestBlocksView(SharedModuleStoreTestCase):
             assert block_data['type'] == block_key.block_type
             assert block_data['display_name'] == (self.store.get_item(block_key).display_name or '')
 
+    def test_no_transformer_timing_header(self):
+        response = self.verify_response()
+        assert response.get('Server-Timing') is None
+
+    @override_waffle_flag(TRANSFORMER_TIMING_HEADER_FLAG, active=True)
+    def test_transformer_timing_header(self):
+        response = self.verify_response()
+        self.verify_response_block_dict(response)
+        transformer_timings = response['Server-Timing'].split(', ')
+        assert any(timing.startswith('start_date;dur=') for timing in transformer_timings)
+        assert all('desc="visited=' in timing for timing in transformer_timings)
+
     def test_return_type_param(self):
         response = self.verify_response(params={'return_type': 'list'})
         self.verify_response_block_list(response)
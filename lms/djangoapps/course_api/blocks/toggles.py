@@ -18,3 +18,15 @@ COURSE_BLOCKS_API_NAMESPACE = 'course_blocks_api'
 HIDE_ACCESS_DENIALS_FLAG = WaffleFlag(
     f'{COURSE_BLOCKS_API_NAMESPACE}.hide_access_denials', __name__
 )
+
+# .. toggle_name: course_blocks_api.transformer_timing_header
+# .. toggle_implementation: WaffleFlag
+# .. toggle_default: False
+# .. toggle_description: Waffle flag to profile the block structure transformers run for Course Blocks API requests
+#   and to report the wall time, blocks visited and blocks removed by each of them in the Server-Timing header of
+#   the response. Profiled requests are also included in the transformer profiler's histograms.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+TRANSFORMER_TIMING_HEADER_FLAG = WaffleFlag(
+    f'{COURSE_BLOCKS_API_NAMESPACE}.transformer_timing_header', __name__
+)
@@ -3,6 +3,8 @@ CourseBlocks API views
 """
 
 
+from contextlib import nullcontext
+
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.http import Http404
@@ -16,12 +18,14 @@ from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 
 from lms.djangoapps.course_goals.models import UserActivity
+from openedx.core.djangoapps.content.block_structure import profiler
 from openedx.core.lib.api.view_utils import DeveloperErrorViewMixin, view_auth_classes
 from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore.exceptions import ItemNotFoundError  # lint-amnesty, pylint: disable=wrong-import-order
 
 from .api import get_block_metadata, get_blocks
 from .forms import BlockListGetForm
+from .toggles import TRANSFORMER_TIMING_HEADER_FLAG
 from .utils import filter_discussion_xblocks_from_response
 
 
@@ -223,22 +227,28 @@ class BlocksView(DeveloperErrorViewMixin, ListAPIView):
         if not params.is_valid():
             raise ValidationError(params.errors)
 
+        report_transformer_timings = TRANSFORMER_TIMING_HEADER_FLAG.is_enabled()
         try:
-            response = Response(
-                get_blocks(
-                    request,
-                    params.cleaned_data['usage_key'],
-                    params.cleaned_data['user'],
-                    params.cleaned_data['depth'],
-                    params.cleaned_data.get('nav_depth'),
-                    params.cleaned_data['requested_fields'],
-                    params.cleaned_data.get('block_counts', []),
-                    params.cleaned_data.get('student_view_data', []),
-                    params.cleaned_data['return_type'],
-                    params.cleaned_data.get('block_types_filter', None),
-                    hide_access_denials=hide_access_denials,
+            with profiler.profiling() if report_transformer_timings else nullcontext():
+                response = Response(
+                    get_blocks(
+                        request,
+                        params.cleaned_data['usage_key'],
+                        params.cleaned_data['user'],
+                        params.cleaned_data['depth'],
+                        params.cleaned_data.get('nav_depth'),
+                        params.cleaned_data['requested_fields'],
+                        params.cleaned_data.get('block_counts', []),
+                        params.cleaned_data.get('student_view_data', []),
+                        params.cleaned_data['return_type'],
+                        params.cleaned_data.get('block_types_filter', None),
+                        hide_access_denials=hide_access_denials,
+                    )
                 )
-            )
+            if report_transformer_timings:
+                # Report the time spent in each transformer, in the
+                # order they were run.
+                response['Server-Timing'] = profiler.server_timing_header(profiler.request_records())
             # If the username is an empty string, and not None, then we are requesting
             # data about the anonymous view of a course, which can be cached. In this
             # case we add the usual caching headers to the response.
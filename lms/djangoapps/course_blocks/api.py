@@ -5,14 +5,12 @@ get_course_blocks function.
 
 
 from django.conf import settings
-from edx_when import field_data
-
 from lms.djangoapps.course_api.blocks.transformers.block_completion import BlockCompletionTransformer
 from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from openedx.features.content_type_gating.block_transformers import ContentTypeGateTransformer
 
-from .transformers import library_content, load_override_data, start_date, user_partitions, visibility
+from .transformers import date_overrides, library_content, load_override_data, start_date, user_partitions, visibility
 from .usage_info import CourseUsageInfo
 
 INDIVIDUAL_STUDENT_OVERRIDE_PROVIDER = (
@@ -45,7 +43,7 @@ def get_course_block_access_transformers(user):
         ContentTypeGateTransformer(),
         user_partitions.UserPartitionTransformer(),
         visibility.VisibilityTransformer(),
-        field_data.DateOverrideTransformer(user),
+        date_overrides.DateOverrideTransformer(user),
     ]
 
     if has_individual_student_override_provider():
@@ -110,3 +108,66 @@ def get_course_blocks(
         collected_block_structure,
         user,
     )
+
+
+def get_course_blocks_for_users(
+        users,
+        starting_block_usage_key,
+        collected_block_structure=None,
+        allow_start_dates_in_future=False,
+):
+    """
+    Yields a transformed block structure for each of the given users,
+    as returned by get_course_blocks with the default transformers,
+    transforming the course only once for all users with the same
+    transform signature (see BlockStructureTransformer.transform_signature).
+
+    Users with the same partition groups, date overrides, and access
+    roles usually share a signature, so bulk jobs that process every
+    learner of a course run only as many transforms as there are
+    distinct signatures.  Users for whom any transformer does not
+    provide a signature (for example, in courses with library content)
+    are transformed individually.
+
+    Arguments:
+        users (iterable of django.contrib.auth.models.User) - User
+            objects for which the block structure is to be transformed.
+
+        starting_block_usage_key (UsageKey) - Specifies the starting block
+            of the block structure that is to be transformed.
+
+        collected_block_structure (BlockStructureBlockData) - A
+            block structure retrieved from a prior call to
+            BlockStructureManager.get_collected.  If None, it is
+            retrieved once for all users.
+
+    Yields:
+        (User, BlockStructureBlockData) - Each user along with their
+            transformed block structure.  Block structures are shared
+            by users with the same signature, so they must not be
+            modified.
+    """
+    block_structure_manager = get_block_structure_manager(starting_block_usage_key.course_key)
+    if collected_block_structure is None:
+        collected_block_structure = block_structure_manager.get_collected()
+
+    shared_block_structures = {}
+    for user in users:
+        transformers = BlockStructureTransformers(get_course_block_access_transformers(user))
+        transformers.usage_info = CourseUsageInfo(
+            starting_block_usage_key.course_key,
+            user,
+            allow_start_dates_in_future,
+        )
+        signature = transformers.transform_signature(collected_block_structure)
+        block_structure = shared_block_structures.get(signature) if signature is not None else None
+        if block_structure is None:
+            block_structure = block_structure_manager.get_transformed(
+                transformers,
+                starting_block_usage_key,
+                collected_block_structure,
+                user,
+            )
+            if signature is not None:
+                shared_block_structures[signature] = block_structure
+        yield user, block_structure
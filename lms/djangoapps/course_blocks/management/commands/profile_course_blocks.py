@@ -0,0 +1,101 @@
+"""
+Command to profile the transformers run by get_course_blocks.
+"""
+
+
+import logging
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from openedx.core.djangoapps.content.block_structure import profiler
+from openedx.core.lib.command_utils import parse_course_keys
+from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Transforms the course blocks of the given courses for the given user a
+    number of times, and reports the wall time, blocks visited and blocks
+    removed by each transformer, so the transformers that dominate the
+    latency of get_course_blocks can be found.
+
+    Example usage:
+        $ ./manage.py lms profile_course_blocks --courses 'course-v1:edX+DemoX+Demo_Course' --username staff
+            --iterations 20 --settings=devstack
+    """
+    help = 'Profiles the transformers run by get_course_blocks for one or more courses.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--courses',
+            dest='courses',
+            nargs='+',
+            required=True,
+            help='Profile course blocks for the list of courses provided.',
+        )
+        parser.add_argument(
+            '--username',
+            dest='username',
+            required=True,
+            help='Username of the user for whom the course blocks are transformed.',
+        )
+        parser.add_argument(
+            '--iterations',
+            dest='iterations',
+            type=int,
+            default=10,
+            help='Number of times to transform the course blocks of each course.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist.")  # lint-amnesty, pylint: disable=raise-missing-from
+
+        if options['iterations'] < 1:
+            raise CommandError('The number of iterations must be positive.')
+
+        profiler.transformer_profiler.clear()
+        with profiler.profiling():
+            for course_key in parse_course_keys(options['courses']):
+                course_usage_key = modulestore().make_course_usage_key(course_key)
+                for _ in range(options['iterations']):
+                    get_course_blocks(user, course_usage_key)
+                log.info('Profiled course blocks of %s.', course_key)
+
+        self.stdout.write(self._format_stats(profiler.transformer_profiler.stats()))
+
+    @staticmethod
+    def _format_stats(stats):
+        """
+        Returns a report of the given profiler stats, sorted by descending
+        total wall time.
+        """
+        lines = [
+            '{:<40} {:>6} {:>12} {:>12} {:>12} {:>10} {:>10}'.format(
+                'transformer', 'runs', 'total (ms)', 'mean (ms)', 'max (ms)', 'visited', 'removed',
+            )
+        ]
+        sorted_stats = sorted(stats.items(), key=lambda item: item[1]['total_wall_time'], reverse=True)
+        for transformer_name, profile in sorted_stats:
+            lines.append('{:<40} {:>6} {:>12.2f} {:>12.2f} {:>12.2f} {:>10} {:>10}'.format(
+                transformer_name,
+                profile['count'],
+                profile['total_wall_time'] * 1000,
+                profile['mean_wall_time'] * 1000,
+                profile['max_wall_time'] * 1000,
+                profile['blocks_visited'],
+                profile['blocks_removed'],
+            ))
+            lines.append('    ' + '  '.join(
+                f'{label}: {count}' for label, count in profile['histogram'].items() if count
+            ))
+        return '\n'.join(lines)
@@ -0,0 +1,43 @@
+"""
+Tests for profile_course_blocks management command.
+"""
+
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from common.djangoapps.student.tests.factories import UserFactory
+from openedx.core.djangoapps.content.block_structure import profiler
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase  # lint-amnesty, pylint: disable=wrong-import-order
+from xmodule.modulestore.tests.factories import CourseFactory  # lint-amnesty, pylint: disable=wrong-import-order
+
+
+class TestProfileCourseBlocks(ModuleStoreTestCase):
+    """
+    Tests profile course blocks management command.
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        self.user = UserFactory.create()
+        self.addCleanup(profiler.transformer_profiler.clear)
+
+    def test_profile(self):
+        out = StringIO()
+        call_command(
+            'profile_course_blocks',
+            '--courses', str(self.course.id),
+            '--username', self.user.username,
+            '--iterations', '3',
+            stdout=out,
+        )
+        stats = profiler.transformer_profiler.stats()
+        assert stats['start_date']['count'] == 3
+        assert 'start_date' in out.getvalue()
+
+    def test_unknown_user(self):
+        with pytest.raises(CommandError):
+            call_command('profile_course_blocks', '--courses', str(self.course.id), '--username', 'unknown')
@@ -9,13 +9,17 @@ import ddt
 from django.http.request import HttpRequest
 
 from common.djangoapps.student.tests.factories import UserFactory
-from lms.djangoapps.course_blocks.api import get_course_blocks
+from lms.djangoapps.course_blocks.api import get_course_blocks, get_course_blocks_for_users
 from lms.djangoapps.course_blocks.transformers.tests.helpers import CourseStructureTestCase
 from lms.djangoapps.course_blocks.transformers.tests.test_user_partitions import UserPartitionTestMixin
+from lms.djangoapps.course_blocks.transformers.visibility import VisibilityTransformer
 from lms.djangoapps.courseware.block_render import make_track_function, prepare_runtime_for_user
+from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort
 from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import BlockFactory, CourseFactory
 
 
 def get_block_side_effect(block_locator, user_known):
@@ -147,3 +151,64 @@ class TestGetCourseBlocks(UserPartitionTestMixin, CourseStructureTestCase):
             set(block_structure.get_block_keys()),
             self.get_block_key_set(self.blocks, *expected_blocks)
         )
+
+
+class TestGetCourseBlocksForUsers(UserPartitionTestMixin, ModuleStoreTestCase):
+    """
+    Tests `get_course_blocks_for_users` API
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.setup_groups_partitions(num_groups=2)
+        self.course = CourseFactory.create(user_partitions=self.user_partitions)
+        self.restricted_chapter = BlockFactory.create(
+            parent=self.course,
+            category='chapter',
+            metadata={'group_access': {self.user_partitions[0].id: [self.groups[0].id]}},
+        )
+        self.public_chapter = BlockFactory.create(parent=self.course, category='chapter')
+        self.setup_cohorts(self.course)
+
+        # The first two users are in the first group and the third user
+        # is in the second group.
+        self.users = [UserFactory.create() for _ in range(3)]
+        for user, cohort in zip(self.users, [self.partition_cohorts[0][0]] * 2 + [self.partition_cohorts[0][1]]):
+            add_user_to_cohort(cohort, user.username)
+
+    def _get_course_blocks_for_users(self):
+        """
+        Returns the list of users and block structures returned by
+        get_course_blocks_for_users, along with the number of transforms.
+        """
+        block_structure_manager = get_block_structure_manager(self.course.id)
+        with patch(
+            'lms.djangoapps.course_blocks.api.get_block_structure_manager',
+            return_value=block_structure_manager,
+        ), patch.object(
+            block_structure_manager, 'get_transformed', wraps=block_structure_manager.get_transformed,
+        ) as mock_get_transformed:
+            user_block_structures = list(get_course_blocks_for_users(self.users, self.course.location))
+        return user_block_structures, mock_get_transformed.call_count
+
+    def test_shared_block_structures(self):
+        user_block_structures, transform_count = self._get_course_blocks_for_users()
+        assert [user for user, _ in user_block_structures] == self.users
+        block_structures = [block_structure for _, block_structure in user_block_structures]
+        assert transform_count == 2
+        assert block_structures[0] is block_structures[1]
+        assert block_structures[0] is not block_structures[2]
+        assert self.restricted_chapter.location in block_structures[0]
+        assert self.restricted_chapter.location not in block_structures[2]
+
+    def test_same_as_get_course_blocks(self):
+        user_block_structures, _ = self._get_course_blocks_for_users()
+        for user, block_structure in user_block_structures:
+            assert set(block_structure.get_block_keys()) == \
+                set(get_course_blocks(user, self.course.location).get_block_keys())
+
+    def test_without_signature(self):
+        with patch.object(VisibilityTransformer, 'transform_signature', return_value=None):
+            user_block_structures, transform_count = self._get_course_blocks_for_users()
+        assert transform_count == len(self.users)
+        assert user_block_structures[0][1] is not user_block_structures[1][1]
@@ -7,7 +7,10 @@ from datetime import datetime
 
 from pytz import utc
 
-from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
+from openedx.core.djangoapps.content.block_structure.transformer import (
+    BlockStructureTransformer,
+    OrderedFilteringTransformerMixin
+)
 from xmodule.seq_block import SequenceBlock  # lint-amnesty, pylint: disable=wrong-import-order
 
 from .utils import collect_merged_boolean_field, collect_merged_date_field
@@ -15,7 +18,7 @@ from .utils import collect_merged_boolean_field, collect_merged_date_field
 MAXIMUM_DATE = utc.localize(datetime.max)
 
 
-class HiddenContentTransformer(BlockStructureTransformer):
+class HiddenContentTransformer(OrderedFilteringTransformerMixin, BlockStructureTransformer):
     """
     A transformer that enforces the hide_after_due field on
     blocks by removing children blocks from the block structure for
@@ -33,6 +36,7 @@ class HiddenContentTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 4
     READ_VERSION = 4
+    SUPPORTS_INCREMENTAL_COLLECT = True
     MERGED_HIDE_AFTER_DUE = 'merged_hide_after_due'
     MERGED_END_DATE = 'merged_end_date'
 
@@ -87,12 +91,16 @@ class HiddenContentTransformer(BlockStructureTransformer):
 
         block_structure.request_xblock_fields('self_paced', 'due')
 
-    def transform(self, usage_info, block_structure):
+    def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Visibility check.
         if usage_info.has_staff_access:
             return [block_structure.create_universal_filter()]
 
-        block_structure.remove_block_traversal(lambda block_key: self._is_block_hidden(block_structure, block_key))
+        return [
+            block_structure.create_removal_filter(
+                lambda block_key: self._is_block_hidden(block_structure, block_key),
+            )
+        ]
 
     def _is_block_hidden(self, block_structure, block_key):
         """
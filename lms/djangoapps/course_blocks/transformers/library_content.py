@@ -22,6 +22,14 @@ from ..utils import get_student_module_as_dict
 logger = logging.getLogger(__name__)
 
 
+def _has_library_content(block_structure):
+    """
+    Returns whether the given block structure contains any
+    library_content blocks.
+    """
+    return any(block_key.block_type == 'library_content' for block_key in block_structure)
+
+
 class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransformer):
     """
     A transformer that manipulates the block structure by removing all
@@ -32,6 +40,7 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -72,6 +81,10 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
                 summary = summarize_block(child_key)
                 block_structure.set_transformer_block_field(child_key, cls, 'block_analytics_summary', summary)
 
+    def transform_signature(self, usage_info, block_structure):
+        # Selections of library content are made for each user.
+        return None if _has_library_content(block_structure) else ()
+
     def transform_block_filters(self, usage_info, block_structure):
         all_library_children = set()
         all_selected_children = set()
@@ -193,6 +206,7 @@ class ContentLibraryOrderTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -211,6 +225,10 @@ class ContentLibraryOrderTransformer(BlockStructureTransformer):
         # There is nothing to collect
         pass  # pylint:disable=unnecessary-pass
 
+    def transform_signature(self, usage_info, block_structure):
+        # Selections of library content are ordered for each user.
+        return None if _has_library_content(block_structure) else ()
+
     def transform(self, usage_info, block_structure):
         """
         Transforms the order of the children of the randomized content block
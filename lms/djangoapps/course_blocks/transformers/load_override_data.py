@@ -60,6 +60,7 @@ class OverrideDataTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     def __init__(self, user):
         self.user = user
@@ -80,6 +81,18 @@ class OverrideDataTransformer(BlockStructureTransformer):
         # collect basic xblock fields
         block_structure.request_xblock_fields(*REQUESTED_FIELDS)
 
+    def transform_signature(self, usage_info, block_structure):
+        """
+        Returns the override data of the user in the course.
+        """
+        return frozenset(
+            StudentFieldOverride.objects.filter(
+                course_id=usage_info.course_key,
+                field__in=REQUESTED_FIELDS,
+                student__id=self.user.id,
+            ).values_list('location', 'field', 'value')
+        )
+
     def transform(self, usage_info, block_structure):
         """
         loads override data into blocks
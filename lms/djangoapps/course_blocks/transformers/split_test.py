@@ -26,6 +26,7 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -74,6 +75,10 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
                 group = child_to_group.get(child_location, None)
                 child.group_access[partition_for_this_block.id] = [group] if group is not None else []
 
+    def transform_signature(self, usage_info, block_structure):
+        # The same split_test blocks are removed for all users.
+        return ()
+
     def transform_block_filters(self, usage_info, block_structure):
         """
         Mutates block_structure based on the given usage_info.
@@ -6,7 +6,9 @@ from datetime import datetime
 
 from pytz import UTC
 
+from common.djangoapps.student.roles import CourseBetaTesterRole
 from lms.djangoapps.courseware.access_utils import check_start_date
+from lms.djangoapps.courseware.masquerade import get_course_masquerade
 from openedx.core.djangoapps.content.block_structure.transformer import (
     BlockStructureTransformer,
     FilteringTransformerMixin
@@ -34,6 +36,7 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
     MERGED_START_DATE = 'merged_start_date'
 
     @classmethod
@@ -89,6 +92,18 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
             func_merge_ancestors=max,
         )
 
+    def transform_signature(self, usage_info, block_structure):
+        if usage_info.has_staff_access or usage_info.allow_start_dates_in_future:
+            return ('all',)
+
+        # Access of masquerading users depends on their masquerade settings.
+        if get_course_masquerade(usage_info.user, usage_info.course_key):
+            return None
+
+        # Beta testers are given access to blocks before their start dates.
+        is_beta_tester = CourseBetaTesterRole(usage_info.course_key).has_user(usage_info.user)
+        return (is_beta_tester, usage_info.include_has_scheduled_content)
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Start Date check.
         if usage_info.has_staff_access or usage_info.allow_start_dates_in_future:
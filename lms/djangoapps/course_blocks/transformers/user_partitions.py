@@ -28,6 +28,7 @@ class UserPartitionTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -75,6 +76,20 @@ class UserPartitionTransformer(BlockStructureTransformer):
             merged_group_access = _MergedGroupAccess(user_partitions, xblock, merged_parent_access_list)
             block_structure.set_transformer_block_field(block_key, cls, 'merged_group_access', merged_group_access)
 
+    def transform_signature(self, usage_info, block_structure):
+        if has_access(usage_info.user, 'staff', usage_info.course_key):
+            return ('staff',)
+
+        user_partitions = block_structure.get_transformer_data(self, 'user_partitions')
+        if not user_partitions:
+            return ()
+
+        # Access denied messages depend only on the user's group and
+        # the allowed groups, so users in the same groups are given the
+        # same messages.
+        user_groups = get_user_partition_groups(usage_info.course_key, user_partitions, usage_info.user, 'id')
+        return frozenset(user_groups.items())
+
     def transform(self, usage_info, block_structure):
         user = usage_info.user
         SplitTestTransformer().transform(usage_info, block_structure)
@@ -164,6 +179,10 @@ class _MergedGroupAccess:
     Note that a user must have access to all partitions in group_access
     or _access in order to access a block.
     """
+    # Instances are not modified once computed at collect time, so they
+    # can be shared between copies of the collected block structure.
+    SHAREABLE_BETWEEN_BLOCK_STRUCTURES = True
+
     def __init__(self, user_partitions, xblock, merged_parent_access_list):
         """
         Arguments:
@@ -26,6 +26,7 @@ class VisibilityTransformer(FilteringTransformerMixin, BlockStructureTransformer
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     MERGED_VISIBLE_TO_STAFF_ONLY = 'merged_visible_to_staff_only'
 
@@ -61,6 +62,9 @@ class VisibilityTransformer(FilteringTransformerMixin, BlockStructureTransformer
             merged_field_name=cls.MERGED_VISIBLE_TO_STAFF_ONLY,
         )
 
+    def transform_signature(self, usage_info, block_structure):
+        return usage_info.has_staff_access
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Visibility check.
         if usage_info.has_staff_access:
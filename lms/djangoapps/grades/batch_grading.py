@@ -0,0 +1,309 @@
+"""
+Batch computation of course grades.
+
+Computing a course grade with CourseGrade.update creates a SubsectionGrade
+object for each subsection of the course and runs the course's grader over
+them, learner by learner.  For courses with many learners, this module
+instead computes the course grades of a chunk of learners at once:
+
+    1. The persisted subsection grades of all the learners in the chunk are
+       loaded with a single query into NumPy arrays of learners by
+       subsections.
+    2. The course's grader (see xmodule.graders.grader_from_conf) is applied
+       to all the learners at once, including dropping the lowest scores of
+       each assignment type and weighting the assignment types.
+    3. The resulting percents are rounded, and compared with the grade
+       cutoffs of the course, as in CourseGrade.update.
+
+The computations mirror those of the graders operation for operation, so
+the percents, letter grades, and passed statuses are the same as those
+computed by CourseGrade.update without force_update_subsections.  Grades
+are not persisted.
+
+Only graders created by grader_from_conf (a WeightedSubsectionsGrader of
+AssignmentFormatGraders) are supported; see supports_grader.
+"""
+
+
+from collections import OrderedDict, defaultdict, namedtuple
+
+import numpy as np
+from django.conf import settings
+
+from lms.djangoapps.course_blocks.api import get_course_blocks_for_users
+from xmodule.graders import AssignmentFormatGrader, WeightedSubsectionsGrader  # lint-amnesty, pylint: disable=wrong-import-order
+
+from .course_data import CourseData
+from .course_grade import CourseGrade, _uniqueify_and_keep_order
+from .models import PersistentSubsectionGrade
+from .subsection_grade import ZeroSubsectionGrade
+
+# Number of learners whose grades are computed at once.
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def supports_grader(grader):
+    """
+    Returns whether the course grades of the given course grader can
+    be computed in batches.
+    """
+    return type(grader) is WeightedSubsectionsGrader and all(  # pylint: disable=unidiomatic-typecheck
+        type(subgrader) is AssignmentFormatGrader and  # pylint: disable=unidiomatic-typecheck
+        isinstance(subgrader.drop_count, int) and subgrader.drop_count >= 0
+        for subgrader, _, _ in grader.subgraders
+    )
+
+
+def grader_percents(grader, subsection_formats, percents, included):
+    """
+    Returns an array of the percent that the given grader would return
+    for each learner.
+
+    Arguments:
+        grader (WeightedSubsectionsGrader) - A course grader supported
+            by supports_grader.
+
+        subsection_formats (list of str) - The format of each subsection,
+            in the order of the subsections in the grade sheet.
+
+        percents (numpy.ndarray) - The graded percent of each learner
+            (row) in each subsection (column).
+
+        included (numpy.ndarray) - Whether each subsection is included
+            in the grade sheet of each learner, which is the case for
+            graded subsections with points possible.
+    """
+    total_percents = np.zeros(len(percents))
+    for subgrader, _, weight in grader.subgraders:
+        columns = [
+            index for index, subsection_format in enumerate(subsection_formats)
+            if subsection_format == subgrader.type
+        ]
+        total_percents = total_percents + _assignment_format_percents(
+            subgrader, percents[:, columns], included[:, columns],
+        ) * weight
+    return total_percents
+
+
+def _assignment_format_percents(grader, percents, included):
+    """
+    Returns an array of the percent that the given AssignmentFormatGrader
+    would return for each learner, given their percents in the
+    subsections of the grader's type.
+    """
+    num_learners, num_subsections = percents.shape
+    min_count = int(float(grader.min_count))
+    num_scores = included.sum(axis=1)
+
+    # The entries of each learner's breakdown are their scores, in order,
+    # followed by placeholder scores of 0 up to min_count.  Missing entries
+    # are infinite, so they are never dropped.
+    entries = np.concatenate([
+        np.where(included, percents, np.inf),
+        np.where(np.arange(min_count) < (min_count - num_scores)[:, np.newaxis], 0.0, np.inf),
+    ], axis=1)
+    kept = np.isfinite(entries)
+
+    if grader.drop_count > 0:
+        # As in AssignmentFormatGrader.total_with_drops, drop the lowest
+        # entries, dropping later entries first among equal ones.
+        positions = np.broadcast_to(-np.arange(entries.shape[1]), entries.shape)
+        dropped = np.lexsort((positions, entries), axis=1)[:, :grader.drop_count]
+        kept[np.arange(num_learners)[:, np.newaxis], dropped] = False
+
+    # Sum the kept scores in order, so that the floating point results
+    # are the same as those of the grader.  Placeholders add nothing.
+    total_percents = np.zeros(num_learners)
+    for column in range(num_subsections):
+        total_percents += np.where(kept[:, column], entries[:, column], 0.0)
+
+    num_kept_entries = np.maximum(min_count, num_scores) - grader.drop_count
+    return np.where(num_kept_entries > 0, total_percents / np.maximum(num_kept_entries, 1), total_percents)
+
+
+def course_percents(percents):
+    """
+    Returns an array of the course grade percents for the given array of
+    percents returned by a course grader, rounded as in
+    CourseGrade._compute_percent.
+    """
+    shifted_percents = percents * 100 + 0.05
+    return np.where(
+        shifted_percents >= 0,
+        np.floor(shifted_percents + 0.5),
+        np.ceil(shifted_percents - 0.5),
+    ) / 100
+
+
+def letter_grades(grade_cutoffs, percents):
+    """
+    Returns the list of letter grades for the given array of course grade
+    percents, as computed by CourseGrade._compute_letter_grade.
+    """
+    grades = np.full(len(percents), None, dtype=object)
+    graded = np.zeros(len(percents), dtype=bool)
+    for letter_grade in sorted(grade_cutoffs, key=lambda x: grade_cutoffs[x], reverse=True):
+        matches = ~graded & (percents >= grade_cutoffs[letter_grade])
+        grades[matches] = letter_grade
+        graded |= matches
+    return grades.tolist()
+
+
+def passed_statuses(grade_cutoffs, percents):
+    """
+    Returns the list of passed statuses for the given array of course grade
+    percents, as computed by CourseGrade._compute_passed.
+    """
+    nonzero_cutoffs = [cutoff for cutoff in grade_cutoffs.values() if cutoff > 0]
+    if not nonzero_cutoffs:
+        return [None] * len(percents)
+    return (percents >= min(nonzero_cutoffs)).tolist()
+
+
+class BatchCourseGrader:
+    """
+    Computes the course grades of many learners in a course at once, from
+    their persisted subsection grades.
+    """
+    BatchGradeResult = namedtuple('BatchGradeResult', ['student', 'structure', 'percent', 'letter_grade', 'passed'])
+
+    def __init__(self, course_data, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Arguments:
+            course_data (CourseData) - The course, independent of any
+                learner.
+
+            chunk_size (int) - The number of learners whose grades are
+                computed at once.
+        """
+        self.course_data = course_data
+        self.chunk_size = chunk_size
+
+    @property
+    def grader(self):
+        """
+        Returns the grader of the course, with any overrides of the
+        grading policy applied.
+        """
+        return CourseGrade._prep_course_for_grading(self.course_data.course).grader  # pylint: disable=protected-access
+
+    def is_supported(self):
+        """
+        Returns whether the course's grades can be computed in batches.
+        """
+        return not settings.GENERATE_PROFILE_SCORES and supports_grader(self.grader)
+
+    def iter(self, users):
+        """
+        Yields a BatchGradeResult for each of the given users, with the
+        user's transformed course structure and computed course grade.
+        """
+        users = list(users)
+        for start in range(0, len(users), self.chunk_size):
+            yield from self.grade(users[start:start + self.chunk_size])
+
+    def grade(self, users):
+        """
+        Returns the list of BatchGradeResults of the given users, which
+        are graded at once.
+        """
+        grader = self.grader
+        grade_cutoffs = self.course_data.course.grade_cutoffs
+        # Group the users by their course structure, which is shared
+        # by all users with the same access to the course content.
+        users_by_structure = OrderedDict()
+        for user, structure in get_course_blocks_for_users(
+            users, self.course_data.location, self.course_data.collected_structure,
+        ):
+            users_by_structure.setdefault(id(structure), (structure, []))[1].append(user)
+
+        subsection_grades = self._load_subsection_grades([user.id for user in users])
+
+        results = []
+        for structure, structure_users in users_by_structure.values():
+            subsections = self._graded_subsections(structure_users[0], structure)
+            percents, included = self._subsection_percents(structure_users, subsections, subsection_grades)
+            percents = course_percents(
+                grader_percents(grader, [subsection.format for subsection in subsections], percents, included)
+            )
+            results.extend(
+                self.BatchGradeResult(user, structure, percent, letter_grade, passed)
+                for user, percent, letter_grade, passed in zip(
+                    structure_users,
+                    percents.tolist(),
+                    letter_grades(grade_cutoffs, percents),
+                    passed_statuses(grade_cutoffs, percents),
+                )
+            )
+        return results
+
+    def _load_subsection_grades(self, user_ids):
+        """
+        Returns a dict mapping each of the given users' ids to a dict of
+        their persisted (earned, possible) graded scores by subsection,
+        taking overrides into account.
+        """
+        course_key = self.course_data.course_key
+        subsection_grades = defaultdict(dict)
+        for user_id, usage_key, earned, possible, earned_override, possible_override in (
+            PersistentSubsectionGrade.objects.filter(user_id__in=user_ids, course_id=course_key).values_list(
+                'user_id',
+                'usage_key',
+                'earned_graded',
+                'possible_graded',
+                'override__earned_graded_override',
+                'override__possible_graded_override',
+            )
+        ):
+            if usage_key.run is None:  # pylint: disable=no-member
+                # See PersistentSubsectionGrade.full_usage_key.
+                usage_key = usage_key.replace(course_key=course_key)
+            subsection_grades[user_id][usage_key] = (
+                earned if earned_override is None else earned_override,
+                possible if possible_override is None else possible_override,
+            )
+        return subsection_grades
+
+    def _graded_subsections(self, user, structure):
+        """
+        Returns the list of graded subsections of the given course
+        structure, as ZeroSubsectionGrades, in the order of the course's
+        grade sheet.
+        """
+        course_data = CourseData(
+            user, self.course_data.course, self.course_data.collected_structure, structure=structure,
+        )
+        subsections = OrderedDict()
+        for chapter_key in structure.get_children(course_data.location):
+            for subsection_key in _uniqueify_and_keep_order(structure.get_children(chapter_key)):
+                if subsection_key not in subsections:
+                    subsection = ZeroSubsectionGrade(structure[subsection_key], course_data)
+                    if subsection.graded:
+                        subsections[subsection_key] = subsection
+        return list(subsections.values())
+
+    @staticmethod
+    def _subsection_percents(users, subsections, subsection_grades):
+        """
+        Returns the arrays of the graded percent of each of the given users
+        in each of the given subsections, and whether each subsection is
+        included in each user's grade sheet.
+        """
+        earned = np.zeros((len(users), len(subsections)))
+        # Subsections without persisted grades have zero grades.
+        possible = np.tile(
+            np.array([subsection.graded_total.possible for subsection in subsections], dtype=float),
+            (len(users), 1),
+        )
+        for row, user in enumerate(users):
+            user_grades = subsection_grades.get(user.id)
+            if user_grades:
+                for column, subsection in enumerate(subsections):
+                    grade = user_grades.get(subsection.location)
+                    if grade:
+                        earned[row, column], possible[row, column] = grade
+
+        # As in compute_percent.
+        has_possible = possible > 0
+        percents = np.where(has_possible, np.around(earned / np.where(has_possible, possible, 1), decimals=4), 0.0)
+        return percents, has_possible
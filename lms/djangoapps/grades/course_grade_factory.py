@@ -9,6 +9,7 @@ from openedx.core.djangoapps.signals.signals import (
     COURSE_GRADE_NOW_FAILED,
     COURSE_GRADE_NOW_PASSED
 )
+from .batch_grading import BatchCourseGrader
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
 from .models import PersistentCourseGrade
@@ -96,6 +97,95 @@ class CourseGradeFactory:
         for user in users:
             yield self._iter_grade_result(user, course_data, force_update)
 
+    def compute(
+            self,
+            users,
+            course=None,
+            collected_block_structure=None,
+            course_key=None,
+    ):
+        """
+        Given a course and an iterable of students (User), yield a GradeResult
+        for every student, like iter.  The CourseGrades are computed from the
+        students' persisted subsection grades, as by update without
+        force_update_subsections, but they are not persisted.
+
+        When the course's grader supports it, the grades of many students are
+        computed at once (see batch_grading), which is much faster for large
+        courses.  If the grades of a batch of students can't be computed, those
+        students are graded one at a time, so that, as with iter, only the
+        students who can't be graded get a GradeResult with an error.
+        """
+        course_data = CourseData(
+            user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
+        )
+        batch_grader = BatchCourseGrader(course_data)
+        if not batch_grader.is_supported():
+            for user in users:
+                yield self._compute_grade_result(user, course_data)
+            return
+
+        users = list(users)
+        for start in range(0, len(users), batch_grader.chunk_size):
+            chunk = users[start:start + batch_grader.chunk_size]
+            try:
+                results = batch_grader.grade(chunk)
+            except Exception:  # pylint: disable=broad-except
+                # Grade these students one at a time, so that only those who
+                # can't be graded get an error.
+                log.exception(
+                    'Cannot grade %d students in course %s at once; grading them one at a time.',
+                    len(chunk),
+                    course_data.course_key,
+                )
+                for user in chunk:
+                    yield self._compute_grade_result(user, course_data)
+                continue
+
+            for result in results:
+                yield self._batch_grade_result(result, course_data)
+
+    def _compute_grade_result(self, user, course_data):
+        """
+        Returns a GradeResult with a CourseGrade for the given user
+        computed without persisting it.
+        """
+        try:
+            course_grade = CourseGrade(
+                user, CourseData(user, course_data.course, course_data.collected_structure),
+            ).update()
+            return self.GradeResult(user, course_grade, None)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception(
+                'Cannot grade student %s in course %s because of exception: %s',
+                user.id,
+                course_data.course_key,
+                str(exc)
+            )
+            return self.GradeResult(user, None, exc)
+
+    def _batch_grade_result(self, result, course_data):
+        """
+        Returns a GradeResult with a CourseGrade for the given
+        BatchGradeResult.
+        """
+        try:
+            user_course_data = CourseData(
+                result.student, course_data.course, course_data.collected_structure, structure=result.structure,
+            )
+            course_grade = CourseGrade(
+                result.student, user_course_data, result.percent, result.letter_grade, result.passed,
+            )
+            return self.GradeResult(result.student, course_grade, None)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception(
+                'Cannot grade student %s in course %s because of exception: %s',
+                result.student.id,
+                course_data.course_key,
+                str(exc)
+            )
+            return self.GradeResult(result.student, None, exc)
+
     def _iter_grade_result(self, user, course_data, force_update):  # lint-amnesty, pylint: disable=missing-function-docstring
         try:
             kwargs = {
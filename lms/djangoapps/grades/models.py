@@ -146,6 +146,9 @@ class VisibleBlocks(models.Model):
 
     _CACHE_NAMESPACE = "grades.models.VisibleBlocks"
 
+    # The BlockRecordList decoded from blocks_json, once blocks is read.
+    _decoded_blocks = None
+
     class Meta:
         app_label = "grades"
 
@@ -160,8 +163,25 @@ class VisibleBlocks(models.Model):
         """
         Returns the blocks_json data stored on this model as a list of
         BlockRecords in the order they were provided.
+
+        The list is decoded once per instance, so instances shared by the
+        grades of many users (see PersistentSubsectionGrade.prefetch) are
+        only decoded once.
+        """
+        if self._decoded_blocks is None:
+            self._decoded_blocks = BlockRecordList.from_json(self.blocks_json)
+        return self._decoded_blocks
+
+    @classmethod
+    def read_by_hashes(cls, hashes):
+        """
+        Returns a dict mapping each of the given hashes to its VisibleBlocks,
+        read with a single query.
         """
-        return BlockRecordList.from_json(self.blocks_json)
+        hashes = set(hashes)
+        if not hashes:
+            return {}
+        return {visible_blocks.hashed: visible_blocks for visible_blocks in cls.objects.filter(hashed__in=hashes)}
 
     @classmethod
     def bulk_read(cls, user_id, course_key):
@@ -278,6 +298,23 @@ class VisibleBlocks(models.Model):
         get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(user_id, course_key)] = prefetched
         return prefetched
 
+    @classmethod
+    def set_prefetched_data(cls, user_id, course_key, visible_blocks):
+        """
+        Stores the given visible blocks, already read from the database, as
+        all the visible blocks of the given user and course in the cache.
+        """
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(user_id, course_key)] = {
+            visible_block.hashed: visible_block for visible_block in visible_blocks
+        }
+
+    @classmethod
+    def clear_prefetched_data(cls, user_id, course_key):
+        """
+        Clears the cached visible blocks of the given user and course.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(user_id, course_key), None)
+
     @classmethod
     def _update_cache(cls, user_id, course_key, visible_blocks):
         """
@@ -387,23 +424,45 @@ class PersistentSubsectionGrade(TimeStampedModel):
     def prefetch(cls, course_key, users):
         """
         Prefetches grades for the given users in the given course.
+
+        The grades, along with their overrides, are read with one query
+        and their visible blocks with another, regardless of the number
+        of users.  Grades with the same visible blocks share a single
+        VisibleBlocks instance, so that its blocks are only decoded once.
+        The per-user caches of VisibleBlocks and
+        PersistentSubsectionGradeOverride are populated as well.
         """
-        cache_key = cls._cache_key(course_key)
-        get_cache(cls._CACHE_NAMESPACE)[cache_key] = defaultdict(list)
-        cached_grades = get_cache(cls._CACHE_NAMESPACE)[cache_key]
-        queryset = cls.objects.select_related('visible_blocks', 'override').filter(
-            user_id__in=[user.id for user in users],
+        user_ids = [user.id for user in users]
+        cached_grades = defaultdict(list, {user_id: [] for user_id in user_ids})
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_key)] = cached_grades
+
+        grades = list(cls.objects.select_related('override').filter(
+            user_id__in=user_ids,
             course_id=course_key,
-        )
-        for record in queryset:
-            cached_grades[record.user_id].append(record)
+        ))
+        visible_blocks_by_hash = VisibleBlocks.read_by_hashes(grade.visible_blocks_id for grade in grades)
+        for grade in grades:
+            grade.visible_blocks = visible_blocks_by_hash[grade.visible_blocks_id]
+            cached_grades[grade.user_id].append(grade)
+
+        for user_id, user_grades in cached_grades.items():
+            VisibleBlocks.set_prefetched_data(
+                user_id, course_key, [grade.visible_blocks for grade in user_grades],
+            )
+            PersistentSubsectionGradeOverride.set_prefetched_data(
+                user_id, course_key, [grade for grade in user_grades if hasattr(grade, 'override')],
+            )
 
     @classmethod
     def clear_prefetched_data(cls, course_key):
         """
-        Clears prefetched grades for this course from the RequestCache.
+        Clears prefetched grades for this course from the RequestCache,
+        along with the visible blocks and overrides prefetched with them.
         """
-        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+        cached_grades = get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+        for user_id in cached_grades or ():
+            VisibleBlocks.clear_prefetched_data(user_id, course_key)
+            PersistentSubsectionGradeOverride.clear_prefetched_overrides_for_learner(user_id, course_key)
 
     @classmethod
     def read_grade(cls, user_id, usage_key):
@@ -793,6 +852,17 @@ class PersistentSubsectionGradeOverride(models.Model):
             cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
         }
 
+    @classmethod
+    def set_prefetched_data(cls, user_id, course_key, grades):
+        """
+        Stores the overrides of the given subsection grades, read along
+        with them, as all the overrides of the given user and course in
+        the cache.
+        """
+        get_cache(cls._CACHE_NAMESPACE)[(user_id, str(course_key))] = {
+            grade.usage_key: grade.override for grade in grades
+        }
+
     @classmethod
     def get_override(cls, user_id, usage_key):  # lint-amnesty, pylint: disable=missing-function-docstring
         prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
@@ -29,11 +29,11 @@ def prefetch_course_and_subsection_grades(course_key, users):
 
 def clear_prefetched_course_grades(course_key):
     _PersistentCourseGrade.clear_prefetched_data(course_key)
-    _PersistentSubsectionGrade.clear_prefetched_data(course_key)
 
 
 def clear_prefetched_course_and_subsection_grades(course_key):
     _PersistentCourseGrade.clear_prefetched_data(course_key)
+    _PersistentSubsectionGrade.clear_prefetched_data(course_key)
 
 
 def get_recently_modified_grades(course_keys, start_date, end_date, users=None):
@@ -0,0 +1,219 @@
+"""
+Tests for the batch_grading module.
+"""
+# pylint: disable=protected-access
+import random
+from collections import OrderedDict, defaultdict, namedtuple
+from unittest.mock import patch
+
+import ddt
+import numpy as np
+from django.test import TestCase
+
+from common.djangoapps.student.models import CourseEnrollment
+from common.djangoapps.student.tests.factories import UserFactory
+from xmodule.graders import AggregatedScore, CourseGrader, grader_from_conf  # lint-amnesty, pylint: disable=wrong-import-order
+
+from .. import batch_grading
+from ..course_data import CourseData
+from ..course_grade import CourseGrade
+from ..course_grade_factory import CourseGradeFactory
+from ..scores import compute_percent
+from ..subsection_grade_factory import SubsectionGradeFactory
+from .base import GradeTestBase
+from .utils import mock_get_score
+
+DEFAULT_GRADER = [
+    {'type': 'Homework', 'min_count': 12, 'drop_count': 2, 'short_label': 'HW', 'weight': 0.15},
+    {'type': 'Lab', 'min_count': 12, 'drop_count': 2, 'weight': 0.15},
+    {'type': 'Midterm Exam', 'min_count': 1, 'drop_count': 0, 'short_label': 'Midterm', 'weight': 0.3},
+    {'type': 'Final Exam', 'min_count': 1, 'drop_count': 0, 'short_label': 'Final', 'weight': 0.4},
+]
+
+FakeUser = namedtuple('FakeUser', ['id'])
+FakeSubsection = namedtuple('FakeSubsection', ['location', 'format', 'graded_total'])
+FakeSubsectionGrade = namedtuple('FakeSubsectionGrade', ['display_name', 'graded_total', 'percent_graded'])
+
+
+@ddt.ddt
+class TestBatchGradingEquivalence(TestCase):
+    """
+    Verifies that batch grading computes the same grades as the graders
+    do for each learner, for randomly generated subsection scores.
+    """
+    NUM_LEARNERS = 300
+    SUBSECTION_FORMATS = ['Homework'] * 10 + ['Lab'] * 14 + ['Midterm Exam', 'Final Exam', 'Ungraded']
+
+    def _generate_scores(self, seed):
+        """
+        Returns the subsections and the (earned, possible) scores of each
+        learner in them.  Scores are drawn from a few values, so that many
+        learners have equal percents in their subsections.
+        """
+        rng = random.Random(seed)
+        subsections = [
+            FakeSubsection(index, subsection_format, AggregatedScore(0.0, rng.choice([0, 1, 4]), True, None))
+            for index, subsection_format in enumerate(self.SUBSECTION_FORMATS)
+        ]
+        subsection_grades = {}
+        for user_id in range(self.NUM_LEARNERS):
+            subsection_grades[user_id] = {}
+            for subsection in subsections:
+                if rng.random() < 0.7:
+                    possible = rng.choice([0.0, 1.0, 3.0, 10.0])
+                    subsection_grades[user_id][subsection.location] = (rng.randint(0, int(possible)), possible)
+        return subsections, subsection_grades
+
+    @staticmethod
+    def _scalar_grades(grader, grade_cutoffs, subsections, subsection_grades):
+        """
+        Returns the list of (percent, letter grade, passed) of each learner,
+        computed with the grader one learner at a time, like CourseGrade.update.
+        """
+        grades = []
+        for user_id in sorted(subsection_grades):
+            grade_sheet = defaultdict(OrderedDict)
+            for subsection in subsections:
+                earned, possible = subsection_grades[user_id].get(
+                    subsection.location, (0.0, subsection.graded_total.possible),
+                )
+                if possible > 0:
+                    grade_sheet[subsection.format][subsection.location] = FakeSubsectionGrade(
+                        str(subsection.location),
+                        AggregatedScore(earned, possible, True, None),
+                        compute_percent(earned, possible) if subsection.location in subsection_grades[user_id] else 0.0,
+                    )
+            percent = CourseGrade._compute_percent(grader.grade(grade_sheet))
+            grades.append((
+                percent,
+                CourseGrade._compute_letter_grade(grade_cutoffs, percent),
+                CourseGrade._compute_passed(grade_cutoffs, percent),
+            ))
+        return grades
+
+    @staticmethod
+    def _batch_grades(grader, grade_cutoffs, subsections, subsection_grades):
+        """
+        Returns the list of (percent, letter grade, passed) of each learner,
+        computed for all learners at once.
+        """
+        users = [FakeUser(user_id) for user_id in sorted(subsection_grades)]
+        percents, included = batch_grading.BatchCourseGrader._subsection_percents(
+            users, subsections, subsection_grades,
+        )
+        percents = batch_grading.course_percents(
+            batch_grading.grader_percents(
+                grader, [subsection.format for subsection in subsections], percents, included,
+            )
+        )
+        return list(zip(
+            percents.tolist(),
+            batch_grading.letter_grades(grade_cutoffs, percents),
+            batch_grading.passed_statuses(grade_cutoffs, percents),
+        ))
+
+    @ddt.data(
+        (DEFAULT_GRADER, {'A': 0.9, 'B': 0.8, 'C': 0.6}),
+        # More lowest scores dropped than there are subsections.
+        ([{'type': 'Homework', 'min_count': 3, 'drop_count': 12, 'weight': 1.0}], {'Pass': 0.5}),
+        # Extra credit, and an assignment type without any subsections.
+        (DEFAULT_GRADER + [{'type': 'Bonus', 'min_count': 0, 'drop_count': 0, 'weight': 0.2}], {'Pass': 0.7}),
+        # A single subsection of each type, and no passing grade.
+        (
+            [
+                {'type': 'Midterm Exam', 'min_count': 1, 'drop_count': 0, 'weight': 0.5},
+                {'type': 'Final Exam', 'min_count': 1, 'drop_count': 1, 'weight': 0.5},
+            ],
+            {'Fail': 0},
+        ),
+    )
+    @ddt.unpack
+    def test_equivalence(self, grader_conf, grade_cutoffs):
+        grader = grader_from_conf(grader_conf)
+        assert batch_grading.supports_grader(grader)
+        for seed in range(5):
+            subsections, subsection_grades = self._generate_scores(seed)
+            assert self._batch_grades(grader, grade_cutoffs, subsections, subsection_grades) ==\
+                self._scalar_grades(grader, grade_cutoffs, subsections, subsection_grades)
+
+    def test_drops_ties(self):
+        grader = grader_from_conf([{'type': 'Homework', 'min_count': 4, 'drop_count': 2, 'weight': 1.0}])
+        percents = np.array([[0.5, 0.1, 0.5, 0.1, 0.7]])
+        included = np.array([[True, True, True, True, False]])
+        assert batch_grading.grader_percents(grader, ['Homework'] * 5, percents, included).tolist() == [0.5]
+
+    def test_unsupported_grader(self):
+        class CustomGrader(CourseGrader):
+            def grade(self, grade_sheet, generate_random_scores=False):
+                return {'percent': 1.0, 'section_breakdown': [], 'grade_breakdown': {}}
+
+        assert not batch_grading.supports_grader(CustomGrader())
+
+
+class TestCourseGradeFactoryCompute(GradeTestBase):
+    """
+    Tests for CourseGradeFactory.compute.
+    """
+    def setUp(self):
+        super().setUp()
+        self.users = [self.request.user] + [UserFactory() for _ in range(3)]
+        for user in self.users[1:]:
+            CourseEnrollment.enroll(user, self.course.id)
+
+        # Persist a different score in the first subsection for each of
+        # the first three users, and none for the last one.
+        for earned, user in enumerate(self.users[:3]):
+            course_structure = CourseData(user, course=self.course).structure
+            with mock_get_score(earned, 2):
+                SubsectionGradeFactory(user, self.course, course_structure).update(
+                    course_structure[self.sequence.location]
+                )
+
+    def _assert_same_as_update(self, results):
+        """
+        Verifies that the given GradeResults have the same grades as those
+        computed for each user with CourseGrade.update.
+        """
+        assert [result.student for result in results] == self.users
+        for result in results:
+            assert result.error is None
+            expected = CourseGrade(result.student, CourseData(result.student, course=self.course)).update()
+            assert (result.course_grade.percent, result.course_grade.letter_grade, result.course_grade.passed) ==\
+                (expected.percent, expected.letter_grade, expected.passed)
+
+    def test_compute(self):
+        results = list(CourseGradeFactory().compute(self.users, course=self.course))
+        self._assert_same_as_update(results)
+        assert [result.course_grade.percent for result in results] == [0.0, 0.25, 0.5, 0.0]
+
+    def test_compute_in_chunks(self):
+        batch_grader = batch_grading.BatchCourseGrader(CourseData(None, course=self.course), chunk_size=3)
+        results = list(batch_grader.iter(self.users))
+        assert [(result.student, result.percent) for result in results] ==\
+            list(zip(self.users, [0.0, 0.25, 0.5, 0.0]))
+
+    def test_compute_unsupported_grader(self):
+        with patch.object(batch_grading, 'supports_grader', return_value=False):
+            with patch.object(batch_grading.BatchCourseGrader, 'grade') as mock_grade:
+                self._assert_same_as_update(list(CourseGradeFactory().compute(self.users, course=self.course)))
+        assert not mock_grade.called
+
+    def test_compute_failed_batch(self):
+        # The students of a batch which fails are graded one at a time, so only those
+        # who can't be graded get an error.
+        failing_user = self.users[1]
+        update = CourseGrade.update
+
+        def update_or_fail(course_grade, *args, **kwargs):
+            if course_grade.user == failing_user:
+                raise Exception('Cannot grade this student.')
+            return update(course_grade, *args, **kwargs)
+
+        with patch.object(batch_grading.BatchCourseGrader, 'grade', side_effect=Exception('The batch failed.')):
+            with patch.object(CourseGrade, 'update', autospec=True, side_effect=update_or_fail):
+                results = list(CourseGradeFactory().compute(self.users, course=self.course))
+
+        assert [result.student for result in results] == self.users
+        assert [result.error is None for result in results] == [True, False, True, True]
+        assert results[1].course_grade is None
+        assert [results[index].course_grade.percent for index in (0, 2, 3)] == [0.0, 0.5, 0.0]
@@ -368,6 +368,39 @@ class PersistentSubsectionGradeTest(GradesModelTestCase):
         deleted = PersistentSubsectionGrade.delete_subsection_grades_for_learner(self.user.id, self.course_key)
         self.assertEqual(deleted, 2)
 
+    def test_prefetch(self):
+        other_user = UserFactory()
+        grade = PersistentSubsectionGrade.update_or_create_grade(**self.params)
+        PersistentSubsectionGradeOverride.update_or_create_override(
+            requesting_user=self.user,
+            subsection_grade_model=grade,
+            earned_graded_override=0.0,
+            feature=GradeOverrideFeatureEnum.gradebook,
+        )
+        PersistentSubsectionGrade.update_or_create_grade(**dict(self.params, user_id=other_user.id))
+        users = [self.user, other_user, UserFactory()]
+
+        # One query for the grades and their overrides, and one for their visible blocks.
+        with self.assertNumQueries(2):
+            PersistentSubsectionGrade.prefetch(self.course_key, users)
+
+        with self.assertNumQueries(0):
+            grades = [PersistentSubsectionGrade.bulk_read_grades(user.id, self.course_key) for user in users]
+            assert [len(user_grades) for user_grades in grades] == [1, 1, 0]
+            assert grades[0][0].visible_blocks is grades[1][0].visible_blocks
+            assert grades[0][0].visible_blocks.blocks == self.block_records
+            assert grades[0][0].visible_blocks.blocks is grades[1][0].visible_blocks.blocks
+            assert VisibleBlocks.bulk_read(other_user.id, self.course_key) == {
+                self.block_records.hash_value: grades[1][0].visible_blocks,
+            }
+            override = PersistentSubsectionGradeOverride.get_override(self.user.id, self.usage_key)
+            assert override.earned_graded_override == 0
+            assert PersistentSubsectionGradeOverride.get_override(other_user.id, self.usage_key) is None
+
+        PersistentSubsectionGrade.clear_prefetched_data(self.course_key)
+        with self.assertNumQueries(1):
+            VisibleBlocks.bulk_read(other_user.id, self.course_key)
+
 
 @ddt.ddt
 class PersistentCourseGradesTest(GradesModelTestCase):
@@ -36,6 +36,19 @@ USE_ON_DISK_GRADE_REPORTING = CourseWaffleFlag(
     f'{WAFFLE_NAMESPACE}.use_on_disk_grade_reporting', __name__
 )
 
+# .. toggle_name: instructor_task.use_batch_course_grading
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When generating grade reports, compute the course grades of many learners at once from their
+#   persisted subsection grades (see lms.djangoapps.grades.batch_grading), rather than reading the persisted course
+#   grade of each learner.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+USE_BATCH_COURSE_GRADING = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.use_batch_course_grading', __name__
+)
+
 
 def optimize_get_learners_switch_enabled():
     """
@@ -69,3 +82,12 @@ def use_on_disk_grade_reporting(course_id):
     False otherwise.
     """
     return USE_ON_DISK_GRADE_REPORTING.is_enabled(course_id)
+
+
+def use_batch_course_grading(course_id):
+    """
+    Returns True if grade reports should compute the course
+    grades of many learners at once in the given course,
+    False otherwise.
+    """
+    return USE_BATCH_COURSE_GRADING.is_enabled(course_id)
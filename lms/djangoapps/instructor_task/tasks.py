@@ -46,6 +46,8 @@ from lms.djangoapps.instructor_task.tasks_helper.module_state import (
     delete_problem_module_state,
     override_score_module_state,
     perform_module_state_update,
+    perform_module_state_update_for_subtask,
+    perform_module_state_update_in_subtasks,
     rescore_problem_module_state,
     reset_attempts_module_state
 )
@@ -73,15 +75,45 @@ def rescore_problem(entry_id, xblock_instance_args):
 
     `xblock_instance_args` provides information needed by _get_module_instance_for_task()
     to instantiate an xblock instance.
+
+    When all the submissions are rescored, they are split into subtasks which rescore
+    them in parallel, see rescore_problem_subtask.
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = gettext_noop('rescored')
     update_fcn = partial(rescore_problem_module_state, xblock_instance_args)
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    def create_rescore_subtask(student_module_list, initial_subtask_status):
+        """Creates a subtask to rescore the given StudentModule instances."""
+        return rescore_problem_subtask.subtask(
+            (
+                entry_id,
+                xblock_instance_args,
+                [student_module['pk'] for student_module in student_module_list],
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+        )
+
+    visit_fcn = partial(perform_module_state_update_in_subtasks, update_fcn, create_rescore_subtask, None)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
+@shared_task
+@set_code_owner_attribute
+def rescore_problem_subtask(entry_id, xblock_instance_args, student_module_ids, subtask_status_dict):
+    """
+    Rescores the submissions of the given StudentModule ids, as one of the subtasks of a
+    rescore_problem task.
+
+    `entry_id` is the id value of the InstructorTask entry of the rescore_problem task, to which
+    the progress of this subtask is recorded.  `subtask_status_dict` is the initial SubtaskStatus
+    of this subtask, as a dict.
+    """
+    update_fcn = partial(rescore_problem_module_state, xblock_instance_args)
+    return perform_module_state_update_for_subtask(update_fcn, entry_id, student_module_ids, subtask_status_dict)
+
+
 @shared_task(base=BaseInstructorTask)
 @set_code_owner_attribute
 def override_problem_score(entry_id, xblock_instance_args):
@@ -28,12 +28,16 @@ from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
 from lms.djangoapps.grades.api import CourseGradeFactory
 from lms.djangoapps.grades.api import context as grades_context
-from lms.djangoapps.grades.api import prefetch_course_and_subsection_grades
+from lms.djangoapps.grades.api import (
+    clear_prefetched_course_and_subsection_grades,
+    prefetch_course_and_subsection_grades,
+)
 from lms.djangoapps.instructor_analytics.basic import list_problem_responses
 from lms.djangoapps.instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.instructor_task.config.waffle import (
     course_grade_report_verified_only,
     problem_grade_report_verified_only,
+    use_batch_course_grading,
     use_on_disk_grade_reporting,
 )
 from lms.djangoapps.teams.models import CourseTeamMembership
@@ -272,7 +276,6 @@ class _CourseGradeBulkContext:  # lint-amnesty, pylint: disable=missing-class-do
         self.enrollments = _EnrollmentBulkContext(context, users)
         bulk_cache_cohorts(context.course_id, users)
         BulkRoleCache.prefetch(users)
-        prefetch_course_and_subsection_grades(context.course_id, users)
         BulkCourseTags.prefetch(context.course_id, users)
 
 
@@ -496,12 +499,37 @@ class GradeReportBase:
         been processed
         """
 
+    def _course_grades(self, users):
+        """
+        Returns a generator of GradeResults for the given users.
+
+        If batch course grading is enabled for the course, the course
+        grades are computed from the persisted subsection grades of many
+        users at once, rather than read user by user.
+        """
+        grade_results = (
+            CourseGradeFactory().compute if use_batch_course_grading(self.context.course_id)
+            else CourseGradeFactory().iter
+        )
+        return grade_results(
+            users,
+            course=self.context.course,
+            collected_block_structure=self.context.course_structure,
+            course_key=self.context.course_id,
+        )
+
     def _batched_rows(self):
         """
         A generator of batches of (success_rows, error_rows) for this report.
+
+        The persisted grades of each batch of users, along with their
+        visible blocks and overrides, are read with a constant number
+        of queries before its rows are generated.
         """
         for users in self._batch_users():
+            prefetch_course_and_subsection_grades(self.context.course_id, users)
             yield self._rows_for_users(users)
+            clear_prefetched_course_and_subsection_grades(self.context.course_id)
             self._clear_caches()
 
 
@@ -565,12 +593,7 @@ class CourseGradeReport(GradeReportBase):
             bulk_context = _CourseGradeBulkContext(self.context, users)
 
             success_rows, error_rows = [], []
-            for user, course_grade, error in CourseGradeFactory().iter(
-                users,
-                course=self.context.course,
-                collected_block_structure=self.context.course_structure,
-                course_key=self.context.course_id,
-            ):
+            for user, course_grade, error in self._course_grades(users):
                 if not course_grade:
                     # An empty gradeset means we failed to grade a student.
                     error_rows.append([user.id, user.username, str(error)])
@@ -750,12 +773,7 @@ class ProblemGradeReport(GradeReportBase):
         Returns a list of rows for the given users for this report.
         """
         success_rows, error_rows = [], []
-        for student, course_grade, error in CourseGradeFactory().iter(
-            users,
-            course=self.context.course,
-            collected_block_structure=self.context.course_structure,
-            course_key=self.context.course_id,
-        ):
+        for student, course_grade, error in self._course_grades(users):
             if not course_grade:
                 err_msg = str(error)
                 # There was an error grading this student.
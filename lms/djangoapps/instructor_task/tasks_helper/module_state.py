@@ -7,6 +7,8 @@ import json
 import logging
 from time import time
 
+from celery.states import FAILURE, SUCCESS
+from django.conf import settings
 from django.utils.translation import gettext_noop
 from opaque_keys.edx.keys import UsageKey
 from xblock.scorable import Score
@@ -25,6 +27,8 @@ from openedx.core.lib.courses import get_course_by_id
 from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
 
 from ..exceptions import UpdateProblemModuleStateError
+from ..models import InstructorTask
+from ..subtasks import SubtaskStatus, check_subtask_is_valid, queue_subtasks_for_query, update_subtask_status
 from .runner import TaskProgress
 from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED, UPDATE_STATUS_SUCCEEDED
 
@@ -60,26 +64,9 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
 
     """
     start_time = time()
-    usage_keys = []
-    problem_url = task_input.get('problem_url')
-    entrance_exam_url = task_input.get('entrance_exam_url')
     student_identifier = task_input.get('student')
     override_score_task = action_name == gettext_noop('overridden')
-    problems = {}
-
-    # if problem_url is present make a usage key from it
-    if problem_url:
-        usage_key = UsageKey.from_string(problem_url).map_into_course(course_id)
-        usage_keys.append(usage_key)
-
-        # find the problem block:
-        problem_block = modulestore().get_item(usage_key)
-        problems[str(usage_key)] = problem_block
-
-    # if entrance_exam is present grab all problems in it
-    if entrance_exam_url:
-        problems = get_problems_in_section(entrance_exam_url)
-        usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
+    usage_keys, problems = _get_problems_for_task(course_id, task_input)
 
     modules_to_update = _get_modules_to_update(
         course_id, usage_keys, student_identifier, filter_fcn, override_score_task
@@ -108,6 +95,95 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     return task_progress.update_task_state()
 
 
+def perform_module_state_update_in_subtasks(update_fcn, create_subtask_fcn, filter_fcn, entry_id, course_id,
+                                            task_input, action_name):
+    """
+    Performs the update of the StudentModule instances of all the students in subtasks.
+
+    The ids of the StudentModule instances that pass the filtering are split into chunks of
+    settings.INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK, and a subtask is queued for each chunk with
+    `create_subtask_fcn`, which takes the list of the dicts with the 'pk' of the instances of a chunk
+    and the initial SubtaskStatus of the subtask.  Each subtask then calls
+    perform_module_state_update_for_subtask, so that the chunks are updated in parallel by the
+    workers instead of one after the other by this task.
+
+    When a particular student is given, or when there are few enough instances to update, they are
+    updated here with `update_fcn`, as by perform_module_state_update.
+
+    Returns the task progress, as perform_module_state_update does.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    if len(entry.subtasks) > 0:
+        # This task was requeued after queueing its subtasks, which are updating the instances.
+        TASK_LOG.warning("Task %s has already queued its subtasks!  InstructorTask = %s", entry.task_id, entry)
+        return json.loads(entry.task_output)
+
+    if not task_input.get('student'):
+        usage_keys = _get_problems_for_task(course_id, task_input)[0]
+        student_modules = _get_modules_to_update(course_id, usage_keys, None, filter_fcn)
+        total_num_modules = student_modules.count()
+        if total_num_modules > settings.INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK:
+            return queue_subtasks_for_query(
+                entry,
+                action_name,
+                create_subtask_fcn,
+                [student_modules.order_by('pk')],
+                [],
+                settings.INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK,
+                total_num_modules,
+            )
+
+    return perform_module_state_update(update_fcn, filter_fcn, entry_id, course_id, task_input, action_name)
+
+
+def perform_module_state_update_for_subtask(update_fcn, entry_id, student_module_ids, subtask_status_dict):
+    """
+    Performs the update of the given StudentModule instances with the `update_fcn` provided, as a
+    subtask queued by perform_module_state_update_in_subtasks.
+
+    The problem blocks are loaded once for all the instances, which are fetched together with their
+    students, and the progress of the subtask is recorded in the InstructorTask of `entry_id` once
+    they have all been updated.  As in perform_module_state_update, a raised exception indicates a
+    fatal condition, which fails the subtask.
+
+    Returns the final status of the subtask, as a dict.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    # Raises a DuplicateTaskException if the subtask was already performed, or is being performed by another worker.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    task_input = json.loads(entry.task_input)
+    try:
+        problems = _get_problems_for_task(entry.course_id, task_input)[1]
+        student_modules = StudentModule.objects.filter(pk__in=student_module_ids).select_related('student')
+        num_found = 0
+        for student_module in student_modules:
+            num_found += 1
+            block = problems[str(student_module.module_state_key)]
+            update_status = update_fcn(block, student_module, task_input)
+            if update_status == UPDATE_STATUS_SUCCEEDED:
+                subtask_status.increment(succeeded=1)
+            elif update_status == UPDATE_STATUS_FAILED:
+                subtask_status.increment(failed=1)
+            elif update_status == UPDATE_STATUS_SKIPPED:
+                subtask_status.increment(skipped=1)
+            else:
+                raise UpdateProblemModuleStateError(f"Unexpected update_status returned: {update_status}")
+        # Instances deleted since the subtask was queued have nothing left to update.
+        subtask_status.increment(skipped=len(student_module_ids) - num_found)
+    except Exception:
+        TASK_LOG.exception("Subtask %s of instructor task %d failed unexpectedly!", current_task_id, entry_id)
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        raise
+
+    subtask_status.increment(state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
 @outer_atomic
 def rescore_problem_module_state(xblock_instance_args, block, student_module, task_input):
     '''
@@ -389,6 +465,33 @@ def _get_task_id_from_xblock_args(xblock_instance_args):
         return xblock_instance_args.get('task_id', UNKNOWN_TASK_ID)
 
 
+def _get_problems_for_task(course_id, task_input):
+    """
+    Returns the usage keys of the problems to update for the given `task_input`, and a dict of the
+    problem blocks by string usage key.
+    """
+    usage_keys = []
+    problems = {}
+    problem_url = task_input.get('problem_url')
+    entrance_exam_url = task_input.get('entrance_exam_url')
+
+    # if problem_url is present make a usage key from it
+    if problem_url:
+        usage_key = UsageKey.from_string(problem_url).map_into_course(course_id)
+        usage_keys.append(usage_key)
+
+        # find the problem block:
+        problem_block = modulestore().get_item(usage_key)
+        problems[str(usage_key)] = problem_block
+
+    # if entrance_exam is present grab all problems in it
+    if entrance_exam_url:
+        problems = get_problems_in_section(entrance_exam_url)
+        usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
+
+    return usage_keys, problems
+
+
 def _get_modules_to_update(course_id, usage_keys, student_identifier, filter_fcn, override_score_task=False):
     """
     Fetches a StudentModule instances for a given `course_id`, `student` object, and `usage_keys`.
@@ -12,6 +12,7 @@ from uuid import uuid4
 import pytest
 import ddt
 from celery.states import FAILURE, SUCCESS
+from django.test.utils import override_settings
 from django.utils.translation import gettext_noop
 from opaque_keys.edx.keys import i4xEncoder
 
@@ -489,6 +490,38 @@ class TestRescoreInstructorTask(TestInstructorTasks):
             action_name='rescored'
         )
 
+    @override_settings(INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK=3)
+    def test_rescoring_in_subtasks(self):
+        """
+        Tests rescores a problem in a course, for all students, in subtasks.
+        """
+        mock_instance = MagicMock()
+        mock_instance.has_submitted_answer.return_value = True
+
+        num_students = 10
+        self._create_students_with_state(num_students)
+        task_entry = self._create_input_entry()
+        with patch(
+                'lms.djangoapps.instructor_task.tasks_helper.module_state.get_block_for_descriptor'
+        ) as mock_get_block:
+            mock_get_block.return_value = mock_instance
+            self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+
+        assert mock_instance.rescore.call_count == num_students
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        assert entry.task_state == SUCCESS
+        subtasks = json.loads(entry.subtasks)
+        assert subtasks['total'] == subtasks['succeeded'] == 4
+        self.assert_task_output(
+            output=json.loads(entry.task_output),
+            total=num_students,
+            attempted=num_students,
+            succeeded=num_students,
+            skipped=0,
+            failed=0,
+            action_name='rescored'
+        )
+
 
 class TestResetAttemptsInstructorTask(TestInstructorTasks):
     """Tests instructor task that resets problem attempts."""
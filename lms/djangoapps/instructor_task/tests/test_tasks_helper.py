@@ -83,6 +83,7 @@ _TEAMS_CONFIG = TeamsConfig({
     'topics': [{'id': 'topic', 'name': 'Topic', 'description': 'A Topic'}],
 })
 USE_ON_DISK_GRADE_REPORT = 'lms.djangoapps.instructor_task.tasks_helper.grades.use_on_disk_grade_reporting'
+USE_BATCH_COURSE_GRADING = 'lms.djangoapps.instructor_task.tasks_helper.grades.use_batch_course_grading'
 
 
 class InstructorGradeReportTestCase(TestReportMixin, InstructorTaskCourseTestCase):
@@ -965,8 +966,9 @@ class TestProblemReportSplitTestContent(TestReportMixin, TestConditionalContent,
         self.define_option_problem(self.problem_a_url, parent=self.vertical_a)
         self.define_option_problem(self.problem_b_url, parent=self.vertical_b)
 
-    @ddt.data(True, False)
-    def test_problem_grade_report(self, use_tempfile):
+    @ddt.data((True, False), (False, False), (False, True))
+    @ddt.unpack
+    def test_problem_grade_report(self, use_tempfile, batch_grading):
         """
         Test that we generate the correct grade report when dealing with A/B tests.
 
@@ -986,7 +988,8 @@ class TestProblemReportSplitTestContent(TestReportMixin, TestConditionalContent,
 
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
             with patch(USE_ON_DISK_GRADE_REPORT, return_value=use_tempfile):
-                result = ProblemGradeReport.generate(None, None, self.course.id, {}, 'graded')
+                with patch(USE_BATCH_COURSE_GRADING, return_value=batch_grading):
+                    result = ProblemGradeReport.generate(None, None, self.course.id, {}, 'graded')
             self.assertDictContainsSubset(
                 {'action_name': 'graded', 'attempted': 2, 'succeeded': 2, 'failed': 0}, result
             )
@@ -1804,11 +1807,13 @@ class TestGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
         self.define_option_problem('Unreleased', parent=self.unreleased_section)
 
     @patch.dict(settings.FEATURES, {'DISABLE_START_DATES': False})
-    def test_grade_report(self):
+    @ddt.data(False, True)
+    def test_grade_report(self, batch_grading):
         self.submit_student_answer(self.student.username, 'Problem1', ['Option 1'])
 
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
-            result = CourseGradeReport.generate(None, None, self.course.id, {}, 'graded')
+            with patch(USE_BATCH_COURSE_GRADING, return_value=batch_grading):
+                result = CourseGradeReport.generate(None, None, self.course.id, {}, 'graded')
             self.assertDictContainsSubset(
                 {'action_name': 'graded', 'attempted': 1, 'succeeded': 1, 'failed': 0},
                 result,
@@ -1252,6 +1252,20 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_CACHE_CODEC
+# .. setting_default: 'pickle'
+# .. setting_description: The codec with which course structures are encoded in the 'course_structure_cache'
+#     cache, either 'pickle' or 'msgpack'. Cached structures are decoded with the codec they were encoded with,
+#     so this can be changed without clearing the cache.
+COURSE_STRUCTURE_CACHE_CODEC = 'pickle'
+
+# .. setting_name: COURSE_STRUCTURE_CACHE_CHUNK_SIZE
+# .. setting_default: 1000000
+# .. setting_description: The largest size in bytes of the encoded course structures cached in a single entry of
+#     the 'course_structure_cache' cache. Larger structures are split into chunks of this size cached in separate
+#     entries, so this should be below the largest item size of the cache backend, which is 1MB for memcached.
+COURSE_STRUCTURE_CACHE_CHUNK_SIZE = 1000000
+
 ############################ OAUTH2 Provider ###################################
 OAUTH_EXPIRE_CONFIDENTIAL_CLIENT_DAYS = 365
 OAUTH_EXPIRE_PUBLIC_CLIENT_DAYS = 30
@@ -3023,6 +3037,12 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+############################# Instructor Tasks ################################
+
+# The number of StudentModule instances updated by each subtask when the instructor
+# task rescoring a problem for all the students is split into subtasks.
+INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK = 1000
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -11,6 +11,7 @@ The following internal data structures are implemented:
 
 
 from copy import deepcopy
+from datetime import date, datetime, timedelta
 from functools import partial
 from logging import getLogger
 
@@ -26,12 +27,59 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 # A dictionary key value for storing a transformer's version number.
 TRANSFORMER_VERSION_KEY = '_version'
 
+# Types of immutable field values, which are shared rather than deep-copied
+# when copying block structures.  Other classes of collected values that
+# are never modified once collected can opt in to being shared by setting a
+# SHAREABLE_BETWEEN_BLOCK_STRUCTURES class attribute to True.
+_IMMUTABLE_TYPES = frozenset([type(None), bool, int, float, str, bytes, date, datetime, timedelta])
+
+
+def _universal_filter(block_key):  # pylint: disable=unused-argument
+    """
+    A filter function that always returns True.
+    """
+    return True
+
+
+def _is_shareable(value):
+    """
+    Returns whether the given field value can be shared between copies
+    of a block structure.
+    """
+    value_type = type(value)
+    return value_type in _IMMUTABLE_TYPES or getattr(value_type, 'SHAREABLE_BETWEEN_BLOCK_STRUCTURES', False) is True
+
+
+def _copy_value(value, memo):
+    """
+    Returns a deep copy of the given field value, sharing the value
+    itself if it is immutable.
+    """
+    return value if _is_shareable(value) else deepcopy(value, memo)
+
+
+def _set_slots_state(obj, state):
+    """
+    Sets the attributes of the given object with __slots__ from the given
+    pickled state, which is either a dict of attribute values, as pickled
+    before __slots__ were used, or a (dict, slots dict) tuple.
+    """
+    if isinstance(state, tuple):
+        state = dict(state[0] or {}, **(state[1] or {}))
+    for name, value in state.items():
+        object.__setattr__(obj, name, value)
+
 
 class _BlockRelations:
     """
     Data structure to encapsulate relationships for a single block,
     including its children and parents.
+
+    It uses __slots__ since there is an instance for every block of
+    every block structure in memory.
     """
+    __slots__ = ('parents', 'children')
+
     def __init__(self):
 
         # List of usage keys of this block's parents.
@@ -42,6 +90,22 @@ class _BlockRelations:
         # list [UsageKey]
         self.children = []
 
+    def __getstate__(self):
+        return {'parents': self.parents, 'children': self.children}
+
+    def __setstate__(self, state):
+        _set_slots_state(self, state)
+
+    def copy(self):
+        """
+        Returns a new _BlockRelations with copies of the lists of
+        parents and children.
+        """
+        relations = _BlockRelations.__new__(_BlockRelations)
+        relations.parents = list(self.parents)
+        relations.children = list(self.children)
+        return relations
+
 
 class BlockStructure:
     """
@@ -283,14 +347,24 @@ class BlockStructure:
 class FieldData:
     """
     Data structure to encapsulate collected fields.
+
+    The fields defined directly on the class are stored in __slots__,
+    so accesses to them don't go through __getattr__ and instances
+    don't carry a __dict__ in addition to the fields dict.
     """
+    __slots__ = ('fields',)
+
+    # Names of the fields defined directly on the class.  Subclasses
+    # that add __slots__ are expected to add their names.
+    OWN_FIELD_NAMES = frozenset(__slots__)
+
     def class_field_names(self):
         """
         Returns list of names of fields that are defined directly
-        on the class. Can be overridden by subclasses. All other
-        fields are assumed to be stored in the self.fields dict.
+        on the class. All other fields are assumed to be stored in
+        the self.fields dict.
         """
-        return ['fields']
+        return list(self.OWN_FIELD_NAMES)
 
     def __init__(self):
         # Map of field name to the field's value for this block.
@@ -298,37 +372,55 @@ class FieldData:
         self.fields = {}
 
     def __getattr__(self, field_name):
-        if self._is_own_field(field_name):
-            return super().__getattr__(field_name)  # lint-amnesty, pylint: disable=no-member
+        # Only called for fields that are not found on the instance.
+        if field_name in self.OWN_FIELD_NAMES:
+            raise AttributeError(f"Field {field_name} is not set")
         try:
             return self.fields[field_name]
         except KeyError:
             raise AttributeError(f"Field {field_name} does not exist")  # lint-amnesty, pylint: disable=raise-missing-from
 
     def __setattr__(self, field_name, field_value):
-        if self._is_own_field(field_name):
-            return super().__setattr__(field_name, field_value)
+        if field_name in self.OWN_FIELD_NAMES:
+            object.__setattr__(self, field_name, field_value)
         else:
             self.fields[field_name] = field_value
 
     def __delattr__(self, field_name):
-        if self._is_own_field(field_name):
-            return super().__delattr__(field_name)
+        if field_name in self.OWN_FIELD_NAMES:
+            object.__delattr__(self, field_name)
         else:
             del self.fields[field_name]
 
-    def _is_own_field(self, field_name):
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.OWN_FIELD_NAMES}
+
+    def __setstate__(self, state):
+        _set_slots_state(self, state)
+
+    def __deepcopy__(self, memo):
+        field_data = self.__class__.__new__(self.__class__)
+        memo[id(self)] = field_data
+        field_data._copy_own_fields(self, memo)  # pylint: disable=protected-access
+        return field_data
+
+    def _copy_own_fields(self, other, memo):
         """
-        Returns whether the given field_name is the name of an
-        actual field of this class.
+        Sets the fields of this instance to deep copies of the fields of
+        the given instance, using the given deepcopy memo.
         """
-        return field_name in self.class_field_names()
+        object.__setattr__(
+            self,
+            'fields',
+            {field_name: _copy_value(value, memo) for field_name, value in other.fields.items()},
+        )
 
 
 class TransformerData(FieldData):
     """
     Data structure to encapsulate collected data for a transformer.
     """
+    __slots__ = ()
 
 
 class TransformerDataMap(dict):
@@ -337,6 +429,13 @@ class TransformerDataMap(dict):
     The map can be accessed by the Transformer's name or the
     Transformer's class type.
     """
+    def __deepcopy__(self, memo):
+        transformer_data_map = TransformerDataMap()
+        memo[id(self)] = transformer_data_map
+        for transformer_name, transformer_data in self.items():
+            dict.__setitem__(transformer_data_map, transformer_name, deepcopy(transformer_data, memo))
+        return transformer_data_map
+
     def __getitem__(self, key):
         key = self._translate_key(key)
         return dict.__getitem__(self, key)
@@ -381,8 +480,8 @@ class BlockData(FieldData):
     """
     Data structure to encapsulate collected data for a single block.
     """
-    def class_field_names(self):
-        return super().class_field_names() + ['location', 'transformer_data']
+    __slots__ = ('location', 'transformer_data')
+    OWN_FIELD_NAMES = FieldData.OWN_FIELD_NAMES | frozenset(__slots__)
 
     def __init__(self, usage_key):
         super().__init__()
@@ -393,6 +492,12 @@ class BlockData(FieldData):
         # Map of transformer name to its block-specific data.
         self.transformer_data = TransformerDataMap()
 
+    def _copy_own_fields(self, other, memo):
+        super()._copy_own_fields(other, memo)
+        # Usage keys are immutable, so the location is shared.
+        object.__setattr__(self, 'location', other.location)
+        object.__setattr__(self, 'transformer_data', deepcopy(other.transformer_data, memo))
+
 
 class BlockStructureBlockData(BlockStructure):
     """
@@ -416,24 +521,64 @@ class BlockStructureBlockData(BlockStructure):
         # Map of a transformer's name to its non-block-specific data.
         self.transformer_data = TransformerDataMap()
 
+        # Whether the BlockData objects in _block_data_map may be shared
+        # with the block structure this one was copied from on write (see
+        # copy_on_write), along with the set of usage keys of the blocks
+        # whose BlockData are owned by this block structure.
+        self._shares_block_data = False
+        self._owned_block_keys = set()
+        self._copy_memo = {}
+
     def copy(self):
         """
         Returns a new instance of BlockStructureBlockData with a
         deep-copy of this instance's contents.
+
+        Usage keys and immutable field values are shared with the copy,
+        as deep-copying them is the bulk of the cost of a generic
+        deepcopy of a large block structure.
         """
         from .factory import BlockStructureFactory
+        memo = {}
         return BlockStructureFactory.create_new(
             self.root_block_usage_key,
-            deepcopy(self._block_relations),
+            {block_key: relations.copy() for block_key, relations in self._block_relations.items()},
+            deepcopy(self.transformer_data, memo),
+            {block_key: deepcopy(block_data, memo) for block_key, block_data in self._block_data_map.items()},
+        )
+
+    def copy_on_write(self):
+        """
+        Returns a new instance of BlockStructureBlockData that shares the
+        block data of this instance until it is modified, for transforming
+        large collected block structures without copying all of their data.
+
+        The block relations and the non-block-specific transformer data are
+        copied, since transformers commonly modify them.  The data of a block
+        is copied only when it is modified through the block structure (for
+        example, by override_xblock_field or set_transformer_block_field) or
+        when a value of it that could be modified in place (such as a dict or
+        a list) is accessed.  So data accessed through the copy is never
+        shared with this instance, other than immutable values.
+
+        This instance must not be modified while the copy is in use.
+        """
+        from .factory import BlockStructureFactory
+        block_structure = BlockStructureFactory.create_new(
+            self.root_block_usage_key,
+            {block_key: relations.copy() for block_key, relations in self._block_relations.items()},
             deepcopy(self.transformer_data),
-            deepcopy(self._block_data_map),
+            dict(self._block_data_map),
         )
+        block_structure._shares_block_data = True  # pylint: disable=protected-access
+        return block_structure
 
     def iteritems(self):
         """
         Returns iterator of (UsageKey, BlockData) pairs for all
         blocks in the BlockStructure.
         """
+        self._own_all_blocks()
         return iter(self._block_data_map.items())
 
     def itervalues(self):
@@ -441,12 +586,15 @@ class BlockStructureBlockData(BlockStructure):
         Returns iterator of BlockData for all blocks in the
         BlockStructure.
         """
+        self._own_all_blocks()
         return iter(self._block_data_map.values())
 
     def __getitem__(self, usage_key):
         """
         Returns the BlockData associated with the given key.
         """
+        if self._shares_block_data:
+            return self._get_own_block(usage_key)
         return self._block_data_map[usage_key]
 
     def get_xblock_field(self, usage_key, field_name, default=None):
@@ -466,7 +614,12 @@ class BlockStructureBlockData(BlockStructure):
                 not found.
         """
         block_data = self._block_data_map.get(usage_key)
-        return get_datetime_field(block_data, field_name, default) if block_data else default
+        if not block_data:
+            return default
+        value = get_datetime_field(block_data, field_name, default)
+        if self._is_shared_value(usage_key, value):
+            value = get_datetime_field(self._get_own_block(usage_key), field_name, default)
+        return value
 
     def override_xblock_field(self, usage_key, field_name, override_data):
         """
@@ -531,7 +684,7 @@ class BlockStructureBlockData(BlockStructure):
             transformer (BlockStructureTransformer) - The transformer
                 whose dictionary data is requested.
         """
-        return self._block_data_map[usage_key].transformer_data[transformer]
+        return self[usage_key].transformer_data[transformer]
 
     def get_transformer_block_field(self, usage_key, transformer, key, default=None):
         """
@@ -553,10 +706,13 @@ class BlockStructureBlockData(BlockStructure):
                 entry is not found.
         """
         try:
-            transformer_data = self.get_transformer_block_data(usage_key, transformer)
+            transformer_data = self._block_data_map[usage_key].transformer_data[transformer]
         except KeyError:
             return default
-        return get_datetime_field(transformer_data, key, default)
+        value = get_datetime_field(transformer_data, key, default)
+        if self._is_shared_value(usage_key, value):
+            value = get_datetime_field(self.get_transformer_block_data(usage_key, transformer), key, default)
+        return value
 
     def set_transformer_block_field(self, usage_key, transformer, key, value):
         """
@@ -634,6 +790,7 @@ class BlockStructureBlockData(BlockStructure):
         # Remove block.
         self._block_relations.pop(usage_key, None)
         self._block_data_map.pop(usage_key, None)
+        self._owned_block_keys.discard(usage_key)
 
         # Recreate the graph connections if descendants are to be kept.
         if keep_descendants:
@@ -644,8 +801,11 @@ class BlockStructureBlockData(BlockStructure):
     def create_universal_filter(self):
         """
         Returns a filter function that always returns True for all blocks.
+
+        The same function is always returned, so combine_filters can
+        skip it.
         """
-        return lambda block_key: True
+        return _universal_filter
 
     def create_removal_filter(self, removal_condition, keep_descendants=False):
         """
@@ -759,12 +919,51 @@ class BlockStructureBlockData(BlockStructure):
         maps it to the given key.
         """
         try:
+            if self._shares_block_data:
+                return self._get_own_block(usage_key)
             return self._block_data_map[usage_key]
         except KeyError:
             block_data = BlockData(usage_key)
             self._block_data_map[usage_key] = block_data
+            self._owned_block_keys.add(usage_key)
             return block_data
 
+    def _get_own_block(self, usage_key):
+        """
+        Returns the BlockData associated with the given usage_key,
+        first replacing it with a copy if it is shared with the block
+        structure this one was copied from on write.
+
+        Raises KeyError if not found.
+        """
+        block_data = self._block_data_map[usage_key]
+        if usage_key not in self._owned_block_keys:
+            block_data = deepcopy(block_data, self._copy_memo)
+            self._block_data_map[usage_key] = block_data
+            self._owned_block_keys.add(usage_key)
+        return block_data
+
+    def _own_all_blocks(self):
+        """
+        Replaces all BlockData that are shared with the block structure
+        this one was copied from on write with copies.
+        """
+        if self._shares_block_data:
+            for usage_key in list(self._block_data_map):
+                self._get_own_block(usage_key)
+
+    def _is_shared_value(self, usage_key, value):
+        """
+        Returns whether the given field value of the block identified by
+        the given usage_key may be modified in place while it is shared
+        with the block structure this one was copied from on write.
+        """
+        return (
+            self._shares_block_data and
+            not _is_shareable(value) and
+            usage_key not in self._owned_block_keys
+        )
+
 
 class BlockStructureModulestoreData(BlockStructureBlockData):
     """
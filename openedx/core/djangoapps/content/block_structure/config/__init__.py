@@ -9,6 +9,40 @@ from openedx.core.lib.cache_utils import request_cached
 
 from .models import BlockStructureConfiguration
 
+# .. toggle_name: block_structure.columnar_serialization
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, collected block structures are written to the cache and to storage in the
+#   versioned columnar format (see block_structure/serialization.py) instead of as a single compressed pickle. Data
+#   in either format can be read regardless of this switch, so it can be turned on and off safely. Existing stored
+#   data can be converted with the convert_block_structure_format management command.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+COLUMNAR_SERIALIZATION = WaffleSwitch('block_structure.columnar_serialization', __name__)
+
+# .. toggle_name: block_structure.incremental_collect
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, updating the collected block structure of a course (for example, after it
+#   is published) re-collects only the blocks that changed since it was last collected, together with their
+#   ancestors and descendants, instead of the entire course. This requires a modulestore that tracks block versions
+#   (split) and is only used when all registered transformers declare SUPPORTS_INCREMENTAL_COLLECT; otherwise, the
+#   entire course is re-collected as before.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+INCREMENTAL_COLLECT = WaffleSwitch('block_structure.incremental_collect', __name__)
+
+# .. toggle_name: block_structure.copy_on_write_transforms
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, a collected block structure that is shared with other requests (or provided
+#   by the caller) is transformed as a copy-on-write copy of it, which shares the collected data of each block until
+#   the block is modified or a mutable value of it is accessed, instead of as a full copy. This reduces the cost of
+#   transforming large courses, since most transformers only read the collected data of most blocks.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+COPY_ON_WRITE_TRANSFORMS = WaffleSwitch('block_structure.copy_on_write_transforms', __name__)
+
 
 @request_cached()
 def num_versions_to_keep():
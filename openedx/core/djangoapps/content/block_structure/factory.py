@@ -9,7 +9,7 @@ class BlockStructureFactory:
     Factory class for BlockStructure objects.
     """
     @classmethod
-    def create_from_modulestore(cls, root_block_usage_key, modulestore):
+    def create_from_modulestore(cls, root_block_usage_key, modulestore, block_keys=None):
         """
         Creates and returns a block structure from the modulestore
         starting at the given root_block_usage_key.
@@ -22,6 +22,11 @@ class BlockStructureFactory:
                 contains the data for the xBlocks within the block
                 structure starting at root_block_usage_key.
 
+            block_keys (set(UsageKey)) - If given, only the blocks with
+                these usage keys (which should include the root) are
+                added to the block structure, and only their xBlocks
+                are instantiated.
+
         Returns:
             BlockStructureModulestoreData - The created block structure
                 with instantiated xBlocks from the given modulestore
@@ -49,11 +54,22 @@ class BlockStructureFactory:
             block_structure._add_xblock(xblock.location, xblock)  # pylint: disable=protected-access
 
             # Add relations with its children and recurse.
-            for child in xblock.get_children():
+            for child in xblock.get_children(usage_id_filter=usage_id_filter):
                 block_structure._add_relation(xblock.location, child.location)  # pylint: disable=protected-access
                 build_block_structure(child)
 
-        root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=False)
+        if block_keys is None:
+            usage_id_filter = None
+            root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=False)
+        else:
+            # Children's usage ids may be specific to a branch or version
+            # of the course, so compare them by type and id only.
+            included_blocks = {(block_key.block_type, block_key.block_id) for block_key in block_keys}
+
+            def usage_id_filter(usage_id):
+                return (usage_id.block_type, usage_id.block_id) in included_blocks
+
+            root_xblock = modulestore.get_item(root_block_usage_key, depth=0, lazy=False)
         build_block_structure(root_xblock)
         return block_structure
 
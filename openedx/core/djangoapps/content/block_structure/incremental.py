@@ -0,0 +1,222 @@
+"""
+Module for incrementally re-collecting BlockStructures.
+
+A full collect instantiates every xBlock in the course and runs every
+transformer's collect over the whole structure.  When only a few blocks of
+a large course changed since it was last collected (for example, after a
+single unit is published), an incremental collect instead:
+
+    1. Compares the version of each block in the modulestore (see
+       get_block_versions) with the version recorded for the block in the
+       previously collected block structure.
+    2. Collects a partial block structure containing only the changed
+       blocks, along with their descendants (whose inherited values may
+       have changed) and their ancestors (whose collected data is
+       percolated down to the changed blocks).
+    3. Patches the previously collected block structure with the newly
+       collected data of those blocks and the current block relations.
+
+This is only correct for transformers whose collected data for a block
+depends solely on the block itself and its ancestors, so it is only used
+when every registered transformer declares SUPPORTS_INCREMENTAL_COLLECT.
+In all other cases, None is returned and a full collect is expected.
+"""
+
+
+from logging import getLogger
+
+from .block_structure import BlockStructure
+from .factory import BlockStructureFactory
+from .transformer_registry import TransformerRegistry
+from .transformers import BlockStructureTransformers
+
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+# Name of the xBlock field under which the modulestore version of each
+# block is recorded in collected block structures.
+BLOCK_VERSION_FIELD = 'block_version'
+
+# Above this fraction of blocks to re-collect, a full collect is preferred.
+MAX_INCREMENTAL_FRACTION = 0.5
+
+
+def record_block_versions(block_structure):
+    """
+    Records the modulestore version of each xBlock in the given
+    block structure, so the block structure can later be re-collected
+    incrementally.
+
+    Arguments:
+        block_structure (BlockStructureModulestoreData) - A block
+            structure with instantiated xBlocks.
+    """
+    for block_key in block_structure:
+        version = getattr(block_structure.get_xblock(block_key), 'update_version', None)
+        if version is not None:
+            block_structure.override_xblock_field(block_key, BLOCK_VERSION_FIELD, version)
+
+
+def supports_incremental_collect():
+    """
+    Returns whether all registered transformers support incremental
+    collection.
+    """
+    return all(
+        getattr(transformer, 'SUPPORTS_INCREMENTAL_COLLECT', False)
+        for transformer in TransformerRegistry.get_registered_transformers()
+    )
+
+
+def collect_incrementally(root_block_usage_key, modulestore, collected_block_structure):
+    """
+    Returns a newly collected block structure for the given
+    root_block_usage_key, re-collecting only the blocks that changed
+    since the given collected_block_structure was collected.
+
+    Arguments:
+        root_block_usage_key (UsageKey) - The usage_key for the root
+            of the block structure.
+
+        modulestore (ModuleStoreRead) - The modulestore that contains
+            the data for the xBlocks.
+
+        collected_block_structure (BlockStructureBlockData) - The
+            previously collected block structure.  It is not modified.
+
+    Returns:
+        BlockStructureBlockData - The collected block structure, or None
+            if it can't be collected incrementally.
+    """
+    if not supports_incremental_collect():
+        return None
+
+    try:
+        block_versions = modulestore.get_block_versions(root_block_usage_key.course_key)
+    except (AttributeError, NotImplementedError):
+        logger.info('BlockStructure: Modulestore does not support incremental collect; %s.', root_block_usage_key)
+        return None
+
+    block_relations = _block_relations(root_block_usage_key, block_versions)
+    if block_relations is None:
+        return None
+
+    changed_blocks = {
+        block_key
+        for block_key, relations in block_relations.items()
+        if (
+            collected_block_structure.get_xblock_field(block_key, BLOCK_VERSION_FIELD) != block_versions[block_key][0]
+            or collected_block_structure.get_children(block_key) != relations.children
+        )
+    }
+    blocks_to_collect = _with_ancestors_and_descendants(block_relations, changed_blocks)
+    blocks_to_collect.add(root_block_usage_key)
+
+    if len(blocks_to_collect) > MAX_INCREMENTAL_FRACTION * len(block_relations):
+        logger.info(
+            'BlockStructure: Too many changed blocks for incremental collect; %s, changed: %d, total: %d.',
+            root_block_usage_key,
+            len(blocks_to_collect),
+            len(block_relations),
+        )
+        return None
+
+    if any(
+        parent not in blocks_to_collect
+        for block_key in blocks_to_collect
+        for parent in block_relations[block_key].parents
+    ):
+        # A re-collected block has a parent that is not re-collected, as
+        # can happen in DAGs, so its percolated data would be incomplete.
+        logger.info('BlockStructure: Changed blocks are not a closed subtree; %s.', root_block_usage_key)
+        return None
+
+    partial_block_structure = BlockStructureFactory.create_from_modulestore(
+        root_block_usage_key,
+        modulestore,
+        block_keys=blocks_to_collect,
+    )
+    BlockStructureTransformers.collect(partial_block_structure)
+    record_block_versions(partial_block_structure)
+
+    logger.info(
+        'BlockStructure: Collected incrementally; %s, changed: %d, re-collected: %d, total: %d.',
+        root_block_usage_key,
+        len(changed_blocks),
+        len(blocks_to_collect),
+        len(block_relations),
+    )
+    return _patch(collected_block_structure, partial_block_structure, block_relations)
+
+
+def _block_relations(root_block_usage_key, block_versions):
+    """
+    Returns the block relations map of the blocks reachable from the
+    given root_block_usage_key in the given block_versions, or None if
+    the root is not found.
+    """
+    if root_block_usage_key not in block_versions:
+        return None
+
+    block_relations = {}
+    BlockStructure._add_block(block_relations, root_block_usage_key)  # pylint: disable=protected-access
+    stack = [root_block_usage_key]
+    visited = {root_block_usage_key}
+    while stack:
+        block_key = stack.pop()
+        for child in block_versions[block_key][1]:
+            if child not in block_versions:
+                continue
+            BlockStructure._add_to_relations(block_relations, block_key, child)  # pylint: disable=protected-access
+            if child not in visited:
+                visited.add(child)
+                stack.append(child)
+    return block_relations
+
+
+def _with_ancestors_and_descendants(block_relations, block_keys):
+    """
+    Returns the set of the given block_keys along with all of their
+    ancestors and descendants in the given block_relations map.
+    """
+    result = set(block_keys)
+    for relation_name in ('parents', 'children'):
+        stack = list(block_keys)
+        visited = set(block_keys)
+        while stack:
+            for related in getattr(block_relations[stack.pop()], relation_name):
+                if related not in visited:
+                    visited.add(related)
+                    result.add(related)
+                    stack.append(related)
+    return result
+
+
+def _patch(collected_block_structure, partial_block_structure, block_relations):
+    """
+    Returns a new block structure with the given block_relations, the
+    collected data of the blocks in the partial_block_structure, and the
+    collected data of the collected_block_structure for all other blocks.
+    """
+    # pylint: disable=protected-access
+    patched_block_structure = collected_block_structure.copy()
+
+    block_data_map = {}
+    for block_key in block_relations:
+        if block_key in partial_block_structure:
+            block_data_map[block_key] = partial_block_structure[block_key]
+        elif block_key in patched_block_structure._block_data_map:
+            block_data_map[block_key] = patched_block_structure[block_key]
+
+    # Transformer-level data is merged field by field, so data that
+    # was not re-collected is kept.
+    for transformer_name, transformer_data in partial_block_structure.transformer_data.items():
+        patched_block_structure.transformer_data.get_or_create(transformer_name).fields.update(
+            transformer_data.fields
+        )
+
+    return BlockStructureFactory.create_new(
+        collected_block_structure.root_block_usage_key,
+        block_relations,
+        patched_block_structure.transformer_data,
+        block_data_map,
+    )
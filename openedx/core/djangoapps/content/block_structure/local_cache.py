@@ -0,0 +1,184 @@
+"""
+Module for the process-local cache of collected BlockStructures.
+
+The BlockStructureStore keeps collected block structures in the django
+cache (typically memcached) and in storage, so every request pays for
+fetching and deserializing the structure even when the same worker process
+deserialized the very same version of it moments before.  This module
+provides a size-bounded, least-recently-used cache of deserialized block
+structures, shared by all requests served by the process.
+
+Entries are keyed by the course's root usage key together with the version
+data of the stored BlockStructureModel, so a stale entry is never returned
+after the course is re-collected.  Entries are shared and must be treated
+as immutable; callers that need to mutate a block structure (such as the
+transform phase) must do so on a copy.
+"""
+
+
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+from weakref import WeakSet
+
+from django.conf import settings
+
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+
+def max_size_in_bytes():
+    """
+    Returns the configured maximum size of the process-local cache.
+    """
+    # .. setting_name: BLOCK_STRUCTURES_SETTINGS['LOCAL_CACHE_MAX_BYTES']
+    # .. setting_default: 0
+    # .. setting_description: Maximum total size, in bytes, of the collected block structures that each process
+    #   keeps in its in-memory least-recently-used cache in front of the block structure cache and storage. The
+    #   size of a block structure is approximated by the size of its serialized data, which is considerably
+    #   smaller than its in-memory size. A value of 0 disables the process-local cache.
+    return settings.BLOCK_STRUCTURES_SETTINGS.get('LOCAL_CACHE_MAX_BYTES', 0)
+
+
+class BlockStructureLocalCache:
+    """
+    Size-bounded LRU cache of collected block structures, keyed by
+    root block usage key and version data.
+    """
+    def __init__(self):
+        self._lock = Lock()
+
+        # Map of (root_block_usage_key, version key) to a tuple of
+        # (BlockStructureBlockData, size in bytes), ordered from least
+        # to most recently used.
+        self._entries = OrderedDict()
+        self._current_size = 0
+
+        # The block structures which have been cached, including those
+        # evicted since, which other requests may still be using.
+        self._shared = WeakSet()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, root_block_usage_key, version_data):
+        """
+        Returns the shared block structure cached for the given
+        root_block_usage_key and version_data, or None if not found.
+        """
+        if not max_size_in_bytes():
+            return None
+
+        key = self._key(root_block_usage_key, version_data)
+        with self._lock:
+            try:
+                block_structure, _ = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return block_structure
+
+    def set(self, root_block_usage_key, version_data, block_structure, size):
+        """
+        Caches the given block structure for the given root_block_usage_key
+        and version_data, evicting least recently used entries as needed to
+        remain within the configured size.  Any other versions of the block
+        structure are removed.
+
+        Arguments:
+            size (int) - Size, in bytes, to account for the entry.
+        """
+        max_size = max_size_in_bytes()
+        if not max_size or size > max_size:
+            return
+
+        key = self._key(root_block_usage_key, version_data)
+        with self._lock:
+            self._remove_all(root_block_usage_key)
+            self._entries[key] = (block_structure, size)
+            self._shared.add(block_structure)
+            self._current_size += size
+            while self._current_size > max_size:
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self._current_size -= evicted_size
+                self.evictions += 1
+                logger.debug('BlockStructure: Evicted from local cache; %s.', evicted_key[0])
+
+    def contains(self, block_structure):
+        """
+        Returns whether the given block structure instance is shared
+        through this cache.  A block structure remains shared after it is
+        evicted or invalidated, since requests which got it from the cache
+        before may still be using it.
+        """
+        with self._lock:
+            return block_structure in self._shared
+
+    def invalidate(self, root_block_usage_key):
+        """
+        Removes all cached versions of the block structure for the
+        given root_block_usage_key.
+        """
+        with self._lock:
+            self._remove_all(root_block_usage_key)
+
+    def invalidate_course(self, course_key):
+        """
+        Removes all cached block structures of the given course.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if getattr(key[0], 'course_key', None) == course_key]:
+                self._remove(key)
+
+    def clear(self):
+        """
+        Removes all entries and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._current_size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Returns a dict of the counters and current usage of this cache,
+        for use in sizing the cache per process.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size_in_bytes': self._current_size,
+                'max_size_in_bytes': max_size_in_bytes(),
+            }
+
+    def _remove_all(self, root_block_usage_key):
+        """
+        Removes all entries for the given root_block_usage_key.
+        Must be called with the lock held.
+        """
+        for key in [key for key in self._entries if key[0] == root_block_usage_key]:
+            self._remove(key)
+
+    def _remove(self, key):
+        """
+        Removes the entry for the given key.  Must be called with the
+        lock held.
+        """
+        _, size = self._entries.pop(key)
+        self._current_size -= size
+
+    @staticmethod
+    def _key(root_block_usage_key, version_data):
+        """
+        Returns the key of the entry for the given values.
+        """
+        return root_block_usage_key, tuple(sorted(version_data.items()))
+
+
+# The cache shared by all requests served by this process.
+local_cache = BlockStructureLocalCache()
@@ -0,0 +1,76 @@
+"""
+Command to convert stored course blocks to the configured serialization format.
+"""
+
+
+import logging
+
+from django.core.management.base import BaseCommand
+
+from openedx.core.djangoapps.content.block_structure.api import get_cache
+from openedx.core.djangoapps.content.block_structure.exceptions import BlockStructureNotFound
+from openedx.core.djangoapps.content.block_structure.models import BlockStructureModel
+from openedx.core.djangoapps.content.block_structure.store import BlockStructureStore
+from openedx.core.lib.command_utils import get_mutually_exclusive_required_option, parse_course_keys
+from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Rewrites stored block structures in the serialization format selected
+    by the block_structure.columnar_serialization waffle switch, so stored
+    data in the legacy pickled format can be migrated to the columnar format
+    (or back) without recollecting it from the modulestore.
+
+    Example usage:
+        $ ./manage.py lms convert_block_structure_format --all_courses --settings=devstack
+        $ ./manage.py lms convert_block_structure_format --courses 'course-v1:edX+DemoX+Demo_Course' --settings=devstack
+    """
+    help = 'Converts stored course blocks to the configured serialization format.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--courses',
+            dest='courses',
+            nargs='+',
+            help='Convert course blocks for the list of courses provided.',
+        )
+        parser.add_argument(
+            '--all_courses',
+            help='Convert course blocks for all courses in block structure storage.',
+            action='store_true',
+            default=False,
+        )
+
+    def handle(self, *args, **options):
+        courses_mode = get_mutually_exclusive_required_option(options, 'courses', 'all_courses')
+        if courses_mode == 'all_courses':
+            usage_keys = list(BlockStructureModel.objects.values_list('data_usage_key', flat=True))
+        else:
+            usage_keys = [
+                modulestore().make_course_usage_key(course_key)
+                for course_key in parse_course_keys(options['courses'])
+            ]
+
+        store = BlockStructureStore(get_cache())
+        num_converted = 0
+        for usage_key in usage_keys:
+            try:
+                if store.convert_format(usage_key):
+                    num_converted += 1
+                    log.info('BlockStructure: Converted stored format for %s.', usage_key)
+            except BlockStructureNotFound:
+                log.warning('BlockStructure: No stored block structure to convert for %s.', usage_key)
+            except Exception as ex:  # pylint: disable=broad-except
+                log.exception('BlockStructure: An error occurred while converting %s: %s', usage_key, str(ex))
+
+        log.critical(
+            'BlockStructure: FINISHED converting stored format; converted %d out of %d.',
+            num_converted,
+            len(usage_keys),
+        )
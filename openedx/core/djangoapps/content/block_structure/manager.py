@@ -6,8 +6,10 @@ BlockStructures.
 
 from contextlib import contextmanager
 
+from . import config
 from .exceptions import BlockStructureNotFound, TransformerDataIncompatible, UsageKeyNotInBlockStructure
 from .factory import BlockStructureFactory
+from .incremental import collect_incrementally, record_block_versions
 from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
@@ -64,7 +66,15 @@ class BlockStructureManager:
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = collected_block_structure.copy() if collected_block_structure else self.get_collected(user)
+        if collected_block_structure:
+            block_structure = self._copy_for_transform(collected_block_structure)
+        else:
+            block_structure = self.get_collected(user)
+            if self.store.is_shared(block_structure):
+                # The collected block structure is shared with other
+                # requests through the process-local cache, so transform
+                # a copy of it instead.
+                block_structure = self._copy_for_transform(block_structure)
 
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
@@ -80,6 +90,16 @@ class BlockStructureManager:
         transformers.transform(block_structure)
         return block_structure
 
+    @staticmethod
+    def _copy_for_transform(block_structure):
+        """
+        Returns a copy of the given collected block structure that can
+        be transformed without modifying it.
+        """
+        if config.COPY_ON_WRITE_TRANSFORMS.is_enabled():
+            return block_structure.copy_on_write()
+        return block_structure.copy()
+
     def get_collected(self, user=None):
         """
         Returns the collected Block Structure for the root_block_usage_key,
@@ -96,7 +116,9 @@ class BlockStructureManager:
         Returns:
             BlockStructureBlockData - A collected block structure,
                 starting at root_block_usage_key, with collected data
-                from each registered transformer.
+                from each registered transformer.  The block structure
+                may be shared through the process-local cache and must
+                not be mutated.
         """
         try:
             block_structure = BlockStructureFactory.create_from_store(
@@ -133,14 +155,34 @@ class BlockStructureManager:
         the modulestore.
         """
         with self._bulk_operations():
-            block_structure = BlockStructureFactory.create_from_modulestore(
-                self.root_block_usage_key,
-                self.modulestore,
-            )
-            BlockStructureTransformers.collect(block_structure)
+            block_structure = None
+            if config.INCREMENTAL_COLLECT.is_enabled():
+                block_structure = self._collect_incrementally()
+
+            if block_structure is None:
+                block_structure = BlockStructureFactory.create_from_modulestore(
+                    self.root_block_usage_key,
+                    self.modulestore,
+                )
+                BlockStructureTransformers.collect(block_structure)
+                record_block_versions(block_structure)
             self.store.add(block_structure)
             return block_structure
 
+    def _collect_incrementally(self):
+        """
+        Returns a block structure collected by re-collecting only the
+        blocks that changed since the block structure in the store was
+        collected, or None if that isn't possible.
+        """
+        try:
+            collected_block_structure = self.store.get(self.root_block_usage_key)
+            BlockStructureTransformers.verify_versions(collected_block_structure)
+        except (BlockStructureNotFound, TransformerDataIncompatible):
+            return None
+
+        return collect_incrementally(self.root_block_usage_key, self.modulestore, collected_block_structure)
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
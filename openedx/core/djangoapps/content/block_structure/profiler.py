@@ -0,0 +1,199 @@
+"""
+Module for profiling the transform phase of BlockStructureTransformers.
+
+When profiling is enabled, BlockStructureTransformers.transform records,
+for each transformer that it runs:
+
+    * wall_time - The time, in seconds, spent in the transformer.  For
+      filtering transformers, this includes creating the filters and
+      evaluating them during the combined traversal.
+    * blocks_visited - The number of blocks the transformer examined.  For
+      filtering transformers, this is the number of blocks its filters
+      were evaluated on, which excludes blocks already rejected by the
+      filters of preceding transformers.  For other transformers, this is
+      the number of blocks in the structure when the transformer was run.
+    * blocks_removed - The number of blocks the transformer removed (or,
+      for filtering transformers, rejected) directly.  Descendants that
+      became unreachable as a result are not counted.
+
+The records of the current request are kept in the request cache, so
+they can be reported with the response, and are aggregated into
+process-wide, per-transformer histograms of wall time.
+"""
+
+
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+from edx_django_utils.cache import RequestCache
+
+REQUEST_CACHE_NAMESPACE = 'block_structure.profiler'
+
+# Upper bounds, in milliseconds, of the wall time histogram buckets.  The
+# last bucket holds all greater times.
+HISTOGRAM_BUCKETS_IN_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def is_enabled():
+    """
+    Returns whether transformers should be profiled in this request,
+    either because profiling is enabled for the process or it was
+    requested for the current request.
+    """
+    # .. setting_name: BLOCK_STRUCTURES_SETTINGS['PROFILE_TRANSFORMERS']
+    # .. setting_default: False
+    # .. setting_description: When True, the wall time, number of blocks visited and number of blocks removed by
+    #   each transformer are recorded whenever block structures are transformed, and aggregated into
+    #   per-transformer histograms (see block_structure/profiler.py). Profiling adds overhead to the evaluation of
+    #   each transformer filter.
+    return settings.BLOCK_STRUCTURES_SETTINGS.get('PROFILE_TRANSFORMERS', False) or bool(_request_data().get('forced'))
+
+
+@contextmanager
+def profiling():
+    """
+    Context manager that enables profiling of the transformers run
+    within it, regardless of the PROFILE_TRANSFORMERS setting.
+    """
+    data = _request_data()
+    previously_forced = data.get('forced', False)
+    data['forced'] = True
+    try:
+        yield
+    finally:
+        data['forced'] = previously_forced
+
+
+def request_records():
+    """
+    Returns the list of TransformerRecords recorded in the current
+    request, in the order the transformers were run.
+    """
+    return list(_request_data().get('records', []))
+
+
+def server_timing_header(records):
+    """
+    Returns a value for the Server-Timing HTTP response header
+    describing the given TransformerRecords.
+    """
+    return ', '.join(
+        '{name};dur={duration:.3f};desc="visited={visited} removed={removed}"'.format(
+            name=record.transformer_name,
+            duration=record.wall_time * 1000,
+            visited=record.blocks_visited,
+            removed=record.blocks_removed,
+        )
+        for record in records
+    )
+
+
+def _request_data():
+    """
+    Returns the request cache data of this module.
+    """
+    return RequestCache(REQUEST_CACHE_NAMESPACE).data
+
+
+class TransformerRecord:
+    """
+    The profile of a single run of a transformer.
+    """
+    __slots__ = ('transformer_name', 'wall_time', 'blocks_visited', 'blocks_removed')
+
+    def __init__(self, transformer_name, wall_time=0.0, blocks_visited=0, blocks_removed=0):
+        self.transformer_name = transformer_name
+        self.wall_time = wall_time
+        self.blocks_visited = blocks_visited
+        self.blocks_removed = blocks_removed
+
+    def profile_filter(self, filter_func):
+        """
+        Returns the given filter function wrapped so that its
+        evaluations are added to this record.
+        """
+        def profiled_filter(block_key):
+            start = perf_counter()
+            retained = filter_func(block_key)
+            self.wall_time += perf_counter() - start
+            self.blocks_visited += 1
+            if not retained:
+                self.blocks_removed += 1
+            return retained
+        return profiled_filter
+
+    def __repr__(self):
+        return (
+            f'TransformerRecord({self.transformer_name!r}, wall_time={self.wall_time}, '
+            f'blocks_visited={self.blocks_visited}, blocks_removed={self.blocks_removed})'
+        )
+
+
+class TransformerProfiler:
+    """
+    Aggregates TransformerRecords into per-transformer counters and
+    wall time histograms, shared by all requests served by the process.
+    """
+    def __init__(self):
+        self._lock = Lock()
+
+        # Map of transformer name to its aggregated counters.
+        self._profiles = {}
+
+    def record(self, record):
+        """
+        Adds the given TransformerRecord to the records of the current
+        request and to the aggregated profile of its transformer.
+        """
+        _request_data().setdefault('records', []).append(record)
+
+        wall_time_in_ms = record.wall_time * 1000
+        bucket = next(
+            (index for index, bound in enumerate(HISTOGRAM_BUCKETS_IN_MS) if wall_time_in_ms <= bound),
+            len(HISTOGRAM_BUCKETS_IN_MS),
+        )
+        with self._lock:
+            profile = self._profiles.setdefault(record.transformer_name, {
+                'count': 0,
+                'total_wall_time': 0.0,
+                'max_wall_time': 0.0,
+                'blocks_visited': 0,
+                'blocks_removed': 0,
+                'histogram': [0] * (len(HISTOGRAM_BUCKETS_IN_MS) + 1),
+            })
+            profile['count'] += 1
+            profile['total_wall_time'] += record.wall_time
+            profile['max_wall_time'] = max(profile['max_wall_time'], record.wall_time)
+            profile['blocks_visited'] += record.blocks_visited
+            profile['blocks_removed'] += record.blocks_removed
+            profile['histogram'][bucket] += 1
+
+    def stats(self):
+        """
+        Returns a dict mapping the name of each profiled transformer to
+        its aggregated counters, where 'histogram' maps the upper bound
+        of each wall time bucket (as a label) to its count.
+        """
+        labels = [f'<={bound}ms' for bound in HISTOGRAM_BUCKETS_IN_MS] + [f'>{HISTOGRAM_BUCKETS_IN_MS[-1]}ms']
+        with self._lock:
+            return {
+                transformer_name: dict(
+                    profile,
+                    mean_wall_time=profile['total_wall_time'] / profile['count'],
+                    histogram=dict(zip(labels, profile['histogram'])),
+                )
+                for transformer_name, profile in self._profiles.items()
+            }
+
+    def clear(self):
+        """
+        Removes all aggregated profiles.
+        """
+        with self._lock:
+            self._profiles.clear()
+
+
+# The profiler shared by all requests served by this process.
+transformer_profiler = TransformerProfiler()
@@ -0,0 +1,348 @@
+"""
+Module for the columnar serialization format of collected BlockStructures.
+
+The legacy format (see openedx.core.lib.cache_utils.zpickle) compresses and
+pickles the entire tuple of block relations, transformer data and block data,
+so every read pays for inflating and unpickling every BlockData and
+TransformerData object in the course.
+
+The columnar format instead lays out a collected block structure as
+independently encoded sections:
+
+    * keys - the table of block usage keys; a block's position in this
+      table is its integer block index.
+    * child_offsets/child_indices and parent_offsets/parent_indices -
+      CSR-style index arrays of the block relations, stored as raw
+      unsigned int arrays so they can be read from a memoryview (or an
+      mmap of a stored file) without being copied or unpickled.
+    * xblock_field:<field_name> - one sparse column per collected xBlock
+      field, holding the indices of the blocks that have the field and
+      their values.
+    * transformer:<transformer_name> - the non-block-specific data of a
+      transformer.
+    * transformer_blocks:<transformer_name> - the indices of the blocks
+      that have block-specific data for the transformer.
+    * transformer_field:<transformer_name>:<field_name> - one sparse column
+      per block-specific field of a transformer.
+
+The sections are located through a directory at the head of the payload,
+so a reader only inflates the sections it decodes.  In particular,
+deserialize accepts a list of transformers and skips the block-specific
+columns of all other transformers.
+
+    +-------+---------+---------------+-----------+----------+-----
+    | MAGIC | VERSION | DIRECTORY_LEN | DIRECTORY | SECTION  | ...
+    +-------+---------+---------------+-----------+----------+-----
+"""
+
+
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations
+from .factory import BlockStructureFactory
+
+# Leading bytes identifying a payload in the columnar format.  Payloads in
+# the legacy format are zlib streams, which never start with these bytes.
+MAGIC = b'BSCF'
+
+# The latest version of the columnar format.  Incrementally update this
+# value whenever the layout changes, keeping the ability to read all
+# previously written versions.
+FORMAT_VERSION = 1
+
+# Big-endian format version and directory length that follow MAGIC.
+_PREAMBLE = struct.Struct('>HI')
+
+# Type code of the arrays used for the block relation indices.
+_INDEX_TYPECODE = 'I'
+
+# Encodings of the individual sections.
+_RAW_ENCODING = 'raw'
+_ZPICKLE_ENCODING = 'zpickle'
+
+# Names, or prefixes of names, of the sections in the payload.
+_KEYS_SECTION = 'keys'
+_CHILD_OFFSETS_SECTION = 'child_offsets'
+_CHILD_INDICES_SECTION = 'child_indices'
+_PARENT_OFFSETS_SECTION = 'parent_offsets'
+_PARENT_INDICES_SECTION = 'parent_indices'
+_BLOCK_DATA_SECTION = 'block_data'
+_XBLOCK_FIELD_PREFIX = 'xblock_field:'
+_TRANSFORMER_PREFIX = 'transformer:'
+_TRANSFORMER_BLOCKS_PREFIX = 'transformer_blocks:'
+_TRANSFORMER_FIELD_PREFIX = 'transformer_field:'
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized data is in the columnar format.
+    """
+    return bytes(serialized_data[:len(MAGIC)]) == MAGIC
+
+
+def serialize(block_structure):
+    """
+    Serializes the collected data of the given block_structure into the
+    columnar format.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The collected block
+            structure to serialize.
+
+    Returns:
+        bytes - The serialized data.
+    """
+    # pylint: disable=protected-access
+    block_relations = block_structure._block_relations
+    block_data_map = block_structure._block_data_map
+
+    # Blocks with data that are no longer in the relations are kept,
+    # positioned after all related blocks.
+    block_keys = list(block_relations)
+    num_related_blocks = len(block_keys)
+    block_keys.extend(key for key in block_data_map if key not in block_relations)
+    block_index = {block_key: index for index, block_key in enumerate(block_keys)}
+
+    writer = _SectionWriter()
+    writer.add_pickled(_KEYS_SECTION, block_keys)
+
+    for offsets_name, indices_name, relation_name in (
+        (_CHILD_OFFSETS_SECTION, _CHILD_INDICES_SECTION, 'children'),
+        (_PARENT_OFFSETS_SECTION, _PARENT_INDICES_SECTION, 'parents'),
+    ):
+        offsets, indices = array(_INDEX_TYPECODE, [0]), array(_INDEX_TYPECODE)
+        for block_key in block_keys[:num_related_blocks]:
+            indices.extend(block_index[related] for related in getattr(block_relations[block_key], relation_name))
+            offsets.append(len(indices))
+        writer.add_raw(offsets_name, offsets)
+        writer.add_raw(indices_name, indices)
+
+    xblock_fields = {}
+    transformer_blocks = {}
+    transformer_fields = {}
+    for block_key, block_data in block_data_map.items():
+        index = block_index[block_key]
+        for field_name, value in block_data.fields.items():
+            _append_to_column(xblock_fields, field_name, index, value)
+        for transformer_name, transformer_data in block_data.transformer_data.items():
+            transformer_blocks.setdefault(transformer_name, []).append(index)
+            for field_name, value in transformer_data.fields.items():
+                _append_to_column(transformer_fields, (transformer_name, field_name), index, value)
+
+    writer.add_raw(_BLOCK_DATA_SECTION, array(_INDEX_TYPECODE, (block_index[key] for key in block_data_map)))
+    for field_name, column in xblock_fields.items():
+        writer.add_pickled(_XBLOCK_FIELD_PREFIX + field_name, column)
+    for transformer_name, transformer_data in block_structure.transformer_data.items():
+        writer.add_pickled(_TRANSFORMER_PREFIX + transformer_name, transformer_data.fields)
+    for transformer_name, indices in transformer_blocks.items():
+        writer.add_raw(_TRANSFORMER_BLOCKS_PREFIX + transformer_name, array(_INDEX_TYPECODE, indices))
+    for (transformer_name, field_name), column in transformer_fields.items():
+        writer.add_pickled(f'{_TRANSFORMER_FIELD_PREFIX}{transformer_name}:{field_name}', column)
+
+    return writer.getvalue(num_related_blocks)
+
+
+def deserialize(serialized_data, root_block_usage_key, transformers=None):
+    """
+    Deserializes the given columnar serialized data and returns the
+    block structure.
+
+    Arguments:
+        serialized_data (bytes-like object) - Data previously returned by
+            serialize.  Any object supporting the buffer protocol, such as
+            a memoryview or an mmap of a stored file, can be given; the
+            block relation arrays are read from it without being copied.
+
+        root_block_usage_key (UsageKey) - The usage key of the root of
+            the block structure.
+
+        transformers ([BlockStructureTransformer or string]) - If given,
+            only the block-specific data of these transformers is decoded.
+            The non-block-specific data (including the version) of all
+            transformers is always decoded.
+
+    Returns:
+        BlockStructureBlockData - The deserialized block structure.
+
+    Raises:
+        ValueError if the given data is not in a supported columnar format.
+    """
+    reader = _SectionReader(serialized_data)
+    block_keys = reader.read(_KEYS_SECTION)
+
+    block_relations = {}
+    for block_key in block_keys[:reader.num_related_blocks]:
+        block_relations[block_key] = _BlockRelations()
+    for offsets_name, indices_name, relation_name in (
+        (_CHILD_OFFSETS_SECTION, _CHILD_INDICES_SECTION, 'children'),
+        (_PARENT_OFFSETS_SECTION, _PARENT_INDICES_SECTION, 'parents'),
+    ):
+        offsets, indices = reader.read(offsets_name), reader.read(indices_name)
+        for index, relations in enumerate(block_relations.values()):
+            setattr(
+                relations,
+                relation_name,
+                [block_keys[related] for related in indices[offsets[index]:offsets[index + 1]]],
+            )
+
+    block_data_by_index = {}
+    for index in reader.read(_BLOCK_DATA_SECTION):
+        block_data_by_index[index] = BlockData(block_keys[index])
+    for field_name in reader.names_with_prefix(_XBLOCK_FIELD_PREFIX):
+        indices, values = reader.read(_XBLOCK_FIELD_PREFIX + field_name)
+        for index, value in zip(indices, values):
+            block_data_by_index[index].fields[field_name] = value
+
+    transformer_data = TransformerDataMap()
+    for transformer_name in reader.names_with_prefix(_TRANSFORMER_PREFIX):
+        transformer_data[transformer_name] = _transformer_data(reader.read(_TRANSFORMER_PREFIX + transformer_name))
+
+    requested_transformer_names = _transformer_names(transformers)
+    for transformer_name in reader.names_with_prefix(_TRANSFORMER_BLOCKS_PREFIX):
+        if requested_transformer_names is None or transformer_name in requested_transformer_names:
+            for index in reader.read(_TRANSFORMER_BLOCKS_PREFIX + transformer_name):
+                block_data_by_index[index].transformer_data[transformer_name] = TransformerData()
+    for column_name in reader.names_with_prefix(_TRANSFORMER_FIELD_PREFIX):
+        transformer_name, field_name = column_name.split(':', 1)
+        if requested_transformer_names is None or transformer_name in requested_transformer_names:
+            indices, values = reader.read(_TRANSFORMER_FIELD_PREFIX + column_name)
+            for index, value in zip(indices, values):
+                block_data_by_index[index].transformer_data[transformer_name].fields[field_name] = value
+
+    return BlockStructureFactory.create_new(
+        root_block_usage_key,
+        block_relations,
+        transformer_data,
+        {block_data.location: block_data for block_data in block_data_by_index.values()},
+    )
+
+
+def _append_to_column(columns, column_key, index, value):
+    """
+    Appends the given block index and value to the sparse column
+    identified by column_key in the given columns map.
+    """
+    try:
+        indices, values = columns[column_key]
+    except KeyError:
+        indices, values = columns[column_key] = ([], [])
+    indices.append(index)
+    values.append(value)
+
+
+def _transformer_data(fields):
+    """
+    Returns a new TransformerData with the given fields.
+    """
+    transformer_data = TransformerData()
+    transformer_data.fields = fields
+    return transformer_data
+
+
+def _transformer_names(transformers):
+    """
+    Returns the set of names of the given transformers, which may be
+    given as either transformer classes or names.  Returns None if no
+    transformers are given.
+    """
+    if transformers is None:
+        return None
+    return {
+        transformer if isinstance(transformer, str) else transformer.name()
+        for transformer in transformers
+    }
+
+
+class _SectionWriter:
+    """
+    Accumulates the encoded sections of a columnar payload.
+    """
+    def __init__(self):
+        self._directory = {}
+        self._sections = []
+        self._offset = 0
+
+    def add_raw(self, name, values):
+        """
+        Adds a section with the raw bytes of the given array.
+        """
+        self._add(name, _RAW_ENCODING, values.tobytes())
+
+    def add_pickled(self, name, value):
+        """
+        Adds a section with the compressed pickle of the given value.
+        """
+        self._add(name, _ZPICKLE_ENCODING, zlib.compress(pickle.dumps(value, 4)))
+
+    def getvalue(self, num_related_blocks):
+        """
+        Returns the complete payload with all added sections.
+        """
+        directory = zlib.compress(pickle.dumps({
+            'byteorder': sys.byteorder,
+            'num_related_blocks': num_related_blocks,
+            'sections': self._directory,
+        }, 4))
+        return b''.join([MAGIC, _PREAMBLE.pack(FORMAT_VERSION, len(directory)), directory] + self._sections)
+
+    def _add(self, name, encoding, data):
+        """
+        Adds a section with the given name, encoding and encoded data.
+        """
+        self._directory[name] = (self._offset, len(data), encoding)
+        self._sections.append(data)
+        self._offset += len(data)
+
+
+class _SectionReader:
+    """
+    Decodes individual sections of a columnar payload on demand.
+    """
+    def __init__(self, serialized_data):
+        if not is_columnar(serialized_data):
+            raise ValueError('Data is not in the columnar block structure format.')
+
+        self._data = memoryview(serialized_data)
+        version, directory_length = _PREAMBLE.unpack_from(self._data, len(MAGIC))
+        if version > FORMAT_VERSION:
+            raise ValueError(f'Unsupported columnar block structure format version {version}.')
+
+        directory_start = len(MAGIC) + _PREAMBLE.size
+        self._sections_start = directory_start + directory_length
+        directory = pickle.loads(zlib.decompress(self._data[directory_start:self._sections_start]))
+        self._byteorder = directory['byteorder']
+        self._directory = directory['sections']
+        self.num_related_blocks = directory['num_related_blocks']
+
+    def names_with_prefix(self, prefix):
+        """
+        Returns the names of all sections starting with the given prefix,
+        with the prefix removed.
+        """
+        return [name[len(prefix):] for name in self._directory if name.startswith(prefix)]
+
+    def read(self, name):
+        """
+        Returns the decoded value of the section with the given name.
+
+        Raw sections are returned as memoryviews onto the underlying data,
+        unless the payload was written on a platform of different
+        endianness, in which case a byte-swapped array copy is returned.
+        """
+        offset, length, encoding = self._directory[name]
+        start = self._sections_start + offset
+        data = self._data[start:start + length]
+
+        if encoding == _ZPICKLE_ENCODING:
+            return pickle.loads(zlib.decompress(data))
+
+        if self._byteorder == sys.byteorder:
+            return data.cast(_INDEX_TYPECODE)
+        values = array(_INDEX_TYPECODE, bytes(data))
+        if self._byteorder != sys.byteorder:
+            values.byteswap()
+        return values
@@ -9,10 +9,11 @@ from logging import getLogger
 
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
-from . import config
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
+from .local_cache import local_cache
 from .models import BlockStructureModel
 from .transformer_registry import TransformerRegistry
 
@@ -49,8 +50,9 @@ class BlockStructureStore:
 
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
+        local_cache.invalidate(block_structure.root_block_usage_key)
 
-    def get(self, root_block_usage_key):
+    def get(self, root_block_usage_key, transformers=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key, if found in the cache or storage.
@@ -63,15 +65,26 @@ class BlockStructureStore:
                 root of the block structure that is to be retrieved
                 from the store.
 
+            transformers ([BlockStructureTransformer]) - If given, and
+                the data is in the columnar format, only the
+                block-specific data of these transformers is decoded.
+
         Returns:
             BlockStructure - The deserialized block structure starting
-            at root_block_usage_key, if found.
+            at root_block_usage_key, if found.  If the process-local
+            cache is enabled, the returned block structure may be shared
+            with other requests (see is_shared) and must not be mutated.
 
         Raises:
             BlockStructureNotFound if the root_block_usage_key is not
             found.
         """
         bs_model = self._get_model(root_block_usage_key)
+        version_data = self._version_data_of_model(bs_model)
+
+        block_structure = local_cache.get(root_block_usage_key, version_data)
+        if block_structure is not None:
+            return block_structure
 
         try:
             serialized_data = self._get_from_cache(bs_model)
@@ -79,7 +92,52 @@ class BlockStructureStore:
             serialized_data = self._get_from_store(bs_model)
             self._add_to_cache(serialized_data, bs_model)
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        block_structure = self._deserialize(serialized_data, root_block_usage_key, transformers)
+        if transformers is None:
+            local_cache.set(root_block_usage_key, version_data, block_structure, len(serialized_data))
+        return block_structure
+
+    def is_shared(self, block_structure):
+        """
+        Returns whether the given block structure, previously returned
+        by get, is shared through the process-local cache and therefore
+        must be copied before being mutated.  This remains true once the
+        block structure is evicted from the cache.
+        """
+        return local_cache.contains(block_structure)
+
+    def convert_format(self, root_block_usage_key):
+        """
+        Rewrites the stored data of the block structure for the given
+        root_block_usage_key in the currently configured serialization
+        format, keeping the version data of the stored model so the
+        stored block structure remains up-to-date.
+
+        Arguments:
+            root_block_usage_key (UsageKey) - The usage_key for the root
+                of the block structure that is to be converted.
+
+        Returns:
+            bool - Whether the stored data was rewritten.
+
+        Raises:
+            BlockStructureNotFound if the root_block_usage_key is not
+            found.
+        """
+        bs_model = self._get_model(root_block_usage_key)
+        serialized_data = self._get_from_store(bs_model)
+        if serialization.is_columnar(serialized_data) == config.COLUMNAR_SERIALIZATION.is_enabled():
+            return False
+
+        block_structure = self._deserialize(serialized_data, root_block_usage_key)
+        serialized_data = self._serialize(block_structure)
+        bs_model, _ = BlockStructureModel.update_or_create(
+            serialized_data,
+            data_usage_key=root_block_usage_key,
+            **self._version_data_of_model(bs_model)
+        )
+        self._add_to_cache(serialized_data, bs_model)
+        return True
 
     def delete(self, root_block_usage_key):
         """
@@ -92,6 +150,7 @@ class BlockStructureStore:
         """
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
+        local_cache.invalidate(root_block_usage_key)
         bs_model.delete()
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
 
@@ -165,6 +224,9 @@ class BlockStructureStore:
         """
         Serializes the data for the given block_structure.
         """
+        if config.COLUMNAR_SERIALIZATION.is_enabled():
+            return serialization.serialize(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -172,12 +234,16 @@ class BlockStructureStore:
         )
         return zpickle(data_to_cache)
 
-    def _deserialize(self, serialized_data, root_block_usage_key):
+    def _deserialize(self, serialized_data, root_block_usage_key, transformers=None):
         """
         Deserializes the given data and returns the parsed block_structure.
+        Data in either the columnar or the legacy pickled format is
+        accepted, so stored data remains readable across format changes.
         """
 
         try:
+            if serialization.is_columnar(serialized_data):
+                return serialization.deserialize(serialized_data, root_block_usage_key, transformers)
             block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         except Exception:
             # Somehow failed to de-serialized the data, assume it's corrupt.
@@ -64,11 +64,15 @@ class MockXBlock:
         except KeyError:
             raise AttributeError  # lint-amnesty, pylint: disable=raise-missing-from
 
-    def get_children(self):
+    def get_children(self, usage_id_filter=None):
         """
         Returns the children of the mock XBlock.
         """
-        return [self.modulestore.get_item(child) for child in self.children]
+        return [
+            self.modulestore.get_item(child)
+            for child in self.children
+            if usage_id_filter is None or usage_id_filter(child)
+        ]
 
 
 class MockModulestore:
@@ -4,6 +4,11 @@ Tests for block_structure.py
 
 
 import itertools
+import os
+import pickle
+import timeit
+import tracemalloc
+import unittest
 # pylint: disable=protected-access
 from collections import namedtuple
 from copy import deepcopy
@@ -14,7 +19,7 @@ import ddt
 
 from openedx.core.lib.graph_traversals import traverse_post_order
 
-from ..block_structure import BlockStructure, BlockStructureModulestoreData
+from ..block_structure import BlockData, BlockStructure, BlockStructureBlockData, BlockStructureModulestoreData
 from ..exceptions import TransformerException
 from .helpers import ChildrenMapTestMixin, MockTransformer, MockXBlock
 
@@ -292,3 +297,177 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         _set_value(new_copy, 'edit2')
         assert _get_value(block_structure) == 'edit1'
         assert _get_value(new_copy) == 'edit2'
+
+    def test_copy_field_values(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
+        start = datetime(2020, 1, 1)
+        block_structure.override_xblock_field(1, 'start', start)
+        block_structure.override_xblock_field(1, 'group_access', {1: [2]})
+        block_structure.set_transformer_data('transformer', 'test_key', ['value'])
+
+        new_copy = block_structure.copy()
+
+        # Immutable values are shared and mutable values are copied.
+        assert new_copy.get_xblock_field(1, 'start') is start
+        assert new_copy.get_xblock_field(1, 'group_access') == {1: [2]}
+        new_copy.get_xblock_field(1, 'group_access')[1].append(3)
+        new_copy.get_transformer_data('transformer', 'test_key').append('new value')
+        assert block_structure.get_xblock_field(1, 'group_access') == {1: [2]}
+        assert block_structure.get_transformer_data('transformer', 'test_key') == ['value']
+
+    def test_copy_on_write(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
+        for block_key in block_structure:
+            block_structure.override_xblock_field(block_key, 'field', 'original_value')
+            block_structure.set_transformer_block_field(block_key, 'transformer', 'test_key', 'original_value')
+
+        new_copy = block_structure.copy_on_write()
+        self.assert_block_structure(new_copy, [[1], [2], [3], []])
+
+        # Blocks are shared until they are modified.
+        new_copy.override_xblock_field(1, 'field', 'edit')
+        new_copy.set_transformer_block_field(2, 'transformer', 'test_key', 'edit')
+        new_copy.remove_block(3, keep_descendants=True)
+        assert new_copy.get_xblock_field(1, 'field') == 'edit'
+        assert new_copy.get_transformer_block_field(2, 'transformer', 'test_key') == 'edit'
+        assert new_copy._block_data_map[0] is block_structure._block_data_map[0]
+        assert new_copy._block_data_map[1] is not block_structure._block_data_map[1]
+        assert new_copy._block_data_map[2] is not block_structure._block_data_map[2]
+
+        # The original is not modified.
+        self.assert_block_structure(block_structure, [[1], [2], [3], []])
+        for block_key in block_structure:
+            assert block_structure.get_xblock_field(block_key, 'field') == 'original_value'
+            assert block_structure.get_transformer_block_field(block_key, 'transformer', 'test_key') ==\
+                'original_value'
+
+    def test_copy_on_write_mutable_values(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
+        start = datetime(2020, 1, 1)
+        block_structure.override_xblock_field(1, 'start', start)
+        block_structure.override_xblock_field(1, 'group_access', {1: [2]})
+        block_structure.set_transformer_block_field(2, 'transformer', 'test_key', ['value'])
+        block_structure.set_transformer_data('transformer', 'test_key', ['value'])
+
+        new_copy = block_structure.copy_on_write()
+
+        # Reading immutable values doesn't copy blocks.
+        assert new_copy.get_xblock_field(1, 'start') is start
+        assert new_copy._block_data_map[1] is block_structure._block_data_map[1]
+
+        # Mutable values can be modified in place without affecting the original.
+        new_copy.get_xblock_field(1, 'group_access')[1].append(3)
+        new_copy.get_transformer_block_field(2, 'transformer', 'test_key').append('new value')
+        new_copy.get_transformer_data('transformer', 'test_key').append('new value')
+        for block_data in new_copy.itervalues():
+            block_data.new_field = 'new value'
+        assert new_copy.get_xblock_field(1, 'group_access') == {1: [2, 3]}
+        assert block_structure.get_xblock_field(1, 'group_access') == {1: [2]}
+        assert block_structure.get_transformer_block_field(2, 'transformer', 'test_key') == ['value']
+        assert block_structure.get_transformer_data('transformer', 'test_key') == ['value']
+        assert block_structure.get_xblock_field(0, 'new_field') is None
+
+    def test_pickle(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
+        block_structure.override_xblock_field(1, 'field', 'value')
+        block_structure.set_transformer_block_field(1, 'transformer', 'test_key', 'test_value')
+
+        block_relations, block_data_map = pickle.loads(
+            pickle.dumps((block_structure._block_relations, block_structure._block_data_map))
+        )
+        assert block_relations[1].parents == [0]
+        assert block_relations[1].children == [2]
+        assert block_data_map[1].location == 1
+        assert block_data_map[1].field == 'value'
+        assert block_data_map[1].transformer_data['transformer'].test_key == 'test_value'
+
+    def test_unpickle_legacy_state(self):
+        # BlockData was pickled with its __dict__ before it used __slots__.
+        block_data = BlockData.__new__(BlockData)
+        block_data.__setstate__({'fields': {'field': 'value'}, 'location': 1, 'transformer_data': {}})
+        assert block_data.location == 1
+        assert block_data.field == 'value'
+        assert getattr(block_data, 'missing_field', None) is None
+
+
+@unittest.skipUnless(os.environ.get('RUN_PERF_TESTS'), 'Performance test; set RUN_PERF_TESTS to run it.')
+class BlockStructureMemoryBenchmark(TestCase, ChildrenMapTestMixin):
+    """
+    Measures the memory used per block and the time to copy a
+    course-sized block structure with collected data.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    NUM_CHAPTERS = 20
+    NUM_SEQUENTIALS_PER_CHAPTER = 10
+    NUM_LEAVES_PER_SEQUENTIAL = 19
+    NUM_ITERATIONS = 5
+
+    def _create_collected_block_structure(self):
+        """
+        Returns a block structure with xBlock fields and transformer
+        data similar to those of a collected course.
+        """
+        children_map = [[]]
+        for _ in range(self.NUM_CHAPTERS):
+            chapter = len(children_map)
+            children_map[0].append(chapter)
+            children_map.append([])
+            for _ in range(self.NUM_SEQUENTIALS_PER_CHAPTER):
+                sequential = len(children_map)
+                children_map[chapter].append(sequential)
+                children_map.append([])
+                for _ in range(self.NUM_LEAVES_PER_SEQUENTIAL):
+                    children_map[sequential].append(len(children_map))
+                    children_map.append([])
+        block_structure = self.create_block_structure(children_map, BlockStructureBlockData)
+        for block_key in block_structure:
+            block_structure.override_xblock_field(block_key, 'display_name', f'Block {block_key}')
+            block_structure.override_xblock_field(block_key, 'start', datetime(2020, 1, 1))
+            block_structure.override_xblock_field(block_key, 'visible_to_staff_only', False)
+            block_structure.set_transformer_block_field(block_key, 'transformer', 'merged_start', datetime(2020, 1, 1))
+            block_structure.set_transformer_block_field(block_key, 'transformer', 'ancestors', [0, block_key])
+        return block_structure
+
+    def test_memory_and_copy_time(self):
+        tracemalloc.start()
+        block_structure = self._create_collected_block_structure()
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        copy_time = min(timeit.repeat(block_structure.copy, number=1, repeat=self.NUM_ITERATIONS))
+        deepcopy_time = min(timeit.repeat(
+            lambda: deepcopy((block_structure._block_relations, block_structure._block_data_map)),
+            number=1,
+            repeat=self.NUM_ITERATIONS,
+        ))
+
+        copy_on_write_time = min(timeit.repeat(block_structure.copy_on_write, number=1, repeat=self.NUM_ITERATIONS))
+
+        def _copy_and_transform(copy_method):
+            """
+            Copies the block structure with the given method and modifies the
+            copy like a transform that reads all blocks and overrides a few.
+            """
+            block_structure_copy = copy_method()
+            for block_key in block_structure_copy.topological_traversal():
+                if block_structure_copy.get_xblock_field(block_key, 'start') is None:
+                    block_structure_copy.override_xblock_field(block_key, 'start', datetime(2021, 1, 1))
+            for block_key in list(block_structure_copy)[:self.NUM_CHAPTERS]:
+                block_structure_copy.override_xblock_field(block_key, 'display_name', 'Overridden')
+
+        transform_time = min(timeit.repeat(
+            lambda: _copy_and_transform(block_structure.copy), number=1, repeat=self.NUM_ITERATIONS,
+        ))
+        copy_on_write_transform_time = min(timeit.repeat(
+            lambda: _copy_and_transform(block_structure.copy_on_write), number=1, repeat=self.NUM_ITERATIONS,
+        ))
+
+        print(f'\nBlock structure of {len(block_structure)} blocks:')
+        print(f'    memory per block (bytes): {memory / len(block_structure):.0f}')
+        print(f'    copy (s): {copy_time}')
+        print(f'    generic deepcopy (s): {deepcopy_time}')
+        print(f'    copy on write (s): {copy_on_write_time}')
+        print(f'    copy and transform (s): {transform_time}')
+        print(f'    copy on write and transform (s): {copy_on_write_transform_time}')
@@ -0,0 +1,286 @@
+"""
+Tests for block_structure/incremental.py
+"""
+
+
+from unittest.mock import patch
+
+from django.test import TestCase
+from edx_toggles.toggles.testutils import override_waffle_switch
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import BlockFactory, CourseFactory
+
+from .. import config
+from ..api import get_block_structure_manager
+from ..exceptions import BlockStructureNotFound
+from ..factory import BlockStructureFactory
+from ..incremental import (
+    BLOCK_VERSION_FIELD,
+    collect_incrementally,
+    record_block_versions,
+    supports_incremental_collect
+)
+from ..manager import BlockStructureManager
+from ..transformers import BlockStructureTransformers
+from .helpers import (
+    ChildrenMapTestMixin,
+    MockCache,
+    MockModulestore,
+    MockModulestoreFactory,
+    MockTransformer,
+    MockXBlock,
+    UsageKeyFactoryMixin,
+    mock_registered_transformers
+)
+
+
+class VersionedMockModulestore(MockModulestore):
+    """
+    A MockModulestore that tracks the versions of its blocks.
+    """
+    def get_block_versions(self, course_key):  # pylint: disable=unused-argument
+        """
+        Returns the version and children of each block.
+        """
+        return {
+            block_key: (xblock.update_version, list(xblock.children))
+            for block_key, xblock in self.blocks.items()
+        }
+
+
+class IncrementalTransformer(MockTransformer):
+    """
+    A transformer that supports incremental collection, percolating the
+    names of each block's ancestors down to the block.
+    """
+    SUPPORTS_INCREMENTAL_COLLECT = True
+    collected_blocks = []
+
+    @classmethod
+    def collect(cls, block_structure):
+        block_structure.request_xblock_fields('name')
+        for block_key in block_structure.topological_traversal():
+            cls.collected_blocks.append(block_key)
+            path = {block_structure.get_xblock(block_key).name}
+            for parent in block_structure.get_parents(block_key):
+                path |= block_structure.get_transformer_block_field(parent, cls, 'path')
+            block_structure.set_transformer_block_field(block_key, cls, 'path', path)
+        block_structure.set_transformer_data(cls, 'collect_count', len(cls.collected_blocks))
+
+
+class NonIncrementalTransformer(MockTransformer):
+    """
+    A transformer that does not support incremental collection.
+    """
+
+
+class TestCollectIncrementally(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for collect_incrementally.
+    """
+    def setUp(self):
+        super().setUp()
+        IncrementalTransformer.collected_blocks = []
+        # Allow re-collecting most of the small test course.
+        patcher = patch('openedx.core.djangoapps.content.block_structure.incremental.MAX_INCREMENTAL_FRACTION', 0.9)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.children_map = [list(children) for children in self.SIMPLE_CHILDREN_MAP]
+        self.modulestore = VersionedMockModulestore()
+        mock_modulestore = MockModulestoreFactory.create(self.children_map, self.block_key_factory)
+        for block_key, xblock in mock_modulestore.blocks.items():
+            xblock.modulestore = self.modulestore
+            xblock.field_map.update(name=f'name {block_key.block_id}', update_version='v1')
+        self.modulestore.set_blocks(mock_modulestore.blocks)
+        self.root_key = self.block_key_factory(0)
+
+        with mock_registered_transformers([IncrementalTransformer]):
+            self.collected_block_structure = self._collect()
+        IncrementalTransformer.collected_blocks = []
+
+    def _collect(self):
+        """
+        Returns a fully collected block structure of the mock modulestore.
+        """
+        block_structure = BlockStructureFactory.create_from_modulestore(self.root_key, self.modulestore)
+        BlockStructureTransformers.collect(block_structure)
+        record_block_versions(block_structure)
+        return BlockStructureFactory.create_new(
+            block_structure.root_block_usage_key,
+            block_structure._block_relations,  # pylint: disable=protected-access
+            block_structure.transformer_data,
+            block_structure._block_data_map,  # pylint: disable=protected-access
+        )
+
+    def _update_block(self, block_id, name):
+        """
+        Updates the name and version of the given block in the modulestore.
+        """
+        xblock = self.modulestore.blocks[self.block_key_factory(block_id)]
+        xblock.field_map.update(name=name, update_version='v2')
+
+    def _collect_incrementally(self, transformers=(IncrementalTransformer,)):
+        """
+        Collects incrementally with the given registered transformers.
+        """
+        with mock_registered_transformers(transformers):
+            return collect_incrementally(self.root_key, self.modulestore, self.collected_block_structure)
+
+    def _assert_collected_blocks(self, block_ids):
+        """
+        Verifies that exactly the given blocks were re-collected.
+        """
+        assert set(IncrementalTransformer.collected_blocks) == {
+            self.block_key_factory(block_id) for block_id in block_ids
+        }
+
+    def _assert_same_as_full_collect(self, block_structure):
+        """
+        Verifies that the given block structure has the same data as a
+        full collect of the mock modulestore.
+        """
+        with mock_registered_transformers([IncrementalTransformer]):
+            expected = self._collect()
+        self.assert_block_structure(block_structure, self.children_map)
+        for block_key in expected:
+            assert block_structure.get_xblock_field(block_key, 'name') == expected.get_xblock_field(block_key, 'name')
+            assert block_structure.get_xblock_field(block_key, BLOCK_VERSION_FIELD) ==\
+                expected.get_xblock_field(block_key, BLOCK_VERSION_FIELD)
+            assert block_structure.get_transformer_block_field(block_key, IncrementalTransformer, 'path') ==\
+                expected.get_transformer_block_field(block_key, IncrementalTransformer, 'path')
+
+    def test_unchanged(self):
+        block_structure = self._collect_incrementally()
+        self._assert_collected_blocks([0])
+        self._assert_same_as_full_collect(block_structure)
+
+    def test_changed_leaf(self):
+        self._update_block(4, 'new name 4')
+        block_structure = self._collect_incrementally()
+        self._assert_collected_blocks([0, 1, 4])
+        self._assert_same_as_full_collect(block_structure)
+        assert block_structure.get_transformer_data(IncrementalTransformer, 'collect_count') == 3
+
+    def test_changed_parent(self):
+        self._update_block(1, 'new name 1')
+        block_structure = self._collect_incrementally()
+        self._assert_collected_blocks([0, 1, 3, 4])
+        self._assert_same_as_full_collect(block_structure)
+
+    def test_added_child(self):
+        new_block_key = self.block_key_factory(5)
+        self.modulestore.blocks[new_block_key] = MockXBlock(
+            new_block_key,
+            field_map={'name': 'name 5', 'update_version': 'v1'},
+            modulestore=self.modulestore,
+        )
+        self.modulestore.blocks[self.block_key_factory(2)].children.append(new_block_key)
+        self.children_map[2].append(5)
+        self.children_map.append([])
+
+        block_structure = self._collect_incrementally()
+        self._assert_collected_blocks([0, 2, 5])
+        self._assert_same_as_full_collect(block_structure)
+
+    def test_removed_child(self):
+        self.modulestore.blocks[self.block_key_factory(1)].children.remove(self.block_key_factory(4))
+        self.children_map[1].remove(4)
+
+        block_structure = self._collect_incrementally()
+        self._assert_collected_blocks([0, 1, 3])
+        self.assert_block_structure(block_structure, self.children_map, missing_blocks=[4])
+
+    def test_original_not_modified(self):
+        self._update_block(4, 'new name 4')
+        self._collect_incrementally()
+        assert self.collected_block_structure.get_xblock_field(self.block_key_factory(4), 'name') == 'name 4'
+
+    def test_too_many_changes(self):
+        self._update_block(1, 'new name 1')
+        self._update_block(2, 'new name 2')
+        assert self._collect_incrementally() is None
+
+    def test_unsupported_transformer(self):
+        assert self._collect_incrementally([IncrementalTransformer, NonIncrementalTransformer]) is None
+
+    def test_unsupported_modulestore(self):
+        with patch.object(self.modulestore, 'get_block_versions', side_effect=NotImplementedError):
+            assert self._collect_incrementally() is None
+
+
+class TestManagerIncrementalCollect(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for incremental collection through BlockStructureManager.
+    """
+    def setUp(self):
+        super().setUp()
+        self.modulestore = MockModulestoreFactory.create(self.SIMPLE_CHILDREN_MAP, self.block_key_factory)
+        self.bs_manager = BlockStructureManager(self.block_key_factory(0), self.modulestore, MockCache())
+
+    @override_waffle_switch(config.INCREMENTAL_COLLECT, active=True)
+    def test_not_yet_collected(self):
+        with mock_registered_transformers([IncrementalTransformer]):
+            with patch.object(self.bs_manager.store, 'get', side_effect=BlockStructureNotFound('')):
+                block_structure = self.bs_manager._update_collected()  # pylint: disable=protected-access
+        self.assert_block_structure(block_structure, self.SIMPLE_CHILDREN_MAP)
+
+    @override_waffle_switch(config.INCREMENTAL_COLLECT, active=True)
+    def test_unsupported_modulestore(self):
+        with mock_registered_transformers([IncrementalTransformer]):
+            self.bs_manager.get_collected()
+
+            # The mock modulestore doesn't track block versions, so
+            # the entire course is re-collected.
+            IncrementalTransformer.collected_blocks = []
+            with patch(
+                'openedx.core.djangoapps.content.block_structure.manager.collect_incrementally',
+                wraps=collect_incrementally,
+            ) as mock_collect_incrementally:
+                block_structure = self.bs_manager._update_collected()  # pylint: disable=protected-access
+        assert mock_collect_incrementally.call_count == 1
+        assert len(IncrementalTransformer.collected_blocks) == len(self.SIMPLE_CHILDREN_MAP)
+        self.assert_block_structure(block_structure, self.SIMPLE_CHILDREN_MAP)
+
+
+class TestRegisteredTransformersIncrementalCollect(ModuleStoreTestCase):
+    """
+    Tests for incremental collection with the transformers registered by default.
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        self.html_blocks = []
+        for _ in range(4):
+            chapter = BlockFactory.create(parent=self.course, category='chapter')
+            sequential = BlockFactory.create(parent=chapter, category='sequential')
+            vertical = BlockFactory.create(parent=sequential, category='vertical')
+            self.html_blocks.append(BlockFactory.create(parent=vertical, category='html', data='<p>One two</p>'))
+
+    def test_registered_transformers_support_incremental_collect(self):
+        assert supports_incremental_collect()
+
+    @override_waffle_switch(config.INCREMENTAL_COLLECT, active=True)
+    def test_collect_incrementally(self):
+        bs_manager = get_block_structure_manager(self.course.id)
+        bs_manager.get_collected()
+
+        html_block = self.html_blocks[0]
+        html_block.data = '<p>One two three</p>'
+        self.store.update_item(html_block, self.user.id)
+        self.store.publish(html_block.location, self.user.id)
+
+        with patch(
+            'openedx.core.djangoapps.content.block_structure.manager.collect_incrementally',
+            wraps=collect_incrementally,
+        ) as mock_collect_incrementally:
+            with patch.object(
+                BlockStructureFactory, 'create_from_modulestore', wraps=BlockStructureFactory.create_from_modulestore
+            ) as mock_create_from_modulestore:
+                block_structure = bs_manager._update_collected()  # pylint: disable=protected-access
+        assert mock_collect_incrementally.call_count == 1
+        # Only the partial block structure of the changed block and its ancestors is created.
+        assert [len(call.kwargs['block_keys']) for call in mock_create_from_modulestore.call_args_list] == [5]
+        assert block_structure.get_transformer_block_field(
+            html_block.location, 'effort_estimation', 'html_word_count'
+        ) == 3
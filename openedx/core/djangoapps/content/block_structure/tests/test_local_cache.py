@@ -0,0 +1,146 @@
+"""
+Tests for block_structure/local_cache.py
+"""
+
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+
+from ..local_cache import BlockStructureLocalCache, local_cache
+from ..store import BlockStructureStore
+from .helpers import ChildrenMapTestMixin, MockCache, UsageKeyFactoryMixin
+
+
+def _block_structures_settings(max_bytes):
+    """
+    Returns BLOCK_STRUCTURES_SETTINGS with the given local cache size.
+    """
+    return dict(settings.BLOCK_STRUCTURES_SETTINGS, LOCAL_CACHE_MAX_BYTES=max_bytes)
+
+
+class _CachedValue:
+    """
+    Stands for a block structure in the cache.
+    """
+
+
+class TestBlockStructureLocalCache(TestCase):
+    """
+    Tests for BlockStructureLocalCache
+    """
+    VERSION_DATA = {'data_version': 'v1', 'block_structure_schema_version': '2'}
+
+    def setUp(self):
+        super().setUp()
+        self.local_cache = BlockStructureLocalCache()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.values = {}
+
+    def _usage_key(self, block_id, course_key=None):
+        """
+        Returns a usage key for the given block_id.
+        """
+        return BlockUsageLocator(course_key or self.course_key, 'course', block_id)
+
+    def _value(self, name):
+        """
+        Returns the block structure to cache with the given name.
+        """
+        return self.values.setdefault(name, _CachedValue())
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS=_block_structures_settings(0))
+    def test_disabled(self):
+        self.local_cache.set(self._usage_key('a'), self.VERSION_DATA, _CachedValue(), 10)
+        assert self.local_cache.get(self._usage_key('a'), self.VERSION_DATA) is None
+        assert self.local_cache.stats()['entries'] == 0
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS=_block_structures_settings(100))
+    def test_get_and_set(self):
+        block_structure = _CachedValue()
+        assert self.local_cache.get(self._usage_key('a'), self.VERSION_DATA) is None
+        self.local_cache.set(self._usage_key('a'), self.VERSION_DATA, block_structure, 10)
+        assert self.local_cache.get(self._usage_key('a'), self.VERSION_DATA) is block_structure
+        assert self.local_cache.contains(block_structure)
+        assert not self.local_cache.contains(_CachedValue())
+
+        # A different version is not returned.
+        assert self.local_cache.get(self._usage_key('a'), dict(self.VERSION_DATA, data_version='v2')) is None
+
+        stats = self.local_cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries'], stats['size_in_bytes']) == (1, 2, 1, 10)
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS=_block_structures_settings(100))
+    def test_new_version_replaces_old(self):
+        self.local_cache.set(self._usage_key('a'), self.VERSION_DATA, _CachedValue(), 10)
+        new_version_data = dict(self.VERSION_DATA, data_version='v2')
+        self.local_cache.set(self._usage_key('a'), new_version_data, _CachedValue(), 20)
+        assert self.local_cache.get(self._usage_key('a'), self.VERSION_DATA) is None
+        assert self.local_cache.stats()['size_in_bytes'] == 20
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS=_block_structures_settings(30))
+    def test_lru_eviction_by_size(self):
+        for block_id in ('a', 'b', 'c'):
+            self.local_cache.set(self._usage_key(block_id), self.VERSION_DATA, self._value(block_id), 10)
+
+        # Use 'a' so that 'b' is the least recently used entry.
+        assert self.local_cache.get(self._usage_key('a'), self.VERSION_DATA) is self._value('a')
+        self.local_cache.set(self._usage_key('d'), self.VERSION_DATA, self._value('d'), 15)
+
+        assert self.local_cache.get(self._usage_key('b'), self.VERSION_DATA) is None
+        assert self.local_cache.get(self._usage_key('c'), self.VERSION_DATA) is None
+        assert self.local_cache.get(self._usage_key('a'), self.VERSION_DATA) is self._value('a')
+        assert self.local_cache.get(self._usage_key('d'), self.VERSION_DATA) is self._value('d')
+        stats = self.local_cache.stats()
+        assert (stats['evictions'], stats['size_in_bytes']) == (2, 25)
+        # The evicted block structures may still be used by the requests which got them.
+        assert self.local_cache.contains(self._value('b'))
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS=_block_structures_settings(30))
+    def test_entry_larger_than_max_size(self):
+        self.local_cache.set(self._usage_key('a'), self.VERSION_DATA, self._value('a'), 31)
+        assert self.local_cache.get(self._usage_key('a'), self.VERSION_DATA) is None
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS=_block_structures_settings(100))
+    def test_invalidate_course(self):
+        other_course_key = CourseLocator('org', 'other', 'run')
+        self.local_cache.set(self._usage_key('a'), self.VERSION_DATA, self._value('a'), 10)
+        self.local_cache.set(self._usage_key('a', other_course_key), self.VERSION_DATA, self._value('other'), 10)
+
+        self.local_cache.invalidate_course(self.course_key)
+        assert self.local_cache.get(self._usage_key('a'), self.VERSION_DATA) is None
+        assert self.local_cache.get(self._usage_key('a', other_course_key), self.VERSION_DATA) is self._value('other')
+        assert self.local_cache.stats()['size_in_bytes'] == 10
+
+
+@override_settings(BLOCK_STRUCTURES_SETTINGS=_block_structures_settings(10 ** 6))
+class TestStoreWithLocalCache(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for BlockStructureStore reads through the process-local cache.
+    """
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(local_cache.clear)
+        self.block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        self.mock_cache = MockCache()
+        self.store = BlockStructureStore(self.mock_cache)
+        self.store.add(self.block_structure)
+
+    def test_shared_between_gets(self):
+        root_block_usage_key = self.block_structure.root_block_usage_key
+        first = self.store.get(root_block_usage_key)
+        self.mock_cache.map.clear()
+        second = self.store.get(root_block_usage_key)
+        assert first is second
+        assert self.store.is_shared(first)
+        assert not self.store.is_shared(first.copy())
+
+    def test_add_invalidates(self):
+        root_block_usage_key = self.block_structure.root_block_usage_key
+        first = self.store.get(root_block_usage_key)
+        self.store.add(self.block_structure)
+        second = self.store.get(root_block_usage_key)
+        assert second is not first
+        self.assert_block_structure(second, self.SIMPLE_CHILDREN_MAP)
+        # Requests which got the invalidated block structure may still be using it.
+        assert self.store.is_shared(first)
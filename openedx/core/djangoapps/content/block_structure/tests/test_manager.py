@@ -5,7 +5,9 @@ Tests for manager.py
 import pytest
 import ddt
 from django.test import TestCase
+from edx_toggles.toggles.testutils import override_waffle_switch
 
+from .. import config
 from ..block_structure import BlockStructureBlockData
 from ..exceptions import UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
@@ -165,6 +167,23 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             )
             self.assert_block_structure(block_structure, expected_structure, missing_blocks=expected_missing_blocks)
 
+    @ddt.data(True, False)
+    def test_get_transformed_does_not_modify_collected(self, copy_on_write):
+        with mock_registered_transformers(self.registered_transformers):
+            collected_block_structure = self.bs_manager.get_collected()
+            with override_waffle_switch(config.COPY_ON_WRITE_TRANSFORMS, active=copy_on_write):
+                block_structure = self.bs_manager.get_transformed(
+                    self.transformers,
+                    starting_block_usage_key=self.block_key_factory(1),
+                    collected_block_structure=collected_block_structure,
+                )
+        TestTransformer1.assert_transformed(block_structure)
+        self.assert_block_structure(collected_block_structure, self.children_map)
+        for block_key in collected_block_structure:
+            assert collected_block_structure.get_transformer_block_field(
+                block_key, TestTransformer1, TestTransformer1.transform_data_key,
+            ) is None
+
     def test_get_transformed_with_nonexistent_starting_block(self):
         with mock_registered_transformers(self.registered_transformers):
             with pytest.raises(UsageKeyNotInBlockStructure):
@@ -0,0 +1,107 @@
+"""
+Tests for block_structure/profiler.py
+"""
+
+
+from unittest.mock import MagicMock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from edx_django_utils.cache import RequestCache
+
+from .. import profiler
+from ..transformers import BlockStructureTransformers
+from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, mock_registered_transformers
+
+
+class RemovingFilteringTransformer(MockFilteringTransformer):
+    """
+    A filtering transformer that removes block 1, along with its descendants.
+    """
+    def transform_block_filters(self, usage_info, block_structure):
+        return [block_structure.create_removal_filter(lambda block_key: block_key == 1)]
+
+
+class RemovingTransformer(MockTransformer):
+    """
+    A transformer that removes block 2.
+    """
+    def transform(self, usage_info, block_structure):
+        block_structure.remove_block(2, keep_descendants=False)
+
+
+class TestTransformerProfiler(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for profiling BlockStructureTransformers.
+    """
+    def setUp(self):
+        super().setUp()
+        RequestCache.clear_all_namespaces()
+        profiler.transformer_profiler.clear()
+        self.addCleanup(profiler.transformer_profiler.clear)
+
+        registered_transformers = [RemovingFilteringTransformer(), MockFilteringTransformer(), RemovingTransformer()]
+        with mock_registered_transformers(registered_transformers):
+            self.transformers = BlockStructureTransformers(registered_transformers, usage_info=MagicMock())
+
+    def _transform(self):
+        """
+        Transforms a new block structure for SIMPLE_CHILDREN_MAP.
+        """
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        self.transformers.transform(block_structure)
+        return block_structure
+
+    def test_disabled(self):
+        self._transform()
+        assert profiler.request_records() == []
+        assert profiler.transformer_profiler.stats() == {}
+
+    def test_profiling(self):
+        with profiler.profiling():
+            block_structure = self._transform()
+        assert not profiler.is_enabled()
+        self.assert_block_structure(block_structure, [[]], missing_blocks=[1, 2, 3, 4])
+
+        records = {
+            record.transformer_name: (record.blocks_visited, record.blocks_removed)
+            for record in profiler.request_records()
+        }
+        assert records == {
+            'RemovingFilteringTransformer': (3, 1),
+            # Block 1 was already rejected by the preceding filter.
+            'MockFilteringTransformer': (2, 0),
+            # Descendants of removed blocks remain until the structure is pruned.
+            'RemovingTransformer': (4, 1),
+        }
+        assert [record.transformer_name for record in profiler.request_records()] == list(records)
+        assert all(record.wall_time >= 0 for record in profiler.request_records())
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS=dict(settings.BLOCK_STRUCTURES_SETTINGS, PROFILE_TRANSFORMERS=True))
+    def test_aggregated_stats(self):
+        self._transform()
+        self._transform()
+
+        stats = profiler.transformer_profiler.stats()
+        assert set(stats) == {'RemovingFilteringTransformer', 'MockFilteringTransformer', 'RemovingTransformer'}
+        transformer_stats = stats['RemovingTransformer']
+        assert (transformer_stats['count'], transformer_stats['blocks_visited'], transformer_stats['blocks_removed']) ==\
+            (2, 8, 2)
+        assert sum(transformer_stats['histogram'].values()) == 2
+        assert transformer_stats['mean_wall_time'] == transformer_stats['total_wall_time'] / 2
+
+    def test_histogram_buckets(self):
+        for wall_time in (0.0005, 0.003, 0.003, 5):
+            profiler.transformer_profiler.record(profiler.TransformerRecord('test', wall_time=wall_time))
+        histogram = profiler.transformer_profiler.stats()['test']['histogram']
+        assert (histogram['<=1ms'], histogram['<=5ms'], histogram['>1000ms']) == (1, 2, 1)
+        assert sum(histogram.values()) == 4
+
+    def test_server_timing_header(self):
+        records = [
+            profiler.TransformerRecord('first', wall_time=0.0015, blocks_visited=10, blocks_removed=2),
+            profiler.TransformerRecord('second', wall_time=0.25, blocks_visited=8),
+        ]
+        assert profiler.server_timing_header(records) == (
+            'first;dur=1.500;desc="visited=10 removed=2", second;dur=250.000;desc="visited=8 removed=0"'
+        )
@@ -0,0 +1,199 @@
+"""
+Tests for block_structure/serialization.py
+"""
+# pylint: disable=protected-access
+
+
+import os
+import timeit
+import unittest
+from unittest import TestCase
+
+import ddt
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+from .. import serialization
+from ..block_structure import BlockStructureBlockData
+from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, UsageKeyFactoryMixin
+
+
+@ddt.ddt
+class TestColumnarSerialization(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the columnar serialization format.
+    """
+    def _create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map, with
+        collected xBlock fields and transformer data.
+        """
+        block_structure = self.create_block_structure(children_map)
+        for transformer in [MockTransformer, MockFilteringTransformer]:
+            block_structure._add_transformer(transformer)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_structure.override_xblock_field(block_key, 'display_name', f'Block {block_id}')
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', block_id)
+            if block_id % 2:
+                block_structure.set_transformer_block_field(block_key, MockFilteringTransformer, 'odd', True)
+        return block_structure
+
+    def _assert_same_data(self, block_structure, expected, transformers=(MockTransformer, MockFilteringTransformer)):
+        """
+        Verifies that the data of the given block structure equates the
+        data of the expected block structure for the given transformers.
+        """
+        assert block_structure.root_block_usage_key == expected.root_block_usage_key
+        assert list(block_structure) == list(expected)
+        assert list(block_structure._block_data_map) == list(expected._block_data_map)
+        for block_key in expected:
+            assert block_structure.get_children(block_key) == expected.get_children(block_key)
+            assert block_structure.get_parents(block_key) == expected.get_parents(block_key)
+            if block_key in expected._block_data_map:
+                assert block_structure[block_key].fields == expected[block_key].fields
+            for transformer in transformers:
+                assert block_structure.get_transformer_block_field(block_key, transformer, 'test') ==\
+                    expected.get_transformer_block_field(block_key, transformer, 'test')
+                assert block_structure.get_transformer_block_field(block_key, transformer, 'odd') ==\
+                    expected.get_transformer_block_field(block_key, transformer, 'odd')
+        for transformer in transformers:
+            assert block_structure._get_transformer_data_version(transformer) ==\
+                expected._get_transformer_data_version(transformer)
+
+    @ddt.data(
+        [],
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self._create_collected_block_structure(children_map)
+        serialized_data = serialization.serialize(block_structure)
+        assert serialization.is_columnar(serialized_data)
+
+        deserialized = serialization.deserialize(serialized_data, block_structure.root_block_usage_key)
+        assert isinstance(deserialized, BlockStructureBlockData)
+        self._assert_same_data(deserialized, block_structure)
+
+    def test_from_memoryview(self):
+        block_structure = self._create_collected_block_structure(self.DAG_CHILDREN_MAP)
+        serialized_data = memoryview(serialization.serialize(block_structure))
+        deserialized = serialization.deserialize(serialized_data, block_structure.root_block_usage_key)
+        self._assert_same_data(deserialized, block_structure)
+
+    def test_removed_blocks(self):
+        block_structure = self._create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.remove_block(self.block_key_factory(1), keep_descendants=True)
+        block_structure.override_xblock_field(self.block_key_factory(10), 'display_name', 'Unrelated')
+
+        serialized_data = serialization.serialize(block_structure)
+        deserialized = serialization.deserialize(serialized_data, block_structure.root_block_usage_key)
+        self._assert_same_data(deserialized, block_structure)
+        assert self.block_key_factory(1) not in deserialized
+        assert self.block_key_factory(10) not in deserialized
+        assert deserialized.get_xblock_field(self.block_key_factory(10), 'display_name') == 'Unrelated'
+
+    def test_requested_transformers_only(self):
+        block_structure = self._create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        serialized_data = serialization.serialize(block_structure)
+        deserialized = serialization.deserialize(
+            serialized_data,
+            block_structure.root_block_usage_key,
+            transformers=[MockTransformer],
+        )
+        self._assert_same_data(deserialized, block_structure, transformers=[MockTransformer])
+
+        # Block-specific data of unrequested transformers is not decoded,
+        # though their versions are.
+        for block_key in deserialized:
+            assert deserialized.get_transformer_block_field(block_key, MockFilteringTransformer, 'odd') is None
+        assert deserialized._get_transformer_data_version(MockFilteringTransformer) == 1
+
+    def test_legacy_format(self):
+        block_structure = self._create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        legacy_data = zpickle((
+            block_structure._block_relations,
+            block_structure.transformer_data,
+            block_structure._block_data_map,
+        ))
+        assert not serialization.is_columnar(legacy_data)
+        with self.assertRaises(ValueError):
+            serialization.deserialize(legacy_data, block_structure.root_block_usage_key)
+
+
+@unittest.skipUnless(os.environ.get('RUN_PERF_TESTS'), 'Performance test; set RUN_PERF_TESTS to run it.')
+class ColumnarSerializationBenchmark(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Compares the columnar serialization format against the legacy zpickle
+    format for a course-sized block structure.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    NUM_CHAPTERS = 20
+    NUM_SEQUENTIALS_PER_CHAPTER = 10
+    NUM_LEAVES_PER_SEQUENTIAL = 15
+    NUM_ITERATIONS = 5
+
+    def setUp(self):
+        super().setUp()
+        children_map = [[]]
+        for _ in range(self.NUM_CHAPTERS):
+            chapter = len(children_map)
+            children_map[0].append(chapter)
+            children_map.append([])
+            for _ in range(self.NUM_SEQUENTIALS_PER_CHAPTER):
+                sequential = len(children_map)
+                children_map[chapter].append(sequential)
+                children_map.append([])
+                for _ in range(self.NUM_LEAVES_PER_SEQUENTIAL):
+                    children_map[sequential].append(len(children_map))
+                    children_map.append([])
+
+        self.block_structure = self.create_block_structure(children_map)
+        self.block_structure._add_transformer(MockTransformer)
+        self.block_structure._add_transformer(MockFilteringTransformer)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            self.block_structure.override_xblock_field(block_key, 'display_name', f'Block {block_id}')
+            self.block_structure.override_xblock_field(block_key, 'graded', bool(block_id % 3))
+            self.block_structure.set_transformer_block_field(block_key, MockTransformer, 'weight', block_id)
+            self.block_structure.set_transformer_block_field(
+                block_key, MockFilteringTransformer, 'group_access', {block_id % 7: [1, 2]},
+            )
+
+    def _time(self, func):
+        """
+        Returns the best wall time in seconds of calling func.
+        """
+        return min(timeit.repeat(func, number=1, repeat=self.NUM_ITERATIONS))
+
+    def test_serialization_timings(self):
+        block_structure = self.block_structure
+        root_key = block_structure.root_block_usage_key
+        legacy_data = zpickle((
+            block_structure._block_relations,
+            block_structure.transformer_data,
+            block_structure._block_data_map,
+        ))
+        columnar_data = serialization.serialize(block_structure)
+
+        results = {
+            'zpickle size (bytes)': len(legacy_data),
+            'columnar size (bytes)': len(columnar_data),
+            'zpickle serialize (s)': self._time(lambda: zpickle((
+                block_structure._block_relations,
+                block_structure.transformer_data,
+                block_structure._block_data_map,
+            ))),
+            'columnar serialize (s)': self._time(lambda: serialization.serialize(block_structure)),
+            'zpickle deserialize (s)': self._time(lambda: zunpickle(legacy_data)),
+            'columnar deserialize (s)': self._time(lambda: serialization.deserialize(columnar_data, root_key)),
+            'columnar deserialize, one transformer (s)': self._time(
+                lambda: serialization.deserialize(columnar_data, root_key, transformers=[MockTransformer])
+            ),
+        }
+        print(f'\nBlock structure serialization of {len(block_structure)} blocks:')
+        for name, value in results.items():
+            print(f'    {name}: {value}')
@@ -4,9 +4,12 @@ Tests for block_structure/cache.py
 
 import pytest
 import ddt
+from edx_toggles.toggles.testutils import override_waffle_switch
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
+from .. import serialization
+from ..config import COLUMNAR_SERIALIZATION
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
 from ..store import BlockStructureStore
@@ -76,3 +79,29 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         assert self.mock_cache.timeout_from_last_call == 0
         self.store.add(self.block_structure)
         assert self.mock_cache.timeout_from_last_call == timeout
+
+    @ddt.data(True, False)
+    def test_add_and_get_with_columnar_serialization(self, columnar):
+        with override_waffle_switch(COLUMNAR_SERIALIZATION, active=columnar):
+            self.store.add(self.block_structure)
+        cache_key = list(self.mock_cache.map)[0]
+        assert serialization.is_columnar(self.mock_cache.map[cache_key]) == columnar
+
+        # Data in either format is readable regardless of the switch.
+        with override_waffle_switch(COLUMNAR_SERIALIZATION, active=not columnar):
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(stored_value, self.children_map)
+
+    def test_convert_format(self):
+        root_block_usage_key = self.block_structure.root_block_usage_key
+        self.store.add(self.block_structure)
+        assert not self.store.convert_format(root_block_usage_key)
+
+        with override_waffle_switch(COLUMNAR_SERIALIZATION, active=True):
+            assert self.store.convert_format(root_block_usage_key)
+            assert not self.store.convert_format(root_block_usage_key)
+
+        self.mock_cache.map.clear()
+        bs_model = self.store._get_model(root_block_usage_key)  # pylint: disable=protected-access
+        assert serialization.is_columnar(bs_model.get_serialized_data())
+        self.assert_block_structure(self.store.get(root_block_usage_key), self.children_map)
@@ -1,17 +1,62 @@
 """
 Tests for transformers.py
 """
+import os
+import timeit
+import unittest
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from ..block_structure import BlockStructureModulestoreData
+from ..block_structure import BlockStructureBlockData, BlockStructureModulestoreData
 from ..exceptions import TransformerDataIncompatible, TransformerException
+from ..transformer import OrderedFilteringTransformerMixin, combine_filters
 from ..transformers import BlockStructureTransformers
 from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, mock_registered_transformers
 
 
+class MarkingTransformer(MockTransformer):
+    """
+    Mock transformer that marks blocks 2 and 3 for removal.
+    """
+    def transform(self, usage_info, block_structure):
+        for block_key in (2, 3):
+            block_structure.override_xblock_field(block_key, 'marked', True)
+
+
+class MarkedRemovalTransformer(OrderedFilteringTransformerMixin, MockTransformer):
+    """
+    Mock ordered filtering transformer that removes the blocks marked by
+    MarkingTransformer.
+    """
+    def transform_block_filters(self, usage_info, block_structure):
+        return [block_structure.create_removal_filter(
+            lambda block_key: block_structure.get_xblock_field(block_key, 'marked', False),
+        )]
+
+
+class UniversalOrderedFilteringTransformer(OrderedFilteringTransformerMixin, MockTransformer):
+    """
+    Mock ordered filtering transformer that retains all blocks.
+    """
+    def transform_block_filters(self, usage_info, block_structure):
+        return [block_structure.create_universal_filter()]
+
+
+class ModuloRemovalTransformer(MockFilteringTransformer):
+    """
+    Mock filtering transformer that removes the blocks whose ids are
+    multiples of MODULO.
+    """
+    MODULO = None
+
+    def transform_block_filters(self, usage_info, block_structure):
+        return [block_structure.create_removal_filter(
+            lambda block_key: block_key and block_key % self.MODULO == 0,
+        )]
+
+
 class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
     """
     Test class for testing BlockStructureTransformers
@@ -75,3 +120,125 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
                 self.transformers.verify_versions(block_structure)
             self.transformers.collect(block_structure)
             assert self.transformers.verify_versions(block_structure)
+
+    def test_combine_filters(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureBlockData)
+        universal_filter = block_structure.create_universal_filter()
+        assert combine_filters(block_structure, []) is universal_filter
+        assert combine_filters(block_structure, [universal_filter, universal_filter]) is universal_filter
+
+        first_filter = MagicMock(side_effect=lambda block_key: block_key != 1)
+        second_filter = MagicMock(return_value=True)
+        assert combine_filters(block_structure, [universal_filter, first_filter]) is first_filter
+
+        combined_filter = combine_filters(block_structure, [first_filter, universal_filter, second_filter])
+        assert [combined_filter(block_key) for block_key in range(3)] == [True, False, True]
+        # The second filter is not evaluated for the block rejected by the first.
+        assert [call.args for call in second_filter.call_args_list] == [(0,), (2,)]
+
+    def test_ordered_filtering_transformers(self):
+        transformers = [
+            MarkingTransformer(),
+            MarkedRemovalTransformer(),
+            UniversalOrderedFilteringTransformer(),
+            MockFilteringTransformer(),
+        ]
+        with mock_registered_transformers(transformers):
+            self.transformers += transformers
+
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureBlockData)
+        with patch.object(
+            block_structure, 'filter_topological_traversal', wraps=block_structure.filter_topological_traversal,
+        ) as mock_traversal:
+            self.transformers.transform(block_structure)
+
+        # The ordered filters ran after MarkingTransformer, in a single
+        # traversal, and the universal MockFilteringTransformer filter
+        # needed no traversal.
+        assert mock_traversal.call_count == 1
+        self.assert_block_structure(block_structure, [[1], [4], [], [], []], missing_blocks=[2, 3])
+
+    def test_transform_signature(self):
+        self.add_mock_transformer()
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureBlockData)
+
+        # Transforms can't be shared by default.
+        assert self.transformers.transform_signature(block_structure) is None
+
+        with patch.object(MockTransformer, 'transform_signature', return_value='signature'), \
+                patch.object(MockFilteringTransformer, 'transform_signature', return_value=()):
+            assert self.transformers.transform_signature(block_structure) == (
+                (MockFilteringTransformer.name(), ()),
+                (MockTransformer.name(), 'signature'),
+            )
+
+
+@unittest.skipUnless(os.environ.get('RUN_PERF_TESTS'), 'Performance test; set RUN_PERF_TESTS to run it.')
+class FusedFiltersBenchmark(ChildrenMapTestMixin, TestCase):
+    """
+    Compares applying the filters of several filtering transformers in a
+    single fused traversal against a traversal per transformer, for a
+    course-sized block structure.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    NUM_CHAPTERS = 20
+    NUM_SEQUENTIALS_PER_CHAPTER = 10
+    NUM_LEAVES_PER_SEQUENTIAL = 19
+    NUM_ITERATIONS = 5
+
+    def setUp(self):
+        super().setUp()
+        children_map = [[]]
+        for _ in range(self.NUM_CHAPTERS):
+            chapter = len(children_map)
+            children_map[0].append(chapter)
+            children_map.append([])
+            for _ in range(self.NUM_SEQUENTIALS_PER_CHAPTER):
+                sequential = len(children_map)
+                children_map[chapter].append(sequential)
+                children_map.append([])
+                for _ in range(self.NUM_LEAVES_PER_SEQUENTIAL):
+                    children_map[sequential].append(len(children_map))
+                    children_map.append([])
+        self.block_structure = self.create_block_structure(children_map, BlockStructureBlockData)
+
+        self.filtering_transformers = [
+            type(f'ModuloRemovalTransformer{modulo}', (ModuloRemovalTransformer,), {'MODULO': modulo})()
+            for modulo in (97, 89, 83, 79)
+        ]
+        with mock_registered_transformers(self.filtering_transformers):
+            self.transformers = BlockStructureTransformers(self.filtering_transformers, usage_info=MagicMock())
+
+    def _time(self, transform):
+        """
+        Returns the best wall time in seconds of calling transform on a
+        fresh copy of the block structure.
+        """
+        timings = []
+        for _ in range(self.NUM_ITERATIONS):
+            block_structure = self.block_structure.copy()
+            start = timeit.default_timer()
+            transform(block_structure)
+            timings.append(timeit.default_timer() - start)
+        return min(timings)
+
+    def _transform_unfused(self, block_structure):
+        """
+        Applies each filtering transformer in its own traversal.
+        """
+        for transformer in self.filtering_transformers:
+            transformer.transform(self.transformers.usage_info, block_structure)
+        block_structure._prune_unreachable()  # pylint: disable=protected-access
+
+    def test_fused_transform_timings(self):
+        fused = self.block_structure.copy()
+        unfused = self.block_structure.copy()
+        self.transformers.transform(fused)
+        self._transform_unfused(unfused)
+        assert set(fused) == set(unfused)
+
+        print(f'\nFiltering {len(self.block_structure)} blocks with {len(self.filtering_transformers)} transformers:')
+        print(f'    unfused (s): {self._time(self._transform_unfused)}')
+        print(f'    fused (s): {self._time(self.transformers.transform)}')
@@ -5,7 +5,6 @@ Transformers.
 
 
 from abc import abstractmethod
-import functools
 
 
 class BlockStructureTransformer:
@@ -58,6 +57,19 @@ class BlockStructureTransformer:
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Whether the transformer's collect method supports incremental
+    # collection (see block_structure/incremental.py).  When a course is
+    # re-collected incrementally, collect is called with a block structure
+    # containing only the blocks that changed since the course was last
+    # collected, along with all of their ancestors and descendants.
+    #
+    # A transformer supports this if the data it collects for a block
+    # depends only on the block itself and its ancestors, as is the case
+    # for data that is percolated down the hierarchy.  Any non-block-specific
+    # data it collects is merged, field by field, into the previously
+    # collected data.
+    SUPPORTS_INCREMENTAL_COLLECT = False
+
     @classmethod
     def name(cls):
         """
@@ -157,6 +169,28 @@ class BlockStructureTransformer:
         """
         raise NotImplementedError
 
+    def transform_signature(self, usage_info, block_structure):  # pylint: disable=unused-argument
+        """
+        Returns a hashable signature of the usage-specific inputs of the
+        transformer's transform method, so a block structure transformed
+        for one usage can be shared with all other usages with the same
+        signature, as when transforming a course for many users at once.
+
+        Two usages with equal signatures must result in exactly the same
+        transformed block structure when transforming the same collected
+        block structure.  The default implementation returns None,
+        indicating that the transform can't be shared with other usages.
+
+        Arguments:
+            usage_info (any negotiated type) - The usage-specific object
+                that would be passed to the transform method.
+
+            block_structure (BlockStructureBlockData) - The collected
+                block structure that would be transformed.  It must not
+                be modified.
+        """
+        return None
+
 
 class FilteringTransformerMixin(BlockStructureTransformer):
     """
@@ -212,17 +246,39 @@ class FilteringTransformerMixin(BlockStructureTransformer):
         raise NotImplementedError
 
 
-def combine_filters(block_structure, filters):
-    return functools.reduce(
-        _filter_chain,
-        filters,
-        block_structure.create_universal_filter()
-    )
+class OrderedFilteringTransformerMixin(FilteringTransformerMixin):
+    """
+    Transformers whose transform logic can be expressed as filters, but
+    which depend on the transforms of the transformers added before them
+    (for example, on field overrides), may implement this mixin instead of
+    FilteringTransformerMixin.
+
+    Their filters are applied in the order in which the transformers were
+    added, rather than before all other transformers.  The filters of
+    consecutive transformers implementing this mixin are still combined and
+    used in a single tree traversal.
+    """
 
 
-def _filter_chain(accumulated, additional):
+def combine_filters(block_structure, filters):
     """
-    Given two functions that take a block_key and return a boolean, yield
-    a function that takes a block key, and 'ands' the functions together
+    Returns a single filter function that 'ands' the given filters.
+
+    The filters are evaluated in the given order for each block, stopping
+    at the first filter that does not retain the block.  Universal filters
+    are skipped.
     """
-    return lambda block_key: accumulated(block_key) and additional(block_key)
+    universal_filter = block_structure.create_universal_filter()
+    filters = tuple(filter_func for filter_func in filters if filter_func is not universal_filter)
+
+    if not filters:
+        return universal_filter
+    if len(filters) == 1:
+        return filters[0]
+
+    def combined_filter(block_key):
+        for filter_func in filters:
+            if not filter_func(block_key):
+                return False
+        return True
+    return combined_filter
@@ -1,10 +1,13 @@
 """
 Module for a collection of BlockStructureTransformers.
 """
+from itertools import groupby
 from logging import getLogger
+from time import perf_counter
 
+from . import profiler
 from .exceptions import TransformerDataIncompatible, TransformerException
-from .transformer import FilteringTransformerMixin, combine_filters
+from .transformer import FilteringTransformerMixin, OrderedFilteringTransformerMixin, combine_filters
 from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
@@ -62,7 +65,8 @@ class BlockStructureTransformers:
             )
 
         for transformer in transformers:
-            if isinstance(transformer, FilteringTransformerMixin):
+            if isinstance(transformer, FilteringTransformerMixin) and \
+                    not isinstance(transformer, OrderedFilteringTransformerMixin):
                 self._transformers['supports_filter'].append(transformer)
             else:
                 self._transformers['no_filter'].append(transformer)
@@ -103,38 +107,105 @@ class BlockStructureTransformers:
             )
         return True
 
+    def transform_signature(self, block_structure):
+        """
+        Returns the combined transform signature (see
+        BlockStructureTransformer.transform_signature) of the transformers
+        in the collection for the collection's usage_info, or None if the
+        transform of any of them can't be shared with other usages.
+        """
+        signatures = []
+        for transformer in self._transformers['supports_filter'] + self._transformers['no_filter']:
+            transform_signature = getattr(transformer, 'transform_signature', None)
+            signature = transform_signature(self.usage_info, block_structure) if transform_signature else None
+            if signature is None:
+                return None
+            signatures.append((transformer.name(), signature))
+        return tuple(signatures)
+
     def transform(self, block_structure):
         """
         The given block structure is transformed by each transformer in the
         collection. Tranformers with filters are combined and run first in a
         single course tree traversal, then remaining transformers are run in
-        the order that they were added.
+        the order that they were added, with the filters of consecutive
+        ordered filtering transformers also combined in a single traversal.
+
+        When profiling is enabled (see block_structure/profiler.py), the
+        time spent in and the blocks removed by each transformer are
+        recorded.
         """
-        self._transform_with_filters(block_structure)
-        self._transform_without_filters(block_structure)
+        profiling = profiler.is_enabled()
+        self._transform_with_filters(block_structure, profiling)
+        self._transform_without_filters(block_structure, profiling)
 
         # Prune the block structure to remove any unreachable blocks.
         block_structure._prune_unreachable()  # pylint: disable=protected-access
 
-    def _transform_with_filters(self, block_structure):
+    def _transform_with_filters(self, block_structure, profiling=False):
         """
         Transforms the given block_structure using the transform_block_filters
         method from the given transformers.
         """
-        if not self._transformers['supports_filter']:
+        self._apply_filters(self._transformers['supports_filter'], block_structure, profiling)
+
+    def _transform_without_filters(self, block_structure, profiling=False):
+        """
+        Transforms the given block_structure using the transform
+        method from the given transformers, in order.  Consecutive
+        ordered filtering transformers are applied in a single traversal.
+        """
+        for is_ordered_filtering, transformers in groupby(
+            self._transformers['no_filter'],
+            key=lambda transformer: isinstance(transformer, OrderedFilteringTransformerMixin),
+        ):
+            if is_ordered_filtering:
+                self._apply_filters(list(transformers), block_structure, profiling)
+                continue
+
+            for transformer in transformers:
+                if not profiling:
+                    transformer.transform(self.usage_info, block_structure)
+                    continue
+
+                num_blocks = len(block_structure)
+                start = perf_counter()
+                transformer.transform(self.usage_info, block_structure)
+                profiler.transformer_profiler.record(profiler.TransformerRecord(
+                    transformer.name(),
+                    wall_time=perf_counter() - start,
+                    blocks_visited=num_blocks,
+                    blocks_removed=max(num_blocks - len(block_structure), 0),
+                ))
+
+    def _apply_filters(self, transformers, block_structure, profiling):
+        """
+        Transforms the given block_structure using the combined filters
+        of the given filtering transformers, in a single traversal.
+        """
+        if not transformers:
             return
 
         filters = []
-        for transformer in self._transformers['supports_filter']:
-            filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+        records = []
+        for transformer in transformers:
+            if not profiling:
+                filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+                continue
+
+            # Combine each transformer's filters separately, so their
+            # evaluations can be attributed to the transformer.
+            start = perf_counter()
+            transformer_filters = transformer.transform_block_filters(self.usage_info, block_structure)
+            record = profiler.TransformerRecord(transformer.name(), wall_time=perf_counter() - start)
+            filters.append(record.profile_filter(combine_filters(block_structure, transformer_filters)))
+            records.append(record)
 
         combined_filters = combine_filters(block_structure, filters)
-        block_structure.filter_topological_traversal(combined_filters)
+        if combined_filters is not block_structure.create_universal_filter():
+            # A universal filter retains all blocks, so the traversal
+            # can be skipped.
+            block_structure.filter_topological_traversal(combined_filters)
 
-    def _transform_without_filters(self, block_structure):
-        """
-        Transforms the given block_structure using the transform
-        method from the given transformers.
-        """
-        for transformer in self._transformers['no_filter']:
-            transformer.transform(self.usage_info, block_structure)
+        for record in records:
+            profiler.transformer_profiler.record(record)
@@ -864,6 +864,8 @@ class ProgramMarketingDataExtender(ProgramDataExtender):
 
         # Aggregate list of instructors for the program keyed by name
         self.instructors = []
+        # Course blocks of the program's course runs keyed by course run key
+        self.course_blocks = {}
 
         # Values for programs' price calculation.
         self.data["avg_price_per_course"] = 0.0
@@ -875,6 +877,14 @@ class ProgramMarketingDataExtender(ProgramDataExtender):
         cache_key = "program.instructors.{uuid}".format(uuid=self.data["uuid"])
         program_instructors = cache.get(cache_key)
 
+        if not program_instructors:
+            # Fetch the course blocks of all of the course runs at once, for their instructors.
+            self.course_blocks = modulestore().get_courses_by_keys(
+                CourseKey.from_string(course_run["key"])
+                for course in self.data["courses"]
+                for course_run in course["course_runs"]
+            )
+
         for course in self.data["courses"]:
             self._execute("_collect_course", course)
             if not program_instructors:
@@ -953,9 +963,8 @@ class ProgramMarketingDataExtender(ProgramDataExtender):
         supports the authoring of course instructor data, we will be able to migrate course
         instructor data into the catalog, retrieve it via the catalog API, and remove this code.
         """
-        module_store = modulestore()
         course_run_key = CourseKey.from_string(course_run["key"])
-        course_block = module_store.get_course(course_run_key)
+        course_block = self.course_blocks.get(course_run_key)
         if course_block:
             course_instructors = getattr(course_block, "instructor_info", {})
 
@@ -250,3 +250,11 @@ class CacheService:
         Caches the value against the given key.
         """
         return self._cache.set(key, value, *args, **kwargs)
+
+    def add(self, key, value, *args, **kwargs):
+        """
+        Caches the value against the given key, unless a value is already cached against it.
+
+        Returns whether the value was cached.
+        """
+        return self._cache.add(key, value, *args, **kwargs)
@@ -21,6 +21,7 @@ class ContentTypeGateTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -71,6 +72,12 @@ class ContentTypeGateTransformer(BlockStructureTransformer):
             current_access = block_structure.get_xblock_field(block_key, 'group_access')
         return current_access or {}
 
+    def transform_signature(self, usage_info, block_structure):
+        return ContentTypeGatingConfig.enabled_for_enrollment(
+            user=usage_info.user,
+            course_key=usage_info.course_key,
+        )
+
     def transform(self, usage_info, block_structure):
         if not ContentTypeGatingConfig.enabled_for_enrollment(
             user=usage_info.user,
@@ -17,10 +17,10 @@ from ..toggles import EFFORT_ESTIMATION_DISABLED_FLAG
 
 
 # Copied here, rather than used directly from class, just to catch any accidental changes
-DISABLE_ESTIMATION = 'disable_estimation'
 EFFORT_ACTIVITIES = 'effort_activities'
 EFFORT_TIME = 'effort_time'
 HTML_WORD_COUNT = 'html_word_count'
+MISSING_ESTIMATION_DATA = 'missing_estimation_data'
 VIDEO_CLIP_DURATION = 'video_clip_duration'
 VIDEO_DURATION = 'video_duration'
 
@@ -117,7 +117,8 @@ class TestEffortEstimationTransformer(ModuleStoreTestCase):
         assert self.get_collection_field(self.video_web_key, VIDEO_CLIP_DURATION) is None
         assert self.get_collection_field(self.html_key, HTML_WORD_COUNT) == 2
 
-        assert self.block_structure.get_transformer_data(EffortEstimationTransformer, DISABLE_ESTIMATION) is None
+        for block_key in self.block_structure:
+            assert self.get_collection_field(block_key, MISSING_ESTIMATION_DATA) is None
 
     def test_collection(self):
         self.collect()
@@ -128,7 +129,8 @@ class TestEffortEstimationTransformer(ModuleStoreTestCase):
         remove_video_for_course(str(self.course_key), 'edxval3')
         self.collect_and_transform()
 
-        assert self.block_structure.get_transformer_data(EffortEstimationTransformer, DISABLE_ESTIMATION) is True
+        assert self.get_collection_field(self.video_web_key, MISSING_ESTIMATION_DATA) is True
+        assert self.get_collection_field(self.video_normal_key, MISSING_ESTIMATION_DATA) is None
 
         assert self.block_structure.get_xblock_field(self.section_key, EFFORT_ACTIVITIES) is None
         assert self.block_structure.get_xblock_field(self.section_key, EFFORT_TIME) is None
@@ -14,12 +14,14 @@ This is used by capa_block.
 """
 
 
+import hashlib
 import logging
 import os.path
 import re
 from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+from threading import Lock
 from typing import Optional
 from xml.sax.saxutils import unescape
 
@@ -77,6 +79,78 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+# The number of parsed problems kept in memory by each process, see ParsedProblemCache
+PARSED_PROBLEM_CACHE_SIZE = 1000
+
+
+class ParsedProblem:
+    """
+    The part of a problem which doesn't depend on its seed: the tree of its XML, with its includes
+    processed and the IDs of its responses and inputs assigned, the positions of its responses and
+    of their inputs in the tree, and its a11y data.
+    """
+    def __init__(self, tree, responses, problem_data):
+        positions = {element: position for position, element in enumerate(tree.iter())}
+        self.tree = tree
+        self.response_positions = [
+            (positions[response], [positions[inputfield] for inputfield in inputfields])
+            for response, inputfields in responses
+        ]
+        self.problem_data = problem_data
+
+    def copy(self):
+        """
+        Returns a copy of the tree, the list of the responses of the copy with their inputs, and a
+        copy of the a11y data, which can all be changed without changing this parsed problem.
+        """
+        tree = deepcopy(self.tree)
+        elements = list(tree.iter())
+        responses = [
+            (elements[response_position], [elements[position] for position in inputfield_positions])
+            for response_position, inputfield_positions in self.response_positions
+        ]
+        return tree, responses, deepcopy(self.problem_data)
+
+
+class ParsedProblemCache:
+    """
+    An in-memory, least recently used cache of parsed problems, by hash of their id and XML.
+
+    The XML of a problem is the same for all the learners, so parsing it once per process and
+    copying the parsed tree for each learner is much cheaper than parsing it each time.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        """
+        Returns the parsed problem cached by the given key, or None.
+        """
+        with self._lock:
+            parsed_problem = self._entries.get(key)
+            if parsed_problem is not None:
+                self._entries.move_to_end(key)
+        return parsed_problem
+
+    def set(self, key, parsed_problem):
+        """
+        Caches the given parsed problem by key, evicting the least recently used ones.
+        """
+        with self._lock:
+            self._entries[key] = parsed_problem
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+PARSED_PROBLEM_CACHE = ParsedProblemCache(PARSED_PROBLEM_CACHE_SIZE)
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -187,26 +261,12 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
+        # parse problem XML file into an element tree, handling any <include file="foo"> tags
+        # and assigning IDs to the responses and their inputs
         if isinstance(problem_text, str):
             # etree chokes on Unicode XML with an encoding declaration
             problem_text = problem_text.encode('utf-8')
-        self.tree = XML(problem_text)
-
-        try:
-            self.make_xml_compatible(self.tree)
-        except Exception:
-            capa_block = self.capa_block
-            log.exception(
-                "CAPAProblemError: %s, id:%s, data: %s",
-                capa_block.display_name,
-                self.problem_id,
-                capa_block.data
-            )
-            raise
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        self.tree, responses, self.problem_data = self._parse_problem(problem_text)
 
         # construct script processor context (eg for customresponse problems)
         if minimal_init:
@@ -214,11 +274,9 @@ class LoncapaProblem(object):
         else:
             self.context = self._extract_context(self.tree)
 
-        # Pre-parse the XML tree: modifies it to add ID's and perform some in-place
-        # transformations.  This also creates the dict (self.responders) of Response
-        # instances for each question in the problem. The dict has keys = xml subtree of
-        # Response, values = Response instance
-        self.problem_data = self._preprocess_problem(self.tree, minimal_init)
+        # Creates the dict (self.responders) of Response instances for each question in the
+        # problem. The dict has keys = xml subtree of Response, values = Response instance
+        self._preprocess_problem(self.tree, responses, minimal_init)
 
         if not minimal_init:
             if not self.student_answers:  # True when student_answers is an empty dict
@@ -831,12 +889,50 @@ class LoncapaProblem(object):
 
     # ======= Private Methods Below ========
 
-    def _process_includes(self):
+    def _parse_problem(self, problem_text):
+        """
+        Parse the problem XML and assign IDs to its responses and inputs.
+
+        Returns the tree, the list of the responses of the tree with their inputs, and the a11y
+        data of the problem.  This doesn't depend on the seed, so it is done once per process for
+        each problem and cached, each instance of the problem getting its own copy.  Problems with
+        includes aren't cached, since the included files can change without the problem changing.
+        """
+        cache_key = hashlib.sha1(str(self.problem_id).encode('utf-8') + b'\n' + problem_text).hexdigest()
+        parsed_problem = PARSED_PROBLEM_CACHE.get(cache_key)
+        if parsed_problem is not None:
+            return parsed_problem.copy()
+
+        tree = XML(problem_text)
+        try:
+            self.make_xml_compatible(tree)
+        except Exception:
+            capa_block = self.capa_block
+            log.exception(
+                "CAPAProblemError: %s, id:%s, data: %s",
+                capa_block.display_name,
+                self.problem_id,
+                capa_block.data
+            )
+            raise
+
+        has_includes = tree.find('.//include') is not None
+        self._process_includes(tree)
+        problem_data = {}
+        responses = self._assign_ids(tree, problem_data)
+        if has_includes:
+            return tree, responses, problem_data
+
+        parsed_problem = ParsedProblem(tree, responses, problem_data)
+        PARSED_PROBLEM_CACHE.set(cache_key, parsed_problem)
+        return parsed_problem.copy()
+
+    def _process_includes(self, tree):
         """
         Handle any <include file="foo"> tags by reading in the specified file and inserting it
         into our XML tree.  Fail gracefully if debugging.
         """
-        includes = self.tree.findall('.//include')
+        includes = tree.findall('.//include')
         for inc in includes:
             filename = inc.get('file')
             if filename is not None:
@@ -915,17 +1011,13 @@ class LoncapaProblem(object):
 
         return path
 
-    def _extract_context(self, tree):
+    def _extract_script_code(self, tree):
         """
-        Extract content of <script>...</script> from the problem.xml file, and exec it in the
-        context of this problem.  Provides ability to randomize problems, and also set
-        variables for problem answer checking.
+        Extract content of <script>...</script> from the problem.xml file.
 
-        Problem XML goes to Python execution context. Runs everything in script tags.
+        Returns the Python code of the scripts, the Python path needed to run it, and
+        the extra files to create in the sandbox for it.
         """
-        context = {}
-        context['seed'] = self.seed
-        context['anonymous_student_id'] = self.capa_system.anonymous_student_id
         all_code = ''
 
         python_path = []
@@ -956,25 +1048,69 @@ class LoncapaProblem(object):
                 extra_files.append(("python_lib.zip", zip_lib))
                 python_path.append("python_lib.zip")
 
+        return all_code, python_path, extra_files
+
+    def _script_globals(self, all_code, seed):
+        """
+        Returns the globals to execute the code of the scripts with, for the given seed.
+
+        The anonymous id of the student is only given to the code which uses it, so that
+        the context of the other problems only depends on the seed, and is cached for all
+        the students with the same seed.
+        """
+        script_globals = {'seed': seed}
+        if 'anonymous_student_id' in all_code:
+            script_globals['anonymous_student_id'] = self.capa_system.anonymous_student_id
+        return script_globals
+
+    def _safe_exec_options(self, python_path, extra_files):
+        """
+        Returns the keyword arguments of safe_exec to execute the code of the scripts with.
+        """
+        return {
+            'python_path': python_path,
+            'extra_files': extra_files,
+            'cache': self.capa_system.cache,
+            'limit_overrides_context': get_course_id_from_capa_block(self.capa_block),
+            'slug': self.problem_id,
+            'unsafely': self.capa_system.can_execute_unsafe_code(),
+        }
+
+    def get_context_jobs(self, seeds):
+        """
+        Returns the safe_exec jobs extracting the context of the problem for each of the given
+        seeds, as a list of (code, globals_dict, random_seed) triples, along with the keyword
+        arguments of safe_exec_many to run them with.
+
+        Returns None if the problem has no Python scripts, or if its scripts use the anonymous
+        id of the student, since their results then differ for each student.
+        """
+        all_code, python_path, extra_files = self._extract_script_code(self.tree)
+        if not all_code or 'anonymous_student_id' in all_code:
+            return None
+        jobs = [(all_code, self._script_globals(all_code, seed), seed) for seed in seeds]
+        return jobs, self._safe_exec_options(python_path, extra_files)
+
+    def _extract_context(self, tree):
+        """
+        Extract content of <script>...</script> from the problem.xml file, and exec it in the
+        context of this problem.  Provides ability to randomize problems, and also set
+        variables for problem answer checking.
+
+        Problem XML goes to Python execution context. Runs everything in script tags.
+        """
+        all_code, python_path, extra_files = self._extract_script_code(tree)
+        context = self._script_globals(all_code, self.seed)
+
+        if all_code:
             try:
-                safe_exec(
-                    all_code,
-                    context,
-                    random_seed=self.seed,
-                    python_path=python_path,
-                    extra_files=extra_files,
-                    cache=self.capa_system.cache,
-                    limit_overrides_context=get_course_id_from_capa_block(
-                        self.capa_block
-                    ),
-                    slug=self.problem_id,
-                    unsafely=self.capa_system.can_execute_unsafe_code(),
-                )
+                safe_exec(all_code, context, random_seed=self.seed, **self._safe_exec_options(python_path, extra_files))
             except Exception as err:
                 log.exception("Error while execing script code: " + all_code)  # lint-amnesty, pylint: disable=logging-not-lazy
                 msg = Text("Error while executing script code: %s" % str(err))
                 raise responsetypes.LoncapaProblemError(msg)
 
+        context.setdefault('anonymous_student_id', self.capa_system.anonymous_student_id)
         # Store code source in context, along with the Python path needed to run it correctly.
         context['script_code'] = all_code
         context['python_path'] = python_path
@@ -1097,20 +1233,17 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree, minimal_init):  # private
+    def _assign_ids(self, tree, problem_data):  # private
         """
         Assign IDs to all the responses
         Assign sub-IDs to all entries (textline, schematic, etc.)
-        Annoted correctness and value
+        Fill problem_data with the a11y data of the responses
         In-place transformation
 
-        Also create capa Response instances for each responsetype and save as self.responders
-
-        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        Returns the list of the responses with their inputs.
         """
         response_id = 1
-        problem_data = {}
-        self.responders = {}
+        responses = []
         for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
             responsetype_id = self.problem_id + "_" + str(response_id)
             # create and save ID for this response
@@ -1132,7 +1265,20 @@ class LoncapaProblem(object):
                 answer_id = answer_id + 1
 
             self.response_a11y_data(response, inputfields, responsetype_id, problem_data)
+            responses.append((response, inputfields))
+
+        return responses
 
+    def _preprocess_problem(self, tree, responses, minimal_init):  # private
+        """
+        Create capa Response instances for each of the given responses of the tree, with their
+        inputs, and save as self.responders
+
+        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        Assign IDs to all the solutions
+        """
+        self.responders = {}
+        for response, inputfields in responses:
             # instantiate capa Response
             responsetype_cls = responsetypes.registry.get_class_for_tag(response.tag)
             responder = responsetype_cls(
@@ -1161,8 +1307,6 @@ class LoncapaProblem(object):
                 solution.attrib['id'] = "%s_solution_%i" % (self.problem_id, solution_id)
                 solution_id += 1
 
-        return problem_data
-
     def response_a11y_data(self, response, inputfields, responsetype_id, problem_data):
         """
         Construct data to be used for a11y.
@@ -47,6 +47,7 @@ from .util import (
     contextualize_text,
     convert_files_to_filenames,
     default_tolerance,
+    evaluate_samples,
     find_with_default,
     get_course_id_from_capa_block,
     get_inner_html_from_xpath,
@@ -3084,6 +3085,12 @@ class FormulaResponse(LoncapaResponse):
         """
         _ = self.capa_system.i18n.gettext
 
+        # Evaluate all the test cases at once when the answer allows it; otherwise
+        # evaluate them one at a time, which also reports the errors of the answer.
+        out = evaluate_samples(answer, var_dict_list, case_sensitive=self.case_sensitive)
+        if out is not None:
+            return out
+
         out = []
         for var_dict in var_dict_list:
             try:
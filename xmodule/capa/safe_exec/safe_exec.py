@@ -1,10 +1,14 @@
 """Capa's specialized use of codejail.safe_exec."""
 import hashlib
+from contextlib import contextmanager
+from threading import Event, Lock
+from time import perf_counter, sleep
 
+import codejail.safe_exec
 from codejail.safe_exec import SafeExecException, json_safe
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import safe_exec as codejail_safe_exec
-from edx_django_utils.monitoring import function_trace
+from edx_django_utils.monitoring import accumulate, function_trace, increment
 
 from . import lazymod
 from .remote_exec import is_codejail_rest_service_enabled, get_remote_exec
@@ -55,6 +59,63 @@ for name, modname in ASSUMED_IMPORTS:
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
 
+# How long an execution waits for the same execution running elsewhere to cache its result,
+# after which it runs the code itself.  This is longer than the sandbox usually allows code to run.
+SINGLE_FLIGHT_TIMEOUT = 10  # seconds
+
+# The code run by safe_exec_many to execute several jobs in one sandbox.  Each job is executed in
+# a forked copy of the sandbox process, so that the modules it imports and their state don't carry
+# over to the next jobs, in its own globals and with the random module seeded with its own seed.
+# Its results are the traceback of the exception it raised, if any, and the JSON-safe part of its
+# globals.
+BATCH_CODE = """\
+import json as _json
+import os as _os
+import traceback as _traceback
+
+
+def _json_safe(_globals):
+    _safe_globals = {}
+    for _name, _value in _globals.items():
+        try:
+            _safe_globals[_name] = _json.loads(_json.dumps(_value))
+        except Exception:
+            pass
+    return _safe_globals
+
+
+def _run_job(_job):
+    _globals = dict(_job['globals_dict'])
+    try:
+        exec(code_prolog % _job['random_seed'] + lazy_imports + _job['code'], _globals)
+    except Exception:
+        return [_traceback.format_exc(), _json_safe(_globals)]
+    return [None, _json_safe(_globals)]
+
+
+batch_results = []
+for _job in batch_jobs:
+    _read_fd, _write_fd = _os.pipe()
+    _pid = _os.fork()
+    if _pid == 0:
+        try:
+            _os.close(_read_fd)
+            with _os.fdopen(_write_fd, 'w') as _output:
+                _json.dump(_run_job(_job), _output)
+        finally:
+            _os._exit(0)
+    _os.close(_write_fd)
+    with _os.fdopen(_read_fd) as _output:
+        batch_results.append(_json.loads(_output.read()))
+    _os.waitpid(_pid, 0)
+del batch_jobs, code_prolog, lazy_imports, _job, _read_fd, _write_fd, _pid
+"""
+
+# The message of the exception raised for a job of safe_exec_many, which is that of codejail's
+# safe_exec for code raising an exception: the job's traceback is what the sandbox writes to stderr.
+JAILED_CODE_ERROR = "Couldn't execute jailed code: stdout: {stdout!r}, stderr: {stderr!r} with status code: {status}"
+
+
 def update_hash(hasher, obj):
     """
     Update a `hashlib` hasher with a nested object.
@@ -78,6 +139,168 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj).encode())
 
 
+class SafeExecCache:
+    """
+    The cache of the results of safe_exec, over a `cache` object with .get(key) and
+    .set(key, value) methods.
+
+    A result is a pair: the exception message, if any, else None; and the JSON-safe
+    globals dictionary after the execution.
+
+    Executions of the same code with the same globals and random seed are single-flight:
+    while one is running, the others wait for its result instead of running the code
+    again, which would otherwise happen when many learners load the same problem at once.
+    The executions of each process wait for each other, and if the cache has .add(key, value, timeout)
+    and .delete(key) methods, as Django caches do, the executions of different processes wait for each
+    other too, through a lock entry which is deleted once the execution is done.
+    """
+    _in_flight = {}
+    _in_flight_lock = Lock()
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    @staticmethod
+    def key(code, globals_dict, random_seed):
+        """
+        Returns the cache key of the execution of `code` with the given globals and random seed.
+        """
+        md5er = hashlib.md5()
+        md5er.update(repr(code).encode('utf-8'))
+        update_hash(md5er, json_safe(globals_dict))
+        return "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+
+    def get(self, key):
+        """
+        Returns the cached result of the given key, or None.
+        """
+        cached = self.cache.get(key)
+        if cached is None:
+            increment('safe_exec.cache_misses')
+        else:
+            increment('safe_exec.cache_hits')
+        return cached
+
+    def set(self, key, emsg, globals_dict):
+        """
+        Caches the result of an execution.  This is complicated by the fact that
+        the globals dict might not be entirely serializable.
+        """
+        self.cache.set(key, (emsg, json_safe(globals_dict)))
+
+    @contextmanager
+    def single_flight(self, key):
+        """
+        Waits for the execution of the given key running elsewhere, if any.
+
+        Yields the result cached by that execution, or None if the caller has to run the code,
+        in which case the executions waiting for it are released when the context exits.
+        """
+        with self._in_flight_lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                in_flight = self._in_flight[key] = Event()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            increment('safe_exec.single_flight_waits')
+            in_flight.wait(SINGLE_FLIGHT_TIMEOUT)
+            yield self.cache.get(key)
+            return
+
+        lock_key = key + '.lock'
+        add = getattr(self.cache, 'add', None)
+        locked = add is not None and add(lock_key, True, SINGLE_FLIGHT_TIMEOUT)
+        try:
+            if add is None or locked:
+                yield None
+            else:
+                yield self._wait_for_other_process(key, lock_key)
+        finally:
+            if locked:
+                self.cache.delete(lock_key)
+            with self._in_flight_lock:
+                del self._in_flight[key]
+            in_flight.set()
+
+    def _wait_for_other_process(self, key, lock_key):
+        """
+        Returns the result of the given key cached by the other process holding `lock_key`, or
+        None if that process released the lock without caching a result, or took too long.
+        """
+        deadline = perf_counter() + SINGLE_FLIGHT_TIMEOUT
+        while perf_counter() < deadline:
+            sleep(0.1)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            if self.cache.get(lock_key) is None:
+                # The result may have been cached just before the lock was released.
+                return self.cache.get(key)
+        return None
+
+
+def _apply_cached_result(cached, globals_dict):
+    """
+    Updates `globals_dict` with a cached result, and returns the exception to raise for it, if any.
+    """
+    emsg, cleaned_results = cached
+    globals_dict.update(cleaned_results)
+    return SafeExecException(emsg) if emsg else None
+
+
+def _execute(code, globals_dict, python_path, extra_files, limit_overrides_context, slug, unsafely):
+    """
+    Runs the complete code in the sandbox, or remotely, updating `globals_dict` with its results.
+
+    Returns the exception message, if any, else None, and the exception to raise for it.
+    """
+    start_time = perf_counter()
+    if is_codejail_rest_service_enabled():
+        data = {
+            "code": code,
+            "globals_dict": globals_dict,
+            "python_path": python_path,
+            "limit_overrides_context": limit_overrides_context,
+            "slug": slug,
+            "unsafely": unsafely,
+            "extra_files": extra_files,
+        }
+
+        emsg, exception = get_remote_exec(data)
+
+    else:
+        # Decide which code executor to use.
+        if unsafely:
+            exec_fn = codejail_not_safe_exec
+        else:
+            exec_fn = codejail_safe_exec
+
+        # Run the code!  Results are side effects in globals_dict.
+        try:
+            exec_fn(
+                code,
+                globals_dict,
+                python_path=python_path,
+                extra_files=extra_files,
+                limit_overrides_context=limit_overrides_context,
+                slug=slug,
+            )
+        except SafeExecException as e:
+            # Saving SafeExecException e in exception to be used later.
+            exception = e
+            emsg = str(e)
+        else:
+            emsg = None
+            exception = None
+
+    accumulate('safe_exec.sandbox_time_ms', int((perf_counter() - start_time) * 1000))
+    increment('safe_exec.sandbox_executions')
+    return emsg, exception
+
+
 @function_trace('safe_exec')
 def safe_exec(
     code,
@@ -108,7 +331,8 @@ def safe_exec(
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
     to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    and the random seed.  Only one execution of the same code with the same globals
+    and random seed runs at a time, see SafeExecCache.
 
     `limit_overrides_context` is an optional string to be used as a key on
     the `settings.CODE_JAIL['limit_overrides']` dictionary in order to apply
@@ -121,69 +345,148 @@ def safe_exec(
 
     If `unsafely` is true, then the code will actually be executed without sandboxing.
     """
-    # Check the cache for a previous result.
-    if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code).encode('utf-8'))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
-        cached = cache.get(key)
-        if cached is not None:
-            # We have a cached result.  The result is a pair: the exception
-            # message, if any, else None; and the resulting globals dictionary.
-            emsg, cleaned_results = cached
-            globals_dict.update(cleaned_results)
-            if emsg:
-                raise SafeExecException(emsg)
-            return
-
     # Create the complete code we'll run.
-    code_prolog = CODE_PROLOG % random_seed
+    complete_code = CODE_PROLOG % random_seed + LAZY_IMPORTS + code
+
+    if not cache:
+        emsg, exception = _execute(
+            complete_code, globals_dict, python_path, extra_files, limit_overrides_context, slug, unsafely
+        )
+        if emsg:
+            raise exception
+        return
+
+    # Check the cache for a previous result, or one being computed elsewhere.
+    safe_exec_cache = SafeExecCache(cache)
+    key = safe_exec_cache.key(code, globals_dict, random_seed)
+    cached = safe_exec_cache.get(key)
+    if cached is None:
+        with safe_exec_cache.single_flight(key) as cached:
+            if cached is None:
+                emsg, exception = _execute(
+                    complete_code, globals_dict, python_path, extra_files, limit_overrides_context, slug, unsafely
+                )
+                # Put the result back in the cache.
+                safe_exec_cache.set(key, emsg, globals_dict)
+                if emsg:
+                    raise exception
+                return
+
+    exception = _apply_cached_result(cached, globals_dict)
+    if exception:
+        raise exception
 
-    if is_codejail_rest_service_enabled():
-        data = {
-            "code": code_prolog + LAZY_IMPORTS + code,
-            "globals_dict": globals_dict,
-            "python_path": python_path,
-            "limit_overrides_context": limit_overrides_context,
-            "slug": slug,
-            "unsafely": unsafely,
-            "extra_files": extra_files,
-        }
 
-        emsg, exception = get_remote_exec(data)
+@function_trace('safe_exec_many')
+def safe_exec_many(
+    jobs,
+    python_path=None,
+    extra_files=None,
+    cache=None,
+    limit_overrides_context=None,
+    slug=None,
+    unsafely=False,
+):
+    """
+    Execute several pieces of python code safely, in a single sandbox execution.
 
-    else:
-        # Decide which code executor to use.
-        if unsafely:
-            exec_fn = codejail_not_safe_exec
-        else:
-            exec_fn = codejail_safe_exec
+    `jobs` is a list of (code, globals_dict, random_seed) triples, each executed as
+    safe_exec would, with the other arguments, which are those of safe_exec.  Running
+    them together saves starting a sandbox, or making a request to the codejail service,
+    for each of them.  Each job runs in its own process forked in the sandbox, so that it
+    has the results it would have with safe_exec, under the same cache key.  The jobs whose
+    results are cached aren't run again, and jobs with the same code, globals and random
+    seed are only run once.  Without a sandbox, the jobs are run one at a time with safe_exec.
 
-        # Run the code!  Results are side effects in globals_dict.
-        try:
-            exec_fn(
-                code_prolog + LAZY_IMPORTS + code,
-                globals_dict,
-                python_path=python_path,
-                extra_files=extra_files,
-                limit_overrides_context=limit_overrides_context,
-                slug=slug,
+    If the sandbox execution itself fails, for instance because the jobs together exceed
+    its time limit, the jobs are then executed one at a time.
+
+    Returns the list of the exceptions raised by the jobs, None for those which succeeded,
+    instead of raising them.
+    """
+    if unsafely or (codejail.safe_exec.UNSAFE and not is_codejail_rest_service_enabled()):
+        # Without a sandbox, the jobs would be forked from this process; run them one at a time instead.
+        return [
+            _safe_exec_job(job, python_path, extra_files, cache, limit_overrides_context, slug, unsafely)
+            for job in jobs
+        ]
+
+    safe_exec_cache = SafeExecCache(cache) if cache else None
+    exceptions = [None] * len(jobs)
+    jobs_to_run = {}
+    for index, (code, globals_dict, random_seed) in enumerate(jobs):
+        key = SafeExecCache.key(code, globals_dict, random_seed)
+        cached = safe_exec_cache.get(key) if safe_exec_cache else None
+        if cached is None:
+            jobs_to_run.setdefault(key, []).append(index)
+        else:
+            exceptions[index] = _apply_cached_result(cached, globals_dict)
+
+    if not jobs_to_run:
+        return exceptions
+
+    batch_jobs = []
+    for indexes in jobs_to_run.values():
+        code, globals_dict, random_seed = jobs[indexes[0]]
+        batch_jobs.append({'code': code, 'globals_dict': json_safe(globals_dict), 'random_seed': random_seed})
+    batch_globals = {
+        'batch_jobs': batch_jobs,
+        'code_prolog': CODE_PROLOG,
+        'lazy_imports': LAZY_IMPORTS,
+    }
+    emsg, _exception = _execute(
+        BATCH_CODE, batch_globals, python_path, extra_files, limit_overrides_context, slug, unsafely
+    )
+    batch_results = batch_globals.get('batch_results')
+    if emsg or batch_results is None or len(batch_results) != len(batch_jobs):
+        # Run the jobs one at a time, so that each job fails or succeeds on its own.
+        for indexes in jobs_to_run.values():
+            exceptions[indexes[0]] = _safe_exec_job(
+                jobs[indexes[0]], python_path, extra_files, cache, limit_overrides_context, slug, unsafely
             )
-        except SafeExecException as e:
-            # Saving SafeExecException e in exception to be used later.
-            exception = e
-            emsg = str(e)
+            _copy_result(jobs, exceptions, indexes)
+        return exceptions
+
+    for (key, indexes), (traceback, cleaned_results) in zip(jobs_to_run.items(), batch_results):
+        if traceback:
+            job_emsg = JAILED_CODE_ERROR.format(stdout=b'', stderr=traceback.encode('utf-8'), status=1)
         else:
-            emsg = None
+            job_emsg = None
+        if safe_exec_cache:
+            safe_exec_cache.set(key, job_emsg, cleaned_results)
+        globals_dict = jobs[indexes[0]][1]
+        exceptions[indexes[0]] = _apply_cached_result((job_emsg, cleaned_results), globals_dict)
+        _copy_result(jobs, exceptions, indexes)
+    return exceptions
 
-    # Put the result back in the cache.  This is complicated by the fact that
-    # the globals dict might not be entirely serializable.
-    if cache:
-        cleaned_results = json_safe(globals_dict)
-        cache.set(key, (emsg, cleaned_results))
 
-    # If an exception happened, raise it now.
-    if emsg:
-        raise exception
+def _safe_exec_job(job, python_path, extra_files, cache, limit_overrides_context, slug, unsafely):
+    """
+    Runs a job of safe_exec_many with safe_exec, and returns the exception it raised, if any.
+    """
+    code, globals_dict, random_seed = job
+    try:
+        safe_exec(
+            code,
+            globals_dict,
+            random_seed=random_seed,
+            python_path=python_path,
+            extra_files=extra_files,
+            cache=cache,
+            limit_overrides_context=limit_overrides_context,
+            slug=slug,
+            unsafely=unsafely,
+        )
+    except SafeExecException as e:
+        return e
+    return None
+
+
+def _copy_result(jobs, exceptions, indexes):
+    """
+    Copies the result of the first job of the given indexes to the other ones, which are the same job.
+    """
+    first_index = indexes[0]
+    for index in indexes[1:]:
+        jobs[index][1].update(json_safe(jobs[first_index][1]))
+        exceptions[index] = exceptions[first_index]
@@ -5,7 +5,10 @@ import hashlib
 import os
 import os.path
 import textwrap
+import threading
+import time
 import unittest
+from unittest.mock import patch
 
 import pytest
 import random2 as random
@@ -19,8 +22,9 @@ from six import unichr
 from six.moves import range
 
 from openedx.core.djangolib.testing.utils import skip_unless_lms
-from xmodule.capa.safe_exec import safe_exec, update_hash
+from xmodule.capa.safe_exec import safe_exec, safe_exec_many, update_hash
 from xmodule.capa.safe_exec.remote_exec import is_codejail_rest_service_enabled
+from xmodule.capa.safe_exec.safe_exec import SafeExecCache
 
 
 class TestSafeExec(unittest.TestCase):  # lint-amnesty, pylint: disable=missing-class-docstring
@@ -217,6 +221,19 @@ class DictCache(object):
         self.cache[key] = value
 
 
+class LockingDictCache(DictCache):
+    """A DictCache which can also add and delete keys, like Django caches."""
+
+    def add(self, key, value, timeout):  # pylint: disable=unused-argument
+        if key in self.cache:
+            return False
+        self.cache[key] = value
+        return True
+
+    def delete(self, key):
+        self.cache.pop(key, None)
+
+
 class TestSafeExecCaching(unittest.TestCase):
     """Test that caching works on safe_exec."""
 
@@ -286,6 +303,105 @@ class TestSafeExecCaching(unittest.TestCase):
             except UnicodeEncodeError:
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
+    def test_single_flight(self):
+        # Executions of the same code at the same time only run it once.
+        def slow_exec(code, globals_dict, **kwargs):  # pylint: disable=unused-argument
+            time.sleep(0.2)
+            globals_dict['a'] = 17
+
+        cache = DictCache({})
+        results = []
+
+        def run():
+            g = {}
+            safe_exec("a = 17", g, cache=cache)
+            results.append(g['a'])
+
+        with patch('xmodule.capa.safe_exec.safe_exec.codejail_safe_exec', side_effect=slow_exec) as mock_exec:
+            threads = [threading.Thread(target=run) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert mock_exec.call_count == 1
+        assert results == [17] * 5
+
+    def test_single_flight_lock_released(self):
+        # The lock shared with other processes is deleted once the execution is done.
+        cache = LockingDictCache({})
+        safe_exec("a = 17", {}, cache=cache)
+        assert not [key for key in cache.cache if key.endswith('.lock')]
+
+    def test_single_flight_lock_released_without_result(self):
+        # Waiting for another process stops as soon as it releases its lock, even without a result.
+        cache = LockingDictCache({})
+        key = SafeExecCache.key("a = 17", {}, None)
+        cache.add(key + '.lock', True, 10)
+        threading.Timer(0.2, cache.delete, [key + '.lock']).start()
+
+        start = time.time()
+        g = {}
+        safe_exec("a = 17", g, cache=cache)
+        assert g['a'] == 17
+        assert time.time() - start < 5
+
+
+class TestSafeExecMany(unittest.TestCase):
+    """Test the execution of several jobs at once."""
+
+    def test_results_match_safe_exec(self):
+        code = "rnums = [random.randint(0, 999) for _ in xrange(100)]"
+        jobs = [(code, {}, seed) for seed in (1, 2, 2, 3)] + [("1/0", {}, 1)]
+        cache = {}
+        exceptions = safe_exec_many(jobs, cache=DictCache(cache))
+
+        assert exceptions[:4] == [None] * 4
+        assert isinstance(exceptions[4], SafeExecException)
+        assert 'ZeroDivisionError' in str(exceptions[4])
+        for code, globals_dict, seed in jobs[:4]:
+            g = {}
+            safe_exec(code, g, random_seed=seed)
+            assert globals_dict['rnums'] == g['rnums']
+        assert jobs[0][1]['rnums'] != jobs[1][1]['rnums']
+        # The duplicate job is only run and cached once.
+        assert len(cache) == 4
+
+    def test_cached_jobs_not_run(self):
+        cache = {}
+        safe_exec("a = 1", {}, random_seed=1, cache=DictCache(cache))
+        cache[list(cache.keys())[0]] = (None, {'a': 17})
+
+        jobs = [("a = 1", {}, 1)]
+        with patch('xmodule.capa.safe_exec.safe_exec.codejail_safe_exec') as mock_exec:
+            assert safe_exec_many(jobs, cache=DictCache(cache)) == [None]
+        mock_exec.assert_not_called()
+        assert jobs[0][1] == {'a': 17}
+
+    @patch('codejail.safe_exec.UNSAFE', False)
+    def test_jobs_are_isolated(self):
+        # Each job starts without the modules imported by the previous ones.
+        code = textwrap.dedent("""\
+            import sys
+            sys.modules.setdefault('shared', []).append(1)
+            n = len(sys.modules['shared'])
+            """)
+        jobs = [(code, {}, seed) for seed in (1, 2)] + [("1/0", {}, 1)]
+        exceptions = safe_exec_many(jobs)
+
+        assert [globals_dict['n'] for _, globals_dict, _ in jobs[:2]] == [1, 1]
+        assert exceptions[:2] == [None, None]
+        # The message of the exception is that of codejail.
+        assert str(exceptions[2]).startswith("Couldn't execute jailed code: stdout: b'', stderr: b'Traceback")
+        assert str(exceptions[2]).endswith("ZeroDivisionError: division by zero\\n' with status code: 1")
+
+    @patch('codejail.safe_exec.UNSAFE', False)
+    def test_failed_batch_runs_jobs_one_at_a_time(self):
+        jobs = [("a = 1", {}, 1), ("a = 2", {}, 1)]
+        with patch('xmodule.capa.safe_exec.safe_exec.BATCH_CODE', "raise Exception('The batch failed.')"):
+            assert safe_exec_many(jobs) == [None, None]
+        assert [globals_dict['a'] for _, globals_dict, _ in jobs] == [1, 2]
+
 
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
@@ -12,10 +12,13 @@ import ddt
 from lxml import etree
 from markupsafe import Markup
 
+from xmodule.capa.capa_problem import PARSED_PROBLEM_CACHE
 from xmodule.capa.correctmap import CorrectMap
 from xmodule.capa.responsetypes import LoncapaProblemError
+from xmodule.capa.safe_exec import safe_exec_many
 from xmodule.capa.tests.helpers import new_loncapa_problem
 from openedx.core.djangolib.markup import HTML
+from openedx.core.lib.safe_lxml.xmlparser import XML
 
 
 FEATURES_WITH_GRADING_METHOD_IN_PROBLEMS = settings.FEATURES.copy()
@@ -840,3 +843,80 @@ class CAPAProblemReportHelpersTest(unittest.TestCase):
             with self.assertRaises(Exception):
                 problem.get_grade_from_current_answers(None, correct_map)
             responder_mock.evaluate_answers.assert_not_called()
+
+
+class ParsedProblemCacheTest(unittest.TestCase):
+    """ Tests of the cache of the parsed problems """
+
+    xml = """
+    <problem>
+        <script type="loncapa/python">
+x = random.randint(1, 1000)
+        </script>
+        <stringresponse answer="$x">
+            <label>What is x?</label>
+            <textline/>
+        </stringresponse>
+    </problem>
+    """
+
+    def setUp(self):
+        super().setUp()
+        PARSED_PROBLEM_CACHE.clear()
+        self.addCleanup(PARSED_PROBLEM_CACHE.clear)
+
+    def test_problem_parsed_once(self):
+        with patch('xmodule.capa.capa_problem.XML', wraps=XML) as mock_xml:
+            problem = new_loncapa_problem(self.xml, seed=1)
+            other_problem = new_loncapa_problem(self.xml, seed=2)
+        assert mock_xml.call_count == 1
+
+        assert problem.tree is not other_problem.tree
+        assert problem.problem_data == other_problem.problem_data == {
+            '1_2_1': {'label': 'What is x?', 'descriptions': {}}
+        }
+        assert problem.problem_data is not other_problem.problem_data
+        responder, = problem.responders.values()
+        other_responder, = other_problem.responders.values()
+        assert responder.xml.getroottree() is problem.tree.getroottree()
+        assert other_responder.xml.getroottree() is other_problem.tree.getroottree()
+        assert responder.inputfields[0].get('id') == other_responder.inputfields[0].get('id') == '1_2_1'
+
+    def test_problem_id_in_key(self):
+        problem = new_loncapa_problem(self.xml, problem_id='1')
+        other_problem = new_loncapa_problem(self.xml, problem_id='2')
+        assert list(problem.problem_data) == ['1_2_1']
+        assert list(other_problem.problem_data) == ['2_2_1']
+
+
+class CAPAProblemContextTest(unittest.TestCase):
+    """ Tests of the context of the scripts of problems """
+
+    def test_context_jobs(self):
+        xml = """
+        <problem>
+            <script type="loncapa/python">
+x = random.randint(1, 1000)
+            </script>
+        </problem>
+        """
+        problem = new_loncapa_problem(xml, seed=3)
+        assert problem.context['anonymous_student_id'] == 'student'
+
+        jobs, options = problem.get_context_jobs([1, 3])
+        assert [(globals_dict, seed) for _, globals_dict, seed in jobs] == [({'seed': 1}, 1), ({'seed': 3}, 3)]
+        assert options['slug'] == '1'
+        assert safe_exec_many(jobs, **options) == [None, None]
+        assert jobs[1][1]['x'] == problem.context['x']
+
+    def test_context_depends_on_student(self):
+        xml = """
+        <problem>
+            <script type="loncapa/python">
+y = anonymous_student_id + '!'
+            </script>
+        </problem>
+        """
+        problem = new_loncapa_problem(xml)
+        assert problem.context['y'] == 'student!'
+        assert problem.get_context_jobs([1]) is None
@@ -6,6 +6,7 @@ import io
 import json
 import os
 import textwrap
+import timeit
 import unittest
 import zipfile
 from datetime import datetime
@@ -570,6 +571,50 @@ class FormulaResponseTest(ResponseTest):
         assert list(problem.responders.values())[0].validate_answer('14*x')
         assert not list(problem.responders.values())[0].validate_answer('3*y+2*x')
 
+    def test_grade_unvectorizable(self):
+        """
+        Test that the answers which cannot be evaluated for all the samples
+        at once are graded one sample at a time.
+        """
+        sample_dict = {'x': (1, 5)}
+        problem = self.build_problem(sample_dict=sample_dict,
+                                     num_samples=10,
+                                     tolerance="1%",
+                                     answer="x*fact(3)")
+        self.assert_grade(problem, '6*x', 'correct')
+        self.assert_grade(problem, 'arccot(1/x)', 'incorrect')
+        # Factorial is only defined for the integers.
+        self.assertRaises(StudentInputError, problem.grade_answers, {'1_2_1': 'fact(x)'})
+
+
+@unittest.skipUnless(os.environ.get('RUN_PERF_TESTS'), 'Performance test; set RUN_PERF_TESTS to run it.')
+class FormulaResponseBenchmark(ResponseTest):
+    """
+    Measures the time to grade formula responses with many samples, which are
+    evaluated all at once unless the answer uses a function which does
+    not take arrays.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    xml_factory_class = FormulaResponseXMLFactory
+
+    NUM_SAMPLES = 100
+    NUM_ITERATIONS = 5
+
+    def test_grade_time(self):
+        problem = self.build_problem(sample_dict={'x': (-10, 10), 'y': (1, 10)},
+                                     num_samples=self.NUM_SAMPLES,
+                                     tolerance=0.01,
+                                     answer="sin(x)^2 + x/y")
+        for submission in ('1 - cos(x)^2 + x/y', '1 - cos(x)^2 + x/y + arccot(x) - arccot(x)'):
+            grade_time = min(timeit.repeat(
+                lambda: problem.grade_answers({'1_2_1': submission}),  # pylint: disable=cell-var-from-loop
+                number=1,
+                repeat=self.NUM_ITERATIONS,
+            ))
+            print(f'{submission}: graded {self.NUM_SAMPLES} samples in {grade_time * 1000:.1f} ms')
+
 
 class StringResponseTest(ResponseTest):  # pylint: disable=missing-class-docstring
     xml_factory_class = StringResponseXMLFactory
@@ -7,12 +7,14 @@ Tests capa util
 import unittest
 
 import ddt
+from calc import evaluator
 from lxml import etree
 
 from xmodule.capa.tests.helpers import test_capa_system
 from xmodule.capa.util import (
     compare_with_tolerance,
     contextualize_text,
+    evaluate_samples,
     get_inner_html_from_xpath,
     remove_markup,
     sanitize_html
@@ -167,3 +169,19 @@ class UtilTest(unittest.TestCase):
         expected_text = '$あなたあなたあなたあなた あなたhi'
         contextual_text = contextualize_text(text, context)
         assert expected_text == contextual_text
+
+    @ddt.data('x+2*y', 'sin(x)^2 + cos(x)^2', 'sqrt(x)', 'e^(i*x)', 'x||y', 'X*Y/2', '2^3^2', '5%', 'fact(3)*x')
+    def test_evaluate_samples(self, math_expr):
+        """Verify that the samples evaluated at once have the results calc gives for each of them."""
+        samples = [{'x': x, 'y': 3.0} for x in (-2.5, 0.5, 1.0, 7.25)]
+        results = evaluate_samples(math_expr, samples)
+        expected = [evaluator(sample, {}, math_expr) for sample in samples]
+        assert len(results) == len(samples)
+        for result, expected_result in zip(results, expected):
+            assert compare_with_tolerance(result, expected_result)
+
+    @ddt.data('fact(x)', 'arccot(x)', '1/(x-x)', '1/(1/(x-x))', 'x||0', '10^400*x', 'z', '(x', '', 'x+')
+    def test_evaluate_samples_unsupported(self, math_expr):
+        """Verify that the formulas which cannot be evaluated at once are left to calc."""
+        samples = [{'x': x} for x in (-2.5, 0.5, 1.0, 7.25)]
+        assert evaluate_samples(math_expr, samples) is None
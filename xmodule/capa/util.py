@@ -4,12 +4,15 @@ Utility functions for capa.
 
 
 import logging
+import operator
 import re
 from cmath import isinf, isnan
 from decimal import Decimal
 
 import nh3
+import numpy
 from calc import evaluator
+from calc.calc import ParseAugmenter, add_defaults, check_parens, eval_number
 from lxml import etree
 
 from openedx.core.djangolib.markup import HTML
@@ -97,6 +100,92 @@ def compare_with_tolerance(student_complex, instructor_complex, tolerance=defaul
         return abs(student_complex - instructor_complex) <= tolerance
 
 
+def evaluate_samples(math_expr, samples, case_sensitive=False):
+    """
+    Evaluate math_expr for all the samples at once, using numpy arrays of their values.
+
+     - math_expr    :  the formula, as accepted by `calc.evaluator`
+     - samples    :  a list of dictionaries mapping the variables to their values
+     - case_sensitive    :  whether the variables and functions are case sensitive
+
+    The formula is parsed once rather than once per sample. Returns the list of the
+    results of the samples, or None when the formula cannot be evaluated this way:
+    when it uses a function which does not take arrays (e.g. factorial), when it
+    does not parse, or when any of its operations divides by zero, overflows or has
+    an invalid result. `calc.evaluator` must then be called for each sample, as it
+    gives the exact results and errors of those cases.
+    """
+    if not samples or not math_expr.strip():
+        return None
+    variable_names = set(samples[0])
+    if any(set(sample) != variable_names for sample in samples):
+        return None
+    variables = {name: numpy.array([sample[name] for sample in samples]) for name in variable_names}
+
+    def casify(name):
+        return name if case_sensitive else name.lower()
+
+    def eval_atom(parse_result):
+        return next(k for k in parse_result if not isinstance(k, str))
+
+    def eval_power(parse_result):
+        power = None
+        for value in reversed(parse_result):
+            if not isinstance(value, str):
+                power = value if power is None else value ** power
+        return power
+
+    def eval_parallel(parse_result):
+        values = [k for k in parse_result if not isinstance(k, str)]
+        if len(values) == 1:
+            return values[0]
+        if any(numpy.any(numpy.equal(value, 0)) for value in values):
+            # calc returns NaN for these samples.
+            return float('nan')
+        return 1. / sum(1. / value for value in values)
+
+    def eval_operations(parse_result, initial, operations):
+        result = initial
+        current_op = operations[None]
+        for token in parse_result:
+            if isinstance(token, str):
+                current_op = operations[token]
+            else:
+                result = current_op(result, token)
+        return result
+
+    try:
+        check_parens(math_expr)
+        math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+        math_interpreter.parse_algebra()
+        all_variables, all_functions = add_defaults(variables, {}, case_sensitive)
+        math_interpreter.check_variables(all_variables, all_functions)
+
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: all_variables[casify(x[0])],
+            'function': lambda x: all_functions[casify(x[0])](x[1]),
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': lambda x: eval_operations(
+                x, 1, {None: operator.mul, '*': operator.mul, '/': operator.truediv}
+            ),
+            'sum': lambda x: eval_operations(x, 0, {None: operator.add, '+': operator.add, '-': operator.sub}),
+        }
+        # Python raises an error where numpy would warn, e.g. on a division by zero.
+        with numpy.errstate(all='raise', under='ignore'):
+            results = numpy.asarray(math_interpreter.reduce_tree(evaluate_actions))
+            if results.dtype.kind not in 'iufc':
+                return None
+            results = numpy.broadcast_to(results, (len(samples),))
+            if not numpy.all(numpy.isfinite(results)):
+                return None
+    except Exception:  # pylint: disable=broad-except
+        return None
+    return results.tolist()
+
+
 def contextualize_text(text, context):  # private
     """
     Takes a string with variables. E.g. $a+$b.
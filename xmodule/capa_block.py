@@ -865,6 +865,51 @@ class _BuiltInProblemBlock(
             # number of possibilities, cap the number of different random seeds.
             self.seed %= MAX_RANDOMIZATION_BINS
 
+    def get_possible_seeds(self):
+        """
+        Returns the list of the seeds which choose_new_seed can choose for this problem.
+        """
+        if self.rerandomize == RANDOMIZATION.NEVER:
+            return [1]
+        elif self.rerandomize == RANDOMIZATION.PER_STUDENT:
+            return list(range(NUM_RANDOMIZATION_BINS))
+        return list(range(MAX_RANDOMIZATION_BINS))
+
+    def get_context_jobs(self, seeds, cache):
+        """
+        Returns the safe_exec jobs extracting the context of this problem for each of the given
+        seeds, and the keyword arguments of safe_exec_many to run them with, caching their results
+        in `cache`; or None if the context can't be computed ahead of time.
+
+        This is used to compute the contexts of the problem before students view it, so it
+        doesn't depend on a student.  See LoncapaProblem.get_context_jobs.
+        """
+        sandbox_service = SandboxService(contentstore, self.scope_ids.usage_id.context_key)
+        capa_system = LoncapaSystem(
+            ajax_url=None,
+            anonymous_student_id=None,
+            cache=cache,
+            can_execute_unsafe_code=sandbox_service.can_execute_unsafe_code,
+            get_python_lib_zip=sandbox_service.get_python_lib_zip,
+            DEBUG=None,
+            i18n=self.runtime.service(self, "i18n"),
+            render_template=None,
+            resources_fs=self.runtime.resources_fs,
+            seed=1,
+            xqueue=None,
+            matlab_api_key=None,
+        )
+        lcp = LoncapaProblem(
+            problem_text=self.data,
+            id=self.location.html_id(),
+            capa_system=capa_system,
+            capa_block=self,
+            state={},
+            seed=1,
+            minimal_init=True,
+        )
+        return lcp.get_context_jobs(seeds)
+
     def new_lcp(self, state, text=None):
         """
         Generate a new Loncapa Problem
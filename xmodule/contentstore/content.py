@@ -373,6 +373,15 @@ class ContentStore:
         '''
         raise NotImplementedError
 
+    def get_content_digests_for_course(self, course_key):
+        """
+        Returns the attributes of each static asset of a course, by the string of its asset key.
+
+        The attributes include the md5 hash of the content of the asset as `custom_md5`,
+        along with displayname, contentType, import_path and locked.
+        """
+        raise NotImplementedError
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
@@ -6,7 +6,10 @@ MongoDB/GridFS-level code for the contentstore.
 import hashlib
 import json
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
+import fs.path
 import gridfs
 import pymongo
 from bson.son import SON
@@ -233,6 +236,16 @@ class MongoContentStore(ContentStore):
         with disk_fs.open(export_name, 'wb') as asset_file:
             asset_file.write(content.data)
 
+    @staticmethod
+    def get_export_path(content):
+        """
+        Returns the path of the file to which `export` writes the given content, relative to its output_directory.
+        """
+        export_name = escape_invalid_characters(name=content.name, invalid_char_list=['/', '\\'])
+        if content.import_path is not None:
+            return fs.path.relpath(fs.path.join(os.path.dirname(content.import_path), export_name))
+        return export_name
+
     def export_all_for_course(self, course_key, output_directory, assets_policy_file):
         """
         Export all of this course's assets to the output_directory. Export all of the assets'
@@ -244,7 +257,6 @@ class MongoContentStore(ContentStore):
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
         """
-        policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
         for asset in assets:
@@ -257,12 +269,51 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
+
+        with open(assets_policy_file, 'w') as f:
+            json.dump(self.get_assets_policy(assets), f, sort_keys=True, indent=4)
+
+    @staticmethod
+    def get_assets_policy(assets):
+        """
+        Returns the policy of the given assets of a course, which `export_all_for_course` writes
+        to the policy file, with the attributes of each asset.
+        """
+        policy = {}
+        for asset in assets:
             for attr, value in asset.items():
                 if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
                     policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+        return policy
 
-        with open(assets_policy_file, 'w') as f:
-            json.dump(policy, f, sort_keys=True, indent=4)
+    def iter_export_files(self, assets, max_workers=1):
+        """
+        Yields the path relative to the output_directory of `export_all_for_course`, and the data,
+        of the file of each of the given assets of a course, in order.
+
+        The assets are read by max_workers threads, so that up to max_workers assets are read
+        while the caller processes the files of the previous ones.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending_contents = deque()
+            for asset in assets:
+                pending_contents.append(executor.submit(self.find, asset['asset_key']))
+                if len(pending_contents) > max_workers:
+                    content = pending_contents.popleft().result()
+                    yield self.get_export_path(content), content.data
+            while pending_contents:
+                content = pending_contents.popleft().result()
+                yield self.get_export_path(content), content.data
+
+    def get_content_digests_for_course(self, course_key):
+        """
+        See :meth:`.ContentStore.get_content_digests_for_course`.
+        """
+        items = self.fs_files.find(
+            query_for_course(course_key, 'asset'),
+            {'filename': 1, 'custom_md5': 1, 'displayname': 1, 'contentType': 1, 'import_path': 1, 'locked': 1},
+        )
+        return {item.pop('filename'): item for item in items}
 
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
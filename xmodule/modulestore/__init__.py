@@ -28,7 +28,7 @@ from xmodule.assetstore import AssetMetadata
 from xmodule.errortracker import make_error_tracker
 from xmodule.util.misc import get_library_or_course_attribute
 
-from .exceptions import InsufficientSpecificationError, InvalidLocationError
+from .exceptions import InsufficientSpecificationError, InvalidLocationError, ItemNotFoundError
 
 log = logging.getLogger('edx.modulestore')
 
@@ -1229,6 +1229,23 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
                 return course
         return None
 
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        Returns a dict mapping each of the given course keys to its course block, omitting
+        the courses which aren't found.
+
+        Default impl--get each course on its own
+        """
+        courses = {}
+        for course_key in course_keys:
+            try:
+                course = self.get_course(course_key, depth=depth, **kwargs)
+            except ItemNotFoundError:
+                course = None
+            if course is not None:
+                courses[course_key] = course
+        return courses
+
     def has_course(self, course_id, ignore_case=False, **kwargs):
         """
         Returns the course_id of the course if it was found, else None
@@ -414,6 +414,25 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except ItemNotFoundError:
             return None
 
+    @strip_key
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        Returns a dict mapping each of the given course keys to its course block, omitting the
+        courses which don't exist. The courses of each modulestore are fetched together.
+
+        :param course_keys: an iterable of CourseKeys
+        """
+        course_keys_by_store = {}
+        for course_key in course_keys:
+            assert isinstance(course_key, CourseKey)
+            store = self._get_modulestore_for_courselike(course_key)
+            course_keys_by_store.setdefault(store, []).append(course_key)
+
+        courses = {}
+        for store, store_course_keys in course_keys_by_store.items():
+            courses.update(store.get_courses_by_keys(store_course_keys, depth=depth, **kwargs))
+        return courses
+
     @strip_key
     def get_library(self, library_key, depth=0, **kwargs):
         """
@@ -636,6 +655,16 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         store = self._get_modulestore_for_courselike(course_key)
         return store.get_orphans(course_key, **kwargs)
 
+    def get_block_versions(self, course_key, **kwargs):
+        """
+        Returns a dict mapping the usage key of each block in the given course to a tuple of the version in
+        which the block was last updated and the usage keys of its children.
+
+        Raises NotImplementedError if the modulestore of the course does not track block versions.
+        """
+        store = self._verify_modulestore_support(course_key, 'get_block_versions')
+        return store.get_block_versions(course_key, **kwargs)
+
     def get_errored_courses(self):
         """
         Return a dictionary of course_dir -> [(msg, exception_str)], for each
@@ -0,0 +1,132 @@
+"""
+Performance tests of the split modulestore, run against the persistence backends of
+split_mongo/memory_connection, which need neither MongoDB nor MySQL.
+
+The tests generate synthetic courses of the sizes in COURSE_SHAPES, or in the
+SPLIT_PERF_COURSE_SHAPES environment variable, such as "10x5x4x3,40x5x5x4" for courses
+with 10 and 40 chapters, of 5 sequentials, each with 4 and 5 verticals of 3 and 4 html
+blocks, and print the time taken by the main read and write operations of the modulestore.
+
+    RUN_PERF_TESTS=1 pytest -s xmodule/modulestore/perf_tests/test_split_modulestore_performance.py
+"""
+
+
+import itertools
+import os
+import time
+import unittest
+
+import ddt
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.utils import VersioningModulestoreBuilder
+
+# The number of chapters, of sequentials per chapter, of verticals per sequential
+# and of html blocks per vertical of the generated courses.
+COURSE_SHAPES = tuple(
+    tuple(int(size) for size in shape.split('x'))
+    for shape in os.environ.get('SPLIT_PERF_COURSE_SHAPES', '4x4x3x3,20x5x4x4').split(',')
+)
+
+PERSISTENCE_BACKENDS = (
+    'xmodule.modulestore.split_mongo.memory_connection.InMemoryPersistenceBackend',
+    'xmodule.modulestore.split_mongo.memory_connection.SQLitePersistenceBackend',
+)
+
+# The number of html blocks of the library copied into the course by copy_from_template.
+NUM_LIBRARY_BLOCKS = 50
+
+USER_ID = ModuleStoreEnum.UserID.test
+
+
+@ddt.ddt
+@unittest.skipUnless(os.environ.get('RUN_PERF_TESTS'), 'Performance test; set RUN_PERF_TESTS to run it.')
+class SplitModulestorePerformance(unittest.TestCase):
+    """
+    Times get_course, get_items, get_parent_location, publish and copy_from_template
+    on generated courses.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def _timed(self, description, func, *args, **kwargs):
+        """
+        Calls func, prints the time it took, and returns its result.
+        """
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        print(f'  {description}: {(time.perf_counter() - start) * 1000:.1f}ms')
+        return result
+
+    def _create_course(self, store, shape):
+        """
+        Creates a course of the given shape, and returns it along with the locations of its
+        leaf blocks.
+        """
+        num_chapters, num_sequentials, num_verticals, num_htmls = shape
+        course = store.create_course('perf', f'course{"x".join(map(str, shape))}', 'run', USER_ID)
+        leaf_locations = []
+        with store.bulk_operations(course.id):
+            for chapter_index in range(num_chapters):
+                chapter = store.create_child(USER_ID, course.location, 'chapter', block_id=f'chapter{chapter_index}')
+                for sequential_index in range(num_sequentials):
+                    sequential = store.create_child(
+                        USER_ID, chapter.location, 'sequential',
+                        block_id=f'sequential{chapter_index}_{sequential_index}',
+                    )
+                    for vertical_index in range(num_verticals):
+                        vertical = store.create_child(
+                            USER_ID, sequential.location, 'vertical',
+                            block_id=f'vertical{chapter_index}_{sequential_index}_{vertical_index}',
+                        )
+                        for html_index in range(num_htmls):
+                            html = store.create_child(
+                                USER_ID, vertical.location, 'html',
+                                block_id=f'html{chapter_index}_{sequential_index}_{vertical_index}_{html_index}',
+                                fields={'display_name': f'Html {html_index}', 'data': '<p>Some text.</p>' * 20},
+                            )
+                            leaf_locations.append(html.location)
+        return course, leaf_locations
+
+    def _create_library(self, store):
+        """
+        Creates a library of NUM_LIBRARY_BLOCKS html blocks, and returns the keys of its blocks.
+        """
+        library = store.create_library('perf', 'library', USER_ID, fields={'display_name': 'Library'})
+        with store.bulk_operations(library.location.library_key):
+            for index in range(NUM_LIBRARY_BLOCKS):
+                store.create_child(
+                    USER_ID, library.location, 'html', block_id=f'html{index}',
+                    fields={'data': f'<p>Library block {index}.</p>'},
+                )
+        return store.get_library(library.location.library_key, remove_version=False, remove_branch=False).children
+
+    @ddt.data(*itertools.product(PERSISTENCE_BACKENDS, COURSE_SHAPES))
+    @ddt.unpack
+    def test_operations(self, persistence_backend, shape):
+        builder = VersioningModulestoreBuilder()
+        with builder.build_with_contentstore(None, persistence_backend=persistence_backend) as store:
+            print(f'\n{persistence_backend.rpartition(".")[2]}, course of shape {"x".join(map(str, shape))}:')
+            with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+                course, leaf_locations = self._timed('create course', self._create_course, store, shape)
+                course_key = course.id
+                self._timed('publish course', store.publish, course.location, USER_ID)
+
+                store._clear_cache()  # pylint: disable=protected-access
+                self._timed('get_course(depth=None), cold', store.get_course, course_key, depth=None)
+                self._timed('get_course(depth=None), warm', store.get_course, course_key, depth=None)
+                items = self._timed('get_items', store.get_items, course_key)
+                self._timed('get_items(html)', store.get_items, course_key, qualifiers={'category': 'html'})
+                self._timed(
+                    f'get_parent_location x{len(leaf_locations)}',
+                    lambda: [store.get_parent_location(location) for location in leaf_locations],
+                )
+
+                source_keys = self._create_library(store)
+                dest_location = store.get_parent_location(leaf_locations[0])
+                self._timed(
+                    f'copy_from_template of {len(source_keys)} blocks',
+                    store.copy_from_template, source_keys, dest_location, USER_ID,
+                )
+                self._timed('publish unit', store.publish, dest_location, USER_ID)
+            print(f'  ({len(items)} blocks)')
@@ -36,6 +36,9 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
 
     Computes the settings (nee 'metadata') inheritance upon creation.
     """
+    # The largest number of pending definitions fetched together when one of them is needed.
+    DEFINITION_BATCH_SIZE = 100
+
     def __init__(self, modulestore, course_entry, default_class, module_data, lazy, **kwargs):  # lint-amnesty, pylint: disable=redefined-outer-name
         """
         Computes the settings inheritance and sets up the cache.
@@ -83,6 +86,12 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
         # Cache of block field datas, keyed by the XBlock instance (since the ScopeId changes!)
         self.block_field_datas = weakref.WeakKeyDictionary()
 
+        # The ids of the definitions of the cached blocks which haven't been fetched yet, in the order
+        # the blocks were cached (the dict is used as an ordered set).
+        self._pending_definition_ids = {}
+        # The definitions fetched by this runtime, by id, when the modulestore has no request cache.
+        self._definitions = {}
+
     @lazy
     def _parent_map(self):  # lint-amnesty, pylint: disable=missing-function-docstring
         parent_map = {}
@@ -138,6 +147,51 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
         self.modulestore.cache_block(course_key, version_guid, block_key, block)
         return block
 
+    def add_pending_definitions(self, block_datas):
+        """
+        Adds the definitions of the given blocks, if they aren't loaded, to those to fetch
+        together when the definition of any of them is needed.
+        """
+        for block_data in block_datas:
+            definition_id = block_data.definition
+            if definition_id is not None and not isinstance(definition_id, LocalId) \
+                    and not block_data.definition_loaded:
+                self._pending_definition_ids[definition_id] = None
+
+    def get_definition(self, course_key, definition_id):
+        """
+        Returns the definition with the given id, respecting the active bulk operation on course_key.
+
+        If the definition is pending, it is fetched along with the pending definitions which follow it,
+        that is, those of the blocks cached after it, which are mostly its descendants and siblings.
+        The fetched definitions are cached for the request.
+        """
+        definitions = self.modulestore.get_definition_cache()
+        if definitions is None:
+            definitions = self._definitions
+
+        definition = definitions.get(definition_id)
+        if definition is not None:
+            return definition
+
+        if definition_id in self._pending_definition_ids:
+            pending_definition_ids = list(self._pending_definition_ids)
+            start = pending_definition_ids.index(definition_id)
+            batch = pending_definition_ids[start:start + self.DEFINITION_BATCH_SIZE]
+            for pending_definition_id in batch:
+                del self._pending_definition_ids[pending_definition_id]
+            for fetched_definition in self.modulestore.get_definitions(
+                course_key, [pending_definition_id for pending_definition_id in batch
+                             if pending_definition_id not in definitions],
+            ):
+                definitions[fetched_definition['_id']] = fetched_definition
+            return definitions.get(definition_id)
+
+        definition = self.modulestore.get_definition(course_key, definition_id)
+        if definition is not None:
+            definitions[definition_id] = definition
+        return definition
+
     def get_module_data(self, block_key, course_key):
         """
         Get block from module_data adding it to module_data if it's not already there but is in the structure
@@ -285,7 +339,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
 
         if not isinstance(definition_id, LocalId) and not block_data.definition_loaded:
             definition_loader = DefinitionLazyLoader(
-                self.modulestore,
+                self,
                 course_key,
                 block_key.type,
                 definition_id,
@@ -0,0 +1,481 @@
+"""
+Persistence backends for split modulestore which don't need MongoDB or MySQL, keeping
+the course indexes, structures and definitions in memory or in a SQLite database.
+
+They implement the interface of MongoPersistenceBackend used by SplitMongoModuleStore,
+and store each document encoded as BSON, as MongoDB does, so that the documents read
+back are new objects with the same types and precision as those read from MongoDB.
+They are meant for tests and benchmarks of the modulestore; see
+xmodule/modulestore/perf_tests/test_split_modulestore_performance.py.
+
+To use one, pass its dotted path as the persistence_backend option of the split modulestore:
+
+    'OPTIONS': {
+        'persistence_backend': 'xmodule.modulestore.split_mongo.memory_connection.SQLitePersistenceBackend',
+        ...
+    },
+    'DOC_STORE_CONFIG': {'database_path': '/tmp/split_modulestore.sqlite3'},
+"""
+
+
+import datetime
+import logging
+import re
+import sqlite3
+from threading import Lock
+
+import bson
+import pytz
+from bson.codec_options import CodecOptions
+from bson.objectid import ObjectId
+
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    DuplicateKeyError,
+    MongoPersistenceBackend,
+    structure_from_mongo,
+    structure_to_mongo
+)
+
+log = logging.getLogger(__name__)
+
+
+class MemoryTable:
+    """
+    Map of the keys of the documents of a collection to the documents, encoded as BSON.
+    """
+    def __init__(self, name):
+        self.name = name
+        self._docs = {}
+
+    def get(self, key):
+        """
+        Returns the document with the given key, or None.
+        """
+        return self._docs.get(key)
+
+    def get_many(self, keys):
+        """
+        Returns the documents with the given keys which exist, in the order of the keys.
+        """
+        return [self._docs[key] for key in keys if key in self._docs]
+
+    def values(self):
+        """
+        Returns all of the documents.
+        """
+        return list(self._docs.values())
+
+    def insert(self, key, data):
+        """
+        Adds a document, raising DuplicateKeyError if one with the same key already exists.
+        """
+        if key in self._docs:
+            raise DuplicateKeyError(f'Duplicate key {key} in {self.name}')
+        self._docs[key] = data
+
+    def replace(self, key, data):
+        """
+        Replaces an existing document.
+        """
+        self._docs[key] = data
+
+    def delete(self, key):
+        """
+        Deletes the document with the given key, and returns whether it existed.
+        """
+        return self._docs.pop(key, None) is not None
+
+    def clear(self):
+        """
+        Deletes all of the documents.
+        """
+        self._docs.clear()
+
+
+class SQLiteTable(MemoryTable):
+    """
+    Table of a SQLite database holding the documents of a collection, encoded as BSON.
+    """
+    def __init__(self, name, connection, lock):
+        super().__init__(name)
+        self._connection = connection
+        self._lock = lock
+        with self._lock, self._connection:
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS {name} (id TEXT PRIMARY KEY, doc BLOB NOT NULL)')
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute(f'SELECT doc FROM {self.name} WHERE id = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, keys):
+        docs = {}
+        with self._lock:
+            # Stay below the default limit of 999 parameters of a query.
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                docs.update(self._connection.execute(
+                    f'SELECT id, doc FROM {self.name} WHERE id IN ({", ".join("?" * len(batch))})', batch
+                ))
+        return [docs[key] for key in keys if key in docs]
+
+    def values(self):
+        with self._lock:
+            return [row[0] for row in self._connection.execute(f'SELECT doc FROM {self.name}')]
+
+    def insert(self, key, data):
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(f'INSERT INTO {self.name} (id, doc) VALUES (?, ?)', (key, data))
+        except sqlite3.IntegrityError:
+            raise DuplicateKeyError(f'Duplicate key {key} in {self.name}')  # pylint: disable=raise-missing-from
+
+    def replace(self, key, data):
+        with self._lock, self._connection:
+            self._connection.execute(f'REPLACE INTO {self.name} (id, doc) VALUES (?, ?)', (key, data))
+
+    def delete(self, key):
+        with self._lock, self._connection:
+            return self._connection.execute(f'DELETE FROM {self.name} WHERE id = ?', (key,)).rowcount > 0
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute(f'DELETE FROM {self.name}')
+
+
+class InMemoryPersistenceBackend:
+    """
+    Persistence backend for split modulestore keeping its documents in memory, for the
+    lifetime of the backend.
+    """
+    def __init__(self, tz_aware=True, **kwargs):  # pylint: disable=unused-argument
+        """
+        The connection parameters of MongoPersistenceBackend, such as host and db, are accepted
+        and ignored, so that the backend can be used with the doc_store_config of a modulestore.
+        """
+        self.codec_options = CodecOptions(tz_aware=tz_aware)
+        self.course_index = self._make_table('active_versions')
+        self.structures = self._make_table('structures')
+        self.definitions = self._make_table('definitions')
+        self.asset_metadata = self._make_table('asset_metadata')
+
+    def _make_table(self, name):
+        """
+        Returns the table holding the documents of the collection with the given name.
+        """
+        return MemoryTable(name)
+
+    def _encode(self, doc):
+        """
+        Returns the given document encoded as BSON.
+        """
+        return bson.encode(doc)
+
+    def _decode(self, data):
+        """
+        Returns the document encoded as BSON in data.
+        """
+        return bson.decode(data, codec_options=self.codec_options)
+
+    @staticmethod
+    def _course_index_key(org, course, run):
+        """
+        Returns the key of the course index of the given course.
+        """
+        return f'{org}\n{course}\n{run}'
+
+    def heartbeat(self):
+        """
+        The documents are always reachable.
+        """
+        return True
+
+    def check_connection(self):
+        """
+        There is no connection which could be closed.
+        """
+        return True
+
+    def ensure_connection(self):
+        """
+        There is no connection which could be closed.
+        """
+
+    def get_structure(self, key, course_context=None):
+        """
+        Get the structure whose id is the given key.
+        """
+        data = self.structures.get(str(key))
+        if data is None:
+            log.warning("doc was None when attempting to retrieve structure for item with key %s", str(key))
+            return None
+        return structure_from_mongo(self._decode(data), course_context)
+
+    def find_structures_by_id(self, ids, course_context=None):
+        """
+        Return all structures that specified in ``ids``.
+        """
+        return [
+            structure_from_mongo(self._decode(data), course_context)
+            for data in self.structures.get_many([str(structure_id) for structure_id in ids])
+        ]
+
+    def get_structures(self, keys, course_context=None):
+        """
+        Get the structures whose ids are the given keys, as a dict mapping each key to its structure.
+        """
+        return {structure['_id']: structure for structure in self.find_structures_by_id(keys, course_context)}
+
+    def find_courselike_blocks_by_id(self, ids, block_type, course_context=None):
+        """
+        Find all structures that specified in `ids`. Among the blocks only return the first
+        block whose type is `block_type`, as MongoPersistenceBackend does.
+        """
+        structures = []
+        for data in self.structures.get_many([str(structure_id) for structure_id in ids]):
+            doc = self._decode(data)
+            structures.append(structure_from_mongo({
+                '_id': doc['_id'],
+                'root': doc['root'],
+                'blocks': [block for block in doc['blocks'] if block['block_type'] == block_type][:1],
+            }, course_context))
+        return structures
+
+    def insert_structure(self, structure, course_context=None):
+        """
+        Insert a new structure.
+        """
+        doc = structure_to_mongo(structure, course_context)
+        self.structures.insert(str(doc['_id']), self._encode(doc))
+
+    def get_course_index(self, key, ignore_case=False):
+        """
+        Get the course_index whose id is the given key.
+        """
+        if not ignore_case:
+            data = self.course_index.get(self._course_index_key(key.org, key.course, key.run))
+            return self._decode(data) if data is not None else None
+        for course_index in self._all_course_indexes():
+            if all(
+                re.match('^{}$'.format(re.escape(getattr(key, key_attr))), course_index[key_attr], re.IGNORECASE)
+                for key_attr in ('org', 'course', 'run')
+            ):
+                return course_index
+        return None
+
+    def _all_course_indexes(self):
+        """
+        Returns all of the course indexes.
+        """
+        return [self._decode(data) for data in self.course_index.values()]
+
+    def find_matching_course_indexes(
+            self,
+            branch=None,
+            search_targets=None,
+            org_target=None,
+            course_context=None,  # pylint: disable=unused-argument
+            course_keys=None
+    ):
+        """
+        Find the course_index matching particular conditions; see MongoPersistenceBackend.
+        """
+        if course_keys:
+            course_indexes = [
+                self._decode(data) for data in self.course_index.get_many([
+                    self._course_index_key(course_key.org, course_key.course, course_key.run)
+                    for course_key in course_keys
+                ])
+            ]
+            return [
+                course_index for course_index in course_indexes
+                if not branch or branch in course_index.get('versions', {})
+            ]
+
+        return [
+            course_index for course_index in self._all_course_indexes()
+            if (branch is None or branch in course_index.get('versions', {})) and all(
+                course_index.get('search_targets', {}).get(key) == value
+                for key, value in (search_targets or {}).items()
+            ) and (not org_target or course_index['org'] == org_target)
+        ]
+
+    def insert_course_index(self, course_index, course_context=None):  # pylint: disable=unused-argument
+        """
+        Create the course_index.
+        """
+        course_index['last_update'] = datetime.datetime.now(pytz.utc)
+        course_index.setdefault('_id', ObjectId())
+        self.course_index.insert(
+            self._course_index_key(course_index['org'], course_index['course'], course_index['run']),
+            self._encode(course_index),
+        )
+
+    def update_course_index(
+        self, course_index, from_index=None, course_context=None  # pylint: disable=unused-argument
+    ):
+        """
+        Update the course_index.
+
+        Arguments:
+            from_index: If set, only update an index if it matches the one specified in `from_index`.
+        """
+        key = self._course_index_key(course_index['org'], course_index['course'], course_index['run'])
+        data = self.course_index.get(key)
+        current_index = self._decode(data) if data is not None else None
+        if current_index is not None and from_index and (
+            current_index['_id'] != from_index['_id'] or
+            ('last_update' in from_index and current_index.get('last_update') != from_index['last_update'])
+        ):
+            current_index = None
+        course_index['last_update'] = datetime.datetime.now(pytz.utc)
+        if current_index is None:
+            log.warning(
+                "Collision in Split Mongo when applying course index. Change was discarded. New index was: %s",
+                course_index,
+            )
+            return
+        course_index.setdefault('_id', current_index['_id'])
+        self.course_index.replace(key, self._encode(course_index))
+
+    def delete_course_index(self, course_key):
+        """
+        Delete the course_index of the given course.
+        """
+        return self.course_index.delete(self._course_index_key(course_key.org, course_key.course, course_key.run))
+
+    def get_definition(self, key, course_context=None):  # pylint: disable=unused-argument
+        """
+        Get the definition whose id is the given key.
+        """
+        data = self.definitions.get(str(key))
+        return self._decode(data) if data is not None else None
+
+    def get_definitions(self, definitions, course_context=None):  # pylint: disable=unused-argument
+        """
+        Retrieve all definitions listed in `definitions`.
+        """
+        return [
+            self._decode(data)
+            for data in self.definitions.get_many([str(definition_id) for definition_id in definitions])
+        ]
+
+    def insert_definition(self, definition, course_context=None):  # pylint: disable=unused-argument
+        """
+        Create the definition.
+        """
+        self.definitions.insert(str(definition['_id']), self._encode(definition))
+
+    def _asset_metadata_key(self, course_key, asset_type, filename):
+        """
+        Returns the key of the metadata of the given asset of the given branch of the given course.
+        """
+        query = MongoPersistenceBackend._asset_metadata_query(  # pylint: disable=protected-access
+            course_key, asset_type, filename
+        )
+        return '\n'.join(str(query[key]) for key in ('org', 'course', 'run', 'branch', 'asset_type', 'filename'))
+
+    def _find_asset_metadata_docs(self, course_key, asset_type=None, filename=None):
+        """
+        Returns the metadata of the assets of the given branch of the given course matching the
+        given type and filename, if given.  The assets aren't indexed, so all of them are read.
+        """
+        query = MongoPersistenceBackend._asset_metadata_query(  # pylint: disable=protected-access
+            course_key, asset_type, filename
+        )
+        return [
+            doc for doc in (self._decode(data) for data in self.asset_metadata.values())
+            if all(doc.get(key) == value for key, value in query.items())
+        ]
+
+    def find_asset_metadata(self, course_key, asset_type, filename):
+        """
+        Get the stored metadata of the asset of the given type and filename in the given branch
+        of the given course, or None.
+        """
+        data = self.asset_metadata.get(self._asset_metadata_key(course_key, asset_type, filename))
+        return self._decode(data) if data is not None else None
+
+    def find_asset_metadata_list(
+        self, course_key, asset_type=None, start=0, maxresults=-1, sort_field='filename', ascending=True
+    ):
+        """
+        Get a page of the stored metadata of the assets of the given type, or of all types if
+        asset_type is None, in the given branch of the given course, sorted by sort_field.
+        """
+        docs = MongoPersistenceBackend._sort_asset_metadata(  # pylint: disable=protected-access
+            self._find_asset_metadata_docs(course_key, asset_type), sort_field, ascending
+        )
+        return docs[start:] if maxresults < 0 else docs[start:start + maxresults]
+
+    def save_asset_metadata_list(self, course_key, asset_docs):
+        """
+        Insert or replace the stored metadata of the given assets, as returned by
+        AssetMetadata.to_storable, in the given branch of the given course.
+        """
+        branch_query = MongoPersistenceBackend._asset_metadata_query(course_key)  # pylint: disable=protected-access
+        for asset_doc in asset_docs:
+            self.asset_metadata.replace(
+                self._asset_metadata_key(course_key, asset_doc['asset_type'], asset_doc['filename']),
+                self._encode(dict(asset_doc, **branch_query)),
+            )
+
+    def delete_asset_metadata(self, course_key, asset_type=None, filename=None):
+        """
+        Delete the stored metadata of the asset of the given type and filename, or of all of the
+        assets if they aren't given, in the given branch of the given course.  Returns the number
+        of assets deleted.
+        """
+        return sum(
+            self.asset_metadata.delete(self._asset_metadata_key(course_key, doc['asset_type'], doc['filename']))
+            for doc in self._find_asset_metadata_docs(course_key, asset_type, filename)
+        )
+
+    def ensure_indexes(self):
+        """
+        The documents are only looked up by their keys, so there are no indexes to create.
+        """
+
+    def close_connections(self):
+        """
+        There is no connection to close.
+        """
+
+    def _drop_database(self, database=True, collections=True, connections=True):  # pylint: disable=unused-argument
+        """
+        A destructive operation to delete all of the documents.
+        Intended to be used by test code for cleanup.
+        """
+        self.course_index.clear()
+        self.structures.clear()
+        self.definitions.clear()
+        self.asset_metadata.clear()
+
+
+class SQLitePersistenceBackend(InMemoryPersistenceBackend):
+    """
+    Persistence backend for split modulestore keeping its documents in a SQLite database,
+    which is kept in memory by default, or in the file at database_path.
+    """
+    def __init__(self, database_path=':memory:', **kwargs):
+        self.connection = sqlite3.connect(database_path, check_same_thread=False)
+        self.lock = Lock()
+        super().__init__(**kwargs)
+
+    def _make_table(self, name):
+        return SQLiteTable(name, self.connection, self.lock)
+
+    def close_connections(self):
+        """
+        Closes the connection to the database.
+        """
+        self.connection.close()
+
+    def _drop_database(self, database=True, collections=True, connections=True):
+        """
+        A destructive operation to delete all of the documents, and optionally close the
+        connection to the database.  Intended to be used by test code for cleanup.
+        """
+        super()._drop_database(database, collections, connections)
+        if connections:
+            self.close_connections()
@@ -4,30 +4,40 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 
 
 import datetime
+import hashlib
 import logging
 import math
 import pickle
 import re
+import struct
 import zlib
+from collections import OrderedDict
 from contextlib import contextmanager
+from threading import Lock
 from time import time
 
+import bson
+from bson.objectid import ObjectId
 from ccx_keys.locator import CCXLocator
+from django.conf import settings
 from django.core.cache import caches, InvalidCacheBackendError
 from django.db.transaction import TransactionManagementError
+import msgpack
 import pymongo
 import pytz
 from mongodb_proxy import autoretry_read
 # Import this just to export it
-from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
+from pymongo.errors import BulkWriteError, DuplicateKeyError  # pylint: disable=unused-import
 from edx_django_utils import monitoring
 from edx_django_utils.cache import RequestCache
 
 from common.djangoapps.split_modulestore_django.models import SplitModulestoreCourseIndex
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
+from xmodule.modulestore.exceptions import ReferentialIntegrityError
 from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
+from xmodule.util.misc import get_library_or_course_attribute
 from openedx.core.lib.cache_utils import request_cached
 
 log = logging.getLogger(__name__)
@@ -190,14 +200,184 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+def block_entry_hash(encoded_block):
+    """
+    Returns the content address of a block of a deduplicated structure, given the block
+    as stored in mongo (see structure_to_mongo), BSON-encoded.
+    """
+    return hashlib.sha1(encoded_block).hexdigest()
+
+
+class BlockEntryCache:
+    """
+    An in-memory, least recently used cache of the BSON-encoded block entries of
+    deduplicated structures, by hash.
+
+    Since the blocks of a course rarely change between versions of its structure,
+    the blocks of the structures read from the db are mostly found in the cache.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get_many(self, block_hashes):
+        """
+        Returns a dict of the cached entries of the given hashes.
+        """
+        found = {}
+        with self._lock:
+            for block_hash in block_hashes:
+                encoded_block = self._entries.get(block_hash)
+                if encoded_block is not None:
+                    self._entries.move_to_end(block_hash)
+                    found[block_hash] = encoded_block
+        return found
+
+    def set_many(self, encoded_blocks):
+        """
+        Caches the given dict of entries by hash, evicting the least recently used ones.
+        """
+        with self._lock:
+            self._entries.update(encoded_blocks)
+            for block_hash in encoded_blocks:
+                self._entries.move_to_end(block_hash)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class PickleStructureCodec:
+    """
+    Encodes course structures with pickle, compressed with zlib.
+
+    This is the original format of the course structure cache, so values written
+    with it which fit in a single cache entry are stored without a header.
+    """
+    codec_id = 0
+    name = 'pickle'
+
+    def encode(self, structure):
+        """
+        Returns the structure pickled, and the compressed pickled data.
+        """
+        pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
+        # 1 = Fastest (slightly larger results)
+        return pickled_data, zlib.compress(pickled_data, 1)
+
+    def decode(self, compressed_data):
+        """
+        Returns the uncompressed data and the structure it encodes.
+        """
+        pickled_data = zlib.decompress(compressed_data)
+        return pickled_data, pickle.loads(pickled_data, encoding='latin-1')
+
+
+class MsgpackStructureCodec:
+    """
+    Encodes course structures with msgpack, compressed with zlib using a preset
+    dictionary of the strings which occur in the blocks of every structure.
+
+    Structures are packed in the format they are stored in mongo (see structure_to_mongo),
+    with ids packed as an extension type and dates as msgpack timestamps, so that
+    decoding the blocks doesn't go through the generic object reconstruction of pickle.
+    Like reading a structure from mongo, this doesn't preserve tuples in the fields of
+    blocks, nor BlockKeys other than the root and the children of blocks.
+    """
+    codec_id = 1
+    name = 'msgpack'
+
+    # The msgpack extension types of the values of structures.
+    EXT_OBJECT_ID = 1
+    EXT_NAIVE_DATETIME = 2
+
+    # The preset dictionary of the compressor, with the most common strings last.
+    # It must never change, because values cached with it can only be decompressed
+    # with the same dictionary; add a new codec instead.
+    ZDICT = b''.join([
+        b'original_usage_versionoriginal_usagesource_version',
+        b'librarylibrary_contentsplit_testconditionallti_consumerdiscussionopenassessment',
+        b'hide_after_duerelease_datevisible_to_staff_onlygroup_accessxml_attributes',
+        b'startdueformatgradedweightmax_attemptsshowanswerrerandomizedata',
+        b'coursechaptersequentialverticalhtmlvideoproblem',
+        b'edited_byedited_onupdate_versionprevious_versiondisplay_namechildren',
+        b'block_iddefinitiondefaultsasidesedit_infoblock_typefields',
+    ])
+
+    def encode(self, structure):
+        """
+        Returns the structure packed, and the compressed packed data.
+        """
+        packed_data = msgpack.packb(structure_to_mongo(structure), default=self._pack_ext, datetime=True)
+        compressor = zlib.compressobj(1, zdict=self.ZDICT)
+        return packed_data, compressor.compress(packed_data) + compressor.flush()
+
+    def decode(self, compressed_data):
+        """
+        Returns the uncompressed data and the structure it encodes.
+        """
+        decompressor = zlib.decompressobj(zdict=self.ZDICT)
+        packed_data = decompressor.decompress(compressed_data) + decompressor.flush()
+        structure = msgpack.unpackb(
+            packed_data, ext_hook=self._unpack_ext, timestamp=3, strict_map_key=False,
+        )
+        return packed_data, structure_from_mongo(structure)
+
+    def _pack_ext(self, value):
+        """
+        Returns the msgpack ExtType of a value which msgpack doesn't support.
+        """
+        if isinstance(value, ObjectId):
+            return msgpack.ExtType(self.EXT_OBJECT_ID, value.binary)
+        if isinstance(value, datetime.datetime):
+            # Only timezone-aware datetimes are packed as timestamps.
+            return msgpack.ExtType(self.EXT_NAIVE_DATETIME, value.isoformat().encode())
+        raise TypeError(f'Cannot encode a value of type {type(value)} in a course structure')
+
+    def _unpack_ext(self, code, data):
+        """
+        Returns the value of the given msgpack extension type.
+        """
+        if code == self.EXT_OBJECT_ID:
+            return ObjectId(data)
+        if code == self.EXT_NAIVE_DATETIME:
+            return datetime.datetime.fromisoformat(data.decode())
+        return msgpack.ExtType(code, data)
+
+
+# The codecs of the course structure cache, by name, for the COURSE_STRUCTURE_CACHE_CODEC setting.
+STRUCTURE_CACHE_CODECS = {
+    codec.name: codec for codec in (PickleStructureCodec, MsgpackStructureCodec)
+}
+STRUCTURE_CACHE_CODECS_BY_ID = {
+    codec.codec_id: codec for codec in STRUCTURE_CACHE_CODECS.values()
+}
+
+
 class CourseStructureCache:
     """
     Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+    The course structures are encoded and compressed when cached, with the codec
+    named by the COURSE_STRUCTURE_CACHE_CODEC setting.
+
+    Structures whose compressed data is larger than the COURSE_STRUCTURE_CACHE_CHUNK_SIZE
+    setting are split into chunks cached under separate keys, and the key of the
+    structure holds a manifest of the chunks.  Cached values are decoded with the
+    codec they were encoded with, so the codec can be changed without clearing the cache.
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
+    # The prefix of cached values which have a header, which can't start zlib data.
+    HEADER_MAGIC = b'\x00CSC'
+    # The id of the codec and the number of chunks, which is 0 if the data follows.
+    HEADER = struct.Struct('>4sBH')
+    # Memcached doesn't store items larger than 1MB by default, including the key.
+    DEFAULT_CHUNK_SIZE = 1000000
+
     def __init__(self):
         self.cache = None
         try:
@@ -205,51 +385,109 @@ class CourseStructureCache:
         except InvalidCacheBackendError:
             pass
 
+        codec_name = getattr(settings, 'COURSE_STRUCTURE_CACHE_CODEC', PickleStructureCodec.name)
+        try:
+            self.codec = STRUCTURE_CACHE_CODECS[codec_name]()
+        except KeyError:
+            log.warning("CourseStructureCache: Unknown codec %s, using pickle", codec_name)
+            self.codec = PickleStructureCodec()
+        self.chunk_size = getattr(settings, 'COURSE_STRUCTURE_CACHE_CHUNK_SIZE', self.DEFAULT_CHUNK_SIZE)
+
+    @staticmethod
+    def _chunk_key(key, index):
+        """
+        Returns the cache key of the chunk with the given index of the structure with the given key.
+        """
+        return f'{key}.{index}'
+
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
+        """Pull the compressed, encoded struct data from cache and deserialize."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
             try:
-                compressed_pickled_data = self.cache.get(key)
-                tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+                cached_data = self.cache.get(key)
+                tagger.tag(from_cache=str(cached_data is not None).lower())
 
-                if compressed_pickled_data is None:
+                if cached_data is None:
                     # Always log cache misses, because they are unexpected
                     tagger.sample_rate = 1
                     return None
 
-                tagger.measure('compressed_size', len(compressed_pickled_data))
-
-                pickled_data = zlib.decompress(compressed_pickled_data)
-                tagger.measure('uncompressed_size', len(pickled_data))
-
-                return pickle.loads(pickled_data, encoding='latin-1')
+                if not cached_data.startswith(self.HEADER_MAGIC):
+                    codec = PickleStructureCodec()
+                    compressed_data = cached_data
+                else:
+                    _, codec_id, num_chunks = self.HEADER.unpack_from(cached_data)
+                    codec = STRUCTURE_CACHE_CODECS_BY_ID[codec_id]()
+                    compressed_data = cached_data[self.HEADER.size:]
+                    if num_chunks:
+                        tagger.measure('chunks', num_chunks)
+                        compressed_data = self._get_chunks(key, num_chunks, compressed_data)
+                        if compressed_data is None:
+                            # A chunk was evicted, which is a miss for the whole structure.
+                            tagger.tag(from_cache='partial')
+                            tagger.sample_rate = 1
+                            return None
+
+                tagger.tag(codec=codec.name)
+                tagger.measure('compressed_size', len(compressed_data))
+
+                uncompressed_data, structure = codec.decode(compressed_data)
+                tagger.measure('uncompressed_size', len(uncompressed_data))
+
+                return structure
             except Exception:  # lint-amnesty, pylint: disable=broad-except
                 # The cached data is corrupt in some way, get rid of it.
                 log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
                 self.cache.delete(key)
                 return None
 
+    def _get_chunks(self, key, num_chunks, digest):
+        """
+        Returns the compressed data of the structure joined from its chunks, or
+        None if any of the chunks isn't cached.
+        """
+        chunk_keys = [self._chunk_key(key, index) for index in range(num_chunks)]
+        chunks = self.cache.get_many(chunk_keys)
+        if len(chunks) != num_chunks:
+            return None
+        compressed_data = b''.join(chunks[chunk_key] for chunk_key in chunk_keys)
+        if hashlib.sha1(compressed_data).digest() != digest:
+            raise ValueError('The chunks of the structure do not match its digest')
+        return compressed_data
+
     def set(self, key, structure, course_context=None):
-        """Given a structure, will pickle, compress, and write to cache."""
+        """Given a structure, will encode, compress, and write to cache."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
-            pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
-            tagger.measure('uncompressed_size', len(pickled_data))
-
-            # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            data_size = len(compressed_pickled_data)
+            codec = self.codec
+            try:
+                uncompressed_data, compressed_data = codec.encode(structure)
+            except TypeError:
+                # The structure has values which the codec can't encode.
+                codec = PickleStructureCodec()
+                uncompressed_data, compressed_data = codec.encode(structure)
+            tagger.tag(codec=codec.name)
+            tagger.measure('uncompressed_size', len(uncompressed_data))
+
+            data_size = len(compressed_data)
             tagger.measure('compressed_size', data_size)
 
             # We rely on the course structure cache default timeout, which should be
             # high by default (~ a few days).
             try:
-                self.cache.set(key, compressed_pickled_data)
+                if isinstance(codec, PickleStructureCodec) and data_size <= self.chunk_size:
+                    # Write the original format, which can be read by code that predates the header.
+                    self.cache.set(key, compressed_data)
+                elif data_size + self.HEADER.size <= self.chunk_size:
+                    self.cache.set(key, self.HEADER.pack(self.HEADER_MAGIC, codec.codec_id, 0) + compressed_data)
+                else:
+                    self._set_chunks(key, codec, compressed_data)
+                    tagger.measure('chunks', math.ceil(data_size / self.chunk_size))
             except Exception:  # pylint: disable=broad-except
                 total_bytes_in_one_mb = 1024 * 1024
                 chunk_size_in_mbs = round(data_size / total_bytes_in_one_mb, 2)
@@ -260,17 +498,47 @@ class CourseStructureCache:
                 monitoring.set_custom_attribute('split_mongo_compressed_size', chunk_size_in_mbs)
                 log.info('Data caching (course structure) failed on chunk size: {} MB'.format(chunk_size_in_mbs))
 
+    def _set_chunks(self, key, codec, compressed_data):
+        """
+        Caches the compressed data of a structure in chunks, and then the manifest
+        of the chunks, so that the manifest is never cached without its chunks.
+        """
+        chunks = {
+            self._chunk_key(key, index): compressed_data[offset:offset + self.chunk_size]
+            for index, offset in enumerate(range(0, len(compressed_data), self.chunk_size))
+        }
+        failed_keys = self.cache.set_many(chunks)
+        if failed_keys:
+            raise ValueError(f'Failed to cache {len(failed_keys)} chunks of the structure')
+        self.cache.set(
+            key,
+            self.HEADER.pack(self.HEADER_MAGIC, codec.codec_id, len(chunks)) + hashlib.sha1(compressed_data).digest(),
+        )
+
 
 class MongoPersistenceBackend:
     """
     Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
     """
+    # The number of block entries of deduplicated structures cached in memory by each backend.
+    BLOCK_ENTRY_CACHE_SIZE = 50000
+
+    # Block entries referenced by a structure written within this time are not deleted
+    # as unreferenced, since the structure may not be inserted yet.
+    BLOCK_ENTRY_GRACE_PERIOD = datetime.timedelta(hours=1)
+
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, with_mysql_subclass=False, **kwargs  # lint-amnesty, pylint: disable=unused-argument
+        asset_collection=None, retry_wait_time=0.1, with_mysql_subclass=False,  # lint-amnesty, pylint: disable=unused-argument
+        deduplicate_structure_blocks=False, **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        If deduplicate_structure_blocks is True, new structures are written in the deduplicated
+        format: each block is stored once, in the structure_blocks collection, by the hash of its
+        content, and structures only list the hashes of their blocks.  Structures are read in
+        either format, regardless of this option.
         """
         # Set a write concern of 1, which makes writes complete successfully to the primary
         # only before returning. Also makes pymongo report write errors.
@@ -297,11 +565,16 @@ class MongoPersistenceBackend:
         # If this MongoPersistenceBackend is being used directly (only MongoDB is involved), this is False.
         self.with_mysql_subclass = with_mysql_subclass
 
+        self.deduplicate_structure_blocks = deduplicate_structure_blocks
+        self.block_entry_cache = BlockEntryCache(self.BLOCK_ENTRY_CACHE_SIZE)
+
     def do_connection(self):
         self.database = connect_to_mongodb(**self.connection_params)
         self.course_index = self.database[self.collection + '.active_versions']
         self.structures = self.database[self.collection + '.structures']
+        self.structure_blocks = self.database[self.collection + '.structure_blocks']
         self.definitions = self.database[self.collection + '.definitions']
+        self.asset_metadata = self.database[self.collection + '.asset_metadata']
 
     def heartbeat(self):
         """
@@ -355,6 +628,7 @@ class MongoPersistenceBackend:
                             str(key)
                         )
                         return None
+                    self._assemble_structure_blocks([doc], course_context)
                     tagger_find_one.measure("blocks", len(doc['blocks']))
                     structure = structure_from_mongo(doc, course_context)
                     tagger_find_one.sample_rate = 1
@@ -363,6 +637,36 @@ class MongoPersistenceBackend:
 
             return structure
 
+    def get_structures(self, keys, course_context=None):
+        """
+        Get the structures from the persistence mechanism whose ids are the given keys.
+
+        As get_structure does, this method uses the cached versions of the structures which are
+        available, but the others are read with a single query and then cached.
+
+        Returns a dict mapping each key to its structure, omitting the structures which aren't found.
+        """
+        with TIMER.timer("get_structures", course_context) as tagger_get_structures:
+            tagger_get_structures.measure("requested_ids", len(keys))
+            cache = CourseStructureCache()
+
+            structures = {}
+            missing_keys = []
+            for key in keys:
+                structure = cache.get(key, course_context)
+                if structure:
+                    structures[key] = structure
+                else:
+                    missing_keys.append(key)
+
+            tagger_get_structures.measure("cache_misses", len(missing_keys))
+            if missing_keys:
+                for structure in self.find_structures_by_id(missing_keys, course_context):
+                    structures[structure['_id']] = structure
+                    cache.set(structure['_id'], structure, course_context)
+
+            return structures
+
     @autoretry_read()
     def find_structures_by_id(self, ids, course_context=None):
         """
@@ -373,10 +677,9 @@ class MongoPersistenceBackend:
         """
         with TIMER.timer("find_structures_by_id", course_context) as tagger:
             tagger.measure("requested_ids", len(ids))
-            docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find({'_id': {'$in': ids}})
-            ]
+            docs = list(self.structures.find({'_id': {'$in': ids}}))
+            self._assemble_structure_blocks(docs, course_context)
+            docs = [structure_from_mongo(structure, course_context) for structure in docs]
             tagger.measure("structures", len(docs))
             return docs
 
@@ -391,13 +694,33 @@ class MongoPersistenceBackend:
         """
         with TIMER.timer("find_courselike_blocks_by_id", course_context) as tagger:
             tagger.measure("requested_ids", len(ids))
-            docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find(
-                    {'_id': {'$in': ids}},
-                    {'blocks': {'$elemMatch': {'block_type': block_type}}, 'root': 1}
-                )
-            ]
+            docs = list(self.structures.find(
+                {'_id': {'$in': ids}},
+                {'blocks': {'$elemMatch': {'block_type': block_type}}, 'root': 1, 'root_block_hash': 1}
+            ))
+            # Deduplicated structures have the hash of their root block, which is the block
+            # returned when it has the given type.  The hashes of all of the blocks of the others,
+            # including those written before root block hashes were kept, are read instead.
+            for doc in docs:
+                root_block_hash = doc.pop('root_block_hash', None)
+                if root_block_hash is not None and doc['root'][0] == block_type:
+                    doc['block_hashes'] = [root_block_hash]
+            other_ids = [doc['_id'] for doc in docs if 'blocks' not in doc and 'block_hashes' not in doc]
+            if other_ids:
+                block_hashes = {
+                    doc['_id']: doc['block_hashes'] for doc in self.structures.find(
+                        {'_id': {'$in': other_ids}, 'block_hashes': {'$exists': True}}, {'block_hashes': 1}
+                    )
+                }
+                for doc in docs:
+                    if doc['_id'] in block_hashes:
+                        doc['block_hashes'] = block_hashes[doc['_id']]
+            self._assemble_structure_blocks(docs, course_context)
+            for doc in docs:
+                # As with the projection of the blocks of structures in the full format,
+                # only keep the first block of the given type.
+                doc['blocks'] = [block for block in doc.get('blocks', []) if block['block_type'] == block_type][:1]
+            docs = [structure_from_mongo(structure, course_context) for structure in docs]
             tagger.measure("structures", len(docs))
             return docs
 
@@ -407,7 +730,150 @@ class MongoPersistenceBackend:
         """
         with TIMER.timer("insert_structure", course_context) as tagger:
             tagger.measure("blocks", len(structure["blocks"]))
-            self.structures.insert_one(structure_to_mongo(structure, course_context))
+            doc = structure_to_mongo(structure, course_context)
+            if self.deduplicate_structure_blocks:
+                doc = self._deduplicate_structure_blocks(doc, course_context)
+            self.structures.insert_one(doc)
+
+    def _deduplicate_structure_blocks(self, doc, course_context=None):
+        """
+        Writes the blocks of the given structure, as stored in mongo, to the
+        structure_blocks collection, and returns the structure in the deduplicated
+        format, which lists the hashes of its blocks instead.
+
+        The entries of all of the blocks, including those which already exist, are
+        stamped with the time they were last referenced, so that they aren't deleted
+        as unreferenced before the structure is inserted.
+        """
+        with TIMER.timer("deduplicate_structure_blocks", course_context) as tagger:
+            now = datetime.datetime.now(pytz.UTC)
+            root_block_hash = None
+            encoded_blocks = OrderedDict()
+            blocks_by_hash = {}
+            for block in doc['blocks']:
+                encoded_block = bson.encode(block)
+                block_hash = block_entry_hash(encoded_block)
+                encoded_blocks[block_hash] = encoded_block
+                blocks_by_hash[block_hash] = block
+                if [block['block_type'], block['block_id']] == list(doc['root']):
+                    root_block_hash = block_hash
+
+            existing_hashes = {
+                entry['_id'] for entry in self.structure_blocks.find(
+                    {'_id': {'$in': list(encoded_blocks)}}, {'_id': 1}
+                )
+            }
+            if existing_hashes:
+                result = self.structure_blocks.update_many(
+                    {'_id': {'$in': list(existing_hashes)}}, {'$set': {'last_referenced': now}}
+                )
+                if result.matched_count < len(existing_hashes):
+                    # Some of the entries were deleted as unreferenced in the meantime.  Those
+                    # which exist now have been stamped, so they won't be deleted any more.
+                    existing_hashes = {
+                        entry['_id'] for entry in self.structure_blocks.find(
+                            {'_id': {'$in': list(existing_hashes)}}, {'_id': 1}
+                        )
+                    }
+            new_entries = [
+                {'_id': block_hash, 'block': block, 'last_referenced': now}
+                for block_hash, block in blocks_by_hash.items()
+                if block_hash not in existing_hashes
+            ]
+            tagger.measure("new_blocks", len(new_entries))
+            if new_entries:
+                try:
+                    self.structure_blocks.insert_many(new_entries, ordered=False)
+                except BulkWriteError as error:
+                    # Another structure added some of the same blocks in the meantime.
+                    if any(write_error['code'] != 11000 for write_error in error.details['writeErrors']):
+                        raise
+            self.block_entry_cache.set_many(encoded_blocks)
+
+        new_doc = {key: value for key, value in doc.items() if key != 'blocks'}
+        new_doc['block_hashes'] = list(encoded_blocks)
+        if root_block_hash is not None:
+            new_doc['root_block_hash'] = root_block_hash
+        return new_doc
+
+    def _assemble_structure_blocks(self, docs, course_context=None):
+        """
+        Replaces the block hashes of the given structures in the deduplicated format
+        with their blocks, as stored in mongo, reading the blocks which aren't cached
+        with a single query.  Structures in the full format are left as is.
+        """
+        block_hashes = {block_hash for doc in docs for block_hash in doc.get('block_hashes', [])}
+        if not block_hashes:
+            return
+
+        with TIMER.timer("assemble_structure_blocks", course_context) as tagger:
+            tagger.measure("blocks", len(block_hashes))
+            encoded_blocks = self.block_entry_cache.get_many(block_hashes)
+            missing_hashes = block_hashes - encoded_blocks.keys()
+            tagger.measure("missing_blocks", len(missing_hashes))
+            if missing_hashes:
+                found_blocks = {
+                    entry['_id']: bson.encode(entry['block'])
+                    for entry in self.structure_blocks.find({'_id': {'$in': list(missing_hashes)}})
+                }
+                self.block_entry_cache.set_many(found_blocks)
+                encoded_blocks.update(found_blocks)
+
+            codec_options = self.structure_blocks.codec_options
+            for doc in docs:
+                if 'block_hashes' in doc:
+                    missing_hashes = set(doc['block_hashes']) - encoded_blocks.keys()
+                    if missing_hashes:
+                        raise ReferentialIntegrityError(
+                            f"The structure {doc['_id']} references missing block entries: {sorted(missing_hashes)}"
+                        )
+                    doc['blocks'] = [
+                        bson.decode(encoded_blocks[block_hash], codec_options=codec_options)
+                        for block_hash in doc.pop('block_hashes')
+                    ]
+
+    def deduplicate_structures(self, batch_size=100):
+        """
+        Rewrites the structures in the full format in the deduplicated format, and
+        yields the id of each rewritten structure.  The content of structures is
+        unchanged, so cached structures remain valid.
+        """
+        while True:
+            docs = list(self.structures.find({'blocks': {'$exists': True}}).limit(batch_size))
+            if not docs:
+                return
+            for doc in docs:
+                self.structures.replace_one({'_id': doc['_id']}, self._deduplicate_structure_blocks(doc))
+                yield doc['_id']
+
+    def unreferenced_block_entry_cutoff(self):
+        """
+        Returns the time before which the block entries must have been last referenced
+        by a structure written to be deleted as unreferenced.
+        """
+        return datetime.datetime.now(pytz.UTC) - self.BLOCK_ENTRY_GRACE_PERIOD
+
+    def find_unreferenced_block_entries(self, cutoff):
+        """
+        Returns the set of the hashes of the block entries last referenced before the given
+        time which aren't referenced by any structure.
+        """
+        entry_hashes = {
+            entry['_id'] for entry in self.structure_blocks.find({'last_referenced': {'$lt': cutoff}}, {'_id': 1})
+        }
+        for doc in self.structures.find({'block_hashes': {'$exists': True}}, {'block_hashes': 1}):
+            entry_hashes.difference_update(doc['block_hashes'])
+        return entry_hashes
+
+    def delete_block_entries(self, block_hashes, cutoff):
+        """
+        Deletes the block entries of the given hashes which haven't been referenced by a
+        structure written since the given time, and returns the number deleted.
+        """
+        self.block_entry_cache.clear()
+        return self.structure_blocks.delete_many(
+            {'_id': {'$in': list(block_hashes)}, 'last_referenced': {'$lt': cutoff}}
+        ).deleted_count
 
     def get_course_index(self, key, ignore_case=False):
         """
@@ -566,6 +1032,102 @@ class MongoPersistenceBackend:
             tagger.tag(block_type=definition['block_type'])
             self.definitions.insert_one(definition)
 
+    @staticmethod
+    def _asset_metadata_query(course_key, asset_type=None, filename=None):
+        """
+        Returns the query for the asset metadata of the given branch of the given course, optionally
+        restricted to the given asset type and filename.
+        """
+        query = {
+            'org': course_key.org,
+            'course': get_library_or_course_attribute(course_key),
+            'run': course_key.run,
+            'branch': course_key.branch,
+        }
+        if asset_type is not None:
+            query['asset_type'] = asset_type
+        if filename is not None:
+            query['filename'] = filename
+        return query
+
+    @staticmethod
+    def _sort_asset_metadata(asset_docs, sort_field='filename', ascending=True):
+        """
+        Returns the given asset metadata sorted by sort_field and then by filename, as
+        find_asset_metadata_list sorts them.
+        """
+        def sort_key(doc):
+            value = doc
+            for field_name in sort_field.split('.'):
+                value = value.get(field_name)
+            # Sort missing values first, as MongoDB does.
+            return (value is not None, value, doc['filename'])
+
+        return sorted(asset_docs, key=sort_key, reverse=not ascending)
+
+    def find_asset_metadata(self, course_key, asset_type, filename):
+        """
+        Get the stored metadata of the asset of the given type and filename in the given branch
+        of the given course, or None.
+        """
+        with TIMER.timer("find_asset_metadata", course_key):
+            return self.asset_metadata.find_one(self._asset_metadata_query(course_key, asset_type, filename))
+
+    def find_asset_metadata_list(
+        self, course_key, asset_type=None, start=0, maxresults=-1, sort_field='filename', ascending=True
+    ):
+        """
+        Get a page of the stored metadata of the assets of the given type, or of all types if
+        asset_type is None, in the given branch of the given course, sorted by sort_field.
+        """
+        with TIMER.timer("find_asset_metadata_list", course_key) as tagger:
+            direction = pymongo.ASCENDING if ascending else pymongo.DESCENDING
+            sort = [(sort_field, direction)]
+            if sort_field != 'filename':
+                sort.append(('filename', direction))
+            cursor = self.asset_metadata.find(
+                self._asset_metadata_query(course_key, asset_type), sort=sort, skip=start,
+            )
+            if maxresults == 0:
+                return []
+            if maxresults > 0:
+                cursor = cursor.limit(maxresults)
+            docs = list(cursor)
+            tagger.measure("assets", len(docs))
+            return docs
+
+    def save_asset_metadata_list(self, course_key, asset_docs):
+        """
+        Insert or replace the stored metadata of the given assets, as returned by
+        AssetMetadata.to_storable, in the given branch of the given course.
+        """
+        if not asset_docs:
+            return
+        with TIMER.timer("save_asset_metadata_list", course_key) as tagger:
+            tagger.measure("assets", len(asset_docs))
+            self.asset_metadata.bulk_write([
+                pymongo.ReplaceOne(
+                    self._asset_metadata_query(course_key, asset_doc['asset_type'], asset_doc['filename']),
+                    dict(
+                        {key: value for key, value in asset_doc.items() if key != '_id'},
+                        **self._asset_metadata_query(course_key)
+                    ),
+                    upsert=True,
+                )
+                for asset_doc in asset_docs
+            ], ordered=False)
+
+    def delete_asset_metadata(self, course_key, asset_type=None, filename=None):
+        """
+        Delete the stored metadata of the asset of the given type and filename, or of all of the
+        assets if they aren't given, in the given branch of the given course.  Returns the number
+        of assets deleted.
+        """
+        with TIMER.timer("delete_asset_metadata", course_key):
+            return self.asset_metadata.delete_many(
+                self._asset_metadata_query(course_key, asset_type, filename)
+            ).deleted_count
+
     def ensure_indexes(self):
         """
         Ensure that all appropriate indexes are created that are needed by this modulestore, or raise
@@ -584,6 +1146,30 @@ class MongoPersistenceBackend:
             unique=True,
             background=True
         )
+        # The asset metadata of a course branch is looked up by type and filename, and listed
+        # by filename or upload date, with or without filtering by type.
+        asset_branch_keys = [
+            ('org', pymongo.ASCENDING),
+            ('course', pymongo.ASCENDING),
+            ('run', pymongo.ASCENDING),
+            ('branch', pymongo.ASCENDING),
+        ]
+        create_collection_index(
+            self.asset_metadata,
+            asset_branch_keys + [('asset_type', pymongo.ASCENDING), ('filename', pymongo.ASCENDING)],
+            unique=True,
+            background=True
+        )
+        for keys in (
+            [
+                ('asset_type', pymongo.ASCENDING),
+                ('edit_info.edited_on', pymongo.ASCENDING),
+                ('filename', pymongo.ASCENDING),
+            ],
+            [('filename', pymongo.ASCENDING)],
+            [('edit_info.edited_on', pymongo.ASCENDING), ('filename', pymongo.ASCENDING)],
+        ):
+            create_collection_index(self.asset_metadata, asset_branch_keys + keys, background=True)
 
     def close_connections(self):
         """
@@ -615,11 +1201,16 @@ class MongoPersistenceBackend:
         elif collections:
             self.course_index.drop()
             self.structures.drop()
+            self.structure_blocks.drop()
             self.definitions.drop()
+            self.asset_metadata.drop()
         else:
             self.course_index.remove({})
             self.structures.remove({})
+            self.structure_blocks.remove({})
             self.definitions.remove({})
+            self.asset_metadata.remove({})
+        self.block_entry_cache.clear()
 
         if connections:
             connection.close()
@@ -636,7 +1227,7 @@ class DjangoFlexPersistenceBackend(MongoPersistenceBackend):
         # detection will be done at the MySQL layer only and not duplicated at the MongoDB layer.
         super().__init__(*args, **kwargs, with_mysql_subclass=True)
 
-    # Structures and definitions are only supported in MongoDB for now.
+    # Structures, definitions and asset metadata are only supported in MongoDB for now.
     # Course indexes are read from MySQL and written to both MongoDB and MySQL
     # Course indexes are cached within the process using their key and ignore_case atrributes as keys.
     # This method is request cached. The keys to the cache are the arguements to the method.
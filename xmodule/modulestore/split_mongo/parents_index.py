@@ -0,0 +1,105 @@
+"""
+Reverse index of the children of the blocks of a split modulestore structure.
+
+A structure only records the children of each block, so finding the parents
+of a block otherwise requires scanning the children of every block in the
+structure, and checking whether a block has a path to the course root requires
+doing so recursively for each of its ancestors.
+"""
+from xmodule.util.keys import BlockKey
+
+# The types of the blocks which are the roots of structures.
+ROOT_BLOCK_TYPES = ('course', 'library')
+
+
+class StructureParentsIndex:
+    """
+    Maps each block of a structure to its parents, along with the set of blocks
+    which have a path to the root of the structure, which is computed on demand.
+
+    The index is built from the blocks of the structure when it is created.  When
+    blocks of the structure are then replaced or removed, the index must be told
+    with update_block and remove_block; see SplitMongoModuleStore._get_parents_index.
+    """
+    def __init__(self, blocks):
+        """
+        Arguments:
+            blocks (dict) - The blocks of the structure, by BlockKey.
+        """
+        # Map of each parent to the set of its children.
+        self._children = {}
+        # Map of each child to the list of its parents, in the order of the blocks.
+        self._parents = {}
+        # Set of the blocks which have a path to the root, or None if not computed.
+        self._blocks_with_path_to_root = None
+        self._blocks = blocks
+        for block_key, block in blocks.items():
+            self._add_children(block_key, block)
+
+    def get_parents(self, block_key):
+        """
+        Returns the list of the keys of the parents of the given block.
+        """
+        return list(self._parents.get(block_key, ()))
+
+    def has_path_to_root(self, block_key):
+        """
+        Returns whether the given block is a root block, which has no parents, or
+        is a descendant of one.
+        """
+        if self._blocks_with_path_to_root is None:
+            self._blocks_with_path_to_root = self._find_blocks_with_path_to_root()
+        return block_key in self._blocks_with_path_to_root or (
+            block_key.type in ROOT_BLOCK_TYPES and not self._parents.get(block_key)
+        )
+
+    def update_block(self, block_key, block):
+        """
+        Updates the index for the given block replacing the block with the same
+        key in the structure.
+        """
+        self._remove_children(block_key)
+        self._add_children(block_key, block)
+        self._blocks_with_path_to_root = None
+
+    def remove_block(self, block_key):
+        """
+        Updates the index for the given block being removed from the structure.
+        """
+        self._remove_children(block_key)
+        self._blocks_with_path_to_root = None
+
+    def _add_children(self, block_key, block):
+        """
+        Adds the given block as the parent of its children.
+        """
+        children = {BlockKey(*child) for child in block.fields.get('children', [])}
+        self._children[block_key] = children
+        for child_key in children:
+            self._parents.setdefault(child_key, []).append(block_key)
+
+    def _remove_children(self, block_key):
+        """
+        Removes the given block as the parent of the children it was added with.
+        """
+        for child_key in self._children.pop(block_key, ()):
+            parents = self._parents[child_key]
+            parents.remove(block_key)
+            if not parents:
+                del self._parents[child_key]
+
+    def _find_blocks_with_path_to_root(self):
+        """
+        Returns the set of the root blocks of the structure and their descendants.
+        """
+        found = set()
+        stack = [
+            block_key for block_key in self._blocks
+            if block_key.type in ROOT_BLOCK_TYPES and not self._parents.get(block_key)
+        ]
+        while stack:
+            block_key = stack.pop()
+            if block_key not in found:
+                found.add(block_key)
+                stack.extend(self._children.get(block_key, ()))
+        return found
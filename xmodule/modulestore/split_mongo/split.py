@@ -57,6 +57,7 @@ Representation:
 
 import copy
 import datetime
+import itertools
 import logging
 from collections import defaultdict
 from importlib import import_module
@@ -100,7 +101,11 @@ from xmodule.modulestore.exceptions import (
     VersionConflictError
 )
 from xmodule.modulestore.split_mongo import CourseEnvelope
-from xmodule.modulestore.split_mongo.mongo_connection import DuplicateKeyError, DjangoFlexPersistenceBackend
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    DjangoFlexPersistenceBackend,
+    DuplicateKeyError,
+    MongoPersistenceBackend
+)
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.util.misc import get_library_or_course_attribute
@@ -108,6 +113,7 @@ from xmodule.util.keys import BlockKey, derive_key
 
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
+from .parents_index import StructureParentsIndex
 
 log = logging.getLogger(__name__)
 
@@ -144,6 +150,10 @@ class SplitBulkWriteRecord(BulkOpsRecord):  # lint-amnesty, pylint: disable=miss
         self.modules = defaultdict(dict)
         self.definitions = {}
         self.definitions_in_db = set()
+        # dict(branch, dict((asset_type, filename), asset metadata, or None if it was deleted))
+        self.asset_metadata = defaultdict(dict)
+        # The branches whose asset metadata was all deleted before the changes in asset_metadata.
+        self.asset_metadata_cleared = set()
         self.course_key = None
 
     # TODO: This needs to track which branches have actually been modified/versioned,
@@ -278,6 +288,22 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                 # append only, so if it's already been written, we can just keep going.
                 log.debug("Attempted to insert duplicate definition %s", _id)
 
+        for branch in bulk_write_record.asset_metadata_cleared:
+            dirty = True
+            self.db_connection.delete_asset_metadata(bulk_write_record.course_key.for_branch(branch))
+
+        for branch, asset_changes in bulk_write_record.asset_metadata.items():
+            if not asset_changes:
+                continue
+            dirty = True
+            branch_key = bulk_write_record.course_key.for_branch(branch)
+            self.db_connection.save_asset_metadata_list(
+                branch_key, [asset_doc for asset_doc in asset_changes.values() if asset_doc is not None]
+            )
+            for (asset_type, filename), asset_doc in asset_changes.items():
+                if asset_doc is None:
+                    self.db_connection.delete_asset_metadata(branch_key, asset_type, filename)
+
         if bulk_write_record.index is not None and bulk_write_record.index != bulk_write_record.initial_index:
             dirty = True
 
@@ -349,6 +375,40 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
             version_guid = course_key.as_object_id(version_guid)
             return self.db_connection.get_structure(version_guid, course_key)
 
+    def get_structures(self, version_guids):
+        """
+        Gets the structures of the given dict mapping course keys to version guids, as get_structure
+        does, but reading all of those which aren't in an active bulk operation with a single call
+        to the persistence backend.
+
+        Returns a dict mapping each course key to its structure, omitting the structures which aren't found.
+        """
+        structures = {}
+        structure_ids = {}
+        for course_key, version_guid in version_guids.items():
+            bulk_write_record = self._get_bulk_ops_record(course_key)
+            structure = bulk_write_record.structures.get(version_guid) if bulk_write_record.active else None
+            if structure is not None:
+                structures[course_key] = structure
+            else:
+                # cast string to ObjectId if necessary
+                structure_ids[course_key] = course_key.as_object_id(version_guid)
+
+        if not structure_ids:
+            return structures
+
+        found_structures = self.db_connection.get_structures(list(set(structure_ids.values())))
+        for course_key, structure_id in structure_ids.items():
+            structure = found_structures.get(structure_id)
+            bulk_write_record = self._get_bulk_ops_record(course_key)
+            if bulk_write_record.active:
+                bulk_write_record.structures[version_guids[course_key]] = structure
+                if structure is not None:
+                    bulk_write_record.structures_in_db.add(version_guids[course_key])
+            if structure is not None:
+                structures[course_key] = structure
+        return structures
+
     def update_structure(self, course_key, structure):
         """
         Update a course structure, respecting the current bulk operation status
@@ -361,6 +421,87 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         else:
             self.db_connection.insert_structure(structure, course_key)
 
+    def get_asset_metadata_doc(self, course_key, asset_type, filename):
+        """
+        Return the stored metadata of the given asset in the asset metadata index, or None,
+        respecting the active bulk operation on course_key.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        if bulk_write_record.active:
+            asset_changes = bulk_write_record.asset_metadata.get(course_key.branch, {})
+            if (asset_type, filename) in asset_changes:
+                return asset_changes[(asset_type, filename)]
+            if course_key.branch in bulk_write_record.asset_metadata_cleared:
+                return None
+        return self.db_connection.find_asset_metadata(course_key, asset_type, filename)
+
+    def get_asset_metadata_docs(
+        self, course_key, asset_type=None, start=0, maxresults=-1, sort_field='filename', ascending=True
+    ):
+        """
+        Return a page of the stored metadata of the assets of the given type, or of all types, in the
+        asset metadata index, respecting the active bulk operation on course_key.
+
+        If the bulk operation changed the assets of the branch, all of its assets are read and
+        the page is taken once the changes are applied.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        cleared = course_key.branch in bulk_write_record.asset_metadata_cleared
+        asset_changes = bulk_write_record.asset_metadata.get(course_key.branch, {})
+        if not bulk_write_record.active or not (cleared or asset_changes):
+            return self.db_connection.find_asset_metadata_list(
+                course_key, asset_type, start, maxresults, sort_field, ascending
+            )
+
+        asset_docs = [] if cleared else [
+            asset_doc for asset_doc in self.db_connection.find_asset_metadata_list(course_key, asset_type)
+            if (asset_doc['asset_type'], asset_doc['filename']) not in asset_changes
+        ]
+        asset_docs.extend(
+            asset_doc for (doc_asset_type, _), asset_doc in asset_changes.items()
+            if asset_doc is not None and asset_type in (None, doc_asset_type)
+        )
+        asset_docs = MongoPersistenceBackend._sort_asset_metadata(  # pylint: disable=protected-access
+            asset_docs, sort_field, ascending
+        )
+        return asset_docs[start:] if maxresults < 0 else asset_docs[start:start + maxresults]
+
+    def save_asset_metadata_docs(self, course_key, asset_docs):
+        """
+        Insert or replace the given asset metadata in the asset metadata index, respecting the
+        current bulk operation status.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        if bulk_write_record.active:
+            asset_changes = bulk_write_record.asset_metadata[course_key.branch]
+            for asset_doc in asset_docs:
+                asset_changes[(asset_doc['asset_type'], asset_doc['filename'])] = asset_doc
+        else:
+            self.db_connection.save_asset_metadata_list(course_key, asset_docs)
+
+    def delete_asset_metadata_doc(self, course_key, asset_type, filename):
+        """
+        Delete the metadata of the given asset from the asset metadata index, respecting the
+        current bulk operation status.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        if bulk_write_record.active:
+            bulk_write_record.asset_metadata[course_key.branch][(asset_type, filename)] = None
+        else:
+            self.db_connection.delete_asset_metadata(course_key, asset_type, filename)
+
+    def delete_all_asset_metadata_docs(self, course_key):
+        """
+        Delete the metadata of all of the assets of the given course branch from the asset
+        metadata index, respecting the current bulk operation status.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        if bulk_write_record.active:
+            bulk_write_record.asset_metadata.pop(course_key.branch, None)
+            bulk_write_record.asset_metadata_cleared.add(course_key.branch)
+        else:
+            self.db_connection.delete_asset_metadata(course_key)
+
     def get_cached_block(self, course_key, version_guid, block_id):
         """
         If there's an active bulk_operation, see if it's cached this block and just return it
@@ -438,6 +579,9 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         if bulk_write_record.active:
             # Only query for the definitions that aren't already cached.
             for definition in bulk_write_record.definitions.values():
+                # get_definition caches the definitions which aren't found as None.
+                if definition is None:
+                    continue
                 definition_id = definition.get('_id')
                 if definition_id in ids:
                     ids.remove(definition_id)
@@ -475,7 +619,10 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
 
         # If we have an active bulk write, and it's already been edited, then just use that structure
         if bulk_write_record.active and course_key.branch in bulk_write_record.dirty_branches:
-            return bulk_write_record.structure_for_branch(course_key.branch)
+            structure = bulk_write_record.structure_for_branch(course_key.branch)
+            # The caller may change the children of its blocks in place.
+            self._clear_parents_index(structure['_id'])
+            return structure
 
         # Otherwise, make a new structure
         new_structure = copy.deepcopy(structure)
@@ -491,6 +638,12 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
 
         return new_structure
 
+    def _clear_parents_index(self, course_version_guid=None):
+        """
+        Clears the cached index of the parents of the blocks of the given structure version,
+        or of all structures.  Overridden by modulestores which cache such indexes.
+        """
+
     def version_block(self, block_data, user_id, update_version):
         """
         Update the block_data object based on it having been edited.
@@ -645,14 +798,32 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None, deduplicate_structure_blocks=False,
+                 persistence_backend=None, asset_metadata_index=False, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param deduplicate_structure_blocks: if True, new structures are written with each of their blocks
+            stored once, by content hash, and shared with the other versions of the structure. See
+            MongoPersistenceBackend.
+        :param persistence_backend: the dotted path of the class persisting the modulestore, which is
+            given doc_store_config. DjangoFlexPersistenceBackend if not specified. See memory_connection
+            for backends which don't need MongoDB.
+        :param asset_metadata_index: if True, the asset metadata of courses is kept in the asset_metadata
+            collection, indexed by course branch, asset type and filename, rather than in the assets field
+            of the course structures. Run the migrate_split_asset_metadata command before enabling it.
         """
 
         super().__init__(contentstore, **kwargs)
 
-        self.db_connection = DjangoFlexPersistenceBackend(**doc_store_config)
+        if persistence_backend is not None:
+            module_path, __, class_name = persistence_backend.rpartition('.')
+            persistence_backend_class = getattr(import_module(module_path), class_name)
+        else:
+            persistence_backend_class = DjangoFlexPersistenceBackend
+        self.db_connection = persistence_backend_class(
+            deduplicate_structure_blocks=deduplicate_structure_blocks, **doc_store_config
+        )
+        self.asset_metadata_index = asset_metadata_index
 
         if default_class is not None:
             module_path, __, class_name = default_class.rpartition('.')
@@ -733,25 +904,36 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 )
 
             # This method supports lazy loading, where the descendent definitions aren't loaded
-            # until they're actually needed.
-            if not lazy:
-                # Non-lazy loading: Load all descendants by id.
+            # until they're actually needed, and are then fetched together.
+            if lazy:
+                system.add_pending_definitions(new_block_data.values())
+            else:
+                # Non-lazy loading: Load the descendants which aren't loaded yet by id,
+                # except for the definitions already fetched for this request.
+                unloaded_blocks = [block for block in new_block_data.values() if not block.definition_loaded]
+                definitions = self.get_definition_cache()
+                if definitions is None:
+                    definitions = {}
                 descendent_definitions = self.get_definitions(
                     course_key,
                     [
                         block.definition
-                        for block in new_block_data.values()
+                        for block in unloaded_blocks
+                        if block.definition not in definitions
                     ]
                 )
                 # Turn definitions into a map.
-                definitions = {definition['_id']: definition
-                               for definition in descendent_definitions}
+                definitions.update(
+                    (definition['_id'], definition) for definition in descendent_definitions
+                )
 
-                for block in new_block_data.values():
+                for block in unloaded_blocks:
                     if block.definition in definitions:
                         definition = definitions[block.definition]
-                        # convert_fields gets done later in the runtime's xblock_from_json
-                        block.fields.update(definition.get('fields'))
+                        # convert_fields gets done later in the runtime's xblock_from_json.
+                        # The definitions are shared by the runtimes of the request, so copy
+                        # their fields so that updates don't cross-pollinate.
+                        block.fields.update(copy.deepcopy(definition.get('fields')))
                         block.definition_loaded = True
 
             system.module_data.update(new_block_data)
@@ -814,6 +996,57 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 pass
         else:
             self.request_cache.data['course_cache'] = {}
+            self.request_cache.data['definition_cache'] = {}
+        self._clear_parents_index(course_version_guid)
+
+    def get_definition_cache(self):
+        """
+        Returns the dict of the definitions fetched for the runtimes of this request, by id,
+        or None if there is no request cache.
+
+        Definitions are never changed once saved, since updating a definition saves it with a new id.
+        """
+        if self.request_cache is None:
+            return None
+        return self.request_cache.data.setdefault('definition_cache', {})
+
+    def _get_parents_index(self, structure):
+        """
+        Returns the StructureParentsIndex of the given structure, building it if it isn't cached.
+
+        Indexes are cached by structure version.  Structures are not changed once saved, except for
+        the structure being edited in a bulk operation, so the index of that structure is cleared
+        when it is returned by version_structure or saved by update_structure, and kept up to date
+        by _update_block_in_structure and _delete_if_true_orphan in between.
+        """
+        if self.request_cache is None:
+            return StructureParentsIndex(structure['blocks'])
+
+        indexes = self.request_cache.data.setdefault('parents_index_cache', {})
+        index = indexes.get(structure['_id'])
+        if index is None:
+            index = indexes[structure['_id']] = StructureParentsIndex(structure['blocks'])
+        return index
+
+    def _get_cached_parents_index(self, structure):
+        """
+        Returns the cached StructureParentsIndex of the given structure, if any.
+        """
+        if self.request_cache is None:
+            return None
+        return self.request_cache.data.setdefault('parents_index_cache', {}).get(structure['_id'])
+
+    def _clear_parents_index(self, course_version_guid=None):
+        """
+        Clears the cached StructureParentsIndex of the given structure version, or of all structures.
+        """
+        if self.request_cache is None:
+            return
+
+        if course_version_guid:
+            self.request_cache.data.setdefault('parents_index_cache', {}).pop(course_version_guid, None)
+        else:
+            self.request_cache.data['parents_index_cache'] = {}
 
     def _lookup_course(self, course_key, head_validation=True):
         """
@@ -1105,6 +1338,51 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(course_id)
         return self._get_structure(course_id, depth, **kwargs)
 
+    @autoretry_read()
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        Gets the course blocks of the given courses, looking up the course indexes of all of the
+        courses in one query rather than one per course.  Their structures are got from the structure
+        cache when they're cached, and the others are read together in one query.
+
+        Returns a dict mapping each of the given course keys to its course block, omitting the
+        courses which aren't found.
+        """
+        courses = {}
+        head_course_keys = []
+        for course_key in course_keys:
+            if not isinstance(course_key, CourseLocator) or course_key.deprecated:
+                # The supplied CourseKey is of the wrong type, so it can't possibly be stored in this modulestore.
+                continue
+            if course_key.version_guid is None and course_key.branch is not None:
+                head_course_keys.append(course_key)
+                continue
+            # Look up the courses of specific versions as get_course does.
+            try:
+                courses[course_key] = self.get_course(course_key, depth=depth, **kwargs)
+            except ItemNotFoundError:
+                pass
+
+        if not head_course_keys:
+            return courses
+
+        course_indexes = {
+            (course_index['org'], course_index['course'], course_index['run']): course_index
+            for course_index in self.find_matching_course_indexes(
+                course_keys=[course_key.for_branch(None) for course_key in head_course_keys]
+            )
+        }
+        version_guids = {}
+        for course_key in head_course_keys:
+            course_index = course_indexes.get((course_key.org, course_key.course, course_key.run))
+            if course_index is not None and course_key.branch in course_index['versions']:
+                version_guids[course_key] = course_index['versions'][course_key.branch]
+
+        for course_key, structure in self.get_structures(version_guids).items():
+            envelope = CourseEnvelope(course_key.replace(version_guid=version_guids[course_key]), structure)
+            courses[course_key] = self._load_items(envelope, [structure['root']], depth, **kwargs)[0]
+        return courses
+
     def get_library(self, library_id, depth=0, head_validation=True, **kwargs):
         """
         Gets the 'library' root block for the library identified by the locator
@@ -1265,20 +1543,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
 
-        # No need of these caches unless include_orphans is set to False
-        path_cache = None
-        parents_cache = None
-
-        if not include_orphans:
-            path_cache = {}
-            parents_cache = self.build_block_key_to_parents_mapping(course.structure)
+        # No need of the index unless include_orphans is set to False
+        parents_index = None if include_orphans else self._get_parents_index(course.structure)
 
         for block_id, value in course.structure['blocks'].items():
             if _block_matches_all(value):
                 if not include_orphans:
                     if (
                         block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
+                        parents_index.has_path_to_root(block_id)
                     ):
                         items.append(block_id)
                 else:
@@ -1318,6 +1591,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         :return Bool: whether or not component has path to the root
         """
+        if path_cache is None and parents_cache is None:
+            # Use the blocks with a path to the root memoized by the structure's index.
+            return self._get_parents_index(course.structure).has_path_to_root(block_key)
 
         if path_cache and block_key in path_cache:
             return path_cache[block_key]
@@ -1357,14 +1633,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        parents_index = self._get_parents_index(course.structure)
+        all_parent_ids = parents_index.get_parents(BlockKey.from_usage_key(locator))
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
         parent_ids = [
             valid_parent
             for valid_parent in all_parent_ids
-            if self.has_path_to_root(valid_parent, course)
+            if parents_index.has_path_to_root(valid_parent)
         ]
 
         if len(parent_ids) == 0:
@@ -1400,6 +1677,34 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             for block_id in items
         ]
 
+    def get_block_versions(self, course_key):
+        """
+        Return a dict mapping the usage key of each block in the course's structure to a tuple of the
+        version of the structure in which the block's current fields were set (its edit_info update_version)
+        and the usage keys of its children.
+
+        Unlike loading the course's xblocks, this only reads the course's structure, so it can be used to
+        cheaply find the blocks that changed between versions of a course. The returned usage keys are branch
+        and version agnostic.
+        """
+        if not isinstance(course_key, CourseLocator) or course_key.deprecated:
+            # The supplied CourseKey is of the wrong type, so it can't possibly be stored in this modulestore.
+            raise ItemNotFoundError(course_key)
+
+        course = self._lookup_course(course_key)
+        agnostic_course_key = course_key.for_branch(None).version_agnostic()
+
+        def make_usage_key(block_key):
+            return agnostic_course_key.make_usage_key(block_type=block_key.type, block_id=block_key.id)
+
+        return {
+            make_usage_key(block_key): (
+                block_data.edit_info.update_version,
+                [make_usage_key(BlockKey(*child)) for child in block_data.fields.get('children', [])],
+            )
+            for block_key, block_data in course.structure['blocks'].items()
+        }
+
     def get_course_index_info(self, course_key):
         """
         The index records the initial creation of the indexed course and tracks the current version
@@ -1772,6 +2077,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 skip_auto_publish=True,
                 **kwargs
             )
+            if self.asset_metadata_index:
+                # The asset metadata isn't part of the structures shared with the source course.
+                for branch in source_index['versions']:
+                    self._copy_indexed_asset_metadata(
+                        source_course_id.for_branch(branch), dest_course_id.for_branch(branch)
+                    )
             # don't copy assets until we create the course in case something's awry
             super().clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
             return new_course
@@ -1919,6 +2230,16 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 self._update_search_targets(index_entry, fields)
             self.insert_course_index(locator, index_entry)
 
+            if self._uses_asset_metadata_index(locator):
+                # The asset metadata index may still have the assets of a deleted course with the same
+                # key.  The course starts with the assets of its structures instead.
+                for branch, version_guid in versions_dict.items():
+                    branch_key = locator.for_branch(branch)
+                    self.delete_all_asset_metadata_docs(branch_key)
+                    self.save_asset_metadata_docs(branch_key, list(itertools.chain.from_iterable(
+                        self.get_structure(locator, version_guid).get('assets', {}).values()
+                    )))
+
             # expensive hack to persist default field values set in __init__ method (e.g., wiki_slug)
             if isinstance(locator, LibraryLocator):
                 course = self.get_library(locator, **kwargs)
@@ -2609,10 +2930,18 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         Only removes the course from the index. The data remains. You can use create_course
         with a versions hash to restore the course; however, the edited_on and
         edited_by won't reflect the originals, of course.
+
+        When the asset metadata index is used, the asset metadata of the course is deleted from it,
+        and a restored course gets the assets of its structures.
         """
         # this is the only real delete in the system. should it do something else?
         log.info("deleting course from split-mongo: %s", course_key)
+        index_entry = self.get_course_index(course_key) if self.asset_metadata_index else None
         self.delete_course_index(course_key)
+        if index_entry is not None:
+            for branch in index_entry['versions']:
+                if self._uses_asset_metadata_index(course_key.for_branch(branch)):
+                    self.delete_all_asset_metadata_docs(course_key.for_branch(branch))
 
         # We do NOT call the super class here since we need to keep the assets
         # in case the course is later restored.
@@ -2694,6 +3023,80 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         """
         return ModuleStoreEnum.Type.split
 
+    def _uses_asset_metadata_index(self, course_key):
+        """
+        Returns whether the asset metadata of the given course branch is kept in the asset metadata
+        index rather than in its structure.  The assets of a course identified only by a version are
+        always those of the structure.
+        """
+        return bool(self.asset_metadata_index and course_key.org and course_key.branch)
+
+    def _check_asset_metadata_course(self, course_key):
+        """
+        Raises ItemNotFoundError if the given branch of the given course doesn't exist, as looking up
+        the assets in its structure would.
+        """
+        index_entry = self.get_course_index(course_key)
+        if index_entry is None or course_key.branch not in index_entry['versions']:
+            raise ItemNotFoundError(course_key)
+
+    def _copy_indexed_asset_metadata(self, source_course_key, dest_course_key):
+        """
+        Replaces the asset metadata of the given course branch in the asset metadata index with the
+        asset metadata of the given source course branch.
+        """
+        if self._uses_asset_metadata_index(source_course_key):
+            asset_docs = self.get_asset_metadata_docs(source_course_key)
+        else:
+            asset_docs = list(itertools.chain.from_iterable(self._find_course_assets(source_course_key).values()))
+        self.delete_all_asset_metadata_docs(dest_course_key)
+        self.save_asset_metadata_docs(dest_course_key, asset_docs)
+
+    def find_asset_metadata(self, asset_key, **kwargs):
+        """
+        Find the metadata for a particular course asset, in the asset metadata index if it's used.
+        """
+        course_key = asset_key.course_key
+        if not self._uses_asset_metadata_index(course_key):
+            return super().find_asset_metadata(asset_key, **kwargs)
+
+        self._check_asset_metadata_course(course_key)
+        asset_doc = self.get_asset_metadata_doc(course_key, asset_key.asset_type, asset_key.path)
+        if asset_doc is None:
+            return None
+        mdata = AssetMetadata(asset_key, asset_key.path, **kwargs)
+        mdata.from_storable(asset_doc)
+        return mdata
+
+    def get_all_asset_metadata(self, course_key, asset_type, start=0, maxresults=-1, sort=None, **kwargs):
+        """
+        Returns a list of asset metadata for all assets of the given asset_type in the course. When the
+        asset metadata index is used, only the requested page of assets is read, in the requested order.
+
+        See ModuleStoreAssetBase.get_all_asset_metadata for the arguments.
+        """
+        if not self._uses_asset_metadata_index(course_key):
+            return super().get_all_asset_metadata(course_key, asset_type, start, maxresults, sort, **kwargs)
+
+        self._check_asset_metadata_course(course_key)
+        sort_field = 'filename'
+        ascending = True
+        if sort:
+            if sort[0] == 'uploadDate':
+                sort_field = 'edit_info.edited_on'
+            if sort[1] == ModuleStoreEnum.SortOrder.descending:
+                ascending = False
+
+        ret_assets = []
+        for asset_doc in self.get_asset_metadata_docs(
+            course_key, asset_type, start, maxresults, sort_field, ascending
+        ):
+            asset_key = course_key.make_asset_key(asset_doc['asset_type'], asset_doc['filename'])
+            new_asset = AssetMetadata(asset_key)
+            new_asset.from_storable(asset_doc)
+            ret_assets.append(new_asset)
+        return ret_assets
+
     def _find_course_assets(self, course_key):
         """
         Split specific lookup
@@ -2716,7 +3119,22 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         The update function can raise an exception if it doesn't want to actually do the commit. The
         surrounding method probably should catch that exception.
+
+        When the asset metadata index is used, the function is only passed the metadata of the given
+        asset, and only that asset is updated, without versioning the structure.
         """
+        course_key = asset_key.course_key
+        if self._uses_asset_metadata_index(course_key):
+            self._check_asset_metadata_course(course_key)
+            asset_doc = self.get_asset_metadata_doc(course_key, asset_key.asset_type, asset_key.path)
+            all_assets = SortedAssetList(iterable=[asset_doc] if asset_doc is not None else [])
+            all_assets_updated = list(update_function(all_assets, all_assets.find(asset_key)))
+            if all_assets_updated:
+                self.save_asset_metadata_docs(course_key, all_assets_updated)
+            else:
+                self.delete_asset_metadata_doc(course_key, asset_key.asset_type, asset_key.path)
+            return
+
         with self.bulk_operations(asset_key.course_key):
             original_structure = self._lookup_course(asset_key.course_key).structure
             index_entry = self._get_index_if_valid(asset_key.course_key)
@@ -2748,6 +3166,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         asset_key = asset_metadata_list[0].asset_id
         course_key = asset_key.course_key
 
+        if self._uses_asset_metadata_index(course_key):
+            self._check_asset_metadata_course(course_key)
+            # Only the given assets are written, rather than all of the assets of their types.
+            assets_by_type = self._save_assets_by_type(course_key, asset_metadata_list, {}, user_id, import_only)
+            self.save_asset_metadata_docs(
+                course_key, list(itertools.chain.from_iterable(assets_by_type.values()))
+            )
+            return
+
         with self.bulk_operations(course_key):
             original_structure = self._lookup_course(course_key).structure
             index_entry = self._get_index_if_valid(course_key)
@@ -2838,6 +3265,11 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             source_course_key (CourseKey): identifier of course to copy from
             dest_course_key (CourseKey): identifier of course to copy to
         """
+        if self._uses_asset_metadata_index(dest_course_key):
+            self._check_asset_metadata_course(dest_course_key)
+            self._copy_indexed_asset_metadata(source_course_key, dest_course_key)
+            return
+
         source_structure = self._lookup_course(source_course_key).structure
         with self.bulk_operations(dest_course_key):
             original_structure = self._lookup_course(dest_course_key).structure
@@ -3070,11 +3502,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         Given a structure, find block_key's parent in that structure. Note returns
         the encoded format for parent
         """
-        return [
-            parent_block_key
-            for parent_block_key, value in structure['blocks'].items()
-            if block_key in value.fields.get('children', [])
-        ]
+        return self._get_parents_index(structure).get_parents(block_key)
 
     def _sync_children(self, source_parent, destination_parent, new_child):
         """
@@ -3091,11 +3519,18 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         destination_parent.fields['children'] = destination_reordered
         return orphans
 
-    def _copy_subdag(self, user_id, destination_version, block_key, source_blocks, destination_blocks, blacklist):
+    def _copy_subdag(
+        self, user_id, destination_version, block_key, source_blocks, destination_blocks, blacklist,
+        subtree_root=True,
+    ):
         """
         Update destination_blocks for the sub-dag rooted at block_key to be like the one in
         source_blocks excluding blacklist.
 
+        Descendants of block_key which were copied from the same version of their source block,
+        and whose children are unchanged, are left as they are, so that only the blocks which
+        changed since the last copy, such as the changes of a publish, get a new edit_info.
+
         Return any newly discovered orphans (as a set)
         """
         orphans = set()
@@ -3118,15 +3553,17 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 for index, child in enumerate(source_children):
                     if child not in blacklist:
                         destination_reordered[index] = child
-            # the history of the published leaps between publications and only points to
-            # previously published versions.
-            previous_version = destination_block.edit_info.update_version
-            destination_block = copy.deepcopy(new_block)
-            destination_block.fields['children'] = destination_reordered.compact_list()
-            destination_block.edit_info.previous_version = previous_version
-            destination_block.edit_info.update_version = destination_version
-            destination_block.edit_info.edited_by = user_id
-            destination_block.edit_info.edited_on = datetime.datetime.now(UTC)
+            destination_children = destination_reordered.compact_list()
+            if subtree_root or not self._is_unchanged_copy(destination_block, new_block, destination_children):
+                # the history of the published leaps between publications and only points to
+                # previously published versions.
+                previous_version = destination_block.edit_info.update_version
+                destination_block = copy.deepcopy(new_block)
+                destination_block.fields['children'] = destination_children
+                destination_block.edit_info.previous_version = previous_version
+                destination_block.edit_info.update_version = destination_version
+                destination_block.edit_info.edited_by = user_id
+                destination_block.edit_info.edited_on = datetime.datetime.now(UTC)
         else:
             destination_block = self._new_block(
                 user_id, new_block.block_type,
@@ -3153,12 +3590,28 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 if child not in blacklist:
                     orphans.update(
                         self._copy_subdag(
-                            user_id, destination_version, BlockKey(*child), source_blocks, destination_blocks, blacklist
+                            user_id, destination_version, BlockKey(*child), source_blocks, destination_blocks,
+                            blacklist, subtree_root=False,
                         )
                     )
         destination_blocks[block_key] = destination_block
         return orphans
 
+    @staticmethod
+    def _is_unchanged_copy(destination_block, source_block, children):
+        """
+        Returns whether destination_block was copied from the current version of source_block and
+        has the given children, so that copying source_block again would only change its edit_info.
+        """
+        source_version = source_block.edit_info.source_version or source_block.edit_info.update_version
+        return (
+            destination_block.edit_info.source_version == source_version and
+            destination_block.definition == source_block.definition and
+            destination_block.fields == dict(source_block.fields, children=children) and
+            destination_block.get_asides() == source_block.get_asides() and
+            destination_block.defaults == source_block.defaults
+        )
+
     def _filter_blacklist(self, fields, blacklist):
         """
         Filter out blacklist from the children field in fields. Will construct a new list for children;
@@ -3176,6 +3629,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         """
         if len(self._get_parents_from_structure(orphan, structure)) == 0:
             orphan_data = structure['blocks'].pop(orphan)
+            parents_index = self._get_cached_parents_index(structure)
+            if parents_index is not None:
+                parents_index.remove_block(orphan)
             for child in orphan_data.fields.get('children', []):
                 self._delete_if_true_orphan(BlockKey(*child), structure)
 
@@ -3254,6 +3710,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         be a json dict key.
         """
         structure['blocks'][block_key] = content
+        parents_index = self._get_cached_parents_index(structure)
+        if parents_index is not None:
+            parents_index.update_block(block_key, content)
 
     @autoretry_read()
     def find_courses_by_search_target(self, field_name, field_value):
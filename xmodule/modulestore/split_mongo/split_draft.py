@@ -1,6 +1,8 @@
 """
 Module for the dual-branch fall-back Draft->Published Versioning ModuleStore
 """
+from collections import defaultdict
+
 from edx_django_utils.monitoring import function_trace
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator, LibraryUsageLocator
 
@@ -60,6 +62,21 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         course_id = self._map_revision_to_branch(course_id)
         return super().get_course(course_id, depth=depth, **kwargs)
 
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        See :py:meth: xmodule.modulestore.split_mongo.split.SplitMongoModuleStore.get_courses_by_keys
+        """
+        course_keys_by_branch_key = defaultdict(list)
+        for course_key in course_keys:
+            if isinstance(course_key, CourseLocator):
+                course_keys_by_branch_key[self._map_revision_to_branch(course_key)].append(course_key)
+        courses = super().get_courses_by_keys(list(course_keys_by_branch_key), depth=depth, **kwargs)
+        return {
+            course_key: course
+            for branch_course_key, course in courses.items()
+            for course_key in course_keys_by_branch_key[branch_course_key]
+        }
+
     def get_library(self, library_id, depth=0, head_validation=True, **kwargs):
         if not head_validation and library_id.version_guid:
             return SplitMongoModuleStore.get_library(
@@ -320,6 +337,14 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         course_key = self._map_revision_to_branch(course_key)
         return super().get_orphans(course_key, **kwargs)
 
+    def get_block_versions(self, course_key, revision=None):
+        """
+        See :meth:`SplitMongoModuleStore.get_block_versions`; uses the branch setting for the revision if
+        none is given.
+        """
+        course_key = self._map_revision_to_branch(course_key, revision=revision)
+        return super().get_block_versions(course_key)
+
     def fix_not_found(self, course_key, user_id):  # lint-amnesty, pylint: disable=arguments-differ
         """
         Fix any children which point to non-existent blocks in the course's published and draft branches
@@ -336,36 +361,67 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         :param xblock: the block to check
         :return: True if the draft and published versions differ
         """
-        def get_course(branch_name):
-            return self._lookup_course(xblock.location.course_key.for_branch(branch_name)).structure
-
-        def get_block(course_structure, block_key):
-            return self._get_block_from_structure(course_structure, block_key)
-
-        draft_course = get_course(ModuleStoreEnum.BranchName.draft)
-        published_course = get_course(ModuleStoreEnum.BranchName.published)
-
-        def has_changes_subtree(block_key):
-            draft_block = get_block(draft_course, block_key)
-            if draft_block is None:  # temporary fix for bad pointers TNL-1141
-                return True
-            published_block = get_block(published_course, block_key)
-            if published_block is None:
-                return True
-
-            # check if the draft has changed since the published was created
-            if self._get_version(draft_block) != self._get_version(published_block):
-                return True
-
-            # check the children in the draft
-            if 'children' in draft_block.fields:
-                return any(
-                    has_changes_subtree(child_block_id) for child_block_id in draft_block.fields['children']
-                )
-
-            return False
-
-        return has_changes_subtree(BlockKey.from_usage_key(xblock.location))
+        course_key = xblock.location.course_key
+        draft_course = self._lookup_course(course_key.for_branch(ModuleStoreEnum.BranchName.draft)).structure
+        published_course = self._lookup_course(course_key.for_branch(ModuleStoreEnum.BranchName.published)).structure
+        block_key = BlockKey.from_usage_key(xblock.location)
+
+        if self.request_cache is None or self._is_structure_being_edited(course_key, draft_course) or \
+                self._is_structure_being_edited(course_key, published_course):
+            return block_key in self._find_changed_blocks(draft_course, published_course, [block_key])
+
+        # Find which blocks have changes at once for all the blocks of the course, such as for the
+        # course outline, which checks each block.
+        changed_blocks_cache = self.request_cache.data.setdefault('changed_blocks_cache', {})
+        versions = (draft_course['_id'], published_course['_id'])
+        if versions not in changed_blocks_cache:
+            changed_blocks_cache[versions] = self._find_changed_blocks(
+                draft_course, published_course, list(draft_course['blocks'])
+            )
+        return block_key in changed_blocks_cache[versions] or block_key not in draft_course['blocks']
+
+    def _is_structure_being_edited(self, course_key, structure):
+        """
+        Returns whether the given structure was created by the active bulk operation on the course, if any,
+        in which case its blocks may still be changed in place.  Other structures are never changed.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        return bulk_write_record.active and structure['_id'] in bulk_write_record.structures and \
+            structure['_id'] not in bulk_write_record.structures_in_db
+
+    def _find_changed_blocks(self, draft_structure, published_structure, block_keys):
+        """
+        Returns the set of the given blocks and of their descendants in the draft structure which
+        have unpublished changes: those which aren't published, or whose published version differs
+        from their draft version, or which have such descendants.  Blocks referenced as children
+        but missing from the draft structure are considered changed as well.
+        """
+        draft_blocks = draft_structure['blocks']
+        published_blocks = published_structure['blocks']
+        changed_blocks = set()
+        visited_blocks = set()
+        for root_key in block_keys:
+            # Visit the blocks depth first, deciding whether a block has changes after its children.
+            stack = [(root_key, False)]
+            while stack:
+                block_key, children_visited = stack.pop()
+                if children_visited:
+                    if any(BlockKey(*child) in changed_blocks for child in draft_blocks[block_key].fields['children']):
+                        changed_blocks.add(block_key)
+                    continue
+                if block_key in visited_blocks:
+                    continue
+                visited_blocks.add(block_key)
+
+                draft_block = draft_blocks.get(block_key)
+                published_block = published_blocks.get(block_key)
+                if draft_block is None or published_block is None or \
+                        self._get_version(draft_block) != self._get_version(published_block):
+                    changed_blocks.add(block_key)
+                elif draft_block.fields.get('children'):
+                    stack.append((block_key, True))
+                    stack.extend((BlockKey(*child), False) for child in draft_block.fields['children'])
+        return changed_blocks
 
     def publish(self, location, user_id, blacklist=None, **kwargs):  # lint-amnesty, pylint: disable=arguments-differ
         """
@@ -3,6 +3,7 @@
 """
 
 
+import hashlib
 import logging
 import mimetypes
 import shutil
@@ -167,6 +168,20 @@ class TestContentstore(unittest.TestCase):
         assert count == 0
         assert not course_assets
 
+    @ddt.data(True, False)
+    def test_get_content_digests(self, deprecated):
+        """
+        Test get_content_digests_for_course
+        """
+        self.set_up_assets(deprecated)
+        digests = self.contentstore.get_content_digests_for_course(self.course1_key)
+        assert len(digests) == len(self.course1_files)
+        for filename in self.course1_files:
+            asset_key = self.course1_key.make_asset_key('asset', filename)
+            with open(f"{DATA_DIR}/static/{filename}", "rb") as f:
+                assert digests[str(asset_key)]['custom_md5'] == hashlib.md5(f.read()).hexdigest()
+            assert digests[str(asset_key)]['displayname'] == filename
+
     @ddt.data(True, False)
     def test_attrs(self, deprecated):
         """
@@ -15,6 +15,8 @@ and then for each combination of modulestores, performing the sequence:
 
 import itertools
 import os
+import tarfile
+from io import BytesIO
 from shutil import rmtree
 from tempfile import mkdtemp
 from unittest.mock import patch
@@ -30,7 +32,7 @@ from xmodule.modulestore.tests.utils import (
     TEST_DATA_DIR,
     MongoContentstoreBuilder,
 )
-from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_exporter import export_course_to_tarball, export_course_to_xml
 from xmodule.modulestore.xml_importer import import_course_from_xml
 from xmodule.partitions.tests.test_partitions import PartitionTestCase
 from xmodule.tests import CourseComparisonTest
@@ -207,3 +209,39 @@ class CrossStoreXMLRoundtrip(CourseComparisonTest, PartitionTestCase):
                         dest_course = dest_store.get_course(dest_course_key, depth=None, lazy=False)  # lint-amnesty, pylint: disable=no-member
 
                         assert dest_course.url_name == 'course'
+
+    @patch('xmodule.video_block.video_block.edxval_api', None)
+    @ddt.data(*COURSE_DATA_NAMES)
+    def test_export_to_tarball(self, course_data_name):
+        with MongoContentstoreBuilder().build() as contentstore:
+            with SPLIT_MODULESTORE_SETUP.build(contentstore=contentstore) as store:
+                course_key = store.make_course_key('a', course_data_name, '2015_Fall')  # lint-amnesty, pylint: disable=no-member
+                import_course_from_xml(
+                    store,
+                    ModuleStoreEnum.UserID.test,
+                    TEST_DATA_DIR,
+                    source_dirs=[course_data_name],
+                    static_content_store=contentstore,
+                    target_id=course_key,
+                    raise_on_failure=True,
+                    create_if_not_present=True,
+                )
+
+                export_course_to_xml(store, contentstore, course_key, self.export_dir, EXPORTED_COURSE_DIR_NAME)
+                tarball = BytesIO()
+                export_course_to_tarball(
+                    store, contentstore, course_key, EXPORTED_COURSE_DIR_NAME, tarball, max_workers=2,
+                )
+
+        # The tarball extracts to the same files as the export to a directory.
+        tarball_dir = path(mkdtemp())
+        self.addCleanup(rmtree, tarball_dir, ignore_errors=True)
+        tarball.seek(0)
+        with tarfile.open(fileobj=tarball, mode='r:gz') as tar_file:
+            tar_file.extractall(tarball_dir)
+        exported_files = sorted(
+            file_path.relpath(self.export_dir) for file_path in path(self.export_dir).walkfiles()
+        )
+        assert sorted(file_path.relpath(tarball_dir) for file_path in tarball_dir.walkfiles()) == exported_files
+        for file_path in exported_files:
+            assert (tarball_dir / file_path).bytes() == (path(self.export_dir) / file_path).bytes(), file_path
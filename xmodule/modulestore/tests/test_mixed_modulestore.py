@@ -966,6 +966,34 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
         for key in locations:
             assert not self._has_changes(locations[key])
 
+    @ddt.data(ModuleStoreEnum.Type.split)
+    def test_publish_unchanged_children(self, default_ms):
+        """
+        Tests that publishing a subtree only versions its root and its changed blocks
+        """
+        locations = self.setup_has_changes(default_ms)
+
+        def published_version(key):
+            """ Returns the update_version of the published version of the given block """
+            published_location = locations[key].for_branch(ModuleStoreEnum.BranchName.published)
+            return self.store.get_item(published_location).update_version
+
+        child_version = published_version('child')
+        child_sibling_version = published_version('child_sibling')
+
+        child = self.store.get_item(locations['child'])
+        child.display_name = 'Changed Display Name'
+        self.store.update_item(child, self.user_id)
+        # The changed blocks are cached per draft version, so the edit is seen.
+        assert self._has_changes(locations['parent'])
+        assert not self._has_changes(locations['child_sibling'])
+
+        self.store.publish(locations['parent'], self.user_id)
+        assert published_version('child') != child_version
+        assert published_version('child_sibling') == child_sibling_version
+        for key in locations:
+            assert not self._has_changes(locations[key])
+
     @ddt.data(ModuleStoreEnum.Type.split)
     def test_has_changes_publish_ancestors(self, default_ms):
         """
@@ -1227,6 +1255,29 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
             published_courses = self.store.get_courses(remove_branch=True)
         assert [c.id for c in draft_courses] == [c.id for c in published_courses]
 
+    @ddt.data(ModuleStoreEnum.Type.split)
+    def test_get_courses_by_keys(self, default_ms):
+        """
+        Test that get_courses_by_keys returns the courses which exist, looking them up together.
+        """
+        self.initdb(default_ms)
+        other_course = self.store.create_course('org', 'other', 'run', self.user_id)
+        course_key = self.course_locations[self.MONGO_COURSEID].course_key
+        missing_course_key = self.store.make_course_key('org', 'missing', 'run')
+
+        # The course indexes are looked up in one query, and the structures are got together.
+        db_connection = self.store._get_modulestore_by_type(default_ms).db_connection  # pylint: disable=protected-access
+        with self.assertNumQueries(1):
+            with patch.object(db_connection, 'get_structures', wraps=db_connection.get_structures) as mock_get:
+                with patch.object(db_connection, 'get_structure') as mock_get_structure:
+                    courses = self.store.get_courses_by_keys([course_key, other_course.id, missing_course_key])
+        assert mock_get.call_count == 1
+        assert len(mock_get.call_args[0][0]) == 2
+        mock_get_structure.assert_not_called()
+        assert set(courses) == {course_key, other_course.id}
+        assert courses[course_key].id == course_key
+        assert courses[other_course.id].location == other_course.location
+
     @ddt.data(ModuleStoreEnum.Type.split)
     def test_create_child_detached_tabs(self, default_ms):
         """
@@ -0,0 +1,211 @@
+""" Test the behavior of split_mongo/memory_connection """
+
+
+import datetime
+import unittest
+
+import ddt
+import pytz
+from bson.objectid import ObjectId
+from opaque_keys.edx.locator import CourseLocator
+
+from xmodule.assetstore import AssetMetadata
+from xmodule.modulestore import BlockData, ModuleStoreEnum
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.memory_connection import InMemoryPersistenceBackend, SQLitePersistenceBackend
+from xmodule.modulestore.split_mongo.mongo_connection import DuplicateKeyError
+from xmodule.modulestore.tests.utils import VersioningModulestoreBuilder
+
+COURSE_KEY = CourseLocator('org', 'course', 'run')
+ROOT = BlockKey('course', 'course')
+CHAPTER = BlockKey('chapter', 'chapter')
+
+
+@ddt.ddt
+class TestMemoryPersistenceBackends(unittest.TestCase):
+    """ Test that the backends store documents like MongoPersistenceBackend """
+
+    def _structure(self):
+        """
+        Returns a structure with a course and a chapter.
+        """
+        structure_id = ObjectId()
+        edit_info = {'edited_on': datetime.datetime.now(pytz.utc), 'update_version': structure_id}
+        return {
+            '_id': structure_id,
+            'root': ROOT,
+            'blocks': {
+                ROOT: BlockData(block_type='course', fields={'children': [CHAPTER]}, edit_info=edit_info),
+                CHAPTER: BlockData(block_type='chapter', fields={'display_name': 'Chapter'}, edit_info=edit_info),
+            },
+        }
+
+    @ddt.data(InMemoryPersistenceBackend, SQLitePersistenceBackend)
+    def test_structures(self, backend_class):
+        backend = backend_class(host='unused', db='unused')
+        structure = self._structure()
+        backend.insert_structure(structure)
+        with self.assertRaises(DuplicateKeyError):
+            backend.insert_structure(structure)
+
+        stored_structure = backend.get_structure(structure['_id'])
+        assert stored_structure['root'] == ROOT
+        assert stored_structure['blocks'][ROOT].fields['children'] == [CHAPTER]
+        assert stored_structure['blocks'][CHAPTER].fields == {'display_name': 'Chapter'}
+        assert stored_structure['blocks'][CHAPTER] is not structure['blocks'][CHAPTER]
+        assert backend.get_structure(ObjectId()) is None
+
+        assert [found['_id'] for found in backend.find_structures_by_id([ObjectId(), structure['_id']])] ==\
+            [structure['_id']]
+        courselike_blocks = backend.find_courselike_blocks_by_id([structure['_id']], 'chapter')
+        assert list(courselike_blocks[0]['blocks']) == [CHAPTER]
+
+    @ddt.data(InMemoryPersistenceBackend, SQLitePersistenceBackend)
+    def test_course_indexes(self, backend_class):
+        backend = backend_class()
+        structure_id = ObjectId()
+        backend.insert_course_index({
+            'org': 'org', 'course': 'course', 'run': 'run',
+            'versions': {'draft-branch': structure_id}, 'search_targets': {'wiki_slug': 'wiki'},
+        })
+        course_index = backend.get_course_index(COURSE_KEY)
+        assert course_index['versions'] == {'draft-branch': structure_id}
+        assert backend.get_course_index(CourseLocator('ORG', 'Course', 'run')) is None
+        assert backend.get_course_index(CourseLocator('ORG', 'Course', 'run'), ignore_case=True) == course_index
+
+        assert len(backend.find_matching_course_indexes(branch='draft-branch')) == 1
+        assert len(backend.find_matching_course_indexes(branch='published-branch')) == 0
+        assert len(backend.find_matching_course_indexes(search_targets={'wiki_slug': 'wiki'}, org_target='org')) == 1
+        assert len(backend.find_matching_course_indexes(org_target='other')) == 0
+        assert len(backend.find_matching_course_indexes(course_keys=[COURSE_KEY, CourseLocator('a', 'b', 'c')])) == 1
+
+        updated_index = dict(course_index, versions={'draft-branch': structure_id, 'published-branch': structure_id})
+        backend.update_course_index(updated_index, from_index=course_index)
+        assert 'published-branch' in backend.get_course_index(COURSE_KEY)['versions']
+
+        # An update from an index which was updated in the meantime is discarded.
+        stale_index = dict(course_index, last_update=course_index['last_update'] - datetime.timedelta(seconds=1))
+        backend.update_course_index(dict(stale_index, versions={}), from_index=stale_index)
+        assert 'published-branch' in backend.get_course_index(COURSE_KEY)['versions']
+
+        backend.delete_course_index(COURSE_KEY)
+        assert backend.get_course_index(COURSE_KEY) is None
+
+    @ddt.data(InMemoryPersistenceBackend, SQLitePersistenceBackend)
+    def test_definitions(self, backend_class):
+        backend = backend_class()
+        definition_id = ObjectId()
+        backend.insert_definition({'_id': definition_id, 'block_type': 'html', 'fields': {'data': '<p>html</p>'}})
+        assert backend.get_definition(definition_id)['fields'] == {'data': '<p>html</p>'}
+        assert [definition['_id'] for definition in backend.get_definitions([ObjectId(), definition_id])] ==\
+            [definition_id]
+
+        backend._drop_database(connections=False)  # pylint: disable=protected-access
+        assert backend.get_definition(definition_id) is None
+
+    @ddt.data(
+        'xmodule.modulestore.split_mongo.memory_connection.InMemoryPersistenceBackend',
+        'xmodule.modulestore.split_mongo.memory_connection.SQLitePersistenceBackend',
+    )
+    def test_modulestore(self, persistence_backend):
+        with VersioningModulestoreBuilder().build_with_contentstore(
+            None, persistence_backend=persistence_backend
+        ) as store:
+            user_id = ModuleStoreEnum.UserID.test
+            course = store.create_course('org', 'course', 'run', user_id)
+            chapter = store.create_child(user_id, course.location, 'chapter', block_id='chapter')
+            html = store.create_child(user_id, chapter.location, 'html', fields={'data': '<p>html</p>'})
+            store.publish(html.location, user_id)
+
+            assert store.get_item(html.location).data == '<p>html</p>'
+            assert store.get_parent_location(html.location).block_id == 'chapter'
+            published_course = store.get_course(
+                course.id.for_branch(ModuleStoreEnum.BranchName.published), depth=None
+            )
+            assert published_course.get_children()[0].get_children()[0].data == '<p>html</p>'
+
+    @ddt.data(
+        'xmodule.modulestore.split_mongo.memory_connection.InMemoryPersistenceBackend',
+        'xmodule.modulestore.split_mongo.memory_connection.SQLitePersistenceBackend',
+    )
+    def test_asset_metadata_index(self, persistence_backend):
+        with VersioningModulestoreBuilder().build_with_contentstore(
+            None, persistence_backend=persistence_backend, asset_metadata_index=True
+        ) as store:
+            user_id = ModuleStoreEnum.UserID.test
+            course = store.create_course('org', 'course', 'run', user_id)
+            asset_keys = [course.id.make_asset_key('asset', filename) for filename in ('b.png', 'c.png', 'a.png')]
+            now = datetime.datetime.now(pytz.utc)
+            store.save_asset_metadata_list([
+                AssetMetadata(asset_key, edited_on=now + datetime.timedelta(seconds=index))
+                for index, asset_key in enumerate(asset_keys)
+            ], user_id, import_only=True)
+            store.save_asset_metadata(AssetMetadata(course.id.make_asset_key('video', 'd.mp4')), user_id)
+
+            # The assets aren't kept in the structures.
+            assert 'assets' not in store._lookup_course(  # pylint: disable=protected-access
+                course.id.for_branch(ModuleStoreEnum.BranchName.draft)
+            ).structure
+            assert store.find_asset_metadata(asset_keys[0]).asset_id.path == 'b.png'
+            assert store.find_asset_metadata(course.id.make_asset_key('asset', 'missing.png')) is None
+
+            def filenames(*args, **kwargs):
+                return [asset.asset_id.path for asset in store.get_all_asset_metadata(course.id, *args, **kwargs)]
+
+            assert filenames('asset') == ['a.png', 'b.png', 'c.png']
+            assert filenames('asset', start=1, maxresults=1) == ['b.png']
+            assert filenames('asset', sort=('uploadDate', ModuleStoreEnum.SortOrder.descending)) == \
+                ['a.png', 'c.png', 'b.png']
+            assert filenames(None) == ['a.png', 'b.png', 'c.png', 'd.mp4']
+
+            store.set_asset_metadata_attr(asset_keys[0], 'locked', True, user_id)
+            assert store.find_asset_metadata(asset_keys[0]).locked
+            assert store.delete_asset_metadata(asset_keys[1], user_id) == 1
+            assert store.delete_asset_metadata(asset_keys[1], user_id) == 0
+            assert filenames('asset') == ['a.png', 'b.png']
+
+            other_course = store.create_course('org', 'other', 'run', user_id)
+            store.copy_all_asset_metadata(course.id, other_course.id, user_id)
+            assert [asset.asset_id.path for asset in store.get_all_asset_metadata(other_course.id, None)] == \
+                ['a.png', 'b.png', 'd.mp4']
+
+    @ddt.data(
+        'xmodule.modulestore.split_mongo.memory_connection.InMemoryPersistenceBackend',
+        'xmodule.modulestore.split_mongo.memory_connection.SQLitePersistenceBackend',
+    )
+    def test_asset_metadata_index_course_lifecycle(self, persistence_backend):
+        with VersioningModulestoreBuilder().build_with_contentstore(
+            None, persistence_backend=persistence_backend, asset_metadata_index=True
+        ) as store:
+            user_id = ModuleStoreEnum.UserID.test
+
+            def filenames(course_key):
+                return [asset.asset_id.path for asset in store.get_all_asset_metadata(course_key, None)]
+
+            course = store.create_course('org', 'course', 'run', user_id)
+            with store.bulk_operations(course.id):
+                store.save_asset_metadata(AssetMetadata(course.id.make_asset_key('asset', 'a.png')), user_id)
+                store.save_asset_metadata(AssetMetadata(course.id.make_asset_key('asset', 'b.png')), user_id)
+                store.delete_asset_metadata(course.id.make_asset_key('asset', 'b.png'), user_id)
+                # The changes are only written at the end of the bulk operation.
+                assert store.db_connection.find_asset_metadata(course.id, 'asset', 'a.png') is None
+                assert filenames(course.id) == ['a.png']
+            assert store.db_connection.find_asset_metadata(course.id, 'asset', 'a.png') is not None
+            assert filenames(course.id) == ['a.png']
+
+            # A new course with the key of a deleted course doesn't get its assets.
+            store.delete_course(course.id, user_id)
+            assert store.db_connection.find_asset_metadata(course.id, 'asset', 'a.png') is None
+            course = store.create_course('org', 'course', 'run', user_id)
+            assert filenames(course.id) == []
+
+            # A course created from the versions of another course gets the assets of their structures.
+            store.asset_metadata_index = False
+            structure_course = store.create_course('org', 'structure', 'run', user_id)
+            store.save_asset_metadata(AssetMetadata(structure_course.id.make_asset_key('asset', 'c.png')), user_id)
+            store.asset_metadata_index = True
+            store.delete_course(course.id, user_id)
+            course = store.create_course(
+                'org', 'course', 'run', user_id, versions_dict=store.get_course_index(structure_course.id)['versions'],
+            )
+            assert filenames(course.id) == ['c.png']
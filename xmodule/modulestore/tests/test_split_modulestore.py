@@ -3,19 +3,26 @@
 """
 
 
+import copy
 import datetime
 import os
+import pickle
 import random
 import re
+import time
 import unittest
+import zlib
 from importlib import import_module
 from unittest.mock import patch
 
 import pytest
 import ddt
+from bson.objectid import ObjectId
 from ccx_keys.locator import CCXBlockUsageLocator
 from django.core.cache import InvalidCacheBackendError, caches
+from django.test.utils import override_settings
 from opaque_keys.edx.locator import BlockUsageLocator, CourseKey, CourseLocator, LocalId
+from pytz import UTC
 from testfixtures import LogCapture
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
 
@@ -31,13 +38,14 @@ from xmodule.modulestore.exceptions import (
     DuplicateItemError,
     InsufficientSpecificationError,
     ItemNotFoundError,
+    ReferentialIntegrityError,
     VersionConflictError
 )
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.modulestore.split_mongo import BlockKey
-from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache
+from xmodule.modulestore.split_mongo.mongo_connection import STRUCTURE_CACHE_CODECS, CourseStructureCache
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
-from xmodule.modulestore.tests.factories import check_mongo_calls
+from xmodule.modulestore.tests.factories import check_mongo_calls, check_mongo_calls_range
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.tabs import CourseTab
@@ -772,6 +780,7 @@ class SplitModuleCourseTests(SplitModuleTest):
         assert root_block_key.block_id == 'course'
 
 
+@ddt.ddt
 class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
     """Tests for the CourseStructureCache"""
 
@@ -879,6 +888,56 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
         # data chunk was less than 1MB so no logs were added.
         self.assertEqual(len(capture.records), 0)
 
+    @ddt.data('pickle', 'msgpack')
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_codecs(self, codec, mock_get_cache):
+        mock_get_cache.return_value = caches['default']
+        structure = self._get_structure(self.new_course)
+
+        with override_settings(COURSE_STRUCTURE_CACHE_CODEC=codec):
+            CourseStructureCache().set('structure', structure)
+        # Cached structures are decoded with the codec they were encoded with.
+        with override_settings(COURSE_STRUCTURE_CACHE_CODEC='msgpack' if codec == 'pickle' else 'pickle'):
+            assert CourseStructureCache().get('structure') == structure
+
+    @ddt.data('pickle', 'msgpack')
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_chunks(self, codec, mock_get_cache):
+        enabled_cache = caches['default']
+        mock_get_cache.return_value = enabled_cache
+        structure = self._get_structure(self.new_course)
+
+        with override_settings(COURSE_STRUCTURE_CACHE_CODEC=codec, COURSE_STRUCTURE_CACHE_CHUNK_SIZE=100):
+            course_cache = CourseStructureCache()
+            course_cache.set('structure', structure)
+            assert enabled_cache.get('structure.1') is not None
+            assert course_cache.get('structure') == structure
+
+            # A structure missing any of its chunks isn't cached.
+            enabled_cache.delete('structure.1')
+            assert course_cache.get('structure') is None
+
+            # A structure with a corrupt chunk is removed from the cache.
+            course_cache.set('structure', structure)
+            enabled_cache.set('structure.1', b'bad_data')
+            assert course_cache.get('structure') is None
+            assert enabled_cache.get('structure') is None
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_original_format(self, mock_get_cache):
+        enabled_cache = caches['default']
+        mock_get_cache.return_value = enabled_cache
+        structure = self._get_structure(self.new_course)
+
+        # Structures cached before the codecs, pickled and compressed without a header, can be read.
+        enabled_cache.set('structure', zlib.compress(pickle.dumps(structure, 4), 1))
+        with override_settings(COURSE_STRUCTURE_CACHE_CODEC='msgpack'):
+            assert CourseStructureCache().get('structure') == structure
+
+        # And are still written in that format by the pickle codec.
+        CourseStructureCache().set('structure', structure)
+        assert pickle.loads(zlib.decompress(enabled_cache.get('structure'))) == structure
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
@@ -888,6 +947,254 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
         )
 
 
+class TestDeduplicatedStructures(SplitModuleTest):
+    """
+    Tests for writing and reading structures in the deduplicated format.
+    """
+    def setUp(self):
+        super().setUp()
+        self.db_connection = modulestore().db_connection
+        self.db_connection.deduplicate_structure_blocks = True
+        self.user = random.getrandbits(32)
+
+    def _get_structure(self, version_guid):
+        """
+        Returns the structure of the given version, reading it from the db.
+        """
+        self.db_connection.block_entry_cache.clear()
+        return self.db_connection.get_structure(version_guid)
+
+    def test_write_and_read(self):
+        course = modulestore().create_course('org', 'course', 'test_run', self.user, BRANCH_NAME_DRAFT)
+        chapter = modulestore().create_child(self.user, course.location, 'chapter', fields={'display_name': 'One'})
+        modulestore().create_child(self.user, chapter.location.version_agnostic(), 'sequential')
+        course = modulestore().get_course(course.id.version_agnostic())
+
+        version_guid = course.location.version_guid
+        doc = self.db_connection.structures.find_one({'_id': version_guid})
+        assert 'blocks' not in doc
+        structure = self._get_structure(version_guid)
+        assert [block_key.id for block_key in structure['blocks']] == [
+            self.db_connection.structure_blocks.find_one({'_id': block_hash})['block']['block_id']
+            for block_hash in doc['block_hashes']
+        ]
+        assert structure['blocks'][BlockKey.from_usage_key(chapter.location)].fields['display_name'] == 'One'
+        assert modulestore().get_item(chapter.location.version_agnostic()).display_name == 'One'
+
+        # The blocks which are unchanged between versions of the structure are only stored once.
+        block_hashes = [
+            block_hash
+            for doc in self.db_connection.structures.find({'block_hashes': {'$exists': True}})
+            for block_hash in doc['block_hashes']
+        ]
+        assert self.db_connection.structure_blocks.count_documents({}) == len(set(block_hashes)) < len(block_hashes)
+
+    def test_deduplicate_structures(self):
+        self.db_connection.deduplicate_structure_blocks = False
+        course = modulestore().create_course('org', 'course', 'test_run', self.user, BRANCH_NAME_DRAFT)
+        modulestore().create_child(self.user, course.location, 'chapter')
+        structure_ids = [doc['_id'] for doc in self.db_connection.structures.find({}, {'_id': 1})]
+        structures = [self._get_structure(structure_id) for structure_id in structure_ids]
+
+        assert sorted(self.db_connection.deduplicate_structures(batch_size=2)) == sorted(structure_ids)
+        assert self.db_connection.structures.count_documents({'blocks': {'$exists': True}}) == 0
+        assert [self._get_structure(structure_id) for structure_id in structure_ids] == structures
+        assert self.db_connection.find_structures_by_id(structure_ids[:1]) == structures[:1]
+
+    def test_find_unreferenced_block_entries(self):
+        course = modulestore().create_course('org', 'course', 'test_run', self.user, BRANCH_NAME_DRAFT)
+        chapter = modulestore().create_child(self.user, course.location, 'chapter')
+        modulestore().delete_item(chapter.location.version_agnostic(), self.user)
+        assert not self.db_connection.find_unreferenced_block_entries()
+
+        # Remove the version which added the chapter, along with the old versions of the course
+        # block, as pruning would.
+        first_version_guid = course.location.version_guid
+        self.db_connection.structures.delete_many({'_id': {'$ne': first_version_guid}})
+        first_version_hashes = self.db_connection.structures.find_one({'_id': first_version_guid})['block_hashes']
+        expected = {entry['_id'] for entry in self.db_connection.structure_blocks.find()} - set(first_version_hashes)
+        assert expected
+
+        # The entries referenced by structures written after the cutoff are kept.
+        assert not self.db_connection.find_unreferenced_block_entries(self.db_connection.unreferenced_block_entry_cutoff())
+        cutoff = datetime.datetime.now(UTC) + datetime.timedelta(seconds=1)
+        unreferenced = self.db_connection.find_unreferenced_block_entries(cutoff)
+        assert unreferenced == expected
+        assert self.db_connection.delete_block_entries(unreferenced, cutoff) == len(expected)
+        assert self._get_structure(first_version_guid)['root'] == BlockKey('course', course.location.block_id)
+
+    def test_existing_block_entries_are_referenced(self):
+        course = modulestore().create_course('org', 'course', 'test_run', self.user, BRANCH_NAME_DRAFT)
+        long_ago = datetime.datetime(2000, 1, 1, tzinfo=UTC)
+        self.db_connection.structure_blocks.update_many({}, {'$set': {'last_referenced': long_ago}})
+
+        # The new version shares the blocks of the course which are unchanged, whose entries
+        # can't be deleted until the version is written.
+        chapter = modulestore().create_child(self.user, course.location, 'chapter')
+        block_hashes = self.db_connection.structures.find_one(
+            {'_id': chapter.location.version_guid}
+        )['block_hashes']
+        cutoff = datetime.datetime.now(UTC) - datetime.timedelta(seconds=1)
+        assert self.db_connection.delete_block_entries(block_hashes, cutoff) == 0
+        assert self._get_structure(chapter.location.version_guid)['blocks']
+
+    def test_missing_block_entry(self):
+        course = modulestore().create_course('org', 'course', 'test_run', self.user, BRANCH_NAME_DRAFT)
+        version_guid = course.location.version_guid
+        self.db_connection.structure_blocks.delete_many({})
+        with pytest.raises(ReferentialIntegrityError):
+            self._get_structure(version_guid)
+
+    def test_find_courselike_blocks_reads_root_block_entry(self):
+        course = modulestore().create_course('org', 'course', 'test_run', self.user, BRANCH_NAME_DRAFT)
+        modulestore().create_child(self.user, course.location, 'chapter')
+        version_guid = modulestore().get_course(course.id.version_agnostic()).location.version_guid
+        self.db_connection.block_entry_cache.clear()
+
+        with patch.object(
+            self.db_connection.block_entry_cache, 'set_many', wraps=self.db_connection.block_entry_cache.set_many
+        ) as mock_set_many:
+            structures = self.db_connection.find_courselike_blocks_by_id([version_guid], 'course')
+        assert [list(structure['blocks']) for structure in structures] == [[BlockKey('course', 'course')]]
+        assert [len(call.args[0]) for call in mock_set_many.call_args_list] == [1]
+
+
+@unittest.skipUnless(os.environ.get('RUN_PERF_TESTS'), 'Performance test; set RUN_PERF_TESTS to run it.')
+class DeduplicatedStructuresBenchmark(SplitModuleTest):
+    """
+    Compares the time to write and read the versions of a large structure, and the space
+    they use, in the full and deduplicated formats.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    NUM_BLOCKS = 5000
+    NUM_VERSIONS = 50
+
+    def _structure_versions(self):
+        """
+        Yields NUM_VERSIONS versions of a structure with NUM_BLOCKS blocks, each changing
+        the display name of one block, like edits in Studio.
+        """
+        # pylint: disable=protected-access
+        store = modulestore()
+        structure = store._new_structure(self.user_id, BlockKey('course', 'course'))
+        for index in range(self.NUM_BLOCKS - 1):
+            structure['blocks'][BlockKey('html', f'html{index}')] = store._new_block(
+                self.user_id, 'html', {'display_name': f'Block {index}'}, ObjectId(), structure['_id'],
+            )
+        for version in range(self.NUM_VERSIONS):
+            structure = copy.deepcopy(structure)
+            structure['previous_version'], structure['_id'] = structure['_id'], ObjectId()
+            block = structure['blocks'][BlockKey('html', f'html{version}')]
+            block.fields['display_name'] = f'Edited block {version}'
+            block.edit_info.update_version = structure['_id']
+            yield structure
+
+    def _benchmark(self, deduplicate_structure_blocks):
+        """
+        Writes and reads the versions of the structure in the given format, and prints
+        the times taken and the size of the stored data.
+        """
+        db_connection = modulestore().db_connection
+        db_connection.deduplicate_structure_blocks = deduplicate_structure_blocks
+        structures = list(self._structure_versions())
+
+        start = time.perf_counter()
+        for structure in structures:
+            db_connection.insert_structure(structure)
+        write_time = time.perf_counter() - start
+
+        db_connection.block_entry_cache.clear()
+        start = time.perf_counter()
+        db_connection.get_structure(structures[0]['_id'])
+        cold_read_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for structure in structures[1:]:
+            db_connection.get_structure(structure['_id'])
+        read_time = (time.perf_counter() - start) / (len(structures) - 1)
+
+        size = sum(
+            db_connection.database.command('collStats', collection.name)['size']
+            for collection in (db_connection.structures, db_connection.structure_blocks)
+        )
+        print(
+            f'\n{"Deduplicated" if deduplicate_structure_blocks else "Full"} format, {self.NUM_VERSIONS} versions '
+            f'of {self.NUM_BLOCKS} blocks: write {write_time / len(structures) * 1000:.1f}ms per version, '
+            f'read {cold_read_time * 1000:.1f}ms cold, {read_time * 1000:.1f}ms warm, '
+            f'{size / 1024 / 1024:.1f}MB stored'
+        )
+
+    def test_full_format(self):
+        self._benchmark(deduplicate_structure_blocks=False)
+
+    def test_deduplicated_format(self):
+        self._benchmark(deduplicate_structure_blocks=True)
+
+
+@ddt.ddt
+@unittest.skipUnless(os.environ.get('RUN_PERF_TESTS'), 'Performance test; set RUN_PERF_TESTS to run it.')
+class CourseStructureCacheCodecBenchmark(SplitModuleTest):
+    """
+    Compares the time to encode and decode a large structure, and the size of the
+    encoded structure, with each codec of the course structure cache.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    # The type of the blocks at each level of the course outline, and their number per parent.
+    OUTLINE = (('chapter', 40), ('sequential', 5), ('vertical', 5), ('problem', 4))
+    NUM_RUNS = 5
+
+    def _structure(self):
+        """
+        Returns a structure in the shape of a course outline, with about 5000 blocks.
+        """
+        # pylint: disable=protected-access
+        store = modulestore()
+        structure = store._new_structure(self.user_id, BlockKey('course', 'course'))
+        parents = [structure['root']]
+        for block_type, num_children in self.OUTLINE:
+            children = []
+            for parent_key in parents:
+                parent_children = [
+                    BlockKey(block_type, f'{block_type}{len(children) + index}') for index in range(num_children)
+                ]
+                structure['blocks'][parent_key].fields['children'] = parent_children
+                children.extend(parent_children)
+            for block_key in children:
+                structure['blocks'][block_key] = store._new_block(
+                    self.user_id,
+                    block_type,
+                    {'display_name': f'{block_type} {block_key.id}', 'graded': True, 'weight': 1.0},
+                    ObjectId(),
+                    structure['_id'],
+                )
+            parents = children
+        return structure
+
+    @ddt.data(*STRUCTURE_CACHE_CODECS)
+    def test_codec(self, codec_name):
+        codec = STRUCTURE_CACHE_CODECS[codec_name]()
+        structure = self._structure()
+
+        start = time.perf_counter()
+        for _ in range(self.NUM_RUNS):
+            uncompressed_data, compressed_data = codec.encode(structure)
+        encode_time = (time.perf_counter() - start) / self.NUM_RUNS
+        start = time.perf_counter()
+        for _ in range(self.NUM_RUNS):
+            _, decoded_structure = codec.decode(compressed_data)
+        decode_time = (time.perf_counter() - start) / self.NUM_RUNS
+
+        assert decoded_structure == structure
+        print(
+            f'\n{codec_name} codec, {len(structure["blocks"])} blocks: encode {encode_time * 1000:.1f}ms, '
+            f'decode {decode_time * 1000:.1f}ms, {len(uncompressed_data) / 1024:.0f}KB encoded, '
+            f'{len(compressed_data) / 1024:.0f}KB compressed'
+        )
+
+
 class SplitModuleItemTests(SplitModuleTest):
     '''
     Item read tests including inheritance
@@ -1098,6 +1405,70 @@ class SplitModuleItemTests(SplitModuleTest):
         parent = modulestore().get_parent_location(locator)
         assert parent is None
 
+    def test_get_parents_in_bulk_operation(self):
+        """
+        Parents found while the structure is edited in a bulk operation reflect the edits.
+        """
+        user = random.getrandbits(32)
+        course = modulestore().create_course('test_org', 'test_parents', 'test_run', user, BRANCH_NAME_DRAFT)
+        with modulestore().bulk_operations(course.id):
+            chapter = modulestore().create_child(user, course.location, 'chapter')
+            sequential = modulestore().create_child(user, chapter.location, 'sequential')
+            assert modulestore().get_parent_location(sequential.location).block_id == chapter.location.block_id
+
+            other_chapter = modulestore().create_child(user, course.location, 'chapter')
+            chapter = modulestore().get_item(chapter.location.version_agnostic())
+            chapter.children.remove(sequential.location.version_agnostic())
+            modulestore().update_item(chapter, user)
+            other_chapter = modulestore().get_item(other_chapter.location.version_agnostic())
+            other_chapter.children.append(sequential.location.version_agnostic())
+            modulestore().update_item(other_chapter, user)
+            assert modulestore().get_parent_location(sequential.location.version_agnostic()).block_id ==\
+                other_chapter.location.block_id
+
+            modulestore().delete_item(other_chapter.location.version_agnostic(), user)
+            assert modulestore().get_parent_location(sequential.location.version_agnostic()) is None
+            assert modulestore().get_parent_location(chapter.location.version_agnostic()).block_id ==\
+                course.location.block_id
+
+    def test_get_item_with_depth_fetches_definitions_together(self):
+        """
+        The definitions of the descendants of a block got with a depth are fetched in one query.
+        """
+        user = random.getrandbits(32)
+        course = modulestore().create_course('test_org', 'test_definitions', 'test_run', user, BRANCH_NAME_DRAFT)
+        vertical = modulestore().create_child(user, course.location, 'vertical')
+        for index in range(5):
+            modulestore().create_child(
+                user, vertical.location.version_agnostic(), 'html', fields={'data': f'<p>{index}</p>'},
+            )
+        modulestore()._clear_cache()  # pylint: disable=protected-access
+
+        # One query for the structure, and one for the definitions of the vertical and its children.
+        with check_mongo_calls_range(max_finds=2):
+            vertical = modulestore().get_item(vertical.location.version_agnostic(), depth=1)
+            assert [child.data for child in vertical.get_children()] == [f'<p>{index}</p>' for index in range(5)]
+
+    def test_get_item_not_lazy_does_not_fetch_loaded_definitions(self):
+        """
+        Getting a block again without lazy loading doesn't fetch the definitions which are already loaded.
+        """
+        user = random.getrandbits(32)
+        course = modulestore().create_course('test_org', 'test_not_lazy', 'test_run', user, BRANCH_NAME_DRAFT)
+        vertical = modulestore().create_child(user, course.location, 'vertical')
+        for index in range(5):
+            modulestore().create_child(
+                user, vertical.location.version_agnostic(), 'html', fields={'data': f'<p>{index}</p>'},
+            )
+        modulestore()._clear_cache()  # pylint: disable=protected-access
+
+        with modulestore().bulk_operations(course.id):
+            modulestore().get_item(vertical.location.version_agnostic(), depth=1, lazy=False)
+            with check_mongo_calls(0):
+                vertical = modulestore().get_item(vertical.location.version_agnostic(), depth=1, lazy=False)
+                assert [child.data for child in vertical.get_children()] ==\
+                    [f'<p>{index}</p>' for index in range(5)]
+
     def test_get_children(self):
         """
         Test the existing get_children method on xblocks
@@ -1116,6 +1487,20 @@ class SplitModuleItemTests(SplitModuleTest):
             expected_ids.remove(child.location.block_id)
         assert len(expected_ids) == 0
 
+    def test_get_block_versions(self):
+        """
+        Test that get_block_versions matches the versions and children of the loaded xblocks
+        """
+        course_key = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        block_versions = modulestore().get_block_versions(course_key)
+        course = modulestore().get_course(course_key, depth=None)
+        usage_key = course.location.for_branch(None).version_agnostic()
+        version, children = block_versions[usage_key]
+        assert version == course.update_version
+        assert children == version_agnostic([child.for_branch(None) for child in course.children])
+        for child in children:
+            assert child in block_versions
+
 
 def version_agnostic(children):
     """
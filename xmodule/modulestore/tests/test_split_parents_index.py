@@ -0,0 +1,71 @@
+""" Test the behavior of split_mongo/StructureParentsIndex """
+
+
+import unittest
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo.parents_index import StructureParentsIndex
+from xmodule.util.keys import BlockKey
+
+COURSE = BlockKey('course', 'course')
+CHAPTER = BlockKey('chapter', 'chapter')
+OTHER_CHAPTER = BlockKey('chapter', 'other_chapter')
+SEQUENTIAL = BlockKey('sequential', 'sequential')
+ORPHAN = BlockKey('vertical', 'orphan')
+ORPHAN_CHILD = BlockKey('problem', 'orphan_child')
+
+
+def _block(*children):
+    """
+    Returns the BlockData of a block with the given children.
+    """
+    return BlockData(block_type='block', fields={'children': list(children)} if children else {})
+
+
+class TestStructureParentsIndex(unittest.TestCase):
+    """ Test that the index matches the children of the blocks of a structure """
+
+    def setUp(self):
+        super().setUp()
+        self.blocks = {
+            COURSE: _block(CHAPTER, OTHER_CHAPTER),
+            CHAPTER: _block(SEQUENTIAL),
+            OTHER_CHAPTER: _block(SEQUENTIAL),
+            SEQUENTIAL: _block(),
+            ORPHAN: _block(ORPHAN_CHILD),
+            ORPHAN_CHILD: _block(),
+        }
+        self.index = StructureParentsIndex(self.blocks)
+
+    def test_get_parents(self):
+        assert self.index.get_parents(COURSE) == []
+        assert self.index.get_parents(CHAPTER) == [COURSE]
+        assert self.index.get_parents(SEQUENTIAL) == [CHAPTER, OTHER_CHAPTER]
+        assert self.index.get_parents(ORPHAN_CHILD) == [ORPHAN]
+        assert self.index.get_parents(BlockKey('problem', 'missing')) == []
+
+    def test_has_path_to_root(self):
+        assert [
+            block_key for block_key in self.blocks if self.index.has_path_to_root(block_key)
+        ] == [COURSE, CHAPTER, OTHER_CHAPTER, SEQUENTIAL]
+
+    def test_update_block(self):
+        assert self.index.has_path_to_root(ORPHAN_CHILD) is False
+        self.blocks[SEQUENTIAL] = _block(ORPHAN)
+        self.index.update_block(SEQUENTIAL, self.blocks[SEQUENTIAL])
+        self.blocks[CHAPTER] = _block()
+        self.index.update_block(CHAPTER, self.blocks[CHAPTER])
+
+        assert self.index.get_parents(SEQUENTIAL) == [OTHER_CHAPTER]
+        assert self.index.get_parents(ORPHAN) == [SEQUENTIAL]
+        assert self.index.has_path_to_root(ORPHAN_CHILD) is True
+
+    def test_remove_block(self):
+        del self.blocks[OTHER_CHAPTER]
+        self.index.remove_block(OTHER_CHAPTER)
+        assert self.index.get_parents(SEQUENTIAL) == [CHAPTER]
+
+        del self.blocks[CHAPTER]
+        self.index.remove_block(CHAPTER)
+        assert self.index.get_parents(SEQUENTIAL) == []
+        assert self.index.has_path_to_root(SEQUENTIAL) is False
@@ -3,6 +3,7 @@ Tests for XML importer.
 """
 
 
+import hashlib
 import importlib
 import os
 import unittest
@@ -257,3 +258,27 @@ class StaticContentImporterTest(unittest.TestCase):  # lint-amnesty, pylint: dis
             )
             mock_file.assert_called_with(full_file_path, 'rb')
             self.mocked_content_store.generate_thumbnail.assert_called_once()
+
+    def test_import_static_file_unchanged(self):
+        base_dir = path('/path/to/dir')
+        full_file_path = os.path.join(base_dir, 'static/some_file.txt')
+        asset_key = self.static_content_importer.target_id.make_asset_key('asset', 'static_some_file.txt')
+        existing_asset = {
+            'custom_md5': hashlib.md5(b'data').hexdigest(),
+            'displayname': 'some_file.txt',
+            'contentType': 'text/plain',
+            'import_path': 'static/some_file.txt',
+        }
+        self.mocked_content_store.get_content_digests_for_course.return_value = {str(asset_key): existing_asset}
+        self.mocked_content_store.generate_thumbnail.return_value = (None, None)
+        with mock.patch(OPEN_BUILTIN, mock.mock_open(read_data=b"data")):
+            assert self.static_content_importer.import_static_file(full_file_path, base_dir=base_dir) ==\
+                ('static/some_file.txt', asset_key)
+            assert not self.mocked_content_store.save.called
+
+        with mock.patch(OPEN_BUILTIN, mock.mock_open(read_data=b"new data")):
+            self.static_content_importer.import_static_file(full_file_path, base_dir=base_dir)
+            self.mocked_content_store.save.assert_called_once()
+        self.mocked_content_store.get_content_digests_for_course.assert_called_once_with(
+            self.static_content_importer.target_id
+        )
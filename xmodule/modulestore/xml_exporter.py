@@ -3,13 +3,17 @@ Methods for exporting course data to XML
 """
 
 
+import io
 import logging
-import os
+import tarfile
+import time
 from abc import abstractmethod
 from json import dumps
 
 import lxml.etree
+from fs.memoryfs import MemoryFS
 from fs.osfs import OSFS
+from fs.path import relpath
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict, Scope
 from openedx.core.djangoapps.content_tagging.api import (
@@ -30,6 +34,9 @@ PUBLISHED_DIR = "published"
 
 DEFAULT_CONTENT_FIELDS = ['metadata', 'data']
 
+# The number of threads reading static assets from the contentstore when exporting to a tarball.
+DEFAULT_EXPORT_WORKERS = 4
+
 
 def _export_drafts(modulestore, course_key, export_fs, xml_centric_course_key):
     """
@@ -124,6 +131,10 @@ class ExportManager:
         self.courselike_key = courselike_key
         self.root_dir = root_dir
         self.target_dir = str(target_dir)
+        # The filesystem in memory of the export to a tarball, if any, and its files when the
+        # static assets were exported.
+        self._tarball_fs = None
+        self._files_before_static_assets = None
 
     @abstractmethod
     def get_key(self):
@@ -157,9 +168,73 @@ class ExportManager:
         """
         Perform the export given the parameters handed to this class at init.
         """
+        self._export(OSFS(self.root_dir))
+
+    def export_to_tarball(self, fileobj, max_workers=DEFAULT_EXPORT_WORKERS):
+        """
+        Perform the export as a gzipped tar stream written to `fileobj`, with the exported
+        files under `target_dir`, like the tarballs of exports made in Studio.  `root_dir` is
+        not used.
+
+        The blocks are serialized into memory on this thread, since xblock runtimes can't be
+        shared between threads.  The static assets are then written to the stream as they are
+        read from the contentstore by `max_workers` threads, so that the stream is compressed
+        while they are read.  The extracted files are the same as those of `export`.
+        """
+        with MemoryFS() as memory_fs:
+            self._tarball_fs = memory_fs
+            try:
+                self._export(memory_fs)
+                files_before_static_assets = self._files_before_static_assets
+            finally:
+                self._tarball_fs = self._files_before_static_assets = None
+
+            with tarfile.open(fileobj=fileobj, mode='w|gz') as tar_file:
+                for dir_path in sorted(memory_fs.walk.dirs()):
+                    _add_directory_to_tarball(tar_file, relpath(dir_path))
+
+                # When exporting to a directory, the files written after the static assets,
+                # like the legacy copy of the course image, replace assets with the same path.
+                # Extracting a tarball keeps the last of the members with the same path.
+                all_files = set(memory_fs.walk.files())
+                has_static_assets = files_before_static_assets is not None
+                for file_path in sorted(files_before_static_assets if has_static_assets else all_files):
+                    _add_file_to_tarball(tar_file, relpath(file_path), memory_fs.readbytes(file_path))
+
+                if has_static_assets:
+                    assets, __ = self.contentstore.get_all_content_for_course(self.courselike_key)
+                    for file_path, data in self.contentstore.iter_export_files(assets, max_workers):
+                        _add_file_to_tarball(tar_file, f'{self.target_dir}/static/{file_path}', data)
+                    _add_file_to_tarball(
+                        tar_file,
+                        f'{self.target_dir}/policies/assets.json',
+                        dumps(self.contentstore.get_assets_policy(assets), sort_keys=True, indent=4).encode('utf-8'),
+                    )
+
+                    for file_path in sorted(all_files - files_before_static_assets):
+                        _add_file_to_tarball(tar_file, relpath(file_path), memory_fs.readbytes(file_path))
+
+    def _export_static_assets(self, static_dir, policy_file):
+        """
+        Export the static assets of the courselike from the contentstore to `static_dir`, and their policy to
+        `policy_file`, both under `root_dir`.  When exporting to a tarball, the assets are instead written to
+        the tarball after the files written so far.
+        """
+        if self._tarball_fs is not None:
+            self._files_before_static_assets = set(self._tarball_fs.walk.files())
+        else:
+            self.contentstore.export_all_for_course(
+                self.courselike_key,
+                self.root_dir + '/' + self.target_dir + '/' + static_dir,
+                self.root_dir + '/' + self.target_dir + '/' + policy_file,
+            )
+
+    def _export(self, fsm):
+        """
+        Perform the export to the given filesystem.
+        """
         with self.modulestore.bulk_operations(self.courselike_key):
 
-            fsm = OSFS(self.root_dir)
             root = lxml.etree.Element('unknown')
 
             # export only the published content
@@ -177,7 +252,7 @@ class ExportManager:
             self.process_root(root, export_fs)
 
             # Process extra items-- drafts, assets, etc
-            root_courselike_dir = self.root_dir + '/' + self.target_dir
+            root_courselike_dir = self.root_dir + '/' + self.target_dir if self.root_dir is not None else None
             self.process_extra(root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs)
 
             # Any last pass adjustments
@@ -207,26 +282,20 @@ class CourseExportManager(ExportManager):
 
     def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
         # Export the modulestore's asset metadata.
-        asset_dir = root_courselike_dir + '/' + AssetMetadata.EXPORTED_ASSET_DIR + '/'
-        if not os.path.isdir(asset_dir):
-            os.makedirs(asset_dir)
+        asset_dir = export_fs.makedirs(AssetMetadata.EXPORTED_ASSET_DIR, recreate=True)
         asset_root = lxml.etree.Element(AssetMetadata.ALL_ASSETS_XML_TAG)
         course_assets = self.modulestore.get_all_asset_metadata(self.courselike_key, None)
         for asset_md in course_assets:
             # All asset types are exported using the "asset" tag - but their asset type is specified in each asset key.
             asset = lxml.etree.SubElement(asset_root, AssetMetadata.ASSET_XML_TAG)
             asset_md.to_xml(asset)
-        with OSFS(asset_dir).open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
+        with asset_dir.open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
             lxml.etree.ElementTree(asset_root).write(asset_xml_file, encoding='utf-8')
 
         # export the static assets
         policies_dir = export_fs.makedir('policies', recreate=True)
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
-            )
+            self._export_static_assets('static/', 'policies/assets.json')
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -241,10 +310,8 @@ class CourseExportManager(ExportManager):
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_courselike_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open('course_image.jpg', 'wb') as course_image_file:
+                    output_dir = export_fs.makedirs('static/images', recreate=True)
+                    with output_dir.open('course_image.jpg', 'wb') as course_image_file:
                         course_image_file.write(course_image.data)
 
         # export the static tabs
@@ -330,11 +397,7 @@ class LibraryExportManager(ExportManager):
         export_fs.makedir('policies', recreate=True)
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
-            )
+            self._export_static_assets('static/', 'policies/assets.json')
 
     def post_process(self, root, export_fs):
         """
@@ -363,6 +426,48 @@ def export_library_to_xml(modulestore, contentstore, library_key, root_dir, libr
     LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
 
 
+def export_course_to_tarball(modulestore, contentstore, course_key, course_dir, fileobj,
+                             max_workers=DEFAULT_EXPORT_WORKERS):
+    """
+    Thin wrapper for the Course Export Manager. See ExportManager.export_to_tarball for details.
+    """
+    CourseExportManager(modulestore, contentstore, course_key, None, course_dir).export_to_tarball(
+        fileobj, max_workers,
+    )
+
+
+def export_library_to_tarball(modulestore, contentstore, library_key, library_dir, fileobj,
+                              max_workers=DEFAULT_EXPORT_WORKERS):
+    """
+    Thin wrapper for the Library Export Manager. See ExportManager.export_to_tarball for details.
+    """
+    LibraryExportManager(modulestore, contentstore, library_key, None, library_dir).export_to_tarball(
+        fileobj, max_workers,
+    )
+
+
+def _add_directory_to_tarball(tar_file, path):
+    """
+    Add a directory with the given path to the tarball.
+    """
+    tar_info = tarfile.TarInfo(path)
+    tar_info.type = tarfile.DIRTYPE
+    tar_info.mode = 0o755
+    tar_info.mtime = time.time()
+    tar_file.addfile(tar_info)
+
+
+def _add_file_to_tarball(tar_file, path, data):
+    """
+    Add a file with the given path and data to the tarball.
+    """
+    tar_info = tarfile.TarInfo(path)
+    tar_info.size = len(data)
+    tar_info.mode = 0o644
+    tar_info.mtime = time.time()
+    tar_file.addfile(tar_info, io.BytesIO(data))
+
+
 def adapt_references(subtree, destination_course_key, export_fs):
     """
     Map every reference in the subtree into destination_course_key and set it back into the xblock fields
@@ -21,12 +21,17 @@ Modulestore virtual   |          XML physical (draft, published)
              (a, b)   |  (a, b) | (x, b) | (x, x) | (x, y) | (a, x)
 """
 
+import hashlib
 import json
 import logging
 import mimetypes
 import os
 import re
+import time
 from abc import abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 import xblock
 from django.core.exceptions import ObjectDoesNotExist
@@ -39,7 +44,7 @@ from xblock.core import XBlockMixin
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict, Scope
 from xblock.runtime import DictKeyValueStore, KvsFieldData
 
-from common.djangoapps.util.monitoring import monitor_import_failure
+from common.djangoapps.util.monitoring import monitor_import_failure, monitor_import_phase
 from xmodule.assetstore import AssetMetadata
 from xmodule.contentstore.content import StaticContent
 from xmodule.errortracker import make_error_tracker
@@ -60,6 +65,8 @@ from .store_utilities import rewrite_nonportable_content_links
 log = logging.getLogger(__name__)
 
 DEFAULT_STATIC_CONTENT_SUBDIR = 'static'
+# The default number of static files of a courselike which are imported at once.
+DEFAULT_STATIC_IMPORT_WORKERS = 4
 
 
 class CourseImportException(Exception):
@@ -118,10 +125,14 @@ class LocationMixin(XBlockMixin):
 
 
 class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docstring
-    def __init__(self, static_content_store, course_data_path, target_id):
+    def __init__(self, static_content_store, course_data_path, target_id, max_workers=1):
         self.static_content_store = static_content_store
         self.target_id = target_id
         self.course_data_path = course_data_path
+        # The number of files which are read and saved at once by import_static_content_directory.
+        self.max_workers = max_workers
+        # The attributes of the assets which the course already has, by asset key; see import_static_file.
+        self._existing_assets = None
         try:
             with open(course_data_path / 'policies/assets.json') as f:
                 self.policy = json.load(f)
@@ -138,28 +149,52 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
         remap_dict = {}
 
         static_dir = self.course_data_path / content_subdir
-        for dirname, _, filenames in os.walk(static_dir):
-            for filename in filenames:
+        self._get_existing_assets()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # The files are imported by max_workers threads, and at most as many files again are
+            # queued to be imported, so that few files are held in memory at once.
+            pending_imports = deque()
+            for dirname, _, filenames in os.walk(static_dir):
+                for filename in filenames:
 
-                file_path = os.path.join(dirname, filename)
+                    file_path = os.path.join(dirname, filename)
 
-                if re.match(ASSET_IGNORE_REGEX, filename):
-                    if verbose:
-                        log.debug('skipping static content %s...', file_path)
-                    continue
+                    if re.match(ASSET_IGNORE_REGEX, filename):
+                        if verbose:
+                            log.debug('skipping static content %s...', file_path)
+                        continue
 
-                if verbose:
-                    log.debug('importing static content %s...', file_path)
+                    if verbose:
+                        log.debug('importing static content %s...', file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
+                    pending_imports.append(executor.submit(self.import_static_file, file_path, base_dir=static_dir))
+                    if len(pending_imports) > 2 * self.max_workers:
+                        self._add_remapping(remap_dict, pending_imports.popleft().result())
 
-                if imported_file_attrs:
-                    # store the remapping information which will be needed
-                    # to subsitute in the module data
-                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+            while pending_imports:
+                self._add_remapping(remap_dict, pending_imports.popleft().result())
 
         return remap_dict
 
+    @staticmethod
+    def _add_remapping(remap_dict, imported_file_attrs):
+        """
+        Adds the subpath and asset key returned by import_static_file, if any, to remap_dict.
+        """
+        if imported_file_attrs:
+            # store the remapping information which will be needed
+            # to subsitute in the module data
+            remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+
+    def _get_existing_assets(self):
+        """
+        Returns the attributes of the assets which the course already has, by asset key.
+        They are fetched once, when the first file is imported.
+        """
+        if self._existing_assets is None:
+            self._existing_assets = self.static_content_store.get_content_digests_for_course(self.target_id)
+        return self._existing_assets
+
     def import_static_file(self, full_file_path, base_dir):  # lint-amnesty, pylint: disable=missing-function-docstring
         filename = os.path.basename(full_file_path)
         try:
@@ -192,6 +227,16 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
         # Check extracted contentType in list of all valid mimetypes
         if not mime_type or mime_type not in self.mimetypes_list:
             mime_type = mimetypes.guess_type(filename)[0]  # Assign guessed mimetype
+        # Content which the course already has with the same attributes, such as when a course
+        # is exported and imported again, is left as it is rather than saved again.
+        existing_asset = self._get_existing_assets().get(str(asset_key))
+        if existing_asset and existing_asset.get('custom_md5') == hashlib.md5(data).hexdigest() and (
+            existing_asset.get('displayname'), existing_asset.get('contentType'),
+            existing_asset.get('import_path'), existing_asset.get('locked', False),
+        ) == (displayname, mime_type, file_subpath, locked):
+            log.debug('static content %s is unchanged', file_subpath)
+            return file_subpath, asset_key
+
         content = StaticContent(
             asset_key, displayname, mime_type, data,
             import_path=file_subpath, locked=locked
@@ -255,7 +300,12 @@ class ImportManager:
         python_lib_filename: The filename of the courselike's python library. Course authors can optionally
             create this file to implement custom logic in their course.
 
+        static_import_workers: The number of static files which are read and saved into static_content_store
+            at once. Files which the courselike already has with the same content and attributes are not saved.
+
         default_class, load_error_blocks: are arguments for constructing the XMLModuleStore (see its doc)
+
+    The time taken by each phase of the import is logged and reported as a custom monitoring attribute.
     """
     store_class = XMLModuleStore
 
@@ -268,6 +318,7 @@ class ImportManager:
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            static_import_workers=DEFAULT_STATIC_IMPORT_WORKERS,
     ):
         self.store = store
         self.user_id = user_id
@@ -283,17 +334,30 @@ class ImportManager:
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
-        self.xml_module_store = self.store_class(
-            data_dir,
-            default_class=default_class,
-            source_dirs=source_dirs,
-            load_error_blocks=load_error_blocks,
-            xblock_mixins=store.xblock_mixins,
-            xblock_select=store.xblock_select,
-            target_course_id=target_id,
-        )
+        self.static_import_workers = static_import_workers
+        with self.import_phase('parse'):
+            self.xml_module_store = self.store_class(
+                data_dir,
+                default_class=default_class,
+                source_dirs=source_dirs,
+                load_error_blocks=load_error_blocks,
+                xblock_mixins=store.xblock_mixins,
+                xblock_select=store.xblock_select,
+                target_course_id=target_id,
+            )
         self.logger, self.errors = make_error_tracker()
 
+    @contextmanager
+    def import_phase(self, phase):
+        """
+        Logs and reports the time taken by the given phase of the import.
+        """
+        start = time.perf_counter()
+        yield
+        duration = time.perf_counter() - start
+        log.info(f'Course import {self.target_id}: {phase} phase took {duration:.2f}s')
+        monitor_import_phase(phase, duration)
+
     def preflight(self):
         """
         Perform any pre-import sanity checks.
@@ -316,7 +380,8 @@ class ImportManager:
         static_content_importer = StaticContentImporter(
             self.static_content_store,
             course_data_path=data_path,
-            target_id=dest_id
+            target_id=dest_id,
+            max_workers=self.static_import_workers,
         )
         if self.do_import_static:
             if self.verbose:
@@ -565,24 +630,27 @@ class ImportManager:
                 source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
                 # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                with self.import_phase('static'):
+                    self.import_static(data_path, dest_id)
 
                 # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                with self.import_phase('asset_metadata'):
+                    self.import_asset_metadata(data_path, dest_id)
 
                 # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                with self.import_phase('children'):
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
             # Drafts must be imported in a separate bulk operation from published items to import properly,
             # due to the recursive_build() above creating a draft item for each course block
             # and then publishing it.
-            with self.store.bulk_operations(dest_id):
+            with self.import_phase('drafts'), self.store.bulk_operations(dest_id):
                 # Import all draft items into the courselike.
                 courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
 
-            with self.store.bulk_operations(dest_id):
+            with self.import_phase('tags'), self.store.bulk_operations(dest_id):
                 try:
                     self.import_tags(data_path, dest_id)
                 except FileNotFoundError: